@@ -1,2 +1,2 @@
-from becalib.layers import MaterialLayer, AirLayer
+from becalib.layers import MaterialLayer, AirLayer, InhomogeneousLayer
 from becalib.component import Component
\ No newline at end of file
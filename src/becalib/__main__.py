@@ -0,0 +1,4 @@
+import sys
+from becalib.cli import main
+
+sys.exit(main())
@@ -5,6 +5,30 @@ from becalib.translator import get_translator
 
 
 # Dynamic Thermal Analysis #
+def get_is_air_array(layers: list[MaterialLayer]) -> np.ndarray:
+    """air layers mask
+    Args:
+        layers (list[MaterialLayer]): ordered list of layers interior to exterior
+
+    Returns:
+        np.ndarray: bool array, True for air layers
+    """
+    return np.array([layer.is_air is True for layer in layers], dtype=bool)
+
+
+def get_layers_values_array(layers: list[MaterialLayer], attribute: str) -> np.ndarray:
+    """float64 array of a material property layer by layer, NaN for air layers
+    Args:
+        layers (list[MaterialLayer]): ordered list of layers interior to exterior
+        attribute (str): layer attribute, example "gross_density"
+
+    Returns:
+        np.ndarray: float64 values
+    """
+    return np.array([np.nan if layer.is_air is True else getattr(layer, attribute) for layer in layers],
+                    dtype=np.float64)
+
+
 def get_periodic_penetration_depth_list(
         layers: list[MaterialLayer],
         time_period:float=24
@@ -15,24 +39,16 @@ def get_periodic_penetration_depth_list(
         time_period (float, optional): analysis period in [h]. Defaults to 24 h.
 
     Returns:
-        np.ndarray: periodic penetration depths
+        np.ndarray: float64 periodic penetration depths, NaN for air layers
     """
-    
-    periodic_penetration_depth_list= []
     time_in_seconds= time_period*3600
 
-    for layer in layers:
-        if layer.is_air is False:
-            delta_layer= np.sqrt(
-                (layer.thermal_conductivity*time_in_seconds)
-                / (np.pi * layer.gross_density * layer.specific_heat_capacity)
-                )
-            periodic_penetration_depth_list.append(delta_layer)
-        else:
-            periodic_penetration_depth_list.append(None)
-
-    
-    return np.array(periodic_penetration_depth_list)
+    return np.sqrt(
+        (get_layers_values_array(layers, "thermal_conductivity") * time_in_seconds)
+        / (np.pi
+           * get_layers_values_array(layers, "gross_density")
+           * get_layers_values_array(layers, "specific_heat_capacity"))
+        )
 
 
 def get_xi_list(
@@ -43,81 +59,63 @@ def get_xi_list(
         Dimensionless quantity
     Args:
         layers (list[MaterialLayer]): ordered list of material layers interior to exterior
-        list of periodic penetration depth δ in [m] layer by layer
+        list of periodic penetration depth δ in [m] layer by layer, NaN for air layers
 
     Returns:
-        np.ndarray:  ξ = s/d
+        np.ndarray:  float64 ξ = s/d, NaN for air layers
     """
+    thicknesses = np.array([layer.thickness for layer in layers], dtype=np.float64)
 
-    xi_list=[]
-
-    i=0
-
-    for layer in layers:
-        if layer.is_air is False:
-            xi_i= layer.thickness / periodic_penetration_depth_list[i]
-            xi_list.append(xi_i)
-        else:
-            xi_list.append(None)
-        
-        i +=1
-
-    return np.array(xi_list)
+    return thicknesses / np.asarray(periodic_penetration_depth_list, dtype=np.float64)
 
 
 def get_heat_transfer_matrix_layer_list(thermal_resistances:np.ndarray,
                                         xi_list:np.ndarray,
                                         periodic_penetration_depth_list:np.ndarray,
                                         thermal_conductivities:np.ndarray,
-                                        ) -> list[np.ndarray]:
+                                        ) -> np.ndarray:
     """list of heat transfer matrix layer by layer
 
     Args:
         thermal_resistances (list[float]):array of all thermal resistances Layer by layer
-        xi_list(list): list of ξ values = s/d
+        xi_list(list): list of ξ values = s/d, NaN for air layers
         periodic_penetration_depth_list(list):periodic penetration depth δ in [m] layer by layer
         thermal_conductivities(list): thermal conductivities "λ" lambda [W/mK] Layer by Layer 
 
     Returns:
-        list[np.ndarray]: list of heat transfer matrix 
+        np.ndarray: (n_layers, 2, 2) complex heat transfer matrices
     """
         
-    resistances= np.delete(thermal_resistances, 0)
-    pp_depths = periodic_penetration_depth_list
-    conduct_ies = thermal_conductivities
-
-    ht_matrix_list: list[np.ndarray] = []  # zz : z matrix list
-    for i in range(0, len(xi_list)):
-        # z is a layer matrix 2X2 of complex values
-        z = np.zeros((2, 2), dtype=np.complex128) 
-    
-        if   xi_list[i] is None:
-            # air_layer
-            z[0][0] = 1
-            z[1][1] = z[0][0]
-            z[0][1]= -resistances[i]
-            z[1][0]=0
-
-        else: 
-            # material layer
-            z[0][0] = complex(
-                (np.cosh(xi_list[i]) * np.cos(xi_list[i])), 
-                (np.sinh(xi_list[i]) * np.sin(xi_list[i]))
-                )
-            z[1][1] = z[0][0]
-
-            z[0][1] = -(pp_depths[i] / (2 * conduct_ies[i])) * \
-                complex(
-                    (np.sinh(xi_list[i]) * np.cos(xi_list[i]) + np.cosh(xi_list[i]) * np.sin(xi_list[i])),
-                    (np.cosh(xi_list[i]) * np.sin(xi_list[i]) - np.sinh(xi_list[i]) * np.cos(xi_list[i])),
-                    )
-            z[1][0] = -(conduct_ies[i] / (pp_depths[i])) * \
-                complex(
-                    (np.sinh(xi_list[i]) * np.cos(xi_list[i]) - np.cosh(xi_list[i]) * np.sin(xi_list[i])),
-                    (np.sinh(xi_list[i]) * np.cos(xi_list[i]) + np.cosh(xi_list[i]) * np.sin(xi_list[i])),
-                    )
-        # add z to zz list
-        ht_matrix_list.append(z)
+    resistances= np.delete(thermal_resistances, 0)[:len(xi_list)]
+    xi = np.asarray(xi_list, dtype=np.float64)
+    is_air = np.isnan(xi)
+    material = ~is_air
+
+    # z is a layer matrix 2X2 of complex values
+    ht_matrix_list = np.zeros((xi.size, 2, 2), dtype=np.complex128)
+
+    # air_layer
+    ht_matrix_list[:, 0, 0] = 1
+    ht_matrix_list[:, 1, 1] = 1
+    ht_matrix_list[is_air, 0, 1] = -resistances[is_air]
+
+    # material layer
+    xi = xi[material]
+    pp_depths = np.asarray(periodic_penetration_depth_list, dtype=np.float64)[material]
+    conduct_ies = np.asarray(thermal_conductivities, dtype=np.float64)[material]
+
+    cosh_xi, sinh_xi = np.cosh(xi), np.sinh(xi)
+    cos_xi, sin_xi = np.cos(xi), np.sin(xi)
+
+    z_11 = (cosh_xi * cos_xi) + 1j * (sinh_xi * sin_xi)
+    ht_matrix_list[material, 0, 0] = z_11
+    ht_matrix_list[material, 1, 1] = z_11
+    ht_matrix_list[material, 0, 1] = -(pp_depths / (2 * conduct_ies)) * (
+        (sinh_xi * cos_xi + cosh_xi * sin_xi)
+        + 1j * (cosh_xi * sin_xi - sinh_xi * cos_xi))
+    ht_matrix_list[material, 1, 0] = -(conduct_ies / pp_depths) * (
+        (sinh_xi * cos_xi - cosh_xi * sin_xi)
+        + 1j * (sinh_xi * cos_xi + cosh_xi * sin_xi))
 
     return ht_matrix_list
 
@@ -168,18 +166,96 @@ def get_heat_transfer_matrix_component(
 
     return htm
 
+
+def get_depth_profiles(
+        ht_matrix_list: np.ndarray,
+        thicknesses: np.ndarray,
+        xi_list: np.ndarray,
+        periodic_penetration_depth_list: np.ndarray,
+        thermal_conductivities: np.ndarray,
+        thermal_resistances: np.ndarray,
+        depths: np.ndarray,
+        time_period: float = 24,
+        exterior_amplitude: float = 1,
+        ) -> dict[str, np.ndarray]:
+    """complex temperature and heat flux amplitudes through the component thickness,
+        exterior temperature wave of exterior_amplitude and constant interior temperature.
+
+        The state (θ, q) of a depth point is Z_partial · Z_k-1 ... Z_1 · Z_i · (0, q_i),
+        cumulative products of layer matrices are computed once, partial layer matrices
+        of all depth points in one vectorized pass.
+
+    Args:
+        ht_matrix_list (np.ndarray): (n_layers, 2, 2) heat transfer matrices layer by layer
+        thicknesses (np.ndarray): thickness of layers in [m]
+        xi_list (np.ndarray): ξ values, NaN for air layers
+        periodic_penetration_depth_list (np.ndarray): periodic penetration depths δ in [m], NaN for air layers
+        thermal_conductivities (np.ndarray): λ [W/mK] layer by layer
+        thermal_resistances (np.ndarray): thermal resistances including Rsi (first) and Rse (last)
+        depths (np.ndarray): distances from the interior surface in [m]
+        time_period (float, optional): analysis period in [h]. Defaults to 24 h.
+        exterior_amplitude (float, optional): exterior temperature amplitude in [K]. Defaults to 1 K.
+
+    Returns:
+        dict[str, np.ndarray]: by depth point: "depths" [m], complex "temperatures" [K] and
+            "heat_fluxes" [W/m²] (positive towards exterior), "temperature_amplitudes" [K],
+            "temperature_time_shifts" [h] (delay on the exterior wave), "heat_flux_amplitudes" [W/m²]
+    """
+    thicknesses = np.asarray(thicknesses, dtype=np.float64)
+    depths = np.asarray(depths, dtype=np.float64)
+    n_layers = thicknesses.size
+    rsi, rse = thermal_resistances[0], thermal_resistances[-1]
+
+    # cumulative products P_k = Z_k ... Z_1 · Z_i, P_0 = Z_i
+    products = np.zeros((n_layers + 1, 2, 2), dtype=np.complex128)
+    products[0] = [[1, -rsi], [0, 1]]
+    for k in range(n_layers):
+        products[k + 1] = ht_matrix_list[k] @ products[k]
+
+    # interior heat flux from the exterior wave: θe = (Z_e · P_N)_12 · q_i
+    z_12 = products[-1, 0, 1] - rse * products[-1, 1, 1]
+    heat_flux_int = exterior_amplitude / z_12
+
+    # layer of each depth point, points on a boundary belong to the next layer
+    boundaries = np.concatenate([[0], np.cumsum(thicknesses)])
+    layer_index = np.clip(np.searchsorted(boundaries, depths, side="right") - 1, 0, n_layers - 1)
+    layer_thicknesses = thicknesses[layer_index]
+    fractions = np.divide(depths - boundaries[layer_index], layer_thicknesses,
+                          out=np.zeros(depths.shape), where=layer_thicknesses > 0)
+
+    # partial layer matrices: ξ and air resistances scale with the covered thickness
+    partial_matrices = get_heat_transfer_matrix_layer_list(
+        thermal_resistances=np.concatenate([[rsi], thermal_resistances[1:-1][layer_index] * fractions]),
+        xi_list=np.asarray(xi_list, dtype=np.float64)[layer_index] * fractions,
+        periodic_penetration_depth_list=np.asarray(periodic_penetration_depth_list, dtype=np.float64)[layer_index],
+        thermal_conductivities=np.asarray(thermal_conductivities, dtype=np.float64)[layer_index])
+
+    # state (θ, q) of each point, interior temperature amplitude 0
+    columns = (partial_matrices @ products[layer_index])[:, :, 1] * heat_flux_int
+    temperatures, heat_fluxes = columns[:, 0], columns[:, 1]
+
+    return {
+        "depths": depths,
+        "temperatures": temperatures,
+        "heat_fluxes": heat_fluxes,
+        "temperature_amplitudes": np.abs(temperatures),
+        "temperature_time_shifts": np.mod(-np.angle(temperatures) * time_period / (2 * np.pi), time_period),
+        "heat_flux_amplitudes": np.abs(heat_fluxes),
+    }
+
 def get_periodic_thermal_transmittance(heat_transfer_matrix_component) -> float:
     """periodic_thermal_transmittance component value \n
         Yie in W/m²K
 
     Args:
         heat_transfer_matrix_component(array): heat transfer matrix f multi layers components
+            or stack of matrices of shape (..., 2, 2)
 
     Returns:
-        float: Yie in W/m²K
+        float: Yie in W/m²K (array for a stack of matrices)
     """
 
-    Z_12  = heat_transfer_matrix_component[0][1]
+    Z_12  = heat_transfer_matrix_component[..., 0, 1]
 
     mod_Z_12 = np.sqrt((Z_12.real) ** 2 + (Z_12.imag) ** 2) # modulo 
 
@@ -216,7 +292,7 @@ def get_time_shift(heat_transfer_matrix_component,
     """
 
     htm = heat_transfer_matrix_component
-    htm_12= htm[0][1]
+    htm_12= htm[..., 0, 1]
 
     phase=(np.arctan2(htm_12.imag, htm_12.real)) * time_period / (2 * np.pi)
 
@@ -234,7 +310,7 @@ def get_thermal_admittance_int(heat_transfer_matrix_component) -> float:
     """
     htm = heat_transfer_matrix_component
 
-    Y_ii = -htm[0][0] / htm[0][1]
+    Y_ii = -htm[..., 0, 0] / htm[..., 0, 1]
     Y_ii = np.sqrt((Y_ii.real) ** 2 + (Y_ii.imag) ** 2)  # the module
 
     return Y_ii
@@ -252,7 +328,7 @@ def get_thermal_admittance_ext(heat_transfer_matrix_component) -> float:
 
     htm = heat_transfer_matrix_component
 
-    Y_ee = -htm[1][1] / htm[0][1]
+    Y_ee = -htm[..., 1, 1] / htm[..., 0, 1]
     Y_ee = np.sqrt((Y_ee.real) ** 2 + (Y_ee.imag) ** 2)  # the module
 
     return Y_ee
@@ -276,8 +352,8 @@ def get_areal_heat_capacity_int(heat_transfer_matrix_component,
         (time_period * 3600)
         / (2 * np.pi)
         * np.sqrt(
-            (((htm[0][0] - 1) / htm[0][1]).real) ** 2
-            + (((htm[0][0] - 1) / htm[0][1]).imag) ** 2
+            (((htm[..., 0, 0] - 1) / htm[..., 0, 1]).real) ** 2
+            + (((htm[..., 0, 0] - 1) / htm[..., 0, 1]).imag) ** 2
         )
     ) / 1000  # kJ/m2 K
 
@@ -300,8 +376,8 @@ def get_areal_heat_capacity_ext(heat_transfer_matrix_component,
         (time_period * 3600)
         / (2 * np.pi)
         * np.sqrt(
-            (((htm[1][1] - 1) / htm[0][1]).real) ** 2
-            + (((htm[1][1] - 1) / htm[0][1]).imag) ** 2
+            (((htm[..., 1, 1] - 1) / htm[..., 0, 1]).real) ** 2
+            + (((htm[..., 1, 1] - 1) / htm[..., 0, 1]).imag) ** 2
         )
     ) / 1000  
 
@@ -318,17 +394,12 @@ def get_areal_heat_capacity_component(
         float: [kJ/m²K]
     """
 
-    areal_heat_capacity_list=[]
-
-    for layer in layers:
-        if layer.is_air is False:
-            areal_heat_capacity_list.append(layer.gross_density*layer.thickness*layer.specific_heat_capacity)
+    areal_heat_capacities = (get_layers_values_array(layers, "gross_density")
+                             * np.array([layer.thickness for layer in layers], dtype=np.float64)
+                             * get_layers_values_array(layers, "specific_heat_capacity"))
 
-        else:
-            #TODO check if 0 is ok for air layer
-            areal_heat_capacity_list.append(0)
-
-    return np.sum(np.array(areal_heat_capacity_list))/1000
+    #TODO check if 0 is ok for air layer
+    return np.sum(np.where(get_is_air_array(layers), 0, areal_heat_capacities))/1000
 
 
 def get_time_constant(areal_heat_capacity_component,thermal_resistance_component)->float:
@@ -343,6 +414,65 @@ def get_time_constant(areal_heat_capacity_component,thermal_resistance_component
     return areal_heat_capacity_component*thermal_resistance_component*1000/3600
 
 
+# DM 26/06/2009 scores, index = class code
+# (msgids translated at render time by get_threshold_labels_italian_dm_26_06_2009)
+THRESHOLD_LABELS_ITALIAN_DM_26_06_2009 = (
+    "Impossible score",
+    "Poor 1/5",
+    "Sufficient 2/5",
+    "Medium 3/5",
+    "Good 4/5",
+    "Excellent 5/5",
+)
+
+
+def get_threshold_codes_italian_dm_26_06_2009(
+        time_shift,
+        decrement_factor) -> np.ndarray:
+    """vectorized class codes in accordance with italian rule DM 26/06/2009 \n
+        5: Excellent, 4: Good, 3: Medium, 2: Sufficient, 1: Poor, 0: Impossible score
+
+    Args:
+        time_shift(float | np.ndarray): in hours
+        decrement_factor(float | np.ndarray): [-]
+
+    Returns:
+        np.ndarray: int8 codes, index of THRESHOLD_LABELS_ITALIAN_DM_26_06_2009
+    """
+    time_shift = np.asarray(time_shift)
+    decrement_factor = np.asarray(decrement_factor)
+
+    # first true condition wins, NaN values give 0 (Impossible score)
+    conditions = [
+        (time_shift > 12) & (decrement_factor < 0.15),
+        (10 < time_shift) & (time_shift <= 12) & (0.15 <= decrement_factor) & (decrement_factor < 0.3),
+        (8 < time_shift) & (time_shift <= 10) & (0.3 <= decrement_factor) & (decrement_factor < 0.4),
+        (6 < time_shift) & (time_shift <= 8) & (0.4 <= decrement_factor) & (decrement_factor < 0.6),
+        (time_shift <= 6) & (0.6 <= decrement_factor),
+    ]
+    return np.select(conditions, [5, 4, 3, 2, 1], default=0).astype(np.int8)
+
+
+def get_threshold_labels_italian_dm_26_06_2009(
+        codes,
+        language:str="en") -> np.ndarray:
+    """translated scores of DM 26/06/2009 class codes,
+        each label is translated once
+
+    Args:
+        codes(int | np.ndarray): class codes, see get_threshold_codes_italian_dm_26_06_2009
+        language(str): en, fr, etc
+
+    Returns:
+        np.ndarray: str scores
+    """
+    _=get_translator(language=language)
+
+    labels = np.array([_(label) for label in THRESHOLD_LABELS_ITALIAN_DM_26_06_2009])
+
+    return labels[np.asarray(codes)]
+
+
 def get_threshold_values_italian_dm_26_06_2009(
         time_shift:float,
         decrement_factor:float,
@@ -366,22 +496,9 @@ def get_threshold_values_italian_dm_26_06_2009(
     """
     _=get_translator(language=language)
 
-    if time_shift >12 and decrement_factor<0.15:
-        return _("Excellent 5/5") 
-    
-    elif (10<time_shift <=12) and (0.15 <= decrement_factor<0.3):
-        return _("Good 4/5")
-    
-    elif (8<time_shift <=10) and (0.3 <= decrement_factor<0.4):
-        return _("Medium 3/5") 
-    
-    elif (6<time_shift <=8) and (0.4 <= decrement_factor<0.6):
-        return _("Sufficient 2/5") 
-    
-    elif time_shift <=6 and (0.6 <= decrement_factor):
-        return _("Poor 1/5") 
-    else:
-        return _("Impossible score") 
+    code = get_threshold_codes_italian_dm_26_06_2009(time_shift, decrement_factor)
+
+    return _(THRESHOLD_LABELS_ITALIAN_DM_26_06_2009[int(code)])
     
 
 def get_mass_component(layers: list[MaterialLayer]) -> float:
@@ -392,15 +509,11 @@ def get_mass_component(layers: list[MaterialLayer]) -> float:
     Returns:
         float: component mass per square meters in [kg/m²]
     """
-    mass_list = []
-    for layer in layers:
-        if layer.is_air is False:
-            mass_list.append(layer.gross_density*layer.thickness)
-        else:
-            # if air add 0
-            mass_list.append(0)
-
-    return np.sum(np.array(mass_list))
+    masses = (get_layers_values_array(layers, "gross_density")
+              * np.array([layer.thickness for layer in layers], dtype=np.float64))
+
+    # if air add 0
+    return np.sum(np.where(get_is_air_array(layers), 0, masses))
 
 
 
@@ -0,0 +1,976 @@
+import collections
+import concurrent.futures
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from becalib.layers import LayerBase, InhomogeneousLayer
+from becalib.definitions import get_layers_from_definition
+from becalib.air_resistances import get_surface_resistances, get_resistance_unventilated_air_layer
+from becalib.algos import (
+    get_periodic_thermal_transmittance,
+    get_decrement_factor,
+    get_time_shift,
+    get_thermal_admittance_int,
+    get_thermal_admittance_ext,
+    get_areal_heat_capacity_int,
+    get_areal_heat_capacity_ext,
+    get_time_constant,
+    get_threshold_codes_italian_dm_26_06_2009,
+)
+
+
+# Names of the batch outputs, same names as Component attributes
+BATCH_OUTPUTS = (
+    "thickness_component",
+    "thermal_resistance_component",
+    "thermal_resistance_upper_limit",
+    "thermal_resistance_lower_limit",
+    "thermal_transmittance_component",
+    "periodic_thermal_transmittance",
+    "decrement_factor",
+    "time_shift",
+    "thermal_admittance_int",
+    "thermal_admittance_ext",
+    "areal_heat_capacity_int",
+    "areal_heat_capacity_ext",
+    "areal_heat_capacity_component",
+    "time_constant",
+    "mass_component",
+    "threshold_code_italian_dm_26_06_2009",
+)
+
+# outputs needing the heat transfer matrices
+DYNAMIC_OUTPUTS = (
+    "periodic_thermal_transmittance",
+    "decrement_factor",
+    "time_shift",
+    "thermal_admittance_int",
+    "thermal_admittance_ext",
+    "areal_heat_capacity_int",
+    "areal_heat_capacity_ext",
+    "threshold_code_italian_dm_26_06_2009",
+)
+
+HEAT_FLOW_DIRECTIONS = ("Ho", "Up", "Do")
+
+# precision: float dtype of layer inputs and outputs (complex matrices follow)
+PRECISIONS = {"double": np.float64, "single": np.float32}
+
+# float layer arrays, cast to the precision dtype
+FLOAT_LAYER_ARRAYS = ("thicknesses", "thermal_conductivities", "gross_densities", "specific_heat_capacities")
+
+
+def get_layers_arrays(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str = "Ho",
+        ) -> dict[str, np.ndarray]:
+    """padded 2D arrays (components x layers) of layer inputs
+
+        Components with less layers are padded with air layers of 0 m
+        (R = 0), their heat transfer matrix is the identity matrix.
+        Layer objects are only read, never modified.
+
+        Components with InhomogeneousLayer are expanded into one row by
+        section path (see get_section_paths), "section_weights" and
+        "component_index" are then added.
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        heat_flow_directions (list[str] | str, optional): "Ho", "Up" or "Do" by component. Defaults to "Ho".
+
+    Returns:
+        dict[str, np.ndarray]: "thicknesses", "thermal_conductivities", "gross_densities",
+            "specific_heat_capacities", "vapour_resistance_factors" (NaN if unknown), "is_air"
+            (n, n_layers) and "heat_flow_directions" (n,)
+    """
+    n_components = len(layers_list)
+
+    if isinstance(heat_flow_directions, str):
+        heat_flow_directions = [heat_flow_directions] * n_components
+
+    if len(heat_flow_directions) != n_components:
+        raise ValueError("heat_flow_directions: one direction by component is needed")
+
+    if any(isinstance(layer, InhomogeneousLayer) for layers in layers_list for layer in layers):
+        paths_list, section_weights, component_index = get_section_paths(layers_list)
+        layers_arrays = get_layers_arrays(
+            paths_list,
+            [heat_flow_directions[i] for i in component_index])
+        layers_arrays["section_weights"] = section_weights
+        layers_arrays["component_index"] = component_index
+        return layers_arrays
+
+    n_layers = max((len(layers) for layers in layers_list), default=0)
+
+    shape = (n_components, n_layers)
+    thicknesses = np.zeros(shape)
+    thermal_conductivities = np.zeros(shape)
+    gross_densities = np.zeros(shape)
+    specific_heat_capacities = np.zeros(shape)
+    vapour_resistance_factors = np.ones(shape)
+    is_air = np.ones(shape, dtype=bool)
+
+    for i, layers in enumerate(layers_list):
+        for j, layer in enumerate(layers):
+            thicknesses[i, j] = layer.thickness
+            if layer.is_air is False:
+                is_air[i, j] = False
+                thermal_conductivities[i, j] = layer.thermal_conductivity
+                gross_densities[i, j] = layer.gross_density
+                specific_heat_capacities[i, j] = layer.specific_heat_capacity
+                if layer.vapour_resistance_factor is None:
+                    vapour_resistance_factors[i, j] = np.nan
+                else:
+                    vapour_resistance_factors[i, j] = layer.vapour_resistance_factor
+
+    return {
+        "thicknesses": thicknesses,
+        "thermal_conductivities": thermal_conductivities,
+        "gross_densities": gross_densities,
+        "specific_heat_capacities": specific_heat_capacities,
+        "vapour_resistance_factors": vapour_resistance_factors,
+        "is_air": is_air,
+        "heat_flow_directions": np.array(heat_flow_directions, dtype="<U2").reshape(n_components),
+    }
+
+
+def get_section_paths(layers_list: list[list[LayerBase]]) -> tuple:
+    """homogeneous section paths of components with inhomogeneous layers
+        (ISO 6946 combined method)
+
+        Each path crosses the whole component through one section of each
+        inhomogeneous layer, its fractional area is the product of section
+        fractional areas. Paths of a component are consecutive.
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+
+    Returns:
+        tuple: (paths layers list, fractional areas (n_paths,), component index (n_paths,))
+    """
+    paths_list = []
+    section_weights = []
+    component_index = []
+
+    for i, layers in enumerate(layers_list):
+        options = [layer.sections if isinstance(layer, InhomogeneousLayer) else [(1.0, layer)]
+                   for layer in layers]
+        for path in itertools.product(*options):
+            paths_list.append([layer for _fraction, layer in path])
+            section_weights.append(np.prod([fraction for fraction, _layer in path]))
+            component_index.append(i)
+
+    return paths_list, np.array(section_weights, dtype=float), np.array(component_index, dtype=np.int64)
+
+
+def combine_heat_transfer_matrices(
+        heat_transfer_matrices: np.ndarray,
+        section_weights: np.ndarray,
+        component_index: np.ndarray,
+        ) -> np.ndarray:
+    """equivalent heat transfer matrix of parallel section paths
+
+        Heat flow rates of the paths add up (area-weighted):
+        1/Z_12 = Σ f/Z_12,m   Z_11/Z_12 = Σ f Z_11,m/Z_12,m   Z_22/Z_12 = Σ f Z_22,m/Z_12,m
+        so periodic transmittance, admittances and areal heat capacities
+        are the area-weighted complex values of the paths.
+
+    Args:
+        heat_transfer_matrices (np.ndarray): (n_paths, 2, 2) heat transfer matrices of paths
+        section_weights (np.ndarray): (n_paths,) fractional areas
+        component_index (np.ndarray): (n_paths,) component of each path, consecutive
+
+    Returns:
+        np.ndarray: (n_components, 2, 2) equivalent heat transfer matrices
+    """
+    starts = _get_first_path_index(component_index)
+    z_12 = heat_transfer_matrices[:, 0, 1]
+
+    z_12_c = 1 / np.add.reduceat(section_weights / z_12, starts)
+    z_11_c = z_12_c * np.add.reduceat(section_weights * heat_transfer_matrices[:, 0, 0] / z_12, starts)
+    z_22_c = z_12_c * np.add.reduceat(section_weights * heat_transfer_matrices[:, 1, 1] / z_12, starts)
+
+    htm = np.empty((starts.size, 2, 2), dtype=heat_transfer_matrices.dtype)
+    htm[:, 0, 0] = z_11_c
+    htm[:, 0, 1] = z_12_c
+    htm[:, 1, 1] = z_22_c
+    # det(Z) = 1
+    htm[:, 1, 0] = (z_11_c * z_22_c - 1) / z_12_c
+
+    return htm
+
+
+def _get_first_path_index(component_index: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, component_index[1:] != component_index[:-1]])
+
+
+def get_surface_resistances_array(heat_flow_directions: np.ndarray) -> tuple:
+    """Surface resistances Rsi and Rse component by component
+
+    Args:
+        heat_flow_directions (np.ndarray): "Ho", "Up" or "Do" by component
+
+    Returns:
+        tuple: (Rsi, Rse) arrays in [m²K/W]
+    """
+    rsi = np.full(heat_flow_directions.shape, np.nan)
+    rse = np.full(heat_flow_directions.shape, np.nan)
+
+    for direction in HEAT_FLOW_DIRECTIONS:
+        rows = heat_flow_directions == direction
+        rsi[rows], rse[rows] = get_surface_resistances(heat_flow_direction=direction)
+
+    if np.isnan(rsi).any():
+        invalid = heat_flow_directions[np.isnan(rsi)][0]
+        # raise the same error as the scalar function
+        get_surface_resistances(heat_flow_direction=invalid)
+
+    return rsi, rse
+
+
+def get_thermal_resistances_array(
+        thicknesses: np.ndarray,
+        thermal_conductivities: np.ndarray,
+        is_air: np.ndarray,
+        heat_flow_directions: np.ndarray,
+        ) -> np.ndarray:
+    """thermal resistances layer by layer (surface resistances excluded)
+        d/λ for material layers, ISO 6946 table for air layers
+
+    Args:
+        thicknesses (np.ndarray): (n, n_layers) in [m]
+        thermal_conductivities (np.ndarray): (n, n_layers) in [W/mK]
+        is_air (np.ndarray): (n, n_layers) air layers mask
+        heat_flow_directions (np.ndarray): (n,) "Ho", "Up" or "Do"
+
+    Returns:
+        np.ndarray: (n, n_layers) in [m²K/W]
+    """
+    resistances = np.zeros(thicknesses.shape, dtype=thicknesses.dtype)
+
+    material = ~is_air
+    resistances[material] = thicknesses[material] / thermal_conductivities[material]
+
+    for direction in HEAT_FLOW_DIRECTIONS:
+        rows = (heat_flow_directions == direction)[:, np.newaxis] & is_air
+        if rows.any():
+            resistances[rows] = get_resistance_unventilated_air_layer(
+                heat_flow_direction=direction,
+                thickness=thicknesses[rows])
+
+    return resistances
+
+
+def get_heat_transfer_matrices(
+        thicknesses: np.ndarray,
+        thermal_conductivities: np.ndarray,
+        gross_densities: np.ndarray,
+        specific_heat_capacities: np.ndarray,
+        thermal_resistances: np.ndarray,
+        is_air: np.ndarray,
+        time_period: float | np.ndarray = 24,
+        ) -> np.ndarray:
+    """heat transfer matrices of all layers of all components (ISO 13786)
+        same values as get_heat_transfer_matrix_layer_list in one vectorized pass
+
+    Args:
+        thicknesses (np.ndarray): (n, n_layers) in [m]
+        thermal_conductivities (np.ndarray): (n, n_layers) in [W/mK]
+        gross_densities (np.ndarray): (n, n_layers) in [kg/m³]
+        specific_heat_capacities (np.ndarray): (n, n_layers) in [J/kgK]
+        thermal_resistances (np.ndarray): (n, n_layers) in [m²K/W], surface resistances excluded
+        is_air (np.ndarray): (n, n_layers) air layers mask
+        time_period (float | np.ndarray, optional): analysis period in [h], scalar or one by component. Defaults to 24 h.
+
+    Returns:
+        np.ndarray: (n, n_layers, 2, 2) complex matrices, complex64 for float32 inputs
+    """
+    shape = thicknesses.shape
+    z = np.zeros(shape + (2, 2), dtype=np.result_type(thicknesses.dtype, np.complex64))
+
+    # air layers (and padding): pure resistance
+    z[..., 0, 0] = 1
+    z[..., 1, 1] = 1
+    z[..., 0, 1] = np.where(is_air, -thermal_resistances, 0)
+
+    material = ~is_air
+    time_in_seconds = np.broadcast_to(
+        np.reshape(np.asarray(time_period, dtype=thicknesses.dtype), (-1, 1)), shape)[material] * 3600
+
+    conductivities = thermal_conductivities[material]
+
+    # periodic penetration depth δ and ξ = d/δ
+    pp_depths = np.sqrt(
+        (conductivities * time_in_seconds)
+        / (np.pi * gross_densities[material] * specific_heat_capacities[material])
+        )
+    xi = thicknesses[material] / pp_depths
+
+    cosh_xi, sinh_xi = np.cosh(xi), np.sinh(xi)
+    cos_xi, sin_xi = np.cos(xi), np.sin(xi)
+
+    z_11 = (cosh_xi * cos_xi) + 1j * (sinh_xi * sin_xi)
+    z_12 = -(pp_depths / (2 * conductivities)) * (
+        (sinh_xi * cos_xi + cosh_xi * sin_xi)
+        + 1j * (cosh_xi * sin_xi - sinh_xi * cos_xi))
+    z_21 = -(conductivities / pp_depths) * (
+        (sinh_xi * cos_xi - cosh_xi * sin_xi)
+        + 1j * (sinh_xi * cos_xi + cosh_xi * sin_xi))
+
+    z[material, 0, 0] = z_11
+    z[material, 1, 1] = z_11
+    z[material, 0, 1] = z_12
+    z[material, 1, 0] = z_21
+
+    return z
+
+
+def _get_layer_keys(
+        thicknesses: np.ndarray,
+        thermal_conductivities: np.ndarray,
+        gross_densities: np.ndarray,
+        specific_heat_capacities: np.ndarray,
+        thermal_resistances: np.ndarray,
+        is_air: np.ndarray,
+        time_period: float | np.ndarray,
+        ) -> np.ndarray:
+    # (n_layers_total, 5) float64 keys: (λ, ρ, c, d, period) for materials,
+    # (R, 0, 0, 0, -1) for air layers, R set by air-gap thickness and heat flow direction
+    shape = thicknesses.shape
+    time_periods = np.broadcast_to(np.reshape(np.asarray(time_period, dtype=float), (-1, 1)), shape)
+    keys = np.stack([
+        np.where(is_air, thermal_resistances, thermal_conductivities),
+        np.where(is_air, 0, gross_densities),
+        np.where(is_air, 0, specific_heat_capacities),
+        np.where(is_air, 0, thicknesses),
+        np.where(is_air, -1, time_periods),
+        ], axis=-1).astype(np.float64).reshape(-1, 5)
+    # -0.0 and 0.0 are the same key
+    return keys + 0.0
+
+
+def _get_unique_rows(keys: np.ndarray) -> tuple:
+    if keys.shape[0] <= 64:
+        # few layers (Component): python dict of row bytes
+        index = {}
+        inverse = np.array([index.setdefault(row.tobytes(), len(index)) for row in keys], dtype=np.int64)
+        first = np.empty(len(index), dtype=np.int64)
+        first[inverse[::-1]] = np.arange(inverse.size)[::-1]
+        return first, inverse
+
+    # unique rows by a 64 bits hash of their bytes (hash table, no sort),
+    # exact rows compared to remove collisions
+    hashes = np.zeros(keys.shape[0], dtype=np.uint64)
+    for column in np.ascontiguousarray(keys).view(np.uint64).T:
+        hashes = (hashes * np.uint64(1000003)) ^ column
+    inverse, unique = pd.factorize(hashes)
+    first = np.empty(unique.size, dtype=np.int64)
+    # reversed assignment: first occurrence is written last
+    first[inverse[::-1]] = np.arange(inverse.size)[::-1]
+    if not np.array_equal(keys, keys[first][inverse]):
+        # hash collision, slower exact unique rows
+        rows = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+        _unique, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    return first, inverse
+
+
+class LayerMatrixCache():
+    def __init__(self, max_size: int = 4096):
+        """bounded (least recently used) cache of layer heat transfer matrices,
+            shared by components using the same layers.
+            Keys: (λ, ρ, c, thickness, period) for material layers and the air-gap
+            resistance (thickness, heat flow direction) for air layers.
+
+        Args:
+            max_size (int, optional): max number of cached matrices (0 disables the cache). Defaults to 4096.
+                Batches with more distinct layers than max_size are computed without cache.
+        """
+        self.max_size = max_size
+
+        self._matrices = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_heat_transfer_matrices(
+            self,
+            thicknesses: np.ndarray,
+            thermal_conductivities: np.ndarray,
+            gross_densities: np.ndarray,
+            specific_heat_capacities: np.ndarray,
+            thermal_resistances: np.ndarray,
+            is_air: np.ndarray,
+            time_period: float | np.ndarray = 24,
+            ) -> np.ndarray:
+        """same values as get_heat_transfer_matrices, matrices are gathered from the cache
+            and only distinct missing layers are computed
+
+        Returns:
+            np.ndarray: (n, n_layers, 2, 2) complex matrices
+        """
+        shape = thicknesses.shape
+        keys = _get_layer_keys(thicknesses, thermal_conductivities, gross_densities,
+                               specific_heat_capacities, thermal_resistances, is_air, time_period)
+        first, inverse = _get_unique_rows(keys)
+
+        if first.size > self.max_size:
+            # too many distinct layers to be cached
+            with self._lock:
+                self.misses += keys.shape[0]
+            return get_heat_transfer_matrices(thicknesses, thermal_conductivities, gross_densities,
+                                              specific_heat_capacities, thermal_resistances, is_air, time_period)
+
+        unique_keys = keys[first]
+        unique_matrices = np.empty((first.size, 2, 2), dtype=np.complex128)
+        missing = np.ones(first.size, dtype=bool)
+        key_bytes = [row.tobytes() for row in unique_keys]
+        with self._lock:
+            for i, key in enumerate(key_bytes):
+                matrix = self._matrices.get(key)
+                if matrix is not None:
+                    self._matrices.move_to_end(key)
+                    unique_matrices[i] = matrix
+                    missing[i] = False
+
+        # computed once by distinct missing layer
+        if missing.any():
+            missing_keys = unique_keys[missing]
+            missing_is_air = missing_keys[:, 4] < 0
+            unique_matrices[missing] = get_heat_transfer_matrices(
+                thicknesses=missing_keys[:, [3]],
+                thermal_conductivities=missing_keys[:, [0]],
+                gross_densities=missing_keys[:, [1]],
+                specific_heat_capacities=missing_keys[:, [2]],
+                thermal_resistances=missing_keys[:, [0]],
+                is_air=missing_is_air[:, np.newaxis],
+                time_period=np.where(missing_is_air, 24, missing_keys[:, 4]))[:, 0]
+
+        with self._lock:
+            n_missing = int(np.count_nonzero(missing))
+            self.misses += n_missing
+            self.hits += keys.shape[0] - n_missing
+            for i in np.flatnonzero(missing):
+                # copy: a view would keep the whole unique_matrices buffer alive
+                self._matrices[key_bytes[i]] = unique_matrices[i].copy()
+            while len(self._matrices) > self.max_size:
+                self._matrices.popitem(last=False)
+
+        return unique_matrices[inverse].reshape(shape + (2, 2))
+
+    def get_stats(self) -> dict:
+        """cache statistics, one lookup by layer
+
+        Returns:
+            dict: "size", "max_size", "hits", "misses", "hit_rate"
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._matrices),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """remove all cached matrices and reset statistics
+        """
+        with self._lock:
+            self._matrices.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# cache shared by Component and batch evaluations
+LAYER_MATRIX_CACHE = LayerMatrixCache()
+
+
+def get_heat_transfer_matrix_components(
+        heat_transfer_matrices: np.ndarray,
+        surface_thermal_resistance_int: np.ndarray,
+        surface_thermal_resistance_ext: np.ndarray,
+        ) -> np.ndarray:
+    """heat transfer matrix of each component
+        Z = Z_e * Z_N * ... * Z_2 * Z_1 * Z_i
+
+    Args:
+        heat_transfer_matrices (np.ndarray): (n, n_layers, 2, 2) layer matrices
+        surface_thermal_resistance_int (np.ndarray): (n,) Rsi
+        surface_thermal_resistance_ext (np.ndarray): (n,) Rse
+
+    Returns:
+        np.ndarray: (n, 2, 2) heat transfer matrices [Z]
+    """
+    n_components, n_layers = heat_transfer_matrices.shape[:2]
+
+    z_i = np.zeros((n_components, 2, 2), dtype=heat_transfer_matrices.dtype)
+    z_i[:, 0, 0] = 1
+    z_i[:, 1, 1] = 1
+    z_e = z_i.copy()
+    z_i[:, 0, 1] = -surface_thermal_resistance_int
+    z_e[:, 0, 1] = -surface_thermal_resistance_ext
+
+    # exterior to interior, one matrix product by layer for all components
+    htm = z_e
+    for j in range(n_layers - 1, -1, -1):
+        htm = np.matmul(htm, heat_transfer_matrices[:, j])
+
+    return np.matmul(htm, z_i)
+
+
+def get_precision_dtype(precision: str) -> type:
+    """float dtype of a precision
+
+    Args:
+        precision (str): "double" (float64/complex128) or "single" (float32/complex64)
+
+    Raises:
+        ValueError: unknown precision
+
+    Returns:
+        type: numpy float dtype
+    """
+    dtype = PRECISIONS.get(precision)
+    if dtype is None:
+        raise ValueError(f"""invalid precision: {precision}
+        available choices: {", ".join(PRECISIONS)}
+        """)
+    return dtype
+
+
+def get_outputs(outputs: list[str] | None = None) -> tuple:
+    """checked tuple of output names
+
+    Args:
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS. Defaults to None = all outputs.
+
+    Raises:
+        ValueError: unknown output name
+
+    Returns:
+        tuple: output names in BATCH_OUTPUTS order
+    """
+    if outputs is None:
+        return BATCH_OUTPUTS
+
+    unknown = set(outputs) - set(BATCH_OUTPUTS)
+    if unknown:
+        raise ValueError(f"""unknown outputs: {", ".join(sorted(unknown))}
+        available choices: {", ".join(BATCH_OUTPUTS)}
+        """)
+
+    return tuple(name for name in BATCH_OUTPUTS if name in outputs)
+
+
+class BatchResults(dict):
+    """outputs of a batch evaluation, one array by name. In single precision,
+        precision_errors holds the max deviation of each output from a float64
+        reference sample (see get_precision_errors), None otherwise.
+    """
+    precision_errors = None
+
+
+def merge_precision_errors(errors_list: list[dict]) -> dict[str, dict[str, float]]:
+    """max errors of several get_precision_errors results (chunks of a run)
+
+    Args:
+        errors_list (list[dict]): results of get_precision_errors, None items are skipped
+
+    Returns:
+        dict[str, dict[str, float]]: by output "max_absolute_error" and "max_relative_error"
+    """
+    max_errors = {}
+    for errors in errors_list:
+        for name, output_errors in (errors or {}).items():
+            previous = max_errors.get(name, {})
+            max_errors[name] = {key: max(value, previous.get(key, 0.0)) for key, value in output_errors.items()}
+    return max_errors
+
+
+def _get_batch_results(
+        results: dict[str, np.ndarray],
+        layers_arrays: dict[str, np.ndarray],
+        time_period: float | np.ndarray,
+        precision: str,
+        error_sample_size: int,
+        ) -> BatchResults:
+    results = BatchResults(results)
+    if precision != "double" and error_sample_size > 0:
+        results.precision_errors = get_precision_errors(
+            layers_arrays, results, time_period=time_period, sample_size=error_sample_size)
+    return results
+
+
+def evaluate_layers_arrays(
+        layers_arrays: dict[str, np.ndarray],
+        time_period: float | np.ndarray = 24,
+        outputs: list[str] | None = None,
+        matrix_cache: LayerMatrixCache | None = LAYER_MATRIX_CACHE,
+        precision: str = "double",
+        error_sample_size: int = 100,
+        ) -> BatchResults:
+    """steady-state and dynamic values of many components in one vectorized pass,
+        section paths of inhomogeneous layers are combined with the ISO 6946 combined method:
+        R = (R' + R'')/2 and area-weighted dynamic values (see combine_heat_transfer_matrices)
+
+    Args:
+        layers_arrays (dict[str, np.ndarray]): layer inputs, see get_layers_arrays
+        time_period (float | np.ndarray, optional): analysis period in [h], scalar or one by component. Defaults to 24 h.
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS to compute. Defaults to None = all outputs.
+            Heat transfer matrices are skipped when no dynamic output is asked.
+        matrix_cache (LayerMatrixCache | None, optional): layer matrices cache. Defaults to LAYER_MATRIX_CACHE,
+            None computes all matrices.
+        precision (str, optional): "double" (float64/complex128) or "single" (float32/complex64),
+            single precision halves memory for screening, the cache (double precision) is not used,
+            see get_precision_errors. Defaults to "double".
+        error_sample_size (int, optional): number of components evaluated in double precision to
+            measure the errors of single precision results (0: no measure). Defaults to 100.
+
+    Returns:
+        BatchResults: one array by name of outputs, precision_errors in single precision
+    """
+    outputs = get_outputs(outputs)
+    dtype = get_precision_dtype(precision)
+    reference_time_period = time_period
+    if dtype is not np.float64:
+        matrix_cache = None
+
+    thicknesses, thermal_conductivities, gross_densities, specific_heat_capacities = (
+        layers_arrays[name].astype(dtype, copy=False) for name in FLOAT_LAYER_ARRAYS)
+    is_air = layers_arrays["is_air"]
+    time_period = np.asarray(time_period, dtype=dtype)
+
+    # section paths of inhomogeneous layers (ISO 6946 combined method)
+    component_index = layers_arrays.get("component_index")
+    if component_index is not None:
+        section_weights = layers_arrays["section_weights"].astype(dtype, copy=False)
+        starts = _get_first_path_index(component_index)
+        paths_time_period = time_period[component_index] if time_period.ndim else time_period
+    else:
+        paths_time_period = time_period
+
+    rsi, rse = (resistances.astype(dtype) for resistances in
+                get_surface_resistances_array(layers_arrays["heat_flow_directions"]))
+
+    ##  Steady-State Thermal Analysis ##
+    thermal_resistances = get_thermal_resistances_array(
+        thicknesses=thicknesses,
+        thermal_conductivities=thermal_conductivities,
+        is_air=is_air,
+        heat_flow_directions=layers_arrays["heat_flow_directions"])
+
+    results = {}
+    results["thickness_component"] = np.sum(thicknesses, axis=1)
+    results["thermal_resistance_component"] = rsi + rse + np.sum(thermal_resistances, axis=1)
+
+    # air layers have ρ = c = 0
+    results["mass_component"] = np.sum(gross_densities * thicknesses, axis=1)
+    results["areal_heat_capacity_component"] = np.sum(
+        gross_densities * thicknesses * specific_heat_capacities, axis=1) / 1000
+
+    if component_index is None:
+        results["thermal_resistance_upper_limit"] = results["thermal_resistance_component"]
+        results["thermal_resistance_lower_limit"] = results["thermal_resistance_component"]
+    else:
+        # upper limit: parallel section paths R' = 1/Σ(f/R_m)
+        upper_limit = 1 / np.add.reduceat(section_weights / results["thermal_resistance_component"], starts)
+
+        # lower limit: equivalent layers R_j = 1/Σ(f/R_mj) in series
+        layer_conductances = np.add.reduceat(
+            section_weights[:, np.newaxis]
+            * np.divide(1, thermal_resistances, out=np.zeros(thermal_resistances.shape, dtype=dtype),
+                        where=thermal_resistances > 0),
+            starts)
+        equivalent_resistances = np.divide(
+            1, layer_conductances, out=np.zeros(layer_conductances.shape, dtype=dtype), where=layer_conductances > 0)
+        lower_limit = rsi[starts] + rse[starts] + np.sum(equivalent_resistances, axis=1)
+
+        results["thermal_resistance_upper_limit"] = upper_limit
+        results["thermal_resistance_lower_limit"] = lower_limit
+        results["thermal_resistance_component"] = (upper_limit + lower_limit) / 2
+        results["thickness_component"] = results["thickness_component"][starts]
+        for name in ("mass_component", "areal_heat_capacity_component"):
+            results[name] = np.add.reduceat(section_weights * results[name], starts)
+
+    results["thermal_transmittance_component"] = 1 / results["thermal_resistance_component"]
+    results["time_constant"] = get_time_constant(
+        results["areal_heat_capacity_component"],
+        results["thermal_resistance_component"])
+
+    if not set(outputs) & set(DYNAMIC_OUTPUTS):
+        return _get_batch_results({name: results[name] for name in outputs}, layers_arrays,
+                                  reference_time_period, precision, error_sample_size)
+
+    ###  Dynamic Thermal Analysis ###
+    compute_matrices = get_heat_transfer_matrices if matrix_cache is None else matrix_cache.get_heat_transfer_matrices
+    htm = get_heat_transfer_matrix_components(
+        compute_matrices(
+            thicknesses=thicknesses,
+            thermal_conductivities=thermal_conductivities,
+            gross_densities=gross_densities,
+            specific_heat_capacities=specific_heat_capacities,
+            thermal_resistances=thermal_resistances,
+            is_air=is_air,
+            time_period=paths_time_period),
+        surface_thermal_resistance_int=rsi,
+        surface_thermal_resistance_ext=rse)
+
+    if component_index is not None:
+        htm = combine_heat_transfer_matrices(htm, section_weights, component_index)
+
+    results["periodic_thermal_transmittance"] = get_periodic_thermal_transmittance(htm)
+    results["decrement_factor"] = get_decrement_factor(
+        results["periodic_thermal_transmittance"],
+        results["thermal_transmittance_component"])
+    results["time_shift"] = get_time_shift(htm, time_period)
+    results["thermal_admittance_int"] = get_thermal_admittance_int(htm)
+    results["thermal_admittance_ext"] = get_thermal_admittance_ext(htm)
+    results["areal_heat_capacity_int"] = get_areal_heat_capacity_int(htm, time_period)
+    results["areal_heat_capacity_ext"] = get_areal_heat_capacity_ext(htm, time_period)
+    # class codes, labels are translated at render time
+    results["threshold_code_italian_dm_26_06_2009"] = get_threshold_codes_italian_dm_26_06_2009(
+        results["time_shift"],
+        results["decrement_factor"])
+
+    return _get_batch_results({name: results[name] for name in outputs}, layers_arrays,
+                              reference_time_period, precision, error_sample_size)
+
+
+def _get_components_arrays(layers_arrays: dict[str, np.ndarray], components: np.ndarray) -> dict[str, np.ndarray]:
+    # layers arrays of some components (sorted indexes), with their section paths
+    component_index = layers_arrays.get("component_index")
+    if component_index is None:
+        rows = components
+    else:
+        rows = np.flatnonzero(np.isin(component_index, components))
+
+    arrays = {name: values[rows] for name, values in layers_arrays.items() if name != "component_index"}
+    if component_index is not None:
+        arrays["component_index"] = np.searchsorted(components, component_index[rows])
+    return arrays
+
+
+def get_precision_errors(
+        layers_arrays: dict[str, np.ndarray],
+        results: dict[str, np.ndarray],
+        time_period: float | np.ndarray = 24,
+        sample_size: int = 1000,
+        seed: int = 0,
+        ) -> dict[str, dict[str, float]]:
+    """max deviation of reduced precision results from a float64 reference
+        evaluated on a random sample of components
+
+    Args:
+        layers_arrays (dict[str, np.ndarray]): layer inputs of results, see get_layers_arrays
+        results (dict[str, np.ndarray]): results of evaluate_layers_arrays (any precision)
+        time_period (float | np.ndarray, optional): same time_period as results. Defaults to 24 h.
+        sample_size (int, optional): number of reference components. Defaults to 1000.
+        seed (int, optional): random seed of the sample. Defaults to 0.
+
+    Returns:
+        dict[str, dict[str, float]]: by output "max_absolute_error" and "max_relative_error",
+            time shifts differences are taken on the periodic circle (23.9 h and 0.1 h differ by 0.2 h)
+    """
+    n_components = len(next(iter(results.values()))) if results else 0
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(n_components, size=min(sample_size, n_components), replace=False))
+
+    time_period = np.asarray(time_period, dtype=np.float64)
+    sample_time_period = time_period[sample] if time_period.ndim else time_period
+    reference = evaluate_layers_arrays(
+        _get_components_arrays(layers_arrays, sample),
+        time_period=sample_time_period,
+        outputs=list(results),
+        matrix_cache=None,
+        precision="double")
+
+    errors = {}
+    for name, values in results.items():
+        reference_values = reference[name].astype(np.float64)
+        differences = np.abs(np.asarray(values)[sample].astype(np.float64) - reference_values)
+        if name == "time_shift":
+            differences = np.abs(np.mod(differences + sample_time_period / 2, sample_time_period)
+                                 - sample_time_period / 2)
+        relative = np.divide(differences, np.abs(reference_values),
+                             out=np.zeros(differences.shape), where=reference_values != 0)
+        errors[name] = {
+            "max_absolute_error": float(np.max(differences, initial=0)),
+            "max_relative_error": float(np.max(relative, initial=0)),
+        }
+
+    return errors
+
+
+def get_component_matrices_arrays(
+        layers_arrays: dict[str, np.ndarray],
+        time_period: float | np.ndarray = 24,
+        matrix_cache: LayerMatrixCache | None = LAYER_MATRIX_CACHE,
+        ) -> np.ndarray:
+    """complex heat transfer matrices of components (surface resistances included), for complex
+        values evaluate_layers_arrays reduces to moduli (example the phase of Y_ii = -Z_11/Z_12)
+
+    Args:
+        layers_arrays (dict[str, np.ndarray]): layer inputs, see get_layers_arrays
+        time_period (float | np.ndarray, optional): analysis period in [h], scalar or one by component. Defaults to 24 h.
+        matrix_cache (LayerMatrixCache | None, optional): layer matrices cache. Defaults to LAYER_MATRIX_CACHE.
+
+    Returns:
+        np.ndarray: (n, 2, 2) heat transfer matrices [Z], section paths combined
+    """
+    time_period = np.asarray(time_period, dtype=np.float64)
+    component_index = layers_arrays.get("component_index")
+    paths_time_period = time_period[component_index] if component_index is not None and time_period.ndim \
+        else time_period
+
+    thermal_resistances = get_thermal_resistances_array(
+        thicknesses=layers_arrays["thicknesses"],
+        thermal_conductivities=layers_arrays["thermal_conductivities"],
+        is_air=layers_arrays["is_air"],
+        heat_flow_directions=layers_arrays["heat_flow_directions"])
+    rsi, rse = get_surface_resistances_array(layers_arrays["heat_flow_directions"])
+
+    compute_matrices = get_heat_transfer_matrices if matrix_cache is None else matrix_cache.get_heat_transfer_matrices
+    htm = get_heat_transfer_matrix_components(
+        compute_matrices(
+            thicknesses=layers_arrays["thicknesses"],
+            thermal_conductivities=layers_arrays["thermal_conductivities"],
+            gross_densities=layers_arrays["gross_densities"],
+            specific_heat_capacities=layers_arrays["specific_heat_capacities"],
+            thermal_resistances=thermal_resistances,
+            is_air=layers_arrays["is_air"],
+            time_period=paths_time_period),
+        surface_thermal_resistance_int=rsi,
+        surface_thermal_resistance_ext=rse)
+
+    if component_index is not None:
+        htm = combine_heat_transfer_matrices(htm, layers_arrays["section_weights"], component_index)
+    return htm
+
+
+def evaluate_batch(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str = "Ho",
+        time_period: float | np.ndarray = 24,
+        outputs: list[str] | None = None,
+        precision: str = "double",
+        error_sample_size: int = 100,
+        ) -> BatchResults:
+    """Summer analysis of many components at once,
+        same values as Component attributes without building Component objects
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        heat_flow_directions (list[str] | str, optional): "Ho", "Up" or "Do" by component. Defaults to "Ho".
+        time_period (float | np.ndarray, optional): analysis period in [h], scalar or one by component. Defaults to 24 h.
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS to compute. Defaults to None = all outputs.
+        precision (str, optional): "double" or "single", see evaluate_layers_arrays. Defaults to "double".
+        error_sample_size (int, optional): sample size of single precision errors. Defaults to 100.
+
+    Returns:
+        BatchResults: one array by name of outputs, precision_errors in single precision
+    """
+    return evaluate_layers_arrays(
+        get_layers_arrays(layers_list, heat_flow_directions),
+        time_period=time_period,
+        outputs=outputs,
+        precision=precision,
+        error_sample_size=error_sample_size)
+
+
+def evaluate_batch_threaded(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str = "Ho",
+        time_period: float | np.ndarray = 24,
+        outputs: list[str] | None = None,
+        precision: str = "double",
+        max_workers: int | None = None,
+        chunk_size: int = 1000,
+        error_sample_size: int = 100,
+        ) -> BatchResults:
+    """same values as evaluate_batch, chunks of components evaluated by a thread pool.
+        Layers are only read and the shared matrix cache is locked, so layers can be
+        shared between components and threads (also on free-threaded CPython builds).
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        heat_flow_directions (list[str] | str, optional): "Ho", "Up" or "Do" by component. Defaults to "Ho".
+        time_period (float | np.ndarray, optional): analysis period in [h], scalar or one by component. Defaults to 24 h.
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS to compute. Defaults to None = all outputs.
+        precision (str, optional): "double" or "single", see evaluate_layers_arrays. Defaults to "double".
+        max_workers (int | None, optional): number of threads. Defaults to None = ThreadPoolExecutor default.
+        chunk_size (int, optional): number of components by vectorized batch. Defaults to 1000.
+        error_sample_size (int, optional): sample size of single precision errors by chunk. Defaults to 100.
+
+    Raises:
+        ValueError: chunk_size < 1
+
+    Returns:
+        BatchResults: one array by name of outputs, precision_errors (max of chunks) in single precision
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    outputs = get_outputs(outputs)
+    n_components = len(layers_list)
+    if isinstance(heat_flow_directions, str):
+        heat_flow_directions = [heat_flow_directions] * n_components
+    time_periods = np.broadcast_to(np.asarray(time_period, dtype=float), (n_components,))
+
+    def evaluate_chunk(start: int) -> dict:
+        stop = start + chunk_size
+        return evaluate_batch(layers_list[start:stop], heat_flow_directions[start:stop], time_periods[start:stop],
+                              outputs=outputs, precision=precision, error_sample_size=error_sample_size)
+
+    starts = range(0, n_components, chunk_size)
+    if len(starts) <= 1:
+        return evaluate_batch(layers_list, heat_flow_directions, time_periods, outputs=outputs, precision=precision,
+                              error_sample_size=error_sample_size)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunks = list(executor.map(evaluate_chunk, starts))
+
+    results = BatchResults({name: np.concatenate([chunk[name] for chunk in chunks]) for name in outputs})
+    if precision != "double" and error_sample_size > 0:
+        results.precision_errors = merge_precision_errors([chunk.precision_errors for chunk in chunks])
+    return results
+
+
+def get_definitions_arrays(definitions: list[dict]) -> tuple:
+    """layer inputs and time periods of component definitions (plain dicts, see becalib.definitions)
+
+    Args:
+        definitions (list[dict]): component definitions
+
+    Returns:
+        tuple: (layers arrays (see get_layers_arrays), time periods (n,) in [h])
+    """
+    layers_arrays = get_layers_arrays(
+        [get_layers_from_definition(definition) for definition in definitions],
+        [definition.get("heat_flow_direction", "Ho") for definition in definitions])
+    time_period = np.array([float(definition.get("time_period", 24)) for definition in definitions])
+    return layers_arrays, time_period
+
+
+def evaluate_definitions(
+        definitions: list[dict],
+        outputs: list[str] | None = None,
+        precision: str = "double",
+        error_sample_size: int = 100,
+        ) -> BatchResults:
+    """batch evaluation of component definitions (plain dicts, see becalib.definitions)
+
+    Args:
+        definitions (list[dict]): component definitions
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS to compute. Defaults to None = all outputs.
+        precision (str, optional): "double" or "single", see evaluate_layers_arrays. Defaults to "double".
+        error_sample_size (int, optional): sample size of single precision errors. Defaults to 100.
+
+    Returns:
+        BatchResults: one array by name of outputs, precision_errors in single precision
+    """
+    layers_arrays, time_period = get_definitions_arrays(definitions)
+    return evaluate_layers_arrays(layers_arrays, time_period=time_period, outputs=outputs, precision=precision,
+                                  error_sample_size=error_sample_size)
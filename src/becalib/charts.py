@@ -193,3 +193,55 @@ def plot_component_layers(
 
     return plt
 
+
+
+def plot_depth_profiles(
+        depths: np.ndarray,
+        temperature_amplitudes: np.ndarray,
+        temperature_time_shifts: np.ndarray,
+        thicknesses: list,
+        time_period: float = 24,
+        language: str = "en"
+    ) -> plt:
+    """temperature amplitude and time shift through the component thickness
+        matplotlib pyplot object, layer boundaries as vertical lines
+
+    Args:
+        depths (np.ndarray): distances from the interior surface in [m]
+        temperature_amplitudes (np.ndarray): in [K]
+        temperature_time_shifts (np.ndarray): delay on the exterior wave in [h]
+        thicknesses (list): list of layers thicknesses interior to exterior
+        time_period (float, optional): in [h]. Defaults to 24h.
+        language (str, optional): Defaults "en", ["fr","en","it"]
+
+    Returns:
+        plt: matplotlib pyplot object
+    """
+
+    # Do not accept None
+    for k,v in locals().items():
+        if v is None:
+            raise TypeError(f"{k} cannot be None")
+
+    _=get_translator(language)
+
+    fig, ax = plt.subplots()
+    ax.plot(depths, temperature_amplitudes, color="tab:red")
+    ax.set_xlabel(_("Distance from interior surface [m]"), fontsize=10, color='black')
+    ax.set_ylabel(_("Temperature amplitude [K]"), fontsize=10, color="tab:red")
+    ax.set_ylim(bottom=0)
+    ax.grid()
+
+    # time shift on a second axis
+    ax2 = ax.twinx()
+    ax2.plot(depths, temperature_time_shifts, color="tab:blue", linestyle="--")
+    ax2.set_ylabel(_("Time shift [h]"), fontsize=10, color="tab:blue")
+    ax2.set_ylim(0, time_period)
+
+    # layer boundaries
+    for boundary in np.cumsum(thicknesses)[:-1]:
+        ax.axvline(x=boundary, color='k', linewidth=0.8)
+
+    ax.set_title(_("Temperature wave through the component"), fontsize=12, color='black')
+
+    return plt
@@ -0,0 +1,254 @@
+"""becalib command line batch evaluator
+
+Example:
+    becalib walls.json roofs.csv -o results.csv --jobs 4 --metrics time_shift,decrement_factor
+"""
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+import re
+import sys
+import time
+from typing import Iterator
+import numpy as np
+from becalib.batch import evaluate_definitions, get_outputs, BATCH_OUTPUTS
+from becalib.algos import get_threshold_labels_italian_dm_26_06_2009
+from becalib.definitions import iter_definitions, get_layers_from_definition
+
+
+OUTPUT_FORMATS = ("csv", "jsonl")
+ID_COLUMNS = ("name", "heat_flow_direction", "time_period")
+THRESHOLD_CODE = "threshold_code_italian_dm_26_06_2009"
+THRESHOLD_LABEL = "threshold_values_italian_dm_26_06_2009"
+
+
+def _iter_chunks(iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def evaluate_chunk(definitions: list[dict], outputs: tuple, precision: str = "double") -> tuple:
+    """evaluate a chunk of definitions, invalid definitions give NaN values
+
+    Args:
+        definitions (list[dict]): component definitions
+        outputs (tuple): names of BATCH_OUTPUTS
+        precision (str, optional): "double" or "single", see evaluate_definitions. Defaults to "double".
+
+    Returns:
+        tuple: (dict of arrays, list of (index, error message))
+    """
+    try:
+        return evaluate_definitions(definitions, outputs=outputs, precision=precision), []
+    except (ValueError, TypeError, KeyError, AttributeError):
+        pass
+
+    # isolate invalid definitions, invalid codes are -1
+    results = {name: np.full(len(definitions), -1 if name == THRESHOLD_CODE else np.nan) for name in outputs}
+    errors = []
+    for i, definition in enumerate(definitions):
+        try:
+            values = evaluate_definitions([definition], outputs=outputs, precision=precision)
+        except (ValueError, TypeError, KeyError, AttributeError) as error:
+            errors.append((i, str(error)))
+            continue
+        for name in outputs:
+            results[name][i] = values[name][0]
+
+    return results, errors
+
+
+def _iter_evaluated_chunks(chunks: Iterator[list], outputs: tuple, jobs: int) -> Iterator[tuple]:
+    if jobs <= 1:
+        for chunk in chunks:
+            yield chunk, *evaluate_chunk(chunk, outputs)
+        return
+
+    # bounded number of chunks in flight, results are yielded in input order
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        in_flight = collections.deque()
+        for chunk in chunks:
+            in_flight.append((chunk, executor.submit(evaluate_chunk, chunk, outputs)))
+            if len(in_flight) >= 2 * jobs:
+                chunk, future = in_flight.popleft()
+                yield chunk, *future.result()
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            yield chunk, *future.result()
+
+
+class _ResultsWriter():
+    def __init__(self, file, output_format: str, outputs: tuple, language: str = "en"):
+        self.file = file
+        self.output_format = output_format
+        self.outputs = outputs
+        self.columns = ID_COLUMNS + outputs
+        self.language = language
+        if THRESHOLD_CODE in outputs:
+            self.columns += (THRESHOLD_LABEL,)
+        if output_format == "csv":
+            self._csv_writer = csv.writer(file)
+            self._csv_writer.writerow(self.columns)
+
+    def write_chunk(self, definitions: list[dict], results: dict):
+        columns = [results[name].tolist() for name in self.outputs]
+        if THRESHOLD_CODE in self.outputs:
+            # translated once by label, not by row
+            codes = results[THRESHOLD_CODE]
+            columns.append(np.where(
+                codes >= 0,
+                get_threshold_labels_italian_dm_26_06_2009(np.maximum(codes, 0), self.language),
+                "").tolist())
+
+        for i, definition in enumerate(definitions):
+            row = [definition.get("name", ""),
+                   definition.get("heat_flow_direction", "Ho"),
+                   definition.get("time_period", 24)]
+            row += [column[i] for column in columns]
+
+            if self.output_format == "csv":
+                self._csv_writer.writerow(row)
+            else:
+                # NaN is not valid json
+                row = [None if isinstance(v, float) and math.isnan(v) else v for v in row]
+                self.file.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+
+
+def _get_safe_file_name(index: int, name: str) -> str:
+    return f"{index:06d}_" + re.sub(r"[^\w.-]+", "_", str(name)).strip("_")
+
+
+def _write_charts_and_report(definitions: list[dict], first_index: int, charts_dir: str | None, report_file, language: str):
+    # Component objects are only built when charts or reports are asked
+    from becalib.component import Component
+    import matplotlib.pyplot as plt
+
+    for i, definition in enumerate(definitions):
+        try:
+            component = Component(
+                name=definition.get("name", ""),
+                layers=get_layers_from_definition(definition),
+                heat_flow_direction=definition.get("heat_flow_direction", "Ho"),
+                time_period=float(definition.get("time_period", 24)),
+                language=language)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            continue
+
+        if report_file is not None:
+            report_file.write(component.get_values() + "\n\n")
+
+        if charts_dir is not None:
+            file_name = _get_safe_file_name(first_index + i, component.name)
+            for suffix, get_chart in (("layers", component.get_component_layers_chart),
+                                      ("waves", component.get_component_sinusoidal_wave_chart)):
+                chart = get_chart()
+                chart.savefig(os.path.join(charts_dir, f"{file_name}_{suffix}.png"))
+                plt.close("all")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="becalib",
+        description="Batch summer analysis (ISO 13786) of building envelope components")
+    parser.add_argument("files", nargs="+",
+                        help="component definition files (.json, .jsonl, .csv, .toml, gbXML .xml)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="results file, '-' for stdout (default)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default=None,
+                        help="results format, default from output extension or csv")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes (default 1, 0 = number of CPUs)")
+    parser.add_argument("-m", "--metrics", action="append", default=None,
+                        help=f"comma separated outputs to compute (default all): {', '.join(BATCH_OUTPUTS)}")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="number of components by vectorized batch (default 1000)")
+    parser.add_argument("--charts", default=None, metavar="DIR",
+                        help="write layers and sinusoidal wave charts (png) in DIR")
+    parser.add_argument("--report", default=None, metavar="FILE",
+                        help="write a text report of all values of each component")
+    parser.add_argument("--language", default="en", help="language of scores, charts and report (default en)")
+    progress = parser.add_mutually_exclusive_group()
+    progress.add_argument("--progress", action="store_true", default=None,
+                          help="report progress on stderr (default when stderr is a terminal)")
+    progress.add_argument("-q", "--quiet", action="store_true", help="no progress report")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        metrics = None
+        if args.metrics:
+            metrics = [m.strip() for value in args.metrics for m in value.split(",") if m.strip()]
+        outputs = get_outputs(metrics)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+
+    output_format = args.format
+    if output_format is None:
+        output_format = "jsonl" if args.output.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    show_progress = args.progress if args.progress is not None else sys.stderr.isatty()
+    show_progress = show_progress and not args.quiet
+
+    if args.charts is not None:
+        import matplotlib
+        matplotlib.use("Agg")
+
+    definitions = itertools.chain.from_iterable(iter_definitions(path) for path in args.files)
+    chunks = _iter_chunks(definitions, args.chunk_size)
+
+    count = 0
+    errors_count = 0
+    start = time.perf_counter()
+    # files opened inside the try: an invalid path is an error message, not a traceback
+    try:
+        with contextlib.ExitStack() as stack:
+            if args.charts is not None:
+                os.makedirs(args.charts, exist_ok=True)
+            out_file = sys.stdout if args.output == "-" else stack.enter_context(
+                open(args.output, "w", encoding="utf-8", newline=""))
+            report_file = stack.enter_context(open(args.report, "w", encoding="utf-8")) if args.report else None
+
+            writer = _ResultsWriter(out_file, output_format, outputs, args.language)
+            for chunk, results, errors in _iter_evaluated_chunks(chunks, outputs, jobs):
+                writer.write_chunk(chunk, results)
+
+                for i, message in errors:
+                    print(f"error: component {count + i} ({chunk[i].get('name', '')}): {message}",
+                          file=sys.stderr)
+                errors_count += len(errors)
+
+                if args.charts is not None or report_file is not None:
+                    _write_charts_and_report(chunk, count, args.charts, report_file, args.language)
+
+                count += len(chunk)
+                if show_progress:
+                    rate = count / max(time.perf_counter() - start, 1e-9)
+                    print(f"\r{count} components evaluated ({rate:.0f}/s)", end="", file=sys.stderr, flush=True)
+
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if show_progress:
+            print(file=sys.stderr)
+
+    return 1 if errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
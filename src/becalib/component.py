@@ -1,13 +1,36 @@
 import numpy as np
 import pandas as pd
-from becalib.charts import plot_component_layers, plot_sinusoidal_wave
-from becalib.layers import MaterialLayer
-from becalib.air_resistances import get_surface_resistances
+from becalib.charts import plot_component_layers, plot_sinusoidal_wave, plot_depth_profiles
+from becalib.layers import MaterialLayer, InhomogeneousLayer, get_layer_from_dict
+from becalib.batch import evaluate_batch, LAYER_MATRIX_CACHE
+from becalib.air_resistances import get_surface_resistances, get_resistance_unventilated_air_layer
 from becalib.translator import get_translator
 from becalib.algos import *
 import copy
 
 
+# Computed values saved by Component.to_dict(include_results=True)
+RESULTS_NAMES = (
+    "surface_thermal_resistance_int",
+    "surface_thermal_resistance_ext",
+    "thickness_component",
+    "thermal_resistance_component",
+    "thermal_resistance_upper_limit",
+    "thermal_resistance_lower_limit",
+    "thermal_transmittance_component",
+    "periodic_thermal_transmittance",
+    "decrement_factor",
+    "time_shift",
+    "thermal_admittance_int",
+    "thermal_admittance_ext",
+    "areal_heat_capacity_int",
+    "areal_heat_capacity_ext",
+    "areal_heat_capacity_component",
+    "time_constant",
+    "mass_component",
+)
+
+
 class Component():
     def __init__(self,
         name: str,
@@ -74,51 +97,42 @@ class Component():
         
         self._set_parameter_names_strings()
 
-        # Override heat_flow_direction for air layers
-        list_of_layers= []
-        for layer in self.layers:
-            if layer.is_air is True:
-                layer.heat_flow_direction = self.heat_flow_direction
-                list_of_layers.append(layer)
-            else:
-                list_of_layers.append(layer)
-        
-        self.layers = list_of_layers
+        # layers are only read: air layers take the heat_flow_direction of the component
+        # without modifying the (maybe shared) layer objects
+        self.layers = list(self.layers)
 
         # np.array of thickness of each Layer
-        self.thicknesses= np.array([layer.thickness for layer in self.layers])
+        self.thicknesses= np.array([layer.thickness for layer in self.layers], dtype=np.float64)
 
         # sum of thicknesses of all layers in [m]
         self.thickness_component= np.sum(self.thicknesses,)
 
+        # air layers mask
+        self.is_air= get_is_air_array(self.layers)
+
+        # array of layer thermal resistances, air layers with the component heat flow direction
+        resistances = np.array([
+            get_resistance_unventilated_air_layer(heat_flow_direction=self.heat_flow_direction,
+                                                  thickness=layer.thickness)
+            if layer.is_air is True else layer.thermal_resistance
+            for layer in self.layers], dtype=np.float64)
+
         # array of thermal conductivities "λ" lambda [W/mK] Layer by Layer 
-        self.thermal_conductivities= np.array([layer.thermal_conductivity for layer in self.layers])
+        self.thermal_conductivities= np.array([
+            layer.thickness / resistance if layer.is_air is True else layer.thermal_conductivity
+            for layer, resistance in zip(self.layers, resistances)], dtype=np.float64)
 
-        # array of gross densities "ρ" rho [kg/mc] Layer by Layer  
-        densities_list = []
-        for layer in self.layers:
-            if layer.is_air is False:
-                densities_list.append(layer.gross_density)
-            else:
-                densities_list.append(None)
-        self.gross_densities= np.array(densities_list)
-
-        # array of Specific heat capacities "c" [J/kgK] Layer by layer
-        specific_heats_list=[]
-        for layer in self.layers:
-            if layer.is_air is False:
-                specific_heats_list.append(layer.specific_heat_capacity)
-            else:
-                specific_heats_list.append(None)
+        # array of gross densities "ρ" rho [kg/mc] Layer by Layer, NaN for air layers
+        self.gross_densities= get_layers_values_array(self.layers, "gross_density")
 
-        self.specific_heat_capacities= np.array(specific_heats_list)
+        # array of Specific heat capacities "c" [J/kgK] Layer by layer, NaN for air layers
+        self.specific_heat_capacities= get_layers_values_array(self.layers, "specific_heat_capacity")
 
         ##  Steady-State Thermal Analysis ##
 
         # thermal_resistances
         # array of all thermal resistances Layer by layer
         # including internal and external surface thermal resistances
-        resistances = np.array([layer.thermal_resistance for layer in self.layers])
         resistances = np.insert(resistances, 0, self.surface_thermal_resistance_int)
         resistances = np.append(resistances, self.surface_thermal_resistance_ext)
 
@@ -128,12 +142,18 @@ class Component():
         # sum of layer resistances including internal 
         # and external resistances
         self.thermal_resistance_component = np.sum(self.thermal_resistances)
+        self.thermal_resistance_upper_limit = self.thermal_resistance_component
+        self.thermal_resistance_lower_limit = self.thermal_resistance_component
 
 
         #thermal_transmittance_component U-value in  W/m²K)
         self.thermal_transmittance_component= 1 / self.thermal_resistance_component
     
-    
+        if any(isinstance(layer, InhomogeneousLayer) for layer in self.layers):
+            # ISO 6946 combined method on section paths
+            self._update_combined_method()
+            return
+
         ###  Dynamic Thermal Analysis ###
 
         # periodic_penetration_depth
@@ -145,13 +165,16 @@ class Component():
                                   periodic_penetration_depth_list= self._periodic_penetration_depth_list
                                   
         )
-        # heat_transfer_matrix layer by layer
+        # heat_transfer_matrix layer by layer, gathered from the shared layer matrices cache
         self._heat_transfer_matrix_layer_list = \
-            get_heat_transfer_matrix_layer_list(
-                thermal_resistances=self.thermal_resistances,
-                xi_list=self._xi_list,
-                periodic_penetration_depth_list=self._periodic_penetration_depth_list,
-                thermal_conductivities=self.thermal_conductivities)
+            LAYER_MATRIX_CACHE.get_heat_transfer_matrices(
+                thicknesses=self.thicknesses[np.newaxis],
+                thermal_conductivities=self.thermal_conductivities[np.newaxis],
+                gross_densities=self.gross_densities[np.newaxis],
+                specific_heat_capacities=self.specific_heat_capacities[np.newaxis],
+                thermal_resistances=self.thermal_resistances[np.newaxis, 1:-1],
+                is_air=self.is_air[np.newaxis],
+                time_period=self.time_period)[0]
         
         # heat_transfer_matrix component
         self._heat_transfer_matrix_component = \
@@ -197,16 +220,107 @@ class Component():
             self.thermal_resistance_component)
         
         # threshold_values_italian_dm_26_06_2009
-        self.threshold_values_italian_dm_26_06_2009=\
-            get_threshold_values_italian_dm_26_06_2009(
+        self.threshold_code_italian_dm_26_06_2009=int(
+            get_threshold_codes_italian_dm_26_06_2009(
                 self.time_shift,
-                self.decrement_factor,
+                self.decrement_factor))
+        self.threshold_values_italian_dm_26_06_2009=\
+            str(get_threshold_labels_italian_dm_26_06_2009(
+                self.threshold_code_italian_dm_26_06_2009,
                 self.language
-            )
+            ))
         
         # mass_component        
         self.mass_component=get_mass_component(self.layers)
 
+    def _update_combined_method(self):
+        """Compute values of components with inhomogeneous layers,
+            ISO 6946 combined method evaluated by becalib.batch on all section paths.
+            Layer by layer matrices are not available.
+        """
+        results = evaluate_batch(
+            layers_list=[self.layers],
+            heat_flow_directions=self.heat_flow_direction,
+            time_period=self.time_period)
+
+        for name, values in results.items():
+            setattr(self, name, values[0])
+
+        self._periodic_penetration_depth_list = None
+        self._xi_list = None
+        self._heat_transfer_matrix_layer_list = None
+        self._heat_transfer_matrix_component = None
+
+        # threshold_values_italian_dm_26_06_2009
+        self.threshold_code_italian_dm_26_06_2009=int(
+            get_threshold_codes_italian_dm_26_06_2009(
+                self.time_shift,
+                self.decrement_factor))
+        self.threshold_values_italian_dm_26_06_2009=\
+            str(get_threshold_labels_italian_dm_26_06_2009(
+                self.threshold_code_italian_dm_26_06_2009,
+                self.language
+            ))
+
+    # Serialization
+    def get_results_dict(self) -> dict:
+        """computed values as a plain (json serializable) dict
+
+        Returns:
+            dict: one float by name of RESULTS_NAMES and the DM 26/06/2009 code and score
+        """
+        results = {name: float(getattr(self, name)) for name in RESULTS_NAMES}
+        results["threshold_code_italian_dm_26_06_2009"] = self.threshold_code_italian_dm_26_06_2009
+        results["threshold_values_italian_dm_26_06_2009"] = self.threshold_values_italian_dm_26_06_2009
+        return results
+
+    def to_dict(self, include_results: bool = False) -> dict:
+        """inputs (and computed values) as a plain (json serializable) dict,
+            same format as component definitions of becalib.definitions
+
+        Args:
+            include_results (bool, optional): add computed values under "results". Defaults to False.
+
+        Returns:
+            dict: component inputs
+        """
+        component_dict = {
+            "name": self.name,
+            "heat_flow_direction": self.heat_flow_direction,
+            "time_period": self.time_period,
+            "language": self.language,
+            "layers": [layer.to_dict() for layer in self.layers],
+        }
+        if include_results:
+            component_dict["results"] = self.get_results_dict()
+
+        return component_dict
+
+    @classmethod
+    def from_dict(cls, component_dict: dict) -> "Component":
+        """Component from a dict of inputs (see to_dict), values are computed again
+
+        Args:
+            component_dict (dict): component inputs, "results" is ignored
+
+        Returns:
+            Component:
+        """
+        return cls(
+            name=component_dict.get("name", ""),
+            layers=[get_layer_from_dict(layer) for layer in component_dict["layers"]],
+            heat_flow_direction=component_dict.get("heat_flow_direction", "Ho"),
+            time_period=component_dict.get("time_period", 24),
+            language=component_dict.get("language", "en"),
+            )
+
+    def __getstate__(self) -> dict:
+        # pickle inputs only, not intermediate matrices and translated labels
+        return self.to_dict()
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(Component.from_dict(state).__dict__)
+
     # Methods to get computed values by strings, DataFrames or charts
     def get_layers_dataframe(self,
             data_type:str="st"):
@@ -226,10 +340,19 @@ class Component():
         list_of_layers_dict.append({"name":_("Interior surface"),
                                     "thermal_resistance":self.surface_thermal_resistance_int}
                                     )
-        for layer in self.layers:
+        for layer, thermal_resistance in zip(self.layers, self.thermal_resistances[1:-1]):
             layer_dict= {}
 
-            if layer.is_air==False:
+            if isinstance(layer, InhomogeneousLayer):
+                layer_dict= {"name":layer.name,
+                             "thickness":layer.thickness,
+                             "thermal_conductivity":layer.thermal_conductivity,
+                             "thermal_resistance":layer.thermal_resistance,
+                             "is_air":False,
+                             "gross_density":layer.gross_density,
+                             "specific_heat_capacity":layer.specific_heat_capacity}
+
+            elif layer.is_air==False:
                 dict_of_computed_values= {"thermal_resistance":layer.thermal_resistance,
                                    "thermal_diffusivity":layer.thermal_diffusivity,
                                    "thermal_effusivity":layer.thermal_effusivity
@@ -243,7 +366,8 @@ class Component():
 
             if layer.is_air==True:
                 
-                dict_of_computed_values= {"thermal_resistance":layer.thermal_resistance}
+                # air layers with the heat flow direction of the component
+                dict_of_computed_values= {"thermal_resistance":thermal_resistance}
                 layer_dict=dict(copy.copy(layer.__dict__))
 
                 layer_dict.pop("heat_flow_direction")
@@ -315,7 +439,11 @@ class Component():
         out_layers_str=out_layers_str+"\n"+ "-----------------------"+"\n"+_("Interior")
         for layer in self.layers:
             out_layers_str=out_layers_str+ "\n"+"-----------------------"
+            # copy in the component language (and heat flow direction for air layers), layers are not modified
+            layer = copy.copy(layer)
             layer.language= self.language
+            if layer.is_air is True:
+                layer.heat_flow_direction= self.heat_flow_direction
             out_layers_str=out_layers_str+ "\n" + layer.get_values()
         out_layers_str=out_layers_str+"\n"+ "-----------------------"+"\n"+ _("Exterior")+"\n"+ "-----------------------"
 
@@ -379,6 +507,65 @@ f"""#######################################
 
 #######################################"""
 
+    def get_depth_profiles(self,
+            n_points: int = 200,
+            depths: np.ndarray | None = None,
+            exterior_amplitude: float = 1) -> dict[str, np.ndarray]:
+        """temperature and heat flux amplitudes through the component thickness
+            for an exterior temperature wave and a constant interior temperature
+
+        Args:
+            n_points (int, optional): evenly spaced depth points. Defaults to 200.
+            depths (np.ndarray | None, optional): distances from the interior surface in [m]. Defaults to None = n_points.
+            exterior_amplitude (float, optional): exterior temperature amplitude in [K]. Defaults to 1 K.
+
+        Raises:
+            ValueError: components with inhomogeneous layers (layer by layer matrices not available)
+
+        Returns:
+            dict[str, np.ndarray]: see becalib.algos.get_depth_profiles
+        """
+        if self._heat_transfer_matrix_layer_list is None:
+            raise ValueError("depth profiles are not available for components with inhomogeneous layers")
+        if depths is None:
+            depths = np.linspace(0, self.thickness_component, n_points)
+
+        return get_depth_profiles(
+            ht_matrix_list=self._heat_transfer_matrix_layer_list,
+            thicknesses=self.thicknesses,
+            xi_list=self._xi_list,
+            periodic_penetration_depth_list=self._periodic_penetration_depth_list,
+            thermal_conductivities=self.thermal_conductivities,
+            thermal_resistances=self.thermal_resistances,
+            depths=depths,
+            time_period=self.time_period,
+            exterior_amplitude=exterior_amplitude)
+
+    def get_depth_profiles_chart(self,
+            n_points: int = 200,
+            max_temp: float = 35,
+            min_temp: float = 28):
+        """temperature amplitude and time shift through the thickness matplotlib pyplot object
+
+        Args:
+            n_points (int, optional): evenly spaced depth points. Defaults to 200.
+            max_temp (float, optional): Max exterior temperature. Defaults to 35°C.
+            min_temp (float, optional): Min exterior temperature. Defaults to 28°C.
+
+        Returns:
+            matplotlib pyplot object: depth profiles
+        """
+        profiles = self.get_depth_profiles(n_points=n_points, exterior_amplitude=(max_temp - min_temp) / 2)
+
+        return plot_depth_profiles(
+            depths=profiles["depths"],
+            temperature_amplitudes=profiles["temperature_amplitudes"],
+            temperature_time_shifts=profiles["temperature_time_shifts"],
+            thicknesses=self.thicknesses,
+            time_period=self.time_period,
+            language=self.language
+                )
+
     def get_component_layers_chart(self):
         """get a matplotlib pyplot object of component layers
         Returns:
@@ -0,0 +1,258 @@
+import csv
+import json
+import math
+import os
+import re
+from typing import Iterable, Iterator
+from becalib.layers import LayerBase, get_layer_from_dict
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # python < 3.11
+    tomllib = None
+
+
+DEFINITION_FORMATS = ("json", "jsonl", "csv", "toml", "gbxml")
+
+# one csv row by layer, consecutive rows with the same "component" value are one component
+CSV_COLUMNS = (
+    "component",
+    "heat_flow_direction",
+    "time_period",
+    "name",
+    "thickness",
+    "thermal_conductivity",
+    "gross_density",
+    "specific_heat_capacity",
+    "is_air",
+    "vapour_resistance_factor",
+)
+
+
+def get_layers_from_definition(definition: dict) -> list[LayerBase]:
+    """ordered list of layers (interior to exterior) of a component definition
+
+    Args:
+        definition (dict): component definition
+            {"name": ..., "heat_flow_direction": "Ho", "time_period": 24, "layers": [layer dicts]}
+
+    Raises:
+        ValueError: invalid definition
+
+    Returns:
+        list[LayerBase]: MaterialLayer and AirLayer objects
+    """
+    layers = definition.get("layers") if isinstance(definition, dict) else None
+    if not layers:
+        raise ValueError(f"component definition without layers: {definition}")
+
+    return [get_layer_from_dict(layer) for layer in layers]
+
+
+def get_definition_format(path: str) -> str:
+    """definition format from file extension
+
+    Args:
+        path (str): file path
+
+    Raises:
+        ValueError: unknown extension
+
+    Returns:
+        str: one of DEFINITION_FORMATS
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "ndjson":
+        extension = "jsonl"
+    elif extension == "xml":
+        extension = "gbxml"
+
+    if extension not in DEFINITION_FORMATS:
+        raise ValueError(f"""unknown definition file extension: {path}
+        available choices: {", ".join(DEFINITION_FORMATS)}
+        """)
+    return extension
+
+
+def _parse_is_air(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _iter_csv_definitions(file) -> Iterator[dict]:
+    definition = None
+
+    for row in csv.DictReader(file):
+        row = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+
+        component_name = row.get("component", "")
+        if definition is None or definition["name"] != component_name:
+            if definition is not None:
+                yield definition
+            definition = {
+                "name": component_name,
+                "heat_flow_direction": row.get("heat_flow_direction", "Ho"),
+                "time_period": float(row.get("time_period", 24)),
+                "layers": [],
+            }
+
+        layer = {"name": row.get("name", ""), "is_air": _parse_is_air(row.get("is_air", False))}
+        for key in ("thickness", "thermal_conductivity", "gross_density", "specific_heat_capacity",
+                    "vapour_resistance_factor"):
+            if key in row:
+                layer[key] = float(row[key])
+        definition["layers"].append(layer)
+
+    if definition is not None:
+        yield definition
+
+
+def _get_json_definitions(data) -> list[dict]:
+    if isinstance(data, dict) and "components" in data:
+        return data["components"]
+    if isinstance(data, dict):
+        return [data]
+    return data
+
+
+def iter_definitions(path: str) -> Iterator[dict]:
+    """lazy reading of component definitions from json, jsonl, csv, toml or gbXML file
+
+        json: one definition, a list of definitions or {"components": [definitions]}
+        jsonl: one definition by line
+        csv: one layer by row, see CSV_COLUMNS
+        toml: [[components]] tables with [[components.layers]] tables
+        gbxml (.xml, .gbxml): distinct constructions, see becalib.gbxml
+
+    Args:
+        path (str): file path
+
+    Yields:
+        dict: component definition
+    """
+    definition_format = get_definition_format(path)
+
+    if definition_format == "jsonl":
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    elif definition_format == "csv":
+        with open(path, encoding="utf-8", newline="") as file:
+            yield from _iter_csv_definitions(file)
+
+    elif definition_format == "json":
+        with open(path, encoding="utf-8") as file:
+            yield from _get_json_definitions(json.load(file))
+
+    elif definition_format == "toml":
+        if tomllib is None:
+            raise ValueError("toml definitions need python >= 3.11 (tomllib)")
+        with open(path, "rb") as file:
+            yield from tomllib.load(file).get("components", [])
+
+    elif definition_format == "gbxml":
+        from becalib.gbxml import iter_gbxml_definitions
+        yield from iter_gbxml_definitions(path)
+
+
+def read_definitions(path: str) -> list[dict]:
+    """list of component definitions from json, jsonl, csv, toml or gbXML file
+
+    Args:
+        path (str): file path
+
+    Returns:
+        list[dict]: component definitions
+    """
+    return list(iter_definitions(path))
+
+
+def _format_toml_key(key) -> str:
+    key = str(key)
+    return key if re.fullmatch(r"[A-Za-z0-9_-]+", key) else json.dumps(key, ensure_ascii=False)
+
+
+def _format_toml_value(value) -> str:
+    # inline toml value: json strings are valid toml strings, dicts are inline tables
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            return "nan" if math.isnan(value) else ("inf" if value > 0 else "-inf")
+        return json.dumps(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_format_toml_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_format_toml_key(key)} = {_format_toml_value(item)}"
+                               for key, item in value.items() if item is not None) + "}"
+    raise ValueError(f"toml definitions: unsupported value {value!r}")
+
+
+def _write_toml_definition(file, definition: dict):
+    # toml has no null: None values are left out (missing keys read as None or defaults)
+    file.write("[[components]]\n")
+    for key, value in definition.items():
+        if key != "layers" and value is not None:
+            file.write(f"{_format_toml_key(key)} = {_format_toml_value(value)}\n")
+    for layer in definition["layers"]:
+        file.write("\n[[components.layers]]\n")
+        for key, value in layer.items():
+            if value is not None:
+                file.write(f"{_format_toml_key(key)} = {_format_toml_value(value)}\n")
+    file.write("\n")
+
+
+def write_definitions(path: str, definitions: Iterable[dict]) -> int:
+    """write component definitions one at a time (constant memory) in json, jsonl, csv or toml,
+        format from file extension, see iter_definitions
+
+    Args:
+        path (str): file path
+        definitions (Iterable[dict]): component definitions, example a generator
+
+    Raises:
+        ValueError: unknown or read only format (gbxml), inhomogeneous layers in csv,
+            unsupported values in toml
+
+    Returns:
+        int: number of written definitions
+    """
+    definition_format = get_definition_format(path)
+    if definition_format == "gbxml":
+        raise ValueError("gbxml definitions are read only")
+
+    n_definitions = 0
+    with open(path, "w", encoding="utf-8", newline="" if definition_format == "csv" else None) as file:
+        if definition_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+        elif definition_format == "json":
+            file.write("[")
+
+        for definition in definitions:
+            if definition_format == "jsonl":
+                file.write(json.dumps(definition, ensure_ascii=False) + "\n")
+            elif definition_format == "json":
+                file.write(("," if n_definitions else "") + "\n" + json.dumps(definition, ensure_ascii=False))
+            elif definition_format == "toml":
+                _write_toml_definition(file, definition)
+            else:
+                for layer in definition["layers"]:
+                    if "sections" in layer:
+                        raise ValueError("csv definitions: inhomogeneous layers are not supported")
+                    writer.writerow({
+                        "component": definition.get("name", ""),
+                        "heat_flow_direction": definition.get("heat_flow_direction", "Ho"),
+                        "time_period": definition.get("time_period", 24),
+                        **layer})
+            n_definitions += 1
+
+        if definition_format == "json":
+            file.write("\n]\n")
+
+    return n_definitions
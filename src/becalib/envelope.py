@@ -0,0 +1,256 @@
+"""building envelope: components with areas and orientations, area-weighted totals
+updated incrementally
+
+Example:
+    envelope = Envelope(name="house")
+    index = envelope.add_component(wall, area=42.5, orientation="S")
+    envelope.set_area(index, 38.0)
+    envelope.get_totals()["transmission_heat_transfer_coefficient"] # Σ U·A in W/K
+    envelope.get_orientation_dataframe()
+"""
+import numpy as np
+import pandas as pd
+from becalib.component import Component
+
+
+# component attribute: name of its area-weighted total
+ENVELOPE_TOTALS = {
+    "thermal_transmittance_component": "transmission_heat_transfer_coefficient", # Σ U·A in W/K
+    "periodic_thermal_transmittance": "periodic_heat_transfer_coefficient", # Σ Y_ie·A in W/K
+    "areal_heat_capacity_int": "internal_heat_capacity", # Σ κ_i·A in kJ/K
+}
+
+
+class Envelope():
+    def __init__(self, name: str = "envelope"):
+        """building envelope: components, areas and orientations stored in arrays.
+            Area-weighted totals (overall and by orientation) are updated incrementally
+            when a component, an area or an orientation changes.
+
+        Args:
+            name (str, optional): envelope name. Defaults to "envelope".
+        """
+        self.name = name
+        self.components = []
+        self.orientations = []
+
+        self._orientation_codes = {}
+        self._values = np.zeros((0, len(ENVELOPE_TOTALS)))
+        self._areas = np.zeros(0)
+        self._codes = np.zeros(0, dtype=np.int64)
+        self._size = 0
+
+        # area and area-weighted sums: overall (4,) and by orientation (n_orientations, 4)
+        self._totals = np.zeros(len(ENVELOPE_TOTALS) + 1)
+        self._orientation_totals = np.zeros((0, len(ENVELOPE_TOTALS) + 1))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def areas(self) -> np.ndarray:
+        """areas of components in [m²] (read only view)"""
+        areas = self._areas[:self._size]
+        areas.flags.writeable = False
+        return areas
+
+    def _get_orientation_code(self, orientation: str) -> int:
+        code = self._orientation_codes.get(orientation)
+        if code is None:
+            code = len(self.orientations)
+            self._orientation_codes[orientation] = code
+            self.orientations.append(orientation)
+            self._orientation_totals = np.concatenate(
+                [self._orientation_totals, np.zeros((1, self._orientation_totals.shape[1]))])
+        return code
+
+    def _reserve(self, n_new: int):
+        # arrays grow by doubling, appends are amortized O(1)
+        capacity = self._areas.size
+        if self._size + n_new <= capacity:
+            return
+        capacity = max(self._size + n_new, 2 * capacity, 16)
+        values = np.zeros((capacity, self._values.shape[1]))
+        values[:self._size] = self._values[:self._size]
+        areas = np.zeros(capacity)
+        areas[:self._size] = self._areas[:self._size]
+        codes = np.zeros(capacity, dtype=np.int64)
+        codes[:self._size] = self._codes[:self._size]
+        self._values, self._areas, self._codes = values, areas, codes
+
+    @staticmethod
+    def _get_component_values(component: Component) -> np.ndarray:
+        return np.array([getattr(component, name) for name in ENVELOPE_TOTALS], dtype=np.float64)
+
+    @staticmethod
+    def _check_areas(areas: np.ndarray):
+        if not np.all(np.isfinite(areas) & (areas >= 0)):
+            raise ValueError(f"areas must be finite and >= 0: {areas}")
+
+    def _get_contributions(self, index: np.ndarray | int) -> np.ndarray:
+        # rows of (A, U·A, Y_ie·A, κ_i·A)
+        areas = self._areas[index]
+        return np.concatenate([np.atleast_1d(areas)[:, np.newaxis],
+                               np.atleast_2d(self._values[index]) * np.atleast_1d(areas)[:, np.newaxis]], axis=1)
+
+    def _add_contributions(self, index: np.ndarray | int, sign: float):
+        contributions = sign * self._get_contributions(index)
+        self._totals += contributions.sum(axis=0)
+        np.add.at(self._orientation_totals, np.atleast_1d(self._codes[index]), contributions)
+
+    def _check_index(self, index: int) -> int:
+        if not -self._size <= index < self._size:
+            raise IndexError(f"component index out of range: {index}")
+        return index % self._size
+
+    def add_components(
+            self,
+            components: list[Component],
+            areas: list[float] | np.ndarray,
+            orientations: list[str] | str = "N",
+            ) -> np.ndarray:
+        """add many components at once
+
+        Args:
+            components (list[Component]): components (a component can be added more times)
+            areas (list[float] | np.ndarray): areas in [m²]
+            orientations (list[str] | str, optional): orientation label by component,
+                example "N", "S", "Roof". Defaults to "N".
+
+        Raises:
+            ValueError: invalid areas or sizes
+
+        Returns:
+            np.ndarray: indexes of added components
+        """
+        if isinstance(orientations, str):
+            orientations = [orientations] * len(components)
+        areas = np.asarray(areas, dtype=np.float64).reshape(-1)
+        if not len(components) == areas.size == len(orientations):
+            raise ValueError("components, areas and orientations must have the same size")
+        self._check_areas(areas)
+
+        index = np.arange(self._size, self._size + areas.size)
+        self._reserve(areas.size)
+        self._values[index] = [self._get_component_values(component) for component in components] \
+            if components else np.zeros((0, self._values.shape[1]))
+        self._areas[index] = areas
+        self._codes[index] = [self._get_orientation_code(orientation) for orientation in orientations]
+        self._size += areas.size
+        self.components.extend(components)
+
+        self._add_contributions(index, 1)
+        return index
+
+    def add_component(self, component: Component, area: float, orientation: str = "N") -> int:
+        """add one component
+
+        Args:
+            component (Component):
+            area (float): in [m²]
+            orientation (str, optional): orientation label, example "N", "S", "Roof". Defaults to "N".
+
+        Returns:
+            int: index of the component
+        """
+        return int(self.add_components([component], [area], [orientation])[0])
+
+    def set_area(self, index: int, area: float):
+        """change the area of one component, totals are updated incrementally
+
+        Args:
+            index (int): component index
+            area (float): in [m²]
+        """
+        index = self._check_index(index)
+        self._check_areas(np.float64(area))
+        self._add_contributions(index, -1)
+        self._areas[index] = area
+        self._add_contributions(index, 1)
+
+    def set_orientation(self, index: int, orientation: str):
+        """change the orientation of one component
+
+        Args:
+            index (int): component index
+            orientation (str): orientation label
+        """
+        index = self._check_index(index)
+        code = self._get_orientation_code(orientation)
+        self._add_contributions(index, -1)
+        self._codes[index] = code
+        self._add_contributions(index, 1)
+
+    def set_component(self, index: int, component: Component):
+        """replace one component, totals are updated incrementally
+
+        Args:
+            index (int): component index
+            component (Component): new component, same area and orientation
+        """
+        index = self._check_index(index)
+        self._add_contributions(index, -1)
+        self.components[index] = component
+        self._values[index] = self._get_component_values(component)
+        self._add_contributions(index, 1)
+
+    def update_component(self, index: int):
+        """read again the values of one component changed in place (after Component.update)
+
+        Args:
+            index (int): component index
+        """
+        index = self._check_index(index)
+        self.set_component(index, self.components[index])
+
+    def recompute(self):
+        """sum again all contributions, removes the rounding drift of many incremental updates
+        """
+        self._totals[:] = 0
+        self._orientation_totals[:] = 0
+        if self._size:
+            self._add_contributions(np.arange(self._size), 1)
+
+    @staticmethod
+    def _get_totals_dict(totals: np.ndarray) -> dict:
+        area = totals[0]
+        results = {"area": area}
+        for i, (name, total_name) in enumerate(ENVELOPE_TOTALS.items()):
+            results[total_name] = totals[i + 1]
+            # area-weighted mean value
+            results[name] = totals[i + 1] / area if area > 0 else np.nan
+        return results
+
+    def get_totals(self) -> dict:
+        """area-weighted totals of the envelope
+
+        Returns:
+            dict: "area" [m²], "transmission_heat_transfer_coefficient" Σ U·A and
+                "periodic_heat_transfer_coefficient" Σ Y_ie·A [W/K], "internal_heat_capacity" Σ κ_i·A [kJ/K]
+                and area-weighted means "thermal_transmittance_component", "periodic_thermal_transmittance" [W/m²K],
+                "areal_heat_capacity_int" [kJ/m²K]
+        """
+        return self._get_totals_dict(self._totals)
+
+    def get_orientation_totals(self, orientation: str) -> dict:
+        """area-weighted totals of one orientation
+
+        Args:
+            orientation (str): orientation label
+
+        Raises:
+            KeyError: orientation not in envelope
+
+        Returns:
+            dict: same keys as get_totals
+        """
+        return self._get_totals_dict(self._orientation_totals[self._orientation_codes[orientation]])
+
+    def get_orientation_dataframe(self) -> pd.DataFrame:
+        """totals by orientation
+
+        Returns:
+            pd.DataFrame: one row by orientation, columns as get_totals
+        """
+        return pd.DataFrame([self.get_orientation_totals(orientation) for orientation in self.orientations],
+                            index=pd.Index(self.orientations, name="orientation"))
@@ -0,0 +1,345 @@
+"""interactive explorer of layer thicknesses with incremental recomputation
+
+Only the matrices of changed layers and the products after them are computed again,
+chart artists are created once and updated in place, slider moves are debounced.
+
+Example (notebook with ipywidgets):
+    explorer = ComponentExplorer(wall)
+    display(explorer.get_sliders(), explorer.figure)
+"""
+import asyncio
+import copy
+import time
+import numpy as np
+from matplotlib.backend_bases import TimerBase
+from matplotlib.figure import Figure
+from becalib.component import Component
+from becalib.batch import (
+    get_layers_arrays,
+    get_surface_resistances_array,
+    get_thermal_resistances_array,
+    get_heat_transfer_matrices,
+)
+from becalib.algos import (
+    get_periodic_thermal_transmittance,
+    get_time_shift,
+    get_areal_heat_capacity_int,
+    get_threshold_codes_italian_dm_26_06_2009,
+)
+from becalib.translator import get_translator
+
+
+class ComponentExplorer():
+    def __init__(self,
+            component: Component,
+            max_temp: float = 35,
+            min_temp: float = 28,
+            debounce: float = 0.05,
+            figure: Figure | None = None,
+            ):
+        """interactive explorer of the layer thicknesses of a component.
+            The component and its layers are not modified, see to_component.
+
+        Args:
+            component (Component): component with homogeneous layers
+            max_temp (float, optional): max exterior temperature of the waves chart. Defaults to 35°C.
+            min_temp (float, optional): min exterior temperature of the waves chart. Defaults to 28°C.
+            debounce (float, optional): delay in [s] without new input before recomputing,
+                timed by the canvas on the GUI event loop, else by the running asyncio loop
+                (notebook kernel), else 0. 0 recomputes at each input. Defaults to 0.05 s.
+            figure (Figure | None, optional): figure to draw in. Defaults to None = new pyplot
+                figure of the current backend (interactive with %matplotlib widget).
+
+        Raises:
+            ValueError: component with inhomogeneous layers
+        """
+        layers_arrays = get_layers_arrays([component.layers], component.heat_flow_direction)
+        if "component_index" in layers_arrays:
+            raise ValueError("explorer is not available for components with inhomogeneous layers")
+
+        self.component = component
+        self.time_period = component.time_period
+        self.max_temp = max_temp
+        self.min_temp = min_temp
+        self.debounce = debounce
+        self.language = component.language
+        # translator installed once, not at each redraw
+        self._ = get_translator(self.language)
+
+        self._layers_arrays = layers_arrays
+        self._names = [layer.name for layer in component.layers]
+        rsi, rse = get_surface_resistances_array(layers_arrays["heat_flow_directions"])
+        self._surface_thermal_resistances = (rsi[0], rse[0])
+
+        self._resistances = self._get_thermal_resistances(slice(None))
+        self._matrices = self._get_matrices(slice(None))
+
+        # prefix products P_k = Z_k-1 ... Z_0 · Z_i, P_0 = Z_i
+        n_layers = len(self._names)
+        self._products = np.zeros((n_layers + 1, 2, 2), dtype=np.complex128)
+        self._products[0] = [[1, -rsi[0]], [0, 1]]
+        self._update_products(0)
+
+        self._pending = {}
+        self._flush_handle = None
+        self.last_update_time = 0.0
+
+        self.results = self._get_results()
+        self.figure = self._create_figure(figure)
+        self._timer = self._get_timer()
+
+    @property
+    def thicknesses(self) -> np.ndarray:
+        """current thicknesses of layers in [m]"""
+        return self._layers_arrays["thicknesses"][0].copy()
+
+    def _get_thermal_resistances(self, columns: slice | list) -> np.ndarray:
+        arrays = self._layers_arrays
+        return get_thermal_resistances_array(
+            arrays["thicknesses"][:, columns], arrays["thermal_conductivities"][:, columns],
+            arrays["is_air"][:, columns], arrays["heat_flow_directions"])[0]
+
+    def _get_matrices(self, columns: slice | list) -> np.ndarray:
+        arrays = self._layers_arrays
+        return get_heat_transfer_matrices(
+            thicknesses=arrays["thicknesses"][:, columns],
+            thermal_conductivities=arrays["thermal_conductivities"][:, columns],
+            gross_densities=arrays["gross_densities"][:, columns],
+            specific_heat_capacities=arrays["specific_heat_capacities"][:, columns],
+            thermal_resistances=self._get_thermal_resistances(columns)[np.newaxis],
+            is_air=arrays["is_air"][:, columns],
+            time_period=self.time_period)[0]
+
+    def _update_products(self, first_layer: int):
+        # products before the first changed layer are still valid
+        for k in range(first_layer, len(self._names)):
+            self._products[k + 1] = self._matrices[k] @ self._products[k]
+
+    def _get_results(self) -> dict:
+        rsi, rse = self._surface_thermal_resistances
+        product = self._products[-1]
+        z_e = np.array([[1, -rse], [0, 1]], dtype=np.complex128)
+        htm = z_e @ product
+
+        thermal_transmittance = 1 / (rsi + np.sum(self._resistances) + rse)
+        periodic_thermal_transmittance = float(get_periodic_thermal_transmittance(htm))
+        decrement_factor = periodic_thermal_transmittance / thermal_transmittance
+        time_shift = float(get_time_shift(htm, self.time_period))
+
+        return {
+            "thickness_component": float(np.sum(self._layers_arrays["thicknesses"])),
+            "thermal_transmittance_component": float(thermal_transmittance),
+            "periodic_thermal_transmittance": periodic_thermal_transmittance,
+            "decrement_factor": float(decrement_factor),
+            "time_shift": time_shift,
+            "areal_heat_capacity_int": float(get_areal_heat_capacity_int(htm, self.time_period)),
+            "threshold_code_italian_dm_26_06_2009": int(
+                get_threshold_codes_italian_dm_26_06_2009(time_shift, decrement_factor)),
+        }
+
+    # chart artists, created once
+    def _get_wave_values(self) -> tuple:
+        mean = (self.max_temp + self.min_temp) / 2
+        amplitude = (self.max_temp - self.min_temp) / 2
+        b = 2 * np.pi / self.time_period
+        exterior = amplitude * np.sin(b * self._times) + mean
+        interior = amplitude * self.results["decrement_factor"] * np.sin(
+            b * (self._times - self.results["time_shift"])) + mean
+        return exterior, interior
+
+    def _get_title(self) -> str:
+        _ = self._
+        return (f"{_('Time shift')}: {self.results['time_shift']:.1f} [h]   "
+                f"{_('Decrement factor')}: {self.results['decrement_factor']:.2f} [-]   "
+                f"U: {self.results['thermal_transmittance_component']:.3f} [W/m²K]")
+
+    def _create_figure(self, figure: Figure | None) -> Figure:
+        _ = self._
+        if figure is None:
+            # canvas (and timers) of the current backend, a bare Figure has no event loop
+            import matplotlib.pyplot as plt
+            figure = plt.figure(figsize=(8, 6))
+        figure.clear()
+        # fixed layout: constrained/tight layouts are computed again at each draw
+        figure.subplots_adjust(left=0.1, right=0.97, top=0.92, bottom=0.08, hspace=0.35)
+        ax_wave, ax_layers = figure.subplots(2, 1, height_ratios=[3, 1])
+
+        self._times = np.arange(0, 2 * self.time_period, 0.1)
+        exterior, interior = self._get_wave_values()
+        ax_wave.plot(self._times, exterior, label=_("Text"))
+        (self._interior_line,) = ax_wave.plot(self._times, interior, label=_("Tsurf_int"))
+        ax_wave.set_xlabel(_('Time [h]'), fontsize=10)
+        ax_wave.set_ylabel(_('Temperature [°C]'), fontsize=10)
+        ax_wave.set_ylim(self.min_temp - 1, self.max_temp + 1)
+        ax_wave.legend(loc="upper right")
+        ax_wave.grid()
+        self._title = ax_wave.set_title(self._get_title(), fontsize=10)
+
+        thicknesses = self._layers_arrays["thicknesses"][0]
+        self._layer_bars = ax_layers.barh(
+            y=0, width=thicknesses, left=np.cumsum(thicknesses) - thicknesses,
+            color=[f"C{i % 10}" for i in range(thicknesses.size)], edgecolor="k")
+        ax_layers.set_yticks([])
+        ax_layers.set_xlabel(_("thickness [m]"), fontsize=10)
+        ax_layers.set_xlim(0, self._get_layers_axis_limit(np.sum(thicknesses)))
+        self._ax_layers = ax_layers
+
+        # changing artists are drawn over a cached background (blitting)
+        self._animated_artists = [self._interior_line, self._title, *self._layer_bars]
+        for artist in self._animated_artists:
+            artist.set_animated(True)
+        self._background = None
+        figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+        return figure
+
+    @staticmethod
+    def _get_layers_axis_limit(thickness_component: float) -> float:
+        # headroom: the axis (full redraw) changes only when the component outgrows it
+        return max(1.25 * thickness_component, 1e-3)
+
+    def _on_draw(self, event):
+        # full redraw: new background, then changing artists
+        canvas = self.figure.canvas
+        self._background = canvas.copy_from_bbox(self.figure.bbox) if canvas.supports_blit else None
+        for artist in self._animated_artists:
+            self.figure.draw_artist(artist)
+
+    def _update_artists(self):
+        _exterior, interior = self._get_wave_values()
+        self._interior_line.set_ydata(interior)
+        self._title.set_text(self._get_title())
+
+        thicknesses = self._layers_arrays["thicknesses"][0]
+        for bar, left, width in zip(self._layer_bars, np.cumsum(thicknesses) - thicknesses, thicknesses):
+            bar.set_x(left)
+            bar.set_width(width)
+
+        canvas = self.figure.canvas
+        thickness_component = np.sum(thicknesses)
+        limit = self._ax_layers.get_xlim()[1]
+        if self._background is None or not (0.5 * limit < thickness_component <= limit):
+            self._ax_layers.set_xlim(0, self._get_layers_axis_limit(thickness_component))
+            canvas.draw_idle()
+            return
+
+        canvas.restore_region(self._background)
+        for artist in self._animated_artists:
+            self.figure.draw_artist(artist)
+        canvas.blit(self.figure.bbox)
+
+    def _get_timer(self) -> TimerBase | None:
+        # single shot timer of the canvas, None without event loop (base timer never fires)
+        if not self.debounce > 0:
+            return None
+        timer = self.figure.canvas.new_timer(interval=max(int(self.debounce * 1000), 1))
+        if type(timer) is TimerBase:
+            return None
+        timer.single_shot = True
+        timer.add_callback(self.flush)
+        return timer
+
+    def set_thickness(self, index: int, thickness: float):
+        """new thickness of one layer, recomputed after debounce seconds without new input
+
+        Args:
+            index (int): layer index, interior to exterior
+            thickness (float): in [m]
+
+        Raises:
+            ValueError: thickness <= 0
+        """
+        if not thickness > 0:
+            raise ValueError(f"thickness must be > 0: {thickness}")
+        index = range(len(self._names))[index]
+
+        self._pending[index] = float(thickness)
+
+        # flush and redraw run on the event loop of the caller, not in a worker thread,
+        # delay restarted at each input: only the last input of a drag is computed
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer.start()
+            return
+        try:
+            loop = asyncio.get_running_loop() if self.debounce > 0 else None
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            self.flush()
+            return
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(self.debounce, self.flush)
+
+    def flush(self):
+        """recompute and redraw now with the last pending thicknesses
+        """
+        start = time.perf_counter()
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        columns = sorted(pending)
+        self._layers_arrays["thicknesses"][0, columns] = [pending[column] for column in columns]
+        self._resistances[columns] = self._get_thermal_resistances(columns)
+        self._matrices[columns] = self._get_matrices(columns)
+        self._update_products(columns[0])
+        self.results = self._get_results()
+
+        self._update_artists()
+        self.last_update_time = time.perf_counter() - start
+
+    def to_component(self, name: str | None = None) -> Component:
+        """new component with the current thicknesses (copies of layers)
+
+        Args:
+            name (str | None, optional): component name. Defaults to None = name of the explored component.
+
+        Returns:
+            Component:
+        """
+        self.flush()
+        layers = []
+        for layer, thickness in zip(self.component.layers, self.thicknesses):
+            layer = copy.copy(layer)
+            layer.thickness = float(thickness)
+            layers.append(layer)
+        return Component(
+            name=self.component.name if name is None else name,
+            layers=layers,
+            heat_flow_direction=self.component.heat_flow_direction,
+            time_period=self.time_period,
+            language=self.language)
+
+    def get_sliders(self,
+            min_thickness: float = 0.001,
+            max_thickness: float = 0.5,
+            step: float = 0.001):
+        """one ipywidgets slider by layer, connected to set_thickness
+
+        Args:
+            min_thickness (float, optional): in [m]. Defaults to 0.001 m.
+            max_thickness (float, optional): in [m]. Defaults to 0.5 m.
+            step (float, optional): in [m]. Defaults to 0.001 m.
+
+        Raises:
+            ImportError: ipywidgets is not installed
+
+        Returns:
+            ipywidgets.VBox: sliders
+        """
+        try:
+            import ipywidgets
+        except ImportError as error:
+            raise ImportError("sliders need ipywidgets: pip install ipywidgets") from error
+
+        sliders = []
+        for index, (name, thickness) in enumerate(zip(self._names, self.thicknesses)):
+            slider = ipywidgets.FloatSlider(
+                value=thickness, min=min_thickness, max=max(max_thickness, thickness),
+                step=step, description=name, readout_format=".3f", continuous_update=True)
+            slider.observe(lambda change, index=index: self.set_thickness(index, change["new"]), names="value")
+            sliders.append(slider)
+        return ipywidgets.VBox(sliders)
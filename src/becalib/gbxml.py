@@ -0,0 +1,248 @@
+"""streaming gbXML constructions importer: Material, Layer and Construction elements
+to component definitions (see becalib.definitions), identical constructions merged
+
+The file is read with iterparse, elements are dropped as soon as they end: memory
+holds the materials, layers and constructions tables only, not the geometry.
+
+Example:
+    definitions = list(iter_gbxml_definitions("building.xml"))
+    results = evaluate_definitions(definitions)
+    components = read_gbxml_components("building.xml")
+"""
+import json
+import xml.etree.ElementTree as ET
+from typing import Iterator
+from becalib.component import Component
+from becalib.definitions import get_layers_from_definition
+
+
+# gbXML unit attribute: factor to SI unit
+LENGTH_UNITS = {"Meters": 1.0, "Centimeters": 0.01, "Millimeters": 0.001, "Kilometers": 1000.0,
+                "Feet": 0.3048, "Inches": 0.0254}
+MATERIAL_VALUES = {
+    # gbXML element: (layer dict key, units)
+    "Thickness": ("thickness", LENGTH_UNITS),
+    "Conductivity": ("thermal_conductivity", {"WPerMeterK": 1.0, "BtuPerHourFtF": 1.730735}),
+    "Density": ("gross_density", {"KgPerCubicM": 1.0, "LbsPerCubicF": 16.018463}),
+    "SpecificHeat": ("specific_heat_capacity", {"JPerKgK": 1.0, "BTUPerLbF": 4186.8}),
+    "R-value": ("thermal_resistance", {"SquareMeterKPerW": 1.0, "HrSquareFtFPerBTU": 0.1761102}),
+}
+
+# gbXML surfaceType: heat flow direction of its construction (others "Ho")
+SURFACE_HEAT_FLOW_DIRECTIONS = {
+    "Roof": "Up",
+    "Ceiling": "Up",
+    "UndergroundCeiling": "Up",
+    "SlabOnGrade": "Do",
+    "UndergroundSlab": "Do",
+    "RaisedFloor": "Do",
+    "InteriorFloor": "Do",
+    "ExposedFloor": "Do",
+}
+
+
+def _get_tag(element: ET.Element) -> str:
+    # local name without {namespace}
+    return element.tag.rpartition("}")[2]
+
+
+def _get_child(element: ET.Element, tag: str) -> ET.Element | None:
+    for child in element:
+        if _get_tag(child) == tag:
+            return child
+    return None
+
+
+def _get_material(element: ET.Element) -> dict:
+    material_id = element.get("id")
+    name_element = _get_child(element, "Name")
+    material = {"name": name_element.text.strip() if name_element is not None and name_element.text else material_id}
+
+    for child in element:
+        tag = _get_tag(child)
+        if tag not in MATERIAL_VALUES or child.text is None:
+            continue
+        key, units = MATERIAL_VALUES[tag]
+        unit = child.get("unit", next(iter(units)))
+        if unit not in units:
+            raise ValueError(f"""material {material_id}: unknown {tag} unit {unit}
+            available choices: {", ".join(units)}
+            """)
+        material[key] = float(child.text) * units[unit]
+
+    return material
+
+
+def _get_material_layer(material_id: str, material: dict) -> dict:
+    # layer dict of a referenced material (unused materials are not checked)
+    if "thickness" not in material:
+        raise ValueError(f"material {material_id}: thickness is needed")
+    if all(key in material for key in ("thermal_conductivity", "gross_density", "specific_heat_capacity")):
+        layer = dict(material, is_air=False)
+        layer.pop("thermal_resistance", None)
+        return layer
+    if "air" in material["name"].lower():
+        # R of air gaps is computed again with ISO 6946 from thickness and heat flow direction
+        return {"name": material["name"], "thickness": material["thickness"], "is_air": True}
+    raise ValueError(f"material {material_id}: Conductivity, Density and SpecificHeat are needed "
+                     "(materials with R-value only are imported as air gaps when named air)")
+
+
+def _get_layer_materials(element: ET.Element) -> list[tuple]:
+    # (material id, fraction of layer area or None)
+    materials = []
+    for child in element:
+        if _get_tag(child) == "MaterialId":
+            fraction = child.get("percentOfLayer")
+            materials.append((child.get("materialIdRef"), None if fraction is None else float(fraction) / 100))
+    return materials
+
+
+def _get_construction(element: ET.Element) -> dict:
+    name_element = _get_child(element, "Name")
+    return {
+        "name": name_element.text.strip() if name_element is not None and name_element.text else element.get("id"),
+        "layer_ids": [child.get("layerIdRef") for child in element if _get_tag(child) == "LayerId"],
+    }
+
+
+def _get_construction_key(heat_flow_direction: str, layers: list[dict]) -> str:
+    def get_values(layer: dict) -> dict:
+        values = {key: value for key, value in layer.items() if key != "name"}
+        if "sections" in values:
+            values["sections"] = [{"fraction": section["fraction"], "layer": get_values(section["layer"])}
+                                  for section in values["sections"]]
+        return values
+    return json.dumps([heat_flow_direction, [get_values(layer) for layer in layers]], sort_keys=True)
+
+
+def _read_gbxml_tables(path: str) -> tuple:
+    """materials, layers, constructions and surface types of constructions,
+        elements are removed from the tree as soon as they are read
+    """
+    materials, layers, constructions, surface_types = {}, {}, {}, {}
+    readers = {"Material": (_get_material, materials),
+               "Layer": (_get_layer_materials, layers),
+               "Construction": (_get_construction, constructions)}
+
+    stack = []
+    read_depth = None # depth of the Material, Layer or Construction being read
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        tag = _get_tag(element)
+        if event == "start":
+            stack.append(element)
+            if read_depth is None and tag in readers:
+                read_depth = len(stack)
+            elif tag == "Surface" and element.get("constructionIdRef") is not None:
+                # attributes are complete at start, geometry is skipped
+                surface_types.setdefault(element.get("constructionIdRef"), element.get("surfaceType"))
+            continue
+
+        stack.pop()
+        if read_depth is not None and len(stack) >= read_depth:
+            continue # children of the element being read
+
+        if read_depth is not None:
+            read_depth = None
+            reader, table = readers[tag]
+            table[element.get("id")] = reader(element)
+
+        # drop the element: it is the last child of its parent
+        element.clear()
+        if stack:
+            del stack[-1][-1]
+
+    return materials, layers, constructions, surface_types
+
+
+def iter_gbxml_definitions(path: str, exterior_first: bool = True, time_period: float = 24) -> Iterator[dict]:
+    """component definitions of gbXML constructions, identical constructions are merged:
+        one definition by distinct layer values (names aside) and heat flow direction,
+        with "construction_ids" of all merged constructions
+
+        Layers with many MaterialId and percentOfLayer are inhomogeneous layers, layers with many
+        MaterialId without percentOfLayer are consecutive material layers.
+        Heat flow direction comes from the surfaceType of the first surface using the construction
+        (see SURFACE_HEAT_FLOW_DIRECTIONS), "Ho" for unused constructions.
+
+    Args:
+        path (str): gbXML file path
+        exterior_first (bool, optional): gbXML layers listed from exterior to interior,
+            reversed to becalib order (interior to exterior). Defaults to True.
+        time_period (float, optional): analysis period in [h]. Defaults to 24 h.
+
+    Raises:
+        ValueError: missing references or material values
+
+    Yields:
+        dict: component definition
+    """
+    materials, layers, constructions, surface_types = _read_gbxml_tables(path)
+
+    definitions = {}
+    for construction_id, construction in constructions.items():
+        heat_flow_direction = SURFACE_HEAT_FLOW_DIRECTIONS.get(surface_types.get(construction_id), "Ho")
+
+        construction_layers = []
+        for layer_id in construction["layer_ids"]:
+            if layer_id not in layers:
+                raise ValueError(f"construction {construction_id}: unknown layer {layer_id}")
+            layer_materials = layers[layer_id]
+            for material_id, _fraction in layer_materials:
+                if material_id not in materials:
+                    raise ValueError(f"layer {layer_id}: unknown material {material_id}")
+            material_layers = [_get_material_layer(material_id, materials[material_id])
+                               for material_id, _fraction in layer_materials]
+
+            fractions = [fraction for _material_id, fraction in layer_materials]
+            if len(material_layers) > 1 and None not in fractions:
+                construction_layers.append({
+                    "name": layer_id,
+                    "thickness": material_layers[0]["thickness"],
+                    "sections": [{"fraction": fraction, "layer": layer}
+                                 for fraction, layer in zip(fractions, material_layers)],
+                    "is_air": False})
+            else:
+                construction_layers.extend(material_layers)
+
+        if exterior_first:
+            construction_layers.reverse()
+        construction_layers = [dict(layer, heat_flow_direction=heat_flow_direction) if layer["is_air"] else layer
+                               for layer in construction_layers]
+
+        # identical constructions: same layer values, names aside
+        key = _get_construction_key(heat_flow_direction, construction_layers)
+        if key in definitions:
+            definitions[key]["construction_ids"].append(construction_id)
+        else:
+            definitions[key] = {
+                "name": construction["name"],
+                "heat_flow_direction": heat_flow_direction,
+                "time_period": time_period,
+                "layers": construction_layers,
+                "construction_ids": [construction_id],
+            }
+
+    yield from definitions.values()
+
+
+def read_gbxml_components(path: str, exterior_first: bool = True, time_period: float = 24,
+                          language: str = "en") -> list[Component]:
+    """Component objects of distinct gbXML constructions, see iter_gbxml_definitions
+
+    Args:
+        path (str): gbXML file path
+        exterior_first (bool, optional): gbXML layers listed from exterior to interior. Defaults to True.
+        time_period (float, optional): analysis period in [h]. Defaults to 24 h.
+        language (str, optional): Defaults to "en".
+
+    Returns:
+        list[Component]:
+    """
+    return [Component(
+                name=definition["name"],
+                layers=get_layers_from_definition(definition),
+                heat_flow_direction=definition["heat_flow_direction"],
+                time_period=definition["time_period"],
+                language=language)
+            for definition in iter_gbxml_definitions(path, exterior_first, time_period)]
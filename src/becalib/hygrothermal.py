@@ -0,0 +1,311 @@
+"""interstitial condensation risk by the Glaser method (ISO 13788),
+vectorized over the 12 months and many components
+
+Example:
+    results = evaluate_condensation(
+        layers_list=[wall.layers for wall in walls],
+        exterior_temperatures=[0.4, 2.3, 7.2, 11.5, 16.2, 20.4, 23.1, 22.4, 18.1, 12.2, 6.2, 1.6],
+        exterior_relative_humidities=[0.85, 0.8, 0.75, 0.75, 0.75, 0.7, 0.65, 0.7, 0.75, 0.8, 0.85, 0.85])
+    results["max_accumulated"], results["dries_out"]
+"""
+import numpy as np
+from becalib.layers import LayerBase
+from becalib.batch import get_layers_arrays, get_thermal_resistances_array, get_surface_resistances_array
+
+
+# water vapour permeability of still air δ0 in [kg/(m s Pa)] (ISO 13788)
+VAPOUR_PERMEABILITY_AIR = 2e-10
+
+# net condensation rates below are numerical noise of straight profiles in [kg/(m² s)]
+CONDENSATION_RATE_TOLERANCE = 1e-14
+
+DAYS_IN_MONTHS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def get_saturation_vapour_pressures(temperatures: float | np.ndarray) -> np.ndarray:
+    """saturation water vapour pressure (ISO 13788 annex E)
+
+    Args:
+        temperatures (float | np.ndarray): in [°C]
+
+    Returns:
+        np.ndarray: p_sat in [Pa]
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    return np.where(
+        temperatures >= 0,
+        610.5 * np.exp(17.269 * temperatures / (237.3 + temperatures)),
+        610.5 * np.exp(21.875 * temperatures / (265.5 + temperatures)))
+
+
+def get_hygrothermal_arrays(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str = "Ho",
+        ) -> dict[str, np.ndarray]:
+    """padded (components x layers) thermal resistances and s_d of many components, from the
+        same layer arrays as the thermal analysis (see becalib.batch.get_layers_arrays),
+        padding layers have R = s_d = 0
+
+        Section paths of inhomogeneous layers are combined layer by layer as parallel
+        layers: R = 1/Σ(f/R) (lower limit of ISO 6946) and s_d = 1/Σ(f/s_d).
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        heat_flow_directions (list[str] | str, optional): "Ho", "Up" or "Do" by component. Defaults to "Ho".
+
+    Raises:
+        ValueError: material layers without vapour_resistance_factor, layers without vapour
+            resistance (s_d <= 0)
+
+    Returns:
+        dict[str, np.ndarray]: "thermal_resistances", "vapour_diffusion_thicknesses" (n, n_layers),
+            "layer_counts", "surface_thermal_resistances_int", "surface_thermal_resistances_ext" (n,)
+    """
+    layers_arrays = get_layers_arrays(layers_list, heat_flow_directions)
+    thicknesses = layers_arrays["thicknesses"]
+    vapour_resistance_factors = layers_arrays["vapour_resistance_factors"]
+
+    unknown = np.isnan(vapour_resistance_factors).any(axis=1)
+    component_index = layers_arrays.get("component_index")
+    if unknown.any():
+        components = np.unique(component_index[unknown] if component_index is not None else np.flatnonzero(unknown))
+        raise ValueError(f"""vapour_resistance_factor (μ) is needed for all material layers
+        components without μ: {", ".join(str(i) for i in components[:10])}""")
+
+    # same air resistances as the thermal analysis: heat flow direction of the component
+    thermal_resistances = get_thermal_resistances_array(
+        thicknesses=thicknesses,
+        thermal_conductivities=layers_arrays["thermal_conductivities"],
+        is_air=layers_arrays["is_air"],
+        heat_flow_directions=layers_arrays["heat_flow_directions"])
+    vapour_diffusion_thicknesses = vapour_resistance_factors * thicknesses
+    rsi, rse = get_surface_resistances_array(layers_arrays["heat_flow_directions"])
+
+    layer_counts = np.array([len(layers) for layers in layers_list], dtype=np.int64)
+    row_counts = layer_counts if component_index is None else layer_counts[component_index]
+    if (vapour_diffusion_thicknesses[np.arange(thicknesses.shape[1]) < row_counts[:, np.newaxis]] <= 0).any():
+        raise ValueError("vapour diffusion thickness s_d = μ d must be > 0 for all layers")
+
+    if component_index is not None:
+        # parallel section paths, padding layers (R = s_d = 0) stay 0
+        starts = np.flatnonzero(np.r_[True, component_index[1:] != component_index[:-1]])
+        section_weights = layers_arrays["section_weights"][:, np.newaxis]
+
+        def combine(values: np.ndarray) -> np.ndarray:
+            conductances = np.add.reduceat(section_weights * np.divide(
+                1, values, out=np.zeros(values.shape), where=values > 0), starts)
+            return np.divide(1, conductances, out=np.zeros(conductances.shape), where=conductances > 0)
+
+        thermal_resistances = combine(thermal_resistances)
+        vapour_diffusion_thicknesses = combine(vapour_diffusion_thicknesses)
+        rsi, rse = rsi[starts], rse[starts]
+
+    return {
+        "thermal_resistances": thermal_resistances,
+        "vapour_diffusion_thicknesses": vapour_diffusion_thicknesses,
+        "layer_counts": layer_counts,
+        "surface_thermal_resistances_int": rsi,
+        "surface_thermal_resistances_ext": rse,
+    }
+
+
+def get_vapour_pressure_profiles(
+        positions: np.ndarray,
+        ceilings: np.ndarray,
+        pinned: np.ndarray,
+        ) -> np.ndarray:
+    """Glaser vapour pressure profiles: straight lines between pinned interfaces
+        (surfaces, wet interfaces) bent at interfaces where the pressure would exceed
+        saturation, that is the greatest convex minorant of the ceilings between pinned
+        interfaces, evaluated as the min of chords spanning each interface
+
+    Args:
+        positions (np.ndarray): (..., K) cumulative s_d of interfaces in [m], non decreasing
+        ceilings (np.ndarray): (..., K) p_sat of interfaces, fixed pressures of pinned interfaces in [Pa]
+        pinned (np.ndarray): (..., K) bool, interfaces with fixed pressure
+
+    Returns:
+        np.ndarray: (..., K) vapour pressures in [Pa]
+    """
+    n_points = positions.shape[-1]
+    index = np.arange(n_points)
+
+    # chord (a, b) allowed if a < b and no pinned interface strictly between a and b
+    pinned_count = np.cumsum(pinned, axis=-1)
+    between = pinned_count[..., np.newaxis, :] - pinned_count[..., :, np.newaxis] \
+        - pinned[..., np.newaxis, :]
+    allowed = (index[:, np.newaxis] < index[np.newaxis, :]) & (between == 0)
+
+    x_a, x_b = positions[..., :, np.newaxis], positions[..., np.newaxis, :]
+    p_a, p_b = ceilings[..., :, np.newaxis], ceilings[..., np.newaxis, :]
+    dx = x_b - x_a
+    slopes = np.divide(p_b - p_a, dx, out=np.zeros(dx.shape), where=dx > 0)
+
+    profiles = ceilings.copy()
+    for j in range(n_points):
+        spanning = allowed & (index[:, np.newaxis] <= j) & (index[np.newaxis, :] >= j)
+        chords = np.where(dx > 0, p_a + slopes * (positions[..., j, np.newaxis, np.newaxis] - x_a),
+                          np.minimum(p_a, p_b))
+        profiles[..., j] = np.minimum(ceilings[..., j], np.min(np.where(spanning, chords, np.inf), axis=(-2, -1)))
+
+    return profiles
+
+
+def _get_condensation_rates(positions: np.ndarray, pressures: np.ndarray) -> np.ndarray:
+    # net condensation rate g_in - g_out at each interface in [kg/(m² s)], 0 on zero width segments
+    dx = np.diff(positions, axis=-1)
+    fluxes = VAPOUR_PERMEABILITY_AIR * np.divide(
+        -np.diff(pressures, axis=-1), dx, out=np.zeros(dx.shape), where=dx > 0)
+    padded = np.zeros(fluxes.shape[:-1] + (fluxes.shape[-1] + 2,))
+    padded[..., 1:-1] = fluxes
+    rates = padded[..., :-1] - padded[..., 1:]
+    return np.where(np.abs(rates) > CONDENSATION_RATE_TOLERANCE, rates, 0)
+
+
+def evaluate_condensation_arrays(
+        hygrothermal_arrays: dict[str, np.ndarray],
+        exterior_temperatures: np.ndarray,
+        exterior_relative_humidities: np.ndarray,
+        interior_temperatures: float | np.ndarray = 20,
+        interior_relative_humidities: float | np.ndarray = 0.5,
+        ) -> dict[str, np.ndarray]:
+    """monthly Glaser method (ISO 13788) of many components in one vectorized pass
+
+        Interfaces are the K = n_layers + 1 layer boundaries, 0 = interior surface.
+        Moisture accumulates from the first month with condensation (after a month
+        without), an interface with accumulated moisture is kept at saturation until it
+        dries out.
+
+    Args:
+        hygrothermal_arrays (dict[str, np.ndarray]): see get_hygrothermal_arrays
+        exterior_temperatures (np.ndarray): θe in [°C], (12,) or (n, 12) monthly means
+        exterior_relative_humidities (np.ndarray): φe [0-1], (12,) or (n, 12)
+        interior_temperatures (float | np.ndarray, optional): θi in [°C]. Defaults to 20 °C.
+        interior_relative_humidities (float | np.ndarray, optional): φi [0-1]. Defaults to 0.5.
+
+    Returns:
+        dict[str, np.ndarray]: by calendar month (n, 12, K): "temperatures" [°C],
+            "saturation_vapour_pressures", "vapour_pressures" [Pa], "condensation" net condensed
+            (< 0 evaporated) in the month and "accumulated" at the end of the month [kg/m²];
+            by component (n,): "max_accumulated", "residual" [kg/m²] at the end of the year,
+            "condensation_risk" (moisture accumulates) and "dries_out" (no residual) bool.
+            Values of padding interfaces are NaN (temperatures, pressures) or 0.
+    """
+    thermal_resistances = hygrothermal_arrays["thermal_resistances"]
+    vapour_diffusion_thicknesses = hygrothermal_arrays["vapour_diffusion_thicknesses"]
+    layer_counts = hygrothermal_arrays["layer_counts"]
+    rsi = hygrothermal_arrays["surface_thermal_resistances_int"]
+    rse = hygrothermal_arrays["surface_thermal_resistances_ext"]
+    n_components, n_layers = thermal_resistances.shape
+    n_points = n_layers + 1
+    shape = (n_components, 12)
+
+    theta_e = np.broadcast_to(np.asarray(exterior_temperatures, dtype=np.float64), shape)
+    theta_i = np.broadcast_to(np.asarray(interior_temperatures, dtype=np.float64), shape)
+    p_e = np.broadcast_to(np.asarray(exterior_relative_humidities, dtype=np.float64), shape) \
+        * get_saturation_vapour_pressures(theta_e)
+    p_i = np.broadcast_to(np.asarray(interior_relative_humidities, dtype=np.float64), shape) \
+        * get_saturation_vapour_pressures(theta_i)
+
+    # interfaces (n, K): thermal resistance from interior air, cumulative s_d
+    resistances = rsi[:, np.newaxis] + np.concatenate(
+        [np.zeros((n_components, 1)), np.cumsum(thermal_resistances, axis=1)], axis=1)
+    total_resistances = resistances[:, -1] + rse
+    positions = np.concatenate(
+        [np.zeros((n_components, 1)), np.cumsum(vapour_diffusion_thicknesses, axis=1)], axis=1)
+
+    index = np.arange(n_points)
+    valid = index <= layer_counts[:, np.newaxis]
+    inner = (index > 0) & (index < layer_counts[:, np.newaxis])
+    exterior = index >= layer_counts[:, np.newaxis]
+
+    # (n, 12, K) temperatures and saturation pressures
+    temperatures = theta_i[..., np.newaxis] - (resistances / total_resistances[:, np.newaxis])[:, np.newaxis, :] \
+        * (theta_i - theta_e)[..., np.newaxis]
+    saturation_pressures = get_saturation_vapour_pressures(temperatures)
+
+    def get_month_profiles(months: np.ndarray, wet: np.ndarray) -> tuple:
+        # (n, K) profiles of one month by component, surfaces and wet interfaces pinned
+        rows = np.arange(n_components)
+        ceilings = np.where(exterior, p_e[rows, months][:, np.newaxis], saturation_pressures[rows, months])
+        ceilings[:, 0] = p_i[rows, months]
+        pinned = exterior | wet
+        pinned[:, 0] = True
+        pressures = get_vapour_pressure_profiles(positions, ceilings, pinned)
+        return pressures, np.where(inner, _get_condensation_rates(positions, pressures), 0)
+
+    # start month: first month with condensation after a month without (dry interfaces)
+    dry = np.zeros((n_components, n_points), dtype=bool)
+    condensing = np.zeros(shape, dtype=bool)
+    for month in range(12):
+        _pressures, rates = get_month_profiles(np.full(n_components, month), dry)
+        condensing[:, month] = (rates > 0).any(axis=1)
+    starts = condensing & ~np.roll(condensing, 1, axis=1)
+    start_months = np.where(starts.any(axis=1), np.argmax(starts, axis=1), 0)
+
+    seconds = DAYS_IN_MONTHS * 86400
+    accumulated = np.zeros((n_components, n_points))
+    vapour_pressures = np.zeros((n_components, 12, n_points))
+    condensation = np.zeros((n_components, 12, n_points))
+    accumulated_months = np.zeros((n_components, 12, n_points))
+    rows = np.arange(n_components)
+
+    for step in range(12):
+        months = (start_months + step) % 12
+        pressures, rates = get_month_profiles(months, accumulated > 0)
+        # evaporation is limited by the accumulated moisture
+        amounts = np.maximum(rates * seconds[months][:, np.newaxis], -accumulated)
+        accumulated = accumulated + amounts
+
+        vapour_pressures[rows, months] = pressures
+        condensation[rows, months] = amounts
+        accumulated_months[rows, months] = accumulated
+
+    nan_padding = np.where(valid, 0, np.nan)[:, np.newaxis, :]
+    max_accumulated = accumulated_months.sum(axis=2).max(axis=1)
+    residual = accumulated.sum(axis=1)
+
+    return {
+        "temperatures": temperatures + nan_padding,
+        "saturation_vapour_pressures": saturation_pressures + nan_padding,
+        "vapour_pressures": vapour_pressures + nan_padding,
+        "condensation": condensation,
+        "accumulated": accumulated_months,
+        "max_accumulated": max_accumulated,
+        "residual": residual,
+        "condensation_risk": max_accumulated > 0,
+        "dries_out": residual <= 0,
+    }
+
+
+def evaluate_condensation(
+        layers_list: list[list[LayerBase]],
+        exterior_temperatures: np.ndarray,
+        exterior_relative_humidities: np.ndarray,
+        heat_flow_directions: list[str] | str = "Ho",
+        interior_temperatures: float | np.ndarray = 20,
+        interior_relative_humidities: float | np.ndarray = 0.5,
+        ) -> dict[str, np.ndarray]:
+    """interstitial condensation check (ISO 13788) of many components at once,
+        same layers_list as becalib.batch.evaluate_batch
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        exterior_temperatures (np.ndarray): θe in [°C], (12,) or (n, 12) monthly means
+        exterior_relative_humidities (np.ndarray): φe [0-1], (12,) or (n, 12)
+        heat_flow_directions (list[str] | str, optional): "Ho", "Up" or "Do" by component. Defaults to "Ho".
+        interior_temperatures (float | np.ndarray, optional): θi in [°C]. Defaults to 20 °C.
+        interior_relative_humidities (float | np.ndarray, optional): φi [0-1]. Defaults to 0.5.
+
+    Raises:
+        ValueError: material layers without vapour_resistance_factor (μ), s_d <= 0
+
+    Returns:
+        dict[str, np.ndarray]: see evaluate_condensation_arrays
+    """
+    return evaluate_condensation_arrays(
+        get_hygrothermal_arrays(layers_list, heat_flow_directions),
+        exterior_temperatures=exterior_temperatures,
+        exterior_relative_humidities=exterior_relative_humidities,
+        interior_temperatures=interior_temperatures,
+        interior_relative_humidities=interior_relative_humidities)
@@ -0,0 +1,151 @@
+"""streaming EnergyPlus IDF export of components: Material, Material:AirGap and
+Construction objects, materials shared by components are written once
+
+Objects are written as soon as a component is read: memory holds the distinct
+materials and the used names, not the components.
+
+Example:
+    with open("constructions.idf", "w", encoding="utf-8") as file:
+        write_idf(file, winners) # Component objects or component definitions
+"""
+from typing import Iterable, Iterator, TextIO
+from becalib.component import Component
+from becalib.layers import LayerBase
+from becalib.definitions import get_layers_from_definition
+from becalib.air_resistances import get_resistance_unventilated_air_layer
+
+
+# max number of layers of an EnergyPlus Construction
+MAX_IDF_LAYERS = 10
+
+IDF_ROUGHNESS = ("VeryRough", "Rough", "MediumRough", "MediumSmooth", "Smooth", "VerySmooth")
+
+
+def _format_number(value: float) -> str:
+    return format(float(value), ".10g")
+
+
+def _format_idf_object(object_type: str, fields: list[tuple[str, str]]) -> str:
+    # one field by line with its comment, as written by the IDF editor
+    lines = [f"{object_type},"]
+    for i, (value, comment) in enumerate(fields):
+        separator = ";" if i == len(fields) - 1 else ","
+        lines.append(f"    {value + separator:<26}!- {comment}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _get_idf_name(name: str) -> str:
+    # commas and semicolons are IDF separators, "!" starts a comment
+    name = " ".join(str(name).replace(",", " ").replace(";", " ").replace("!", " ").split())
+    return name or "unnamed"
+
+
+class _UniqueNames():
+    # case insensitive unique names (IDF names of a same object class)
+    def __init__(self):
+        self._names = set()
+
+    def get(self, name: str) -> str:
+        unique_name, i = name, 1
+        while unique_name.lower() in self._names:
+            i += 1
+            unique_name = f"{name} {i}"
+        self._names.add(unique_name.lower())
+        return unique_name
+
+
+def _get_material_fields(layer: LayerBase, heat_flow_direction: str, roughness: str) -> tuple:
+    """(object type, values) of a layer, InhomogeneousLayer as an equivalent homogeneous material
+    """
+    if layer.is_air:
+        # ISO 6946 resistance with the heat flow direction of the component
+        return "Material:AirGap", (
+            (_format_number(get_resistance_unventilated_air_layer(
+                heat_flow_direction=heat_flow_direction, thickness=layer.thickness)), "Thermal Resistance {m2-K/W}"),)
+    return "Material", (
+        (roughness, "Roughness"),
+        (_format_number(layer.thickness), "Thickness {m}"),
+        (_format_number(layer.thermal_conductivity), "Conductivity {W/m-K}"),
+        (_format_number(layer.gross_density), "Density {kg/m3}"),
+        (_format_number(layer.specific_heat_capacity), "Specific Heat {J/kg-K}"),
+    )
+
+
+def iter_idf_objects(
+        components: Iterable[Component | dict],
+        roughness: str = "MediumRough",
+        ) -> Iterator[str]:
+    """IDF text of components one object at a time: new materials of a component, then its construction
+
+        Identical materials (same type and values) are written once, names are made unique
+        (case insensitive) with a number suffix. Air layers are Material:AirGap with the
+        ISO 6946 resistance of the component heat flow direction. InhomogeneousLayer are
+        written as homogeneous materials with equivalent values (lower limit λ, area-weighted ρ and c).
+        Construction layers are listed from exterior to interior (EnergyPlus order).
+
+    Args:
+        components (Iterable[Component | dict]): Component objects or component definitions
+            (see becalib.definitions), example a generator
+        roughness (str, optional): roughness of materials, one of IDF_ROUGHNESS. Defaults to "MediumRough".
+
+    Raises:
+        ValueError: invalid roughness, more than MAX_IDF_LAYERS layers
+
+    Yields:
+        str: IDF object text
+    """
+    if roughness not in IDF_ROUGHNESS:
+        raise ValueError(f"""invalid roughness: {roughness}
+        available choices: {", ".join(IDF_ROUGHNESS)}
+        """)
+
+    material_names = _UniqueNames()
+    construction_names = _UniqueNames()
+    materials = {} # (object type, values): name
+
+    for component in components:
+        if isinstance(component, Component):
+            name, layers, heat_flow_direction = component.name, component.layers, component.heat_flow_direction
+        else:
+            name, layers = component.get("name", ""), get_layers_from_definition(component)
+            heat_flow_direction = component.get("heat_flow_direction", "Ho")
+
+        if len(layers) > MAX_IDF_LAYERS:
+            raise ValueError(f"component {name}: EnergyPlus constructions have at most {MAX_IDF_LAYERS} layers")
+
+        layer_names = []
+        for layer in reversed(layers):
+            object_type, fields = _get_material_fields(layer, heat_flow_direction, roughness)
+            key = (object_type, tuple(value for value, _comment in fields))
+            if key not in materials:
+                material_name = material_names.get(_get_idf_name(layer.name))
+                materials[key] = material_name
+                yield _format_idf_object(object_type, [(material_name, "Name"), *fields])
+            layer_names.append(materials[key])
+
+        yield _format_idf_object("Construction", [
+            (construction_names.get(_get_idf_name(name)), "Name"),
+            *((layer_name, "Outside Layer" if i == 0 else f"Layer {i + 1}")
+              for i, layer_name in enumerate(layer_names))])
+
+
+def write_idf(
+        file: TextIO,
+        components: Iterable[Component | dict],
+        roughness: str = "MediumRough",
+        ) -> dict:
+    """write components as IDF objects, see iter_idf_objects
+
+    Args:
+        file (TextIO): text file opened for writing
+        components (Iterable[Component | dict]): Component objects or component definitions
+        roughness (str, optional): roughness of materials. Defaults to "MediumRough".
+
+    Returns:
+        dict: number of written objects by IDF object type
+    """
+    counts = {"Material": 0, "Material:AirGap": 0, "Construction": 0}
+    for idf_object in iter_idf_objects(components, roughness):
+        counts[idf_object[:idf_object.index(",")]] += 1
+        file.write(idf_object)
+    return counts
@@ -40,7 +40,8 @@ class MaterialLayer(LayerBase):
         gross_density:float,
         specific_heat_capacity:float,
         is_air:bool =False,
-        language:str="en" 
+        language:str="en",
+        vapour_resistance_factor:float | None=None,
 
         ):
         
@@ -54,6 +55,8 @@ class MaterialLayer(LayerBase):
             specific_heat_capacity (float): "c" [J/kgK]
             is_air (bool, optional): Defaults to False
             language (str, optional): Defaults to "en". 
+            vapour_resistance_factor (float | None, optional): "μ" [-] (ISO 10456), needed by the
+                condensation check (becalib.hygrothermal). Defaults to None (unknown).
         """
 
         super().__init__(name,
@@ -66,6 +69,7 @@ class MaterialLayer(LayerBase):
         self.thermal_conductivity= thermal_conductivity  # λ [W/mK]
         self.gross_density =gross_density # ro [kg/m³]
         self.specific_heat_capacity= specific_heat_capacity  # c [J/kgK]   
+        self.vapour_resistance_factor= vapour_resistance_factor  # μ [-]
     
     
 
@@ -97,6 +101,48 @@ class MaterialLayer(LayerBase):
         """
         return np.sqrt(self.thermal_conductivity*self.specific_heat_capacity*self.gross_density)
 
+    @property
+    def vapour_diffusion_thickness(self):
+        """water vapour diffusion-equivalent air layer thickness s_d = μ d in [m]
+        Returns:
+            float | None: s_d in [m], None if μ is unknown
+        """
+        if self.vapour_resistance_factor is None:
+            return None
+        return self.vapour_resistance_factor * self.thickness
+
+    def to_dict(self) -> dict:
+        """inputs as a plain (json serializable) dict
+        Returns:
+            dict: layer inputs
+        """
+        return {
+            "name": self.name,
+            "thickness": self.thickness,
+            "thermal_conductivity": self.thermal_conductivity,
+            "gross_density": self.gross_density,
+            "specific_heat_capacity": self.specific_heat_capacity,
+            "vapour_resistance_factor": self.vapour_resistance_factor,
+            "is_air": False,
+            "language": self.language,
+        }
+
+    @classmethod
+    def from_dict(cls, layer_dict: dict) -> "MaterialLayer":
+        """MaterialLayer from a dict of inputs (see to_dict)
+        Returns:
+            MaterialLayer:
+        """
+        return cls(
+            name=str(layer_dict.get("name", "")),
+            thickness=float(layer_dict["thickness"]),
+            thermal_conductivity=float(layer_dict["thermal_conductivity"]),
+            gross_density=float(layer_dict["gross_density"]),
+            specific_heat_capacity=float(layer_dict["specific_heat_capacity"]),
+            language=layer_dict.get("language", "en"),
+            vapour_resistance_factor=None if layer_dict.get("vapour_resistance_factor") is None
+                else float(layer_dict["vapour_resistance_factor"]),
+            )
 
 
     def get_values(self):
@@ -168,7 +214,42 @@ class AirLayer(LayerBase):
     def thermal_conductivity(self):
         "lambda W/mK"
         return self.thickness/self.thermal_resistance
-    
+
+    @property
+    def vapour_resistance_factor(self):
+        "μ [-] of still air"
+        return 1.0
+
+    @property
+    def vapour_diffusion_thickness(self):
+        "s_d = μ d in [m]"
+        return self.thickness
+
+    def to_dict(self) -> dict:
+        """inputs as a plain (json serializable) dict
+        Returns:
+            dict: layer inputs
+        """
+        return {
+            "name": self.name,
+            "thickness": self.thickness,
+            "heat_flow_direction": self.heat_flow_direction,
+            "is_air": True,
+            "language": self.language,
+        }
+
+    @classmethod
+    def from_dict(cls, layer_dict: dict) -> "AirLayer":
+        """AirLayer from a dict of inputs (see to_dict)
+        Returns:
+            AirLayer:
+        """
+        return cls(
+            name=str(layer_dict.get("name", "")),
+            thickness=float(layer_dict["thickness"]),
+            heat_flow_direction=layer_dict.get("heat_flow_direction", "Ho"),
+            language=layer_dict.get("language", "en"),
+            )
 
 
     def get_values(self):
@@ -193,4 +274,173 @@ f"""{self.name}:
 {thickness_str} : {self.thickness:0.3f} [m]
 {thermal_conductivity_str} : {self.thermal_conductivity:0.3f} [W/mK]
 {heat_flow_direction_str} : {self.heat_flow_direction} "Ho": Horizontal (wall),"Up": Upwards (Roof),"Do": Downwards (floor)
-{thermal_resistance_str} : {self.thermal_resistance:0.3f} m²K/W"""
\ No newline at end of file
+{thermal_resistance_str} : {self.thermal_resistance:0.3f} m²K/W"""
+
+class InhomogeneousLayer(LayerBase):
+    def __init__(self,
+        name:str,
+        thickness:float,
+        sections:list[tuple[float, LayerBase]],
+        language:str="en"
+        ):
+        """Inhomogeneous layer made of area-weighted sections,
+            example: insulation between timber studs.
+            Components are computed with the combined method of ISO 6946
+            (upper and lower limits of thermal resistance)
+
+        Args:
+            name (str):
+            thickness (float):  "d" in m thickness of layer
+            sections (list[tuple[float, LayerBase]]): (fractional area [-], MaterialLayer or AirLayer)
+                section layers have the thickness of the layer, sum of fractional areas is 1
+            language (str, optional): Defaults to "en".
+        """
+        super().__init__(name,
+                      thickness,
+                      False,
+                      language)
+
+        if not sections:
+            raise ValueError("sections: at least one section is needed")
+
+        for fraction, layer in sections:
+            if isinstance(layer, InhomogeneousLayer):
+                raise ValueError("sections: nested inhomogeneous layers are not allowed")
+            if not fraction > 0:
+                raise ValueError(f"sections: fractional area of {layer.name} have to be > 0")
+            if not np.isclose(layer.thickness, thickness, rtol=1e-9, atol=0):
+                raise ValueError(f"sections: thickness of {layer.name} have to be {thickness} m")
+
+        if not np.isclose(sum(fraction for fraction, _layer in sections), 1, atol=1e-6):
+            raise ValueError("sections: sum of fractional areas have to be 1")
+
+        self.sections= [(float(fraction), layer) for fraction, layer in sections]
+
+    @property
+    def thermal_resistance(self):
+        """equivalent R in m²K/W of lower limit method (ISO 6946): 1/Σ(f/R)
+        Returns:
+            float:
+        """
+        return 1 / sum(fraction / layer.thermal_resistance for fraction, layer in self.sections)
+
+    @property
+    def thermal_conductivity(self):
+        """equivalent lambda W/mK: Σ f λ
+        """
+        return self.thickness / self.thermal_resistance
+
+    @property
+    def gross_density(self):
+        """area-weighted ρ [kg/m³], air sections count as 0
+        """
+        return sum(fraction * layer.gross_density
+                   for fraction, layer in self.sections if layer.is_air is False)
+
+    @property
+    def specific_heat_capacity(self):
+        """c [J/kgK] such as ρ*c is the area-weighted ρ*c of sections
+        """
+        heat_capacity = sum(fraction * layer.gross_density * layer.specific_heat_capacity
+                            for fraction, layer in self.sections if layer.is_air is False)
+        if self.gross_density == 0:
+            return 0.0
+        return heat_capacity / self.gross_density
+
+    @property
+    def vapour_diffusion_thickness(self):
+        """equivalent s_d [m] of parallel sections: 1/Σ(f/s_d), None if a μ is unknown
+        """
+        if any(layer.vapour_diffusion_thickness is None for _fraction, layer in self.sections):
+            return None
+        return 1 / sum(fraction / layer.vapour_diffusion_thickness for fraction, layer in self.sections)
+
+    @property
+    def vapour_resistance_factor(self):
+        """equivalent μ [-]: s_d / d, None if a μ is unknown
+        """
+        vapour_diffusion_thickness = self.vapour_diffusion_thickness
+        if vapour_diffusion_thickness is None:
+            return None
+        return vapour_diffusion_thickness / self.thickness
+
+    def to_dict(self) -> dict:
+        """inputs as a plain (json serializable) dict
+        Returns:
+            dict: layer inputs, sections as {"fraction": f, "layer": layer dict}
+        """
+        return {
+            "name": self.name,
+            "thickness": self.thickness,
+            "sections": [{"fraction": fraction, "layer": layer.to_dict()}
+                         for fraction, layer in self.sections],
+            "is_air": False,
+            "language": self.language,
+        }
+
+    @classmethod
+    def from_dict(cls, layer_dict: dict) -> "InhomogeneousLayer":
+        """InhomogeneousLayer from a dict of inputs (see to_dict),
+            section layers without thickness get the layer thickness
+        Returns:
+            InhomogeneousLayer:
+        """
+        thickness = float(layer_dict["thickness"])
+        sections = []
+        for section in layer_dict["sections"]:
+            section_layer = dict(section["layer"])
+            section_layer.setdefault("thickness", thickness)
+            sections.append((float(section["fraction"]), get_layer_from_dict(section_layer)))
+
+        return cls(
+            name=str(layer_dict.get("name", "")),
+            thickness=thickness,
+            sections=sections,
+            language=layer_dict.get("language", "en"),
+            )
+
+    def get_values(self):
+        _=get_translator(self.language)
+
+        thickness_str= _("Thickness")
+        thermal_conductivity_str=_("Thermal conductivity λ")
+        thermal_resistance_str=_("Thermal resistance R")
+        sections_str=_("Sections")
+
+        sections_values="\n".join(
+            f"  {fraction*100:0.1f} % {layer.name}" for fraction, layer in self.sections)
+
+        return \
+f"""{self.name}:
+
+{thickness_str} : {self.thickness:0.3f} [m]
+{thermal_conductivity_str} : {self.thermal_conductivity:0.3f} [W/mK]
+{thermal_resistance_str} : {self.thermal_resistance:0.3f} m²K/W
+{sections_str} :
+{sections_values}"""
+
+
+def get_layer_from_dict(layer_dict:dict) -> LayerBase:
+    """build a MaterialLayer or an AirLayer from a plain dict
+        (json definitions, csv rows, to_dict outputs, etc)
+
+    Args:
+        layer_dict (dict): "name", "thickness" and "is_air" for air layers,
+            "sections" for inhomogeneous layers or
+            "thermal_conductivity", "gross_density", "specific_heat_capacity"
+            for material layers
+
+    Raises:
+        ValueError: missing or invalid layer values
+
+    Returns:
+        LayerBase: MaterialLayer or AirLayer
+    """
+    try:
+        if layer_dict.get("is_air", False):
+            return AirLayer.from_dict(layer_dict)
+        if "sections" in layer_dict:
+            return InhomogeneousLayer.from_dict(layer_dict)
+        return MaterialLayer.from_dict(layer_dict)
+    except KeyError as error:
+        raise ValueError(f"missing layer value: {error}") from None
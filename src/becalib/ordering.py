@@ -0,0 +1,240 @@
+import math
+import numpy as np
+from becalib.component import Component
+from becalib.layers import InhomogeneousLayer
+from becalib.batch import (
+    get_layers_arrays,
+    get_surface_resistances_array,
+    get_thermal_resistances_array,
+    get_heat_transfer_matrices,
+)
+from becalib.algos import get_time_shift, get_periodic_thermal_transmittance
+
+
+# time shift is maximized, decrement factor and periodic transmittance are minimized
+ORDERING_OBJECTIVES = ("time_shift", "decrement_factor", "periodic_thermal_transmittance")
+
+# diagonal scalings of the pruning bound, the tightest one is kept
+BOUND_SCALES = np.logspace(-3, 3, 25)
+
+
+def _get_surface_matrix(surface_thermal_resistance: float) -> np.ndarray:
+    return np.array([[1, -surface_thermal_resistance], [0, 1]], dtype=np.complex128)
+
+
+def _get_scaled_norms(matrices: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    # spectral norms of D^-1 Z D with D = diag(1, s), shape (n, n_scales)
+    scaled = matrices[:, np.newaxis] * np.ones((1, scales.size, 2, 2))
+    scaled[..., 0, 1] *= scales
+    scaled[..., 1, 0] /= scales
+    return np.linalg.norm(scaled, ord=2, axis=(-2, -1))
+
+
+def _get_layer_groups(
+        layers_arrays: dict,
+        thermal_resistances: np.ndarray,
+        layer_position: np.ndarray,
+        ) -> np.ndarray:
+    # index of the previous identical free layer (same thermal inputs), -1 if none,
+    # layers with a fixed position are not grouped: the order of twins would conflict with their positions
+    keys = np.stack([layers_arrays[name][0] for name in (
+        "thicknesses", "thermal_conductivities", "gross_densities", "specific_heat_capacities")]
+        + [thermal_resistances[0], layers_arrays["is_air"][0]], axis=1)
+    previous = np.full(keys.shape[0], -1)
+    for j in np.flatnonzero(layer_position < 0):
+        for k in range(j - 1, -1, -1):
+            if layer_position[k] < 0 and np.array_equal(keys[j], keys[k]):
+                previous[j] = k
+                break
+    return previous
+
+
+def get_best_layer_orders(
+        component: Component,
+        objective: str = "time_shift",
+        top_k: int = 5,
+        fixed_positions: dict[int, int] | None = None,
+        max_batch: int = 65536,
+        ) -> dict:
+    """best orderings of the layers of a component by time shift or decrement factor
+
+        Depth-first search on orderings built from the interior side: the partial
+        product Z_k...Z_1 Z_i of a prefix is computed once and shared by all orderings
+        starting with this prefix. Nodes are expanded by vectorized batches.
+
+        Pruned branches:
+            - permutations of identical free layers (same inputs), evaluated once
+            - layers placed out of their fixed position
+            - for decrement factor and periodic transmittance, branches whose upper
+              bound of |Z_12| (scaled spectral norms of the remaining layers, any
+              order) cannot reach the current top-k
+        The time shift (phase of Z_12) has no bound: all distinct orderings are
+        evaluated, only the prefix products are shared. Cost grows as n!, about
+        10 free distinct layers at most.
+        U-value, mass and heat capacities do not depend on the order.
+
+    Args:
+        component (Component): component with homogeneous layers, not modified
+        objective (str, optional): "time_shift" (max), "decrement_factor" (min) or
+            "periodic_thermal_transmittance" (min). Defaults to "time_shift".
+        top_k (int, optional): number of returned orderings. Defaults to 5.
+        fixed_positions (dict[int, int] | None, optional): {position: layer index},
+            negative positions from exterior side, example {0: 0, -1: -1} keeps finishes. Defaults to None.
+        max_batch (int, optional): max number of nodes expanded at once. Defaults to 65536.
+
+    Raises:
+        ValueError: unknown objective, invalid fixed positions or inhomogeneous layers
+
+    Returns:
+        dict: "orders" (k, n_layers) layer indexes (interior to exterior) best first,
+            "time_shift", "decrement_factor", "periodic_thermal_transmittance" (k,),
+            "n_nodes" expanded nodes and "n_orders" evaluated complete orderings
+    """
+    if objective not in ORDERING_OBJECTIVES:
+        raise ValueError(f"""unknown objective: {objective}
+        available choices: {", ".join(ORDERING_OBJECTIVES)}
+        """)
+    if any(isinstance(layer, InhomogeneousLayer) for layer in component.layers):
+        raise ValueError("layer ordering of inhomogeneous layers is not supported")
+
+    n_layers = len(component.layers)
+
+    # fixed position -> layer, layer -> fixed position
+    position_layer = np.full(n_layers, -1)
+    layer_position = np.full(n_layers, -1)
+    for position, layer_index in (fixed_positions or {}).items():
+        position, layer_index = position % n_layers, layer_index % n_layers
+        if position_layer[position] >= 0 or layer_position[layer_index] >= 0:
+            raise ValueError("fixed_positions: one layer by position and one position by layer")
+        position_layer[position] = layer_index
+        layer_position[layer_index] = position
+
+    # layer matrices, same values as Component
+    layers_arrays = get_layers_arrays([component.layers], component.heat_flow_direction)
+    rsi, rse = get_surface_resistances_array(layers_arrays["heat_flow_directions"])
+    thermal_resistances = get_thermal_resistances_array(
+        thicknesses=layers_arrays["thicknesses"],
+        thermal_conductivities=layers_arrays["thermal_conductivities"],
+        is_air=layers_arrays["is_air"],
+        heat_flow_directions=layers_arrays["heat_flow_directions"])
+    matrices = get_heat_transfer_matrices(
+        thicknesses=layers_arrays["thicknesses"],
+        thermal_conductivities=layers_arrays["thermal_conductivities"],
+        gross_densities=layers_arrays["gross_densities"],
+        specific_heat_capacities=layers_arrays["specific_heat_capacities"],
+        thermal_resistances=thermal_resistances,
+        is_air=layers_arrays["is_air"],
+        time_period=component.time_period)[0]
+    z_e = _get_surface_matrix(rse[0])
+    thermal_transmittance = 1 / (rsi[0] + rse[0] + np.sum(thermal_resistances))
+
+    previous_identical = _get_layer_groups(layers_arrays, thermal_resistances, layer_position)
+
+    # log of spectral norms of D^-1 Z D, D = diag(1, s), bound of the remaining layers product
+    scales = BOUND_SCALES
+    log_norms = np.log(_get_scaled_norms(matrices, scales))  # (n, n_scales)
+    log_norm_e = np.log(_get_scaled_norms(z_e[np.newaxis], scales))[0]
+    use_bound = objective != "time_shift"
+
+    def get_bounds(products: np.ndarray, used: np.ndarray) -> np.ndarray:
+        # |Z_12| <= ||D^-1 Z_e Z_N...Z_k+1 D||_2 * ||(P_12, P_22 / s)||_2, any order of the remaining layers
+        if not use_bound:
+            return np.full(products.shape[0], np.inf)
+        remaining_log = log_norm_e + np.matmul(~used, log_norms)
+        prefix_norms = np.hypot(np.abs(products[:, 0, 1])[:, np.newaxis],
+                                np.abs(products[:, 1, 1])[:, np.newaxis] / scales)
+        # relative margin for rounding errors
+        return np.min(np.exp(remaining_log) * prefix_norms, axis=1) * (1 + 1e-9)
+
+    # top-k store, scores are maximized
+    best_scores = np.empty(0)
+    best_orders = np.empty((0, n_layers), dtype=np.int64)
+    best_matrices = np.empty((0, 2, 2), dtype=np.complex128)
+
+    n_nodes = 0
+    n_orders = 0
+    n_free = int(np.sum(layer_position < 0))
+
+    # stack of node batches: (prefix products (B,2,2), used layers (B,n), orders (B,depth), bounds (B,))
+    stack = [(_get_surface_matrix(rsi[0])[np.newaxis], np.zeros((1, n_layers), dtype=bool),
+              np.empty((1, 0), dtype=np.int64), np.full(1, np.inf))]
+
+    while stack:
+        products, used, orders, bounds = stack.pop()
+        depth = orders.shape[1]
+
+        if best_scores.size == top_k:
+            # the top-k may have improved since the batch was pushed
+            keep = bounds >= best_scores.min()
+            products, used, orders = products[keep], used[keep], orders[keep]
+            if not keep.any():
+                continue
+
+        if depth == n_layers:
+            component_matrices = np.matmul(z_e, products)
+            n_orders += component_matrices.shape[0]
+            if objective == "time_shift":
+                scores = get_time_shift(component_matrices, component.time_period)
+            else:
+                # max |Z_12| = min Y_ie = min decrement factor
+                scores = np.abs(component_matrices[:, 0, 1])
+
+            best_scores = np.concatenate([best_scores, scores])
+            best_orders = np.concatenate([best_orders, orders])
+            best_matrices = np.concatenate([best_matrices, component_matrices])
+            if best_scores.size > top_k:
+                keep = np.argsort(-best_scores, kind="stable")[:top_k]
+                best_scores, best_orders, best_matrices = best_scores[keep], best_orders[keep], best_matrices[keep]
+            continue
+
+        # allowed layers at this position (B, n)
+        if position_layer[depth] >= 0:
+            allowed = np.zeros_like(used)
+            allowed[:, position_layer[depth]] = True
+        else:
+            allowed = (layer_position < 0)[np.newaxis, :].repeat(used.shape[0], axis=0)
+        allowed &= ~used
+        has_previous = previous_identical >= 0
+        allowed[:, has_previous] &= used[:, previous_identical[has_previous]]
+
+        parents, layers = np.nonzero(allowed)
+        n_nodes += parents.size
+        if parents.size == 0:
+            continue
+
+        children_used = used[parents]
+        children_used[np.arange(parents.size), layers] = True
+        children_orders = np.concatenate([orders[parents], layers[:, np.newaxis]], axis=1)
+        children_products = np.matmul(matrices[layers], products[parents])
+        children_bounds = get_bounds(children_products, children_used)
+
+        # about max_batch orderings below each batch
+        n_free_left = n_free - int(np.sum(children_used[0] & (layer_position < 0)))
+        batch_size = max(1, max_batch // math.factorial(n_free_left))
+        if use_bound:
+            # most promising children are expanded first, until a first top-k is found the
+            # best child is expanded alone, then batches of growing size
+            sort = np.argsort(-children_bounds, kind="stable")
+            if best_scores.size == top_k:
+                sizes = np.full(sort.size, batch_size)
+            else:
+                sizes = np.minimum(2 ** np.maximum(np.arange(sort.size) - 1, 0), batch_size)
+            ends = np.minimum(np.cumsum(sizes), sort.size)
+            starts = np.concatenate([[0], ends[:-1]])
+            batches = [sort[start:end] for start, end in zip(starts, ends) if end > start]
+        else:
+            batches = [slice(start, start + batch_size) for start in range(0, parents.size, batch_size)]
+        for batch in batches[::-1]:
+            stack.append((children_products[batch], children_used[batch],
+                          children_orders[batch], children_bounds[batch]))
+
+    periodic_thermal_transmittance = get_periodic_thermal_transmittance(best_matrices)
+
+    return {
+        "orders": best_orders,
+        "time_shift": get_time_shift(best_matrices, component.time_period),
+        "decrement_factor": periodic_thermal_transmittance / thermal_transmittance,
+        "periodic_thermal_transmittance": periodic_thermal_transmittance,
+        "n_nodes": n_nodes,
+        "n_orders": n_orders,
+    }
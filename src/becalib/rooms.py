@@ -0,0 +1,176 @@
+"""room summer temperatures from component admittances (harmonic method, EN ISO 13792
+simplified approach), vectorized over room variants for overheating screening
+
+The room is one node at the operative temperature: the ISO 6946 interior surface
+resistances of the components already lump convective and radiative exchanges.
+Periodic inputs (24 hourly values) are split into harmonics, the heat balance of
+each harmonic k is solved with the complex ISO 13786 values at period T/k:
+
+    Σ A·Y_ii·θ_i + H·θ_i = Σ A·Y_ie·θ_sa + H·θ_e + Φ
+
+with H = ventilation and window conductances and Φ the gains (internal and
+transmitted solar). The mean (k = 0) uses the thermal transmittances.
+
+Example:
+    components = get_room_components([wall.layers, roof.layers, floor.layers], ["Ho", "Up", "Do"])
+    results = evaluate_rooms(components, areas, exterior_temperatures=design_day_temperatures,
+                             gains=hourly_gains, air_change_rates=0.5, volumes=75, internal=[False, False, True])
+    results["peak_operative_temperature"] # (n_rooms,) in °C
+"""
+import numpy as np
+from becalib.layers import LayerBase
+from becalib.batch import get_layers_arrays, evaluate_layers_arrays, get_component_matrices_arrays
+
+
+# volumetric heat capacity of air ρ·c in [J/m³K]
+AIR_HEAT_CAPACITY = 1200
+
+
+def get_room_components(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str = "Ho",
+        time_period: float = 24,
+        n_harmonics: int = 12,
+        ) -> dict:
+    """complex periodic values of the components of rooms at the harmonics of time_period
+
+    Args:
+        layers_list (list[list[LayerBase]]): layers of each component (interior first),
+            example [component.layers for component in components]
+        heat_flow_directions (list[str] | str, optional): one by component or one for all. Defaults to "Ho".
+        time_period (float, optional): period of the room inputs in [h]. Defaults to 24 h.
+        n_harmonics (int, optional): number of harmonics, 12 solves 24 hourly values exactly. Defaults to 12.
+
+    Raises:
+        ValueError: n_harmonics < 1
+
+    Returns:
+        dict: (n_components, n_harmonics + 1) complex "thermal_admittance_int" Y_ii and
+            "periodic_thermal_transmittance" Y_ie in [W/m²K] (column 0: U), "time_period"
+    """
+    if n_harmonics < 1:
+        raise ValueError("n_harmonics: >= 1 is needed")
+    layers_arrays = get_layers_arrays(layers_list, heat_flow_directions)
+    thermal_transmittances = evaluate_layers_arrays(
+        layers_arrays, outputs=["thermal_transmittance_component"])["thermal_transmittance_component"]
+
+    admittances = np.empty((len(thermal_transmittances), n_harmonics + 1), dtype=np.complex128)
+    transmittances = np.empty(admittances.shape, dtype=np.complex128)
+    admittances[:, 0] = transmittances[:, 0] = thermal_transmittances
+    for k in range(1, n_harmonics + 1):
+        htm = get_component_matrices_arrays(layers_arrays, time_period / k)
+        # ISO 13786: Y_ii = -Z_11/Z_12, Y_ie = -1/Z_12 (q positive towards the exterior)
+        admittances[:, k] = -htm[:, 0, 0] / htm[:, 0, 1]
+        transmittances[:, k] = -1 / htm[:, 0, 1]
+
+    return {
+        "thermal_admittance_int": admittances,
+        "periodic_thermal_transmittance": transmittances,
+        "time_period": time_period,
+    }
+
+
+def _get_harmonics(values: np.ndarray, n_values: int) -> np.ndarray:
+    # constant values have no time axis
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 0 or values.shape[-1] == 1:
+        values = np.broadcast_to(values, (*values.shape[:-1], n_values) if values.ndim else (n_values,))
+    if values.shape[-1] != n_values:
+        raise ValueError(f"profiles: {n_values} values by period are needed")
+    return np.fft.rfft(values, axis=-1)
+
+
+def evaluate_rooms(
+        components: dict,
+        areas: np.ndarray,
+        exterior_temperatures: np.ndarray,
+        gains: float | np.ndarray = 0,
+        air_change_rates: float | np.ndarray = 0,
+        volumes: float | np.ndarray = 0,
+        window_conductances: float | np.ndarray = 0,
+        sol_air_temperatures: np.ndarray | None = None,
+        internal: list[bool] | np.ndarray | None = None,
+        ) -> dict[str, np.ndarray]:
+    """periodic operative temperatures of room variants (free floating, no cooling)
+
+        Profiles are n_times values equally spaced over the time period of components
+        (24 hourly values by default), only the harmonics of components are kept.
+        Internal components (partitions, floors between similar rooms) have the room
+        temperature on both sides.
+
+    Args:
+        components (dict): component values, see get_room_components
+        areas (np.ndarray): (n_rooms, n_components) or (n_components,) areas in [m²], 0 if absent
+        exterior_temperatures (np.ndarray): (n_times,) or (n_rooms, n_times) exterior air temperatures in [°C]
+        gains (float | np.ndarray, optional): internal and transmitted solar gains in [W], scalar,
+            (n_times,) or (n_rooms, n_times). Defaults to 0.
+        air_change_rates (float | np.ndarray, optional): ventilation in [1/h], scalar or (n_rooms,). Defaults to 0.
+        volumes (float | np.ndarray, optional): room air volumes in [m³], scalar or (n_rooms,). Defaults to 0.
+        window_conductances (float | np.ndarray, optional): Σ U·A of windows in [W/K] (no heat capacity),
+            scalar or (n_rooms,). Defaults to 0.
+        sol_air_temperatures (np.ndarray | None, optional): exterior temperatures of components in [°C],
+            (n_components, n_times) or (n_rooms, n_components, n_times), see becalib.weather.
+            Defaults to None = exterior_temperatures.
+        internal (list[bool] | np.ndarray | None, optional): (n_components,) internal components.
+            Defaults to None = no internal component.
+
+    Raises:
+        ValueError: invalid shapes, rooms without heat transfer to the exterior
+
+    Returns:
+        dict[str, np.ndarray]: (n_rooms, n_times) "operative_temperatures" in [°C], (n_rooms,)
+            "peak_operative_temperature", "mean_operative_temperature", "operative_temperature_swing"
+            (max - min) in [°C] and "time_of_peak" in [h]
+    """
+    admittances = components["thermal_admittance_int"]
+    transmittances = components["periodic_thermal_transmittance"]
+    n_components = admittances.shape[0]
+
+    areas = np.atleast_2d(np.asarray(areas, dtype=np.float64))
+    if areas.shape[1] != n_components:
+        raise ValueError(f"areas: (n_rooms, {n_components}) values are needed")
+    exterior_temperatures = np.asarray(exterior_temperatures, dtype=np.float64)
+    if exterior_temperatures.ndim == 0:
+        raise ValueError("exterior_temperatures: (n_times,) or (n_rooms, n_times) values are needed")
+    n_times = exterior_temperatures.shape[-1]
+    # harmonics of components resolved by the profiles
+    n_harmonics = min(admittances.shape[1] - 1, n_times // 2)
+    admittances, transmittances = admittances[:, :n_harmonics + 1], transmittances[:, :n_harmonics + 1]
+
+    internal = np.zeros(n_components, dtype=bool) if internal is None else np.asarray(internal, dtype=bool)
+    if internal.shape != (n_components,):
+        raise ValueError(f"internal: {n_components} values are needed")
+    exterior_areas = areas * ~internal
+
+    conductances = (AIR_HEAT_CAPACITY / 3600 * np.asarray(air_change_rates, dtype=np.float64)
+                    * np.asarray(volumes, dtype=np.float64) + np.asarray(window_conductances, dtype=np.float64))
+    conductances = np.reshape(conductances, (-1, 1))
+
+    exterior = _get_harmonics(exterior_temperatures, n_times)[..., :n_harmonics + 1]
+    if sol_air_temperatures is None:
+        component_gains = (exterior_areas @ transmittances) * exterior
+    else:
+        sol_air = _get_harmonics(sol_air_temperatures, n_times)[..., :n_harmonics + 1]
+        if sol_air.shape[-2] != n_components:
+            raise ValueError(f"sol_air_temperatures: {n_components} profiles by room are needed")
+        component_gains = exterior_areas @ (transmittances * sol_air) if sol_air.ndim == 2 \
+            else np.einsum("rc,ck,rck->rk", exterior_areas, transmittances, sol_air)
+
+    # internal components: same temperature on both sides, Y_ii - Y_ie
+    denominator = areas @ (admittances - internal[:, np.newaxis] * transmittances) + conductances
+    if not np.all(denominator[:, 0].real > 0):
+        raise ValueError("rooms without heat transfer to the exterior (exterior areas or ventilation needed)")
+    numerator = component_gains + conductances * exterior + _get_harmonics(gains, n_times)[..., :n_harmonics + 1]
+
+    harmonics = np.zeros((*np.broadcast_shapes(numerator.shape, denominator.shape)[:-1], n_times // 2 + 1),
+                         dtype=np.complex128)
+    harmonics[:, :n_harmonics + 1] = numerator / denominator
+    temperatures = np.fft.irfft(harmonics, n=n_times, axis=-1)
+
+    return {
+        "operative_temperatures": temperatures,
+        "peak_operative_temperature": temperatures.max(axis=1),
+        "mean_operative_temperature": temperatures.mean(axis=1),
+        "operative_temperature_swing": np.ptp(temperatures, axis=1),
+        "time_of_peak": np.argmax(temperatures, axis=1) * components["time_period"] / n_times,
+    }
@@ -0,0 +1,305 @@
+import json
+import struct
+import numpy as np
+from becalib.layers import LayerBase, MaterialLayer, AirLayer, InhomogeneousLayer
+from becalib.component import Component, RESULTS_NAMES
+
+
+FORMAT_NAME = "becalib"
+FORMAT_VERSION = 1
+
+# binary format: MAGIC, header (version, header size), json header, raw arrays
+MAGIC = b"BECALIB\x00"
+_BINARY_PREFIX = struct.Struct("<8sII")
+
+OBJECT_TYPES = {
+    "component": Component,
+    "material_layer": MaterialLayer,
+    "air_layer": AirLayer,
+    "inhomogeneous_layer": InhomogeneousLayer,
+}
+
+# codes of AirLayer heat flow directions in binary format, 0 for material layers
+_DIRECTION_CODES = {"Ho": 1, "Up": 2, "Do": 3}
+_DIRECTIONS = ("", "Ho", "Up", "Do")
+
+
+def _get_object_type(obj) -> str:
+    for object_type, cls in OBJECT_TYPES.items():
+        if type(obj) is cls:
+            return object_type
+    raise ValueError(f"cannot serialize object of type {type(obj).__name__}")
+
+
+def _check_version(name: str, version: int):
+    if name != FORMAT_NAME:
+        raise ValueError(f"not a {FORMAT_NAME} serialization")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"serialization version {version} is newer than supported version {FORMAT_VERSION}")
+
+
+# JSON
+def to_json(objects: Component | LayerBase | list, include_results: bool = True) -> str:
+    """versioned json of components and layers (interoperability format)
+
+    Args:
+        objects (Component | LayerBase | list): one object or a list of objects
+        include_results (bool, optional): save computed values of components. Defaults to True.
+
+    Returns:
+        str: json string
+    """
+    is_list = isinstance(objects, (list, tuple))
+    items = []
+    for obj in (objects if is_list else [objects]):
+        object_type = _get_object_type(obj)
+        if object_type == "component":
+            item = obj.to_dict(include_results=include_results)
+        else:
+            item = obj.to_dict()
+        items.append({"type": object_type, **item})
+
+    document = {"format": FORMAT_NAME, "version": FORMAT_VERSION}
+    if is_list:
+        document["objects"] = items
+    else:
+        document["object"] = items[0]
+
+    return json.dumps(document, ensure_ascii=False)
+
+
+def from_json(text: str) -> Component | LayerBase | list:
+    """components and layers from a to_json string, values are computed again
+
+    Args:
+        text (str): json string
+
+    Raises:
+        ValueError: invalid or unsupported document
+
+    Returns:
+        Component | LayerBase | list: one object or a list of objects, as saved
+    """
+    document = json.loads(text)
+    _check_version(document.get("format"), document.get("version", 0))
+
+    def get_object(item: dict):
+        try:
+            cls = OBJECT_TYPES[item["type"]]
+        except KeyError:
+            raise ValueError(f"unknown object type: {item.get('type')}") from None
+        return cls.from_dict(item)
+
+    if "objects" in document:
+        return [get_object(item) for item in document["objects"]]
+    return get_object(document["object"])
+
+
+# Binary
+def _pack(header: dict, arrays: dict[str, np.ndarray]) -> bytes:
+    header = dict(header, arrays=[])
+    buffers = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        header["arrays"].append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape)})
+        buffers.append(array.tobytes())
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return b"".join([_BINARY_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes, *buffers])
+
+
+def _unpack(data: bytes) -> tuple:
+    try:
+        magic, version, header_size = _BINARY_PREFIX.unpack_from(data)
+    except struct.error:
+        raise ValueError(f"not a {FORMAT_NAME} binary serialization") from None
+    if magic != MAGIC:
+        raise ValueError(f"not a {FORMAT_NAME} binary serialization")
+    _check_version(FORMAT_NAME, version)
+
+    offset = _BINARY_PREFIX.size
+    header = json.loads(bytes(data[offset:offset + header_size]).decode("utf-8"))
+    offset += header_size
+
+    arrays = {}
+    for array_info in header.pop("arrays"):
+        dtype = np.dtype(array_info["dtype"])
+        count = int(np.prod(array_info["shape"], dtype=np.int64))
+        # zero copy views on data
+        arrays[array_info["name"]] = np.frombuffer(
+            data, dtype=dtype, count=count, offset=offset).reshape(array_info["shape"])
+        offset += count * dtype.itemsize
+
+    return header, arrays
+
+
+def encode_components(components: list[Component], include_results: bool = True) -> bytes:
+    """compact versioned binary of a list of components (columnar float64 arrays)
+
+    Args:
+        components (list[Component]): components to save
+        include_results (bool, optional): save computed values. Defaults to True.
+
+    Raises:
+        ValueError: inhomogeneous layers are only supported by to_json
+
+    Returns:
+        bytes: binary serialization
+    """
+    layers = [layer for component in components for layer in component.layers]
+    if any(isinstance(layer, InhomogeneousLayer) for layer in layers):
+        raise ValueError("binary serialization of inhomogeneous layers is not supported, use to_json")
+    n_layers = len(layers)
+
+    def get_column(get_value, dtype=np.float64):
+        return np.fromiter((get_value(layer) for layer in layers), dtype=dtype, count=n_layers)
+
+    header = {
+        "format": FORMAT_NAME,
+        "names": [component.name for component in components],
+        "heat_flow_directions": [component.heat_flow_direction for component in components],
+        "languages": [component.language for component in components],
+        "layer_names": [layer.name for layer in layers],
+        "layer_languages": [layer.language for layer in layers],
+        "results": include_results,
+    }
+
+    arrays = {
+        "time_periods": np.fromiter((component.time_period for component in components),
+                                    dtype=np.float64, count=len(components)),
+        "layer_counts": np.fromiter((len(component.layers) for component in components),
+                                    dtype=np.int32, count=len(components)),
+        "thicknesses": get_column(lambda layer: layer.thickness),
+        "thermal_conductivities": get_column(lambda layer: 0.0 if layer.is_air else layer.thermal_conductivity),
+        "gross_densities": get_column(lambda layer: 0.0 if layer.is_air else layer.gross_density),
+        "specific_heat_capacities": get_column(lambda layer: 0.0 if layer.is_air else layer.specific_heat_capacity),
+        # NaN: unknown μ
+        "vapour_resistance_factors": get_column(
+            lambda layer: np.nan if layer.vapour_resistance_factor is None else layer.vapour_resistance_factor),
+        "is_air": get_column(lambda layer: layer.is_air, bool),
+        "air_directions": get_column(
+            lambda layer: _DIRECTION_CODES[layer.heat_flow_direction] if layer.is_air else 0, np.uint8),
+    }
+
+    if include_results:
+        arrays["results"] = np.array(
+            [[getattr(component, name) for name in RESULTS_NAMES] for component in components],
+            dtype=np.float64).reshape(len(components), len(RESULTS_NAMES))
+        header["threshold_values_italian_dm_26_06_2009"] = [
+            component.threshold_values_italian_dm_26_06_2009 for component in components]
+
+    return _pack(header, arrays)
+
+
+def decode_components_arrays(data: bytes) -> dict:
+    """decode an encode_components binary into arrays, without building objects
+
+        "layers_arrays" are padded (components x layers) arrays ready for
+        becalib.batch.evaluate_layers_arrays
+
+    Args:
+        data (bytes): binary serialization
+
+    Returns:
+        dict: "names", "languages", "time_periods", "layer_counts", "layer_names",
+            "layers_arrays" and "results" (dict of arrays by name of RESULTS_NAMES, if saved)
+    """
+    header, arrays = _unpack(data)
+    _check_version(header.get("format"), FORMAT_VERSION)
+
+    layer_counts = arrays["layer_counts"].astype(np.int64)
+    n_components = layer_counts.size
+    n_max = int(layer_counts.max()) if n_components else 0
+
+    # flat layer index -> (component, position) of the padded arrays
+    rows = np.repeat(np.arange(n_components), layer_counts)
+    starts = np.cumsum(layer_counts) - layer_counts
+    columns = np.arange(rows.size) - np.repeat(starts, layer_counts)
+
+    def get_padded(flat: np.ndarray, fill, dtype=np.float64) -> np.ndarray:
+        padded = np.full((n_components, n_max), fill, dtype=dtype)
+        padded[rows, columns] = flat
+        return padded
+
+    decoded = {
+        "names": header["names"],
+        "languages": header["languages"],
+        "time_periods": arrays["time_periods"],
+        "layer_counts": arrays["layer_counts"],
+        "layer_names": header["layer_names"],
+        "layer_languages": header["layer_languages"],
+        "layer_air_directions": np.array(_DIRECTIONS)[arrays["air_directions"]],
+        "layers_arrays": {
+            "thicknesses": get_padded(arrays["thicknesses"], 0.0),
+            "thermal_conductivities": get_padded(arrays["thermal_conductivities"], 0.0),
+            "gross_densities": get_padded(arrays["gross_densities"], 0.0),
+            "specific_heat_capacities": get_padded(arrays["specific_heat_capacities"], 0.0),
+            "is_air": get_padded(arrays["is_air"], True, dtype=bool),
+            "heat_flow_directions": np.array(header["heat_flow_directions"], dtype="<U2").reshape(n_components),
+        },
+    }
+
+    if header["results"]:
+        decoded["results"] = {name: arrays["results"][:, i] for i, name in enumerate(RESULTS_NAMES)}
+        decoded["results"]["threshold_values_italian_dm_26_06_2009"] = header["threshold_values_italian_dm_26_06_2009"]
+
+    return decoded
+
+
+def decode_components(data: bytes) -> list[Component]:
+    """components from an encode_components binary, values are computed again
+
+    Args:
+        data (bytes): binary serialization
+
+    Returns:
+        list[Component]:
+    """
+    header, arrays = _unpack(data)
+    _check_version(header.get("format"), FORMAT_VERSION)
+
+    # python floats once for all layers
+    thicknesses = arrays["thicknesses"].tolist()
+    conductivities = arrays["thermal_conductivities"].tolist()
+    densities = arrays["gross_densities"].tolist()
+    heat_capacities = arrays["specific_heat_capacities"].tolist()
+    # unknown μ (NaN, binaries written before vapour resistance factors): None
+    vapour_resistance_factors = arrays.get(
+        "vapour_resistance_factors", np.full(len(thicknesses), np.nan))
+    vapour_resistance_factors = np.where(
+        np.isnan(vapour_resistance_factors), None, vapour_resistance_factors).tolist()
+    is_air = arrays["is_air"].tolist()
+    air_directions = arrays["air_directions"].tolist()
+    layer_names = header["layer_names"]
+    layer_languages = header["layer_languages"]
+
+    components = []
+    start = 0
+    for i, count in enumerate(arrays["layer_counts"].tolist()):
+        layers = []
+        for j in range(start, start + count):
+            if is_air[j]:
+                layers.append(AirLayer(
+                    name=layer_names[j],
+                    thickness=thicknesses[j],
+                    heat_flow_direction=_DIRECTIONS[air_directions[j]],
+                    language=layer_languages[j]))
+            else:
+                layers.append(MaterialLayer(
+                    name=layer_names[j],
+                    thickness=thicknesses[j],
+                    thermal_conductivity=conductivities[j],
+                    gross_density=densities[j],
+                    specific_heat_capacity=heat_capacities[j],
+                    language=layer_languages[j],
+                    vapour_resistance_factor=vapour_resistance_factors[j]))
+        start += count
+
+        components.append(Component(
+            name=header["names"][i],
+            layers=layers,
+            heat_flow_direction=header["heat_flow_directions"][i],
+            time_period=float(arrays["time_periods"][i]),
+            language=header["languages"][i]))
+
+    return components
@@ -0,0 +1,375 @@
+"""Local HTTP/JSON evaluation service
+
+Concurrent requests are collected during a short window (a few ms) and
+evaluated together in one vectorized batch (becalib.batch). Repeated
+assemblies are answered from a LRU cache.
+
+Endpoints:
+    POST /evaluate : one component definition or a list of definitions
+    GET /metrics   : latency, throughput, batching and cache statistics
+
+Component definition (json):
+    {"name": "Wall", "heat_flow_direction": "Ho", "time_period": 24,
+     "layers": [{"name": "Concrete", "thickness": 0.2, "thermal_conductivity": 1.8,
+                 "gross_density": 2400, "specific_heat_capacity": 1000},
+                {"name": "Air gap", "thickness": 0.05, "is_air": true}]}
+
+Run with:
+    python -m becalib.service --host 127.0.0.1 --port 8000
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+import numpy as np
+from becalib.batch import evaluate_batch, BATCH_OUTPUTS, LAYER_MATRIX_CACHE
+from becalib.algos import get_threshold_labels_italian_dm_26_06_2009
+from becalib.definitions import get_layers_from_definition
+
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+MAX_BODY_SIZE = 16 * 1024 * 1024  # bytes
+
+
+def get_assembly_key(definition: dict) -> str:
+    """canonical cache key of a component definition
+        the component and layer names do not change the results
+
+    Args:
+        definition (dict): component definition
+
+    Returns:
+        str: canonical json string
+    """
+    layers = []
+    for layer in definition["layers"]:
+        layer = {k: v for k, v in layer.items() if k not in ("name", "language")}
+        layers.append(layer)
+
+    return json.dumps(
+        [definition.get("heat_flow_direction", "Ho"),
+         float(definition.get("time_period", 24)),
+         layers],
+        sort_keys=True)
+
+
+class EvaluationService():
+    def __init__(self,
+        batch_window: float = 0.002,
+        max_batch_size: int = 1024,
+        cache_size: int = 4096,
+        latency_window: int = 10000,
+        ):
+        """Micro-batching evaluation service
+
+        Args:
+            batch_window (float, optional): collecting window of concurrent requests in [s]. Defaults to 0.002 s.
+            max_batch_size (int, optional): a batch is evaluated as soon as it reaches this size. Defaults to 1024.
+            cache_size (int, optional): max number of cached assemblies (0 disables the cache). Defaults to 4096.
+            latency_window (int, optional): number of last latencies kept for percentiles. Defaults to 10000.
+        """
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+
+        self._cache = collections.OrderedDict()
+        self._pending = []
+        self._flush_handle = None
+        self._latencies = collections.deque(maxlen=latency_window)
+        self._started_at = time.perf_counter()
+
+        self.requests_count = 0
+        self.batches_count = 0
+        self.evaluated_count = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.errors_count = 0
+
+    # Micro-batching
+    async def evaluate(self, definition: dict) -> dict:
+        """evaluate one component definition, batched with concurrent calls
+
+        Args:
+            definition (dict): component definition
+
+        Raises:
+            ValueError: invalid definition
+
+        Returns:
+            dict: "name", one value by name of BATCH_OUTPUTS and the DM 26/06/2009 score
+        """
+        start = time.perf_counter()
+        self.requests_count += 1
+
+        try:
+            key = get_assembly_key(definition)
+        except (KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f"invalid component definition: {error}") from None
+
+        values = self._cache.get(key)
+        if values is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((key, definition, future))
+            self._schedule_flush()
+            values = await future
+
+        self._latencies.append(time.perf_counter() - start)
+
+        return {"name": definition.get("name", ""), **values}
+
+    def _schedule_flush(self):
+        loop = asyncio.get_running_loop()
+        if len(self._pending) >= self.max_batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            asyncio.get_running_loop().create_task(self._evaluate_pending(pending))
+
+    async def _evaluate_pending(self, pending: list):
+        # same assemblies in the batch are evaluated once
+        definitions = {}
+        for key, definition, _future in pending:
+            definitions.setdefault(key, definition)
+
+        keys = list(definitions)
+        self.batches_count += 1
+
+        try:
+            layers_list = [get_layers_from_definition(definitions[key]) for key in keys]
+            heat_flow_directions = [definitions[key].get("heat_flow_direction", "Ho") for key in keys]
+            time_periods = [float(definitions[key].get("time_period", 24)) for key in keys]
+
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, evaluate_batch, layers_list, heat_flow_directions, time_periods)
+        except (ValueError, TypeError, KeyError) as error:
+            # evaluate one by one to isolate invalid definitions
+            if len(keys) > 1:
+                for key, definition, future in pending:
+                    asyncio.get_running_loop().create_task(
+                        self._evaluate_pending([(key, definition, future)]))
+                return
+            for _key, _definition, future in pending:
+                if not future.done():
+                    future.set_exception(ValueError(f"invalid component definition: {error}"))
+            return
+        except Exception as error:
+            # not a definition error: all requests of the batch fail, none waits forever
+            for _key, _definition, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.evaluated_count += len(keys)
+        # NaN and infinity are not valid json: null
+        columns = {name: [value if math.isfinite(value) else None for value in results[name].tolist()]
+                   for name in BATCH_OUTPUTS}
+        columns["threshold_values_italian_dm_26_06_2009"] = get_threshold_labels_italian_dm_26_06_2009(
+            results["threshold_code_italian_dm_26_06_2009"]).tolist()
+
+        values_by_key = {}
+        for i, key in enumerate(keys):
+            values = {name: column[i] for name, column in columns.items()}
+            values_by_key[key] = values
+            self._cache_values(key, values)
+
+        for key, _definition, future in pending:
+            if not future.done():
+                future.set_result(values_by_key[key])
+
+    def _cache_values(self, key: str, values: dict):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = values
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_metrics(self) -> dict:
+        """latency, throughput, batching and cache statistics
+
+        Returns:
+            dict: metrics, latencies in [ms]
+        """
+        uptime = time.perf_counter() - self._started_at
+        latencies = np.array(self._latencies) * 1000
+
+        if latencies.size:
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            latency_max = latencies.max()
+        else:
+            p50 = p90 = p99 = latency_max = 0.0
+
+        lookups = self.cache_hits + self.cache_misses
+        layer_matrix_cache = LAYER_MATRIX_CACHE.get_stats()
+
+        return {
+            "uptime_s": uptime,
+            "requests": self.requests_count,
+            "errors": self.errors_count,
+            "throughput_rps": self.requests_count / uptime if uptime > 0 else 0.0,
+            "batches": self.batches_count,
+            "evaluated_assemblies": self.evaluated_count,
+            "mean_batch_size": self.evaluated_count / self.batches_count if self.batches_count else 0.0,
+            "cache_size": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "layer_matrix_cache_size": layer_matrix_cache["size"],
+            "layer_matrix_cache_hit_rate": layer_matrix_cache["hit_rate"],
+            "latency_p50_ms": float(p50),
+            "latency_p90_ms": float(p90),
+            "latency_p99_ms": float(p99),
+            "latency_max_ms": float(latency_max),
+        }
+
+    # HTTP
+    async def handle_connection(self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter):
+        """minimal HTTP/1.1 handler with keep-alive connections
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, path, _version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, {"error": "invalid request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                content_length = headers.get("content-length", "") or "0"
+                if not (content_length.isascii() and content_length.isdigit()):
+                    await self._send(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    break
+                length = int(content_length)
+                if length > MAX_BODY_SIZE:
+                    await self._send(writer, 413, {"error": "body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                await self._send(writer, status, payload, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        path = path.split("?", 1)[0]
+
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}
+            return 200, self.get_metrics()
+
+        if path == "/evaluate":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                data = json.loads(body)
+                if isinstance(data, list):
+                    payload = list(await asyncio.gather(*[self.evaluate(d) for d in data]))
+                else:
+                    payload = await self.evaluate(data)
+            except (ValueError, TypeError, AttributeError) as error:
+                self.errors_count += 1
+                return 400, {"error": str(error)}
+            except Exception as error:
+                self.errors_count += 1
+                return 500, {"error": f"evaluation failed: {error!r}"}
+            return 200, payload
+
+        return 404, {"error": f"unknown path: {path}"}
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool = True):
+        body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        writer.write(head + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """start listening, returns the asyncio server
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def _serve_forever(service: EvaluationService, host: str, port: int):
+    server = await service.start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, **kwargs):
+    """run the evaluation service until interrupted
+
+    Args:
+        host (str, optional): Defaults to "127.0.0.1".
+        port (int, optional): Defaults to 8000.
+        **kwargs: EvaluationService parameters
+    """
+    asyncio.run(_serve_forever(EvaluationService(**kwargs), host, port))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="becalib local evaluation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-window", type=float, default=2.0, help="batch window in [ms]")
+    parser.add_argument("--max-batch-size", type=int, default=1024)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    try:
+        serve(host=args.host,
+              port=args.port,
+              batch_window=args.batch_window / 1000,
+              max_batch_size=args.max_batch_size,
+              cache_size=args.cache_size)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
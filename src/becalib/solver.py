@@ -0,0 +1,169 @@
+import numpy as np
+from becalib.component import Component
+from becalib.batch import get_layers_arrays, evaluate_layers_arrays
+
+
+# constraint name: (batch output, "max" = value <= target or "min" = value >= target)
+SOLVER_CONSTRAINTS = {
+    "max_thermal_transmittance": ("thermal_transmittance_component", "max"),
+    "max_periodic_thermal_transmittance": ("periodic_thermal_transmittance", "max"),
+    "max_decrement_factor": ("decrement_factor", "max"),
+    "min_time_shift": ("time_shift", "min"),
+    "min_threshold_code": ("threshold_code_italian_dm_26_06_2009", "min"),
+}
+
+# max number of rows by vectorized evaluation
+MAX_ROWS = 65536
+
+
+def _get_paths(layers_arrays: dict, n_components: int) -> tuple:
+    # first row and number of rows of each component (section paths of inhomogeneous layers)
+    component_index = layers_arrays.get("component_index")
+    if component_index is None:
+        return np.arange(n_components), np.ones(n_components, dtype=np.int64)
+    counts = np.bincount(component_index, minlength=n_components)
+    return np.cumsum(counts) - counts, counts
+
+
+def _get_trial_arrays(
+        layers_arrays: dict,
+        paths: tuple,
+        layer_index: np.ndarray,
+        components: np.ndarray,
+        thicknesses: np.ndarray,
+        ) -> dict:
+    """copy of layers arrays of components (may repeat) with new thicknesses of the solved layer
+    """
+    starts, counts = paths
+    path_counts = counts[components]
+    trial_index = np.repeat(np.arange(components.size), path_counts)
+    path_rows = np.repeat(starts[components] - np.cumsum(path_counts) + path_counts, path_counts) \
+        + np.arange(trial_index.size)
+
+    trial_arrays = {name: layers_arrays[name][path_rows] for name in (
+        "thicknesses", "thermal_conductivities", "gross_densities",
+        "specific_heat_capacities", "is_air", "heat_flow_directions")}
+    trial_arrays["thicknesses"][np.arange(path_rows.size), layer_index[components][trial_index]] = \
+        thicknesses[trial_index]
+
+    if "component_index" in layers_arrays:
+        trial_arrays["section_weights"] = layers_arrays["section_weights"][path_rows]
+        trial_arrays["component_index"] = trial_index
+
+    return trial_arrays
+
+
+def get_minimum_thicknesses(
+        components: list[Component] | Component,
+        layer_index: int | list[int],
+        min_thickness: float = 0.001,
+        max_thickness: float = 0.5,
+        tolerance: float = 1e-4,
+        n_scan: int = 16,
+        **constraints,
+        ) -> dict:
+    """minimum thickness of one layer of each component meeting all performance targets,
+        vectorized over all components (components and layers are not modified)
+
+        Thicknesses are first scanned on a grid of n_scan values between min_thickness
+        and max_thickness to bracket the first feasible thickness, then the bracket is
+        refined by bisection down to tolerance. Targets not met at any grid thickness
+        are reported as unreachable.
+
+    Args:
+        components (list[Component] | Component): components to solve
+        layer_index (int | list[int]): index of the solved layer (interior to exterior), one for all or one by component
+        min_thickness (float, optional): in [m]. Defaults to 0.001 m.
+        max_thickness (float, optional): in [m]. Defaults to 0.5 m.
+        tolerance (float, optional): thickness tolerance in [m]. Defaults to 0.1 mm.
+        n_scan (int, optional): number of scanned thicknesses. Defaults to 16.
+        **constraints: targets, any mix of SOLVER_CONSTRAINTS, example:
+            max_thermal_transmittance=0.28, min_time_shift=10
+
+    Raises:
+        ValueError: no or unknown constraints, invalid layer index or bounds
+
+    Returns:
+        dict: "thickness" (NaN if unreachable), "reachable" (bool) and the constrained
+            outputs at the solution thickness, one value by component
+    """
+    if not constraints:
+        raise ValueError(f"no constraints, available choices: {', '.join(SOLVER_CONSTRAINTS)}")
+    unknown = set(constraints) - set(SOLVER_CONSTRAINTS)
+    if unknown:
+        raise ValueError(f"""unknown constraints: {", ".join(sorted(unknown))}
+        available choices: {", ".join(SOLVER_CONSTRAINTS)}
+        """)
+    if not 0 < min_thickness < max_thickness:
+        raise ValueError("thickness bounds: 0 < min_thickness < max_thickness is needed")
+
+    if isinstance(components, Component):
+        components = [components]
+    n_components = len(components)
+
+    layer_index = np.broadcast_to(np.asarray(layer_index, dtype=np.int64), (n_components,)).copy()
+    n_layers = np.array([len(component.layers) for component in components], dtype=np.int64)
+    if ((layer_index < 0) | (layer_index >= n_layers)).any():
+        raise ValueError("layer_index: out of range layer index")
+
+    layers_arrays = get_layers_arrays(
+        [component.layers for component in components],
+        [component.heat_flow_direction for component in components])
+    time_periods = np.array([component.time_period for component in components], dtype=float)
+    paths = _get_paths(layers_arrays, n_components)
+    outputs = sorted({SOLVER_CONSTRAINTS[name][0] for name in constraints})
+
+    def evaluate(rows: np.ndarray, thicknesses: np.ndarray) -> tuple:
+        feasible = np.ones(rows.size, dtype=bool)
+        values = {output: np.empty(rows.size) for output in outputs}
+        for start in range(0, rows.size, MAX_ROWS):
+            chunk = slice(start, start + MAX_ROWS)
+            results = evaluate_layers_arrays(
+                _get_trial_arrays(layers_arrays, paths, layer_index, rows[chunk], thicknesses[chunk]),
+                time_period=time_periods[rows[chunk]],
+                outputs=outputs)
+            for name, target in constraints.items():
+                output, sense = SOLVER_CONSTRAINTS[name]
+                if sense == "max":
+                    feasible[chunk] &= results[output] <= target
+                else:
+                    feasible[chunk] &= results[output] >= target
+            for output in outputs:
+                values[output][chunk] = results[output]
+        return feasible, values
+
+    # bracketing scan
+    grid = np.linspace(min_thickness, max_thickness, max(n_scan, 2))
+    rows = np.repeat(np.arange(n_components), grid.size)
+    feasible, _values = evaluate(rows, np.tile(grid, n_components))
+    feasible = feasible.reshape(n_components, grid.size)
+
+    reachable = feasible.any(axis=1)
+    first = np.argmax(feasible, axis=1)
+    upper = grid[first]
+    lower = np.where(first > 0, grid[np.maximum(first - 1, 0)], upper)
+
+    # vectorized bisection, upper is always feasible
+    active = reachable & (first > 0)
+    while active.any():
+        active &= (upper - lower) > tolerance
+        rows = np.flatnonzero(active)
+        if rows.size == 0:
+            break
+        middle = (lower[rows] + upper[rows]) / 2
+        middle_feasible, _values = evaluate(rows, middle)
+        upper[rows[middle_feasible]] = middle[middle_feasible]
+        lower[rows[~middle_feasible]] = middle[~middle_feasible]
+
+    solution = {"thickness": np.where(reachable, upper, np.nan), "reachable": reachable}
+
+    # outputs at solution thickness
+    for output in outputs:
+        solution[output] = np.full(n_components, np.nan)
+    rows = np.flatnonzero(reachable)
+    if rows.size:
+        _feasible, values = evaluate(rows, upper[rows])
+        for output in outputs:
+            solution[output][rows] = values[output]
+
+    return solution
@@ -0,0 +1,231 @@
+"""queryable store of evaluated components in local files
+
+One .npy column by output and a sorted index by output (values and row order):
+range and threshold queries are answered by binary search on the most selective
+index, other conditions are checked on the candidate rows only.
+Component definitions are saved as json lines with byte offsets for random access.
+
+Files of a store directory (one row by component, results order):
+    <output>.npy             values of an output by row
+    <output>.sorted.npy      values of an output sorted ascending, NaN last
+    <output>.order.npy       row of each sorted value (stable argsort)
+    definitions.jsonl        one json definition by line
+    definitions.offsets.npy  byte offset of each line, last = file size
+    store.json               version, n_components and outputs, written last
+
+Queries: min_<output>= and max_<output>= bounds are inclusive, NaN values never
+match. Each bounded output gives a row range of its sorted index by binary search,
+the rows of the narrowest range are the candidates, the other bounds are checked
+on the candidate values only. The cost is O(log n) by bound plus the candidates.
+
+Example:
+    store = create_result_store("catalog", definitions, evaluate_definitions(definitions))
+    rows = store.query(min_time_shift=12, max_thermal_transmittance_component=0.25, max_mass_component=300)
+    store.get_definitions(rows)
+"""
+import json
+import os
+from typing import Iterable
+import numpy as np
+from becalib.batch import BATCH_OUTPUTS
+
+
+MANIFEST_FILE = "store.json"
+DEFINITIONS_FILE = "definitions.jsonl"
+STORE_VERSION = 1
+
+
+def _get_paths(directory: str, name: str) -> tuple:
+    # column, sorted values and row order of an output
+    return (os.path.join(directory, f"{name}.npy"),
+            os.path.join(directory, f"{name}.sorted.npy"),
+            os.path.join(directory, f"{name}.order.npy"))
+
+
+def create_result_store(
+        directory: str,
+        definitions: Iterable[dict],
+        results: dict[str, np.ndarray],
+        ) -> "ResultStore":
+    """save definitions and results with one sorted index by output
+
+    Args:
+        directory (str): store directory, created if needed, a previous store is overwritten
+        definitions (Iterable[dict]): component definitions (see becalib.definitions) in results order,
+            example a generator
+        results (dict[str, np.ndarray]): one array by output of BATCH_OUTPUTS,
+            example evaluate_definitions results or load_study_results of becalib.studies
+
+    Raises:
+        ValueError: unknown outputs, not one definition by result
+
+    Returns:
+        ResultStore: opened store
+    """
+    unknown = set(results) - set(BATCH_OUTPUTS)
+    if unknown:
+        raise ValueError(f"unknown outputs: {', '.join(sorted(unknown))}")
+    sizes = {len(values) for values in results.values()}
+    if len(sizes) > 1:
+        raise ValueError("outputs of results must have the same size")
+    n_components = sizes.pop() if sizes else None
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    # definitions: json lines and byte offset of each line (last = file size)
+    offsets = [0]
+    with open(os.path.join(directory, DEFINITIONS_FILE), "wb") as file:
+        for definition in definitions:
+            line = json.dumps(definition, ensure_ascii=False).encode("utf-8") + b"\n"
+            file.write(line)
+            offsets.append(offsets[-1] + len(line))
+    if n_components is None:
+        n_components = len(offsets) - 1
+    if len(offsets) - 1 != n_components:
+        raise ValueError(f"one definition by result is needed: {len(offsets) - 1} != {n_components}")
+    np.save(os.path.join(directory, "definitions.offsets.npy"), np.array(offsets, dtype=np.int64))
+
+    outputs = [name for name in BATCH_OUTPUTS if name in results]
+    for name in outputs:
+        values = np.asarray(results[name])
+        column_path, sorted_path, order_path = _get_paths(directory, name)
+        np.save(column_path, values)
+        # stable sort, NaN last
+        order = np.argsort(values, kind="stable")
+        np.save(order_path, order.astype(np.int64))
+        np.save(sorted_path, values[order])
+
+    # manifest last: a store without manifest is incomplete
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump({"version": STORE_VERSION, "n_components": int(n_components), "outputs": outputs}, file)
+
+    return ResultStore(directory)
+
+
+class ResultStore():
+    def __init__(self, directory: str):
+        """read only store of create_result_store, arrays are memory-mapped
+
+        Args:
+            directory (str): store directory
+
+        Raises:
+            ValueError: no complete store in directory or newer version
+        """
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"no result store in directory: {directory}")
+        with open(manifest_path, encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["version"] > STORE_VERSION:
+            raise ValueError(f"store version {manifest['version']} is newer than supported version {STORE_VERSION}")
+
+        self.directory = directory
+        self.n_components = manifest["n_components"]
+        self.outputs = tuple(manifest["outputs"])
+        self._offsets = np.load(os.path.join(directory, "definitions.offsets.npy"), mmap_mode="r")
+        self._columns = {}
+        self._indexes = {}
+        for name in self.outputs:
+            column_path, sorted_path, order_path = _get_paths(directory, name)
+            self._columns[name] = np.load(column_path, mmap_mode="r")
+            self._indexes[name] = (np.load(sorted_path, mmap_mode="r"), np.load(order_path, mmap_mode="r"))
+
+    def __len__(self) -> int:
+        return self.n_components
+
+    def _get_conditions(self, conditions: dict) -> dict:
+        # {output: [min, max]} from min_<output>= and max_<output>= keywords
+        bounds = {}
+        for key, value in conditions.items():
+            kind, _separator, name = key.partition("_")
+            if kind not in ("min", "max") or name not in self._columns:
+                raise ValueError(f"""invalid condition: {key}
+                available choices: min_<output> or max_<output> with outputs: {", ".join(self.outputs)}
+                """)
+            bounds.setdefault(name, [-np.inf, np.inf])[0 if kind == "min" else 1] = value
+        return bounds
+
+    def _get_index_range(self, name: str, low: float, high: float) -> tuple:
+        sorted_values = self._indexes[name][0]
+        return (int(np.searchsorted(sorted_values, low, side="left")),
+                int(np.searchsorted(sorted_values, high, side="right")))
+
+    def count(self, **conditions) -> int:
+        """upper bound of the number of matching rows: size of the most selective index range
+
+        Args:
+            **conditions: same as query
+
+        Returns:
+            int: number of candidate rows (exact for one output)
+        """
+        bounds = self._get_conditions(conditions)
+        if not bounds:
+            return self.n_components
+        return min(stop - start for start, stop in
+                   (self._get_index_range(name, *bound) for name, bound in bounds.items()))
+
+    def query(self, **conditions) -> np.ndarray:
+        """rows with all values inside bounds (inclusive), NaN values never match
+
+        Args:
+            **conditions: min_<output>= and max_<output>= bounds, example
+                min_time_shift=12, max_thermal_transmittance_component=0.25
+
+        Raises:
+            ValueError: invalid condition
+
+        Returns:
+            np.ndarray: sorted row indexes
+        """
+        bounds = self._get_conditions(conditions)
+        if not bounds:
+            return np.arange(self.n_components)
+
+        # candidates from the narrowest index range, binary search only
+        ranges = {name: self._get_index_range(name, *bound) for name, bound in bounds.items()}
+        first = min(ranges, key=lambda name: ranges[name][1] - ranges[name][0])
+        start, stop = ranges[first]
+        rows = np.sort(self._indexes[first][1][start:stop])
+
+        # other conditions on candidate rows only
+        for name, (low, high) in bounds.items():
+            if name == first or rows.size == 0:
+                continue
+            values = self._columns[name][rows]
+            rows = rows[(values >= low) & (values <= high)]
+
+        return rows
+
+    def get_results(self, rows: np.ndarray) -> dict[str, np.ndarray]:
+        """results of rows
+
+        Args:
+            rows (np.ndarray): row indexes
+
+        Returns:
+            dict[str, np.ndarray]: one array by output
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return {name: np.asarray(column[rows]) for name, column in self._columns.items()}
+
+    def get_definitions(self, rows: np.ndarray) -> list[dict]:
+        """component definitions of rows, read by byte offset (no scan)
+
+        Args:
+            rows (np.ndarray): row indexes
+
+        Returns:
+            list[dict]: component definitions
+        """
+        definitions = []
+        with open(os.path.join(self.directory, DEFINITIONS_FILE), "rb") as file:
+            for row in np.asarray(rows, dtype=np.int64).tolist():
+                start, stop = int(self._offsets[row]), int(self._offsets[row + 1])
+                file.seek(start)
+                definitions.append(json.loads(file.read(stop - start)))
+        return definitions
@@ -0,0 +1,181 @@
+"""out-of-core evaluation of large parametric studies
+
+Results are written chunk by chunk in one memory-mapped .npy file by output,
+peak memory is set by chunk_size, not by the study size.
+An interrupted study resumes from the last completed chunk.
+In single precision, the max deviation from a float64 reference sample of each chunk
+is recorded in the progress file.
+
+Example:
+    results = evaluate_study(iter_my_definitions(), n_components=10**8, directory="study")
+    results["time_shift"][:10]
+"""
+import itertools
+import json
+import os
+from typing import Iterable
+import numpy as np
+from numpy.lib.format import open_memmap
+from becalib.batch import (
+    evaluate_layers_arrays,
+    get_definitions_arrays,
+    get_outputs,
+    get_precision_dtype,
+    get_precision_errors,
+    merge_precision_errors,
+)
+
+
+PROGRESS_FILE = "progress.json"
+STUDY_VERSION = 1
+
+# integer outputs, other outputs have the float dtype of the study precision
+OUTPUT_DTYPES = {"threshold_code_italian_dm_26_06_2009": np.int8}
+
+
+def _get_output_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}.npy")
+
+
+def _write_progress(directory: str, progress: dict):
+    # atomic: a crash leaves the previous or the new progress file, never a partial one
+    path = os.path.join(directory, PROGRESS_FILE)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(progress, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def get_study_progress(directory: str) -> dict | None:
+    """progress of a study
+
+    Args:
+        directory (str): study directory
+
+    Returns:
+        dict | None: "n_components", "chunk_size", "outputs", "precision", "completed_chunks",
+            "completed_components" and in single precision "max_errors", None if no study in directory
+    """
+    path = os.path.join(directory, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        progress = json.load(file)
+    # studies written before precision modes
+    progress.setdefault("precision", "double")
+    return progress
+
+
+def load_study_results(directory: str, mode: str = "r") -> dict[str, np.memmap]:
+    """memory-mapped results of a study (complete or not)
+
+    Args:
+        directory (str): study directory
+        mode (str, optional): numpy memmap mode. Defaults to "r" (read only).
+
+    Raises:
+        ValueError: no study in directory
+
+    Returns:
+        dict[str, np.memmap]: one array by output, rows of uncompleted chunks are not valid
+    """
+    progress = get_study_progress(directory)
+    if progress is None:
+        raise ValueError(f"no study in directory: {directory}")
+    return {name: open_memmap(_get_output_path(directory, name), mode=mode) for name in progress["outputs"]}
+
+
+def evaluate_study(
+        definitions: Iterable[dict],
+        n_components: int,
+        directory: str,
+        outputs: list[str] | None = None,
+        chunk_size: int = 10000,
+        resume: bool = True,
+        precision: str = "double",
+        error_sample_size: int = 100,
+        ) -> dict[str, np.memmap]:
+    """chunked evaluation of a lazily generated study into memory-mapped .npy files
+
+        Each chunk is evaluated by becalib.batch, written in the preallocated .npy files
+        and flushed before the progress file is updated. On resume the definitions of
+        completed chunks are skipped, so definitions must be generated in the same order.
+
+    Args:
+        definitions (Iterable[dict]): component definitions (see becalib.definitions), example a generator
+        n_components (int): number of definitions, size of preallocated arrays
+        directory (str): study directory, created if needed
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS. Defaults to None = all outputs.
+        chunk_size (int, optional): number of components evaluated at once. Defaults to 10000.
+        resume (bool, optional): continue the study of directory. Defaults to True.
+            If False, a previous study is overwritten.
+        precision (str, optional): "double" or "single" (float32 results, half size files),
+            see becalib.batch.evaluate_layers_arrays. Defaults to "double".
+        error_sample_size (int, optional): components by chunk evaluated again in float64
+            to measure single precision errors. Defaults to 100.
+
+    Raises:
+        ValueError: invalid sizes, study of directory with other settings, less definitions than n_components
+
+    Returns:
+        dict[str, np.memmap]: read only results, one array by output
+    """
+    outputs = get_outputs(outputs)
+    dtype = get_precision_dtype(precision)
+    if n_components < 0 or chunk_size < 1:
+        raise ValueError("n_components >= 0 and chunk_size >= 1 are needed")
+
+    os.makedirs(directory, exist_ok=True)
+
+    settings = {
+        "version": STUDY_VERSION,
+        "n_components": int(n_components),
+        "chunk_size": int(chunk_size),
+        "outputs": list(outputs),
+        "precision": precision,
+    }
+    progress = get_study_progress(directory) if resume else None
+
+    if progress is not None:
+        if any(progress.get(key) != value for key, value in settings.items()):
+            raise ValueError(f"""study of {directory} has other settings: {progress}
+            use resume=False to start a new study""")
+        arrays = load_study_results(directory, mode="r+")
+    else:
+        arrays = {name: open_memmap(_get_output_path(directory, name), mode="w+",
+                                    dtype=OUTPUT_DTYPES.get(name, dtype), shape=(n_components,))
+                  for name in outputs}
+        progress = dict(settings, completed_chunks=0, completed_components=0)
+        _write_progress(directory, progress)
+
+    start = progress["completed_components"]
+    iterator = itertools.islice(iter(definitions), start, n_components)
+
+    while start < n_components:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if start + len(chunk) < min(start + chunk_size, n_components):
+            raise ValueError(f"less definitions than n_components: {start + len(chunk)} < {n_components}")
+
+        layers_arrays, time_period = get_definitions_arrays(chunk)
+        # errors measured below with a seed by chunk
+        results = evaluate_layers_arrays(layers_arrays, time_period=time_period, outputs=outputs,
+                                         precision=precision, error_sample_size=0)
+        stop = start + len(chunk)
+        for name in outputs:
+            arrays[name][start:stop] = results[name]
+            arrays[name].flush()
+
+        if dtype is not np.float64:
+            errors = get_precision_errors(layers_arrays, results, time_period=time_period,
+                                          sample_size=error_sample_size, seed=progress["completed_chunks"])
+            progress["max_errors"] = merge_precision_errors([progress.get("max_errors"), errors])
+
+        start = stop
+        progress["completed_chunks"] += 1
+        progress["completed_components"] = start
+        _write_progress(directory, progress)
+
+    del arrays
+    return load_study_results(directory)
@@ -0,0 +1,278 @@
+"""surrogate of a parametric component: tabulated outputs on a regular grid of layer
+thicknesses, multilinear interpolation of many variants with one table lookup
+
+Example:
+    surrogate = fit_surrogate(wall, layer_index=[1, 3], thickness_ranges=[(0.05, 0.3), (0.02, 0.2)])
+    surrogate.errors["time_shift"] # max errors against exact evaluation on random variants
+    surrogate.predict(thicknesses)["thermal_transmittance_component"] # thicknesses (n, 2)
+    surrogate.save("wall.npz")
+    load_surrogate("wall.npz")
+"""
+import itertools
+import json
+import numpy as np
+from becalib.component import Component
+from becalib.batch import BATCH_OUTPUTS, get_layers_arrays, evaluate_layers_arrays
+from becalib.algos import get_threshold_codes_italian_dm_26_06_2009
+
+
+# outputs computed from interpolated values instead of interpolated
+CLASS_OUTPUTS = ("threshold_code_italian_dm_26_06_2009",)
+
+# tabulated transform of outputs: U = 1/R is exact with R linear in thicknesses,
+# dynamic values decay about exponentially with thicknesses
+OUTPUT_TRANSFORMS = {
+    "thermal_transmittance_component": (np.reciprocal, np.reciprocal),
+    "periodic_thermal_transmittance": (np.log, np.exp),
+    "decrement_factor": (np.log, np.exp),
+    "thermal_admittance_int": (np.log, np.exp),
+    "thermal_admittance_ext": (np.log, np.exp),
+    "areal_heat_capacity_int": (np.log, np.exp),
+    "areal_heat_capacity_ext": (np.log, np.exp),
+}
+
+# max number of rows by vectorized evaluation
+MAX_ROWS = 65536
+
+
+def _get_variant_arrays(template_arrays: dict, layer_index: np.ndarray, thicknesses: np.ndarray) -> dict:
+    """layers arrays of variants of one template component (rows of section paths are repeated)
+    """
+    n_paths = template_arrays["thicknesses"].shape[0]
+    n_variants = thicknesses.shape[0]
+    rows = np.tile(np.arange(n_paths), n_variants)
+    variant_index = np.repeat(np.arange(n_variants), n_paths)
+
+    variant_arrays = {name: template_arrays[name][rows] for name in (
+        "thicknesses", "thermal_conductivities", "gross_densities",
+        "specific_heat_capacities", "is_air", "heat_flow_directions")}
+    variant_arrays["thicknesses"][:, layer_index] = thicknesses[variant_index]
+
+    if "component_index" in template_arrays:
+        variant_arrays["section_weights"] = template_arrays["section_weights"][rows]
+        variant_arrays["component_index"] = variant_index
+
+    return variant_arrays
+
+
+class ThicknessSurrogate():
+    def __init__(
+            self,
+            axes: list[np.ndarray],
+            values: np.ndarray,
+            outputs: list[str],
+            layer_index: list[int],
+            time_period: float = 24,
+            errors: dict | None = None,
+            ):
+        """multilinear interpolant of tabulated outputs, see fit_surrogate
+
+        Args:
+            axes (list[np.ndarray]): increasing grid thicknesses in [m] of each variable layer
+            values (np.ndarray): (n_outputs, n_1, ..., n_k) tabulated outputs, transformed
+                by OUTPUT_TRANSFORMS and time shifts unwrapped across the grid
+            outputs (list[str]): output names (CLASS_OUTPUTS are computed, not tabulated)
+            layer_index (list[int]): indexes of the variable layers in the template component
+            time_period (float, optional): analysis period in [h]. Defaults to 24 h.
+            errors (dict | None, optional): validated errors by output. Defaults to None.
+        """
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        self.values = np.asarray(values, dtype=np.float64)
+        self.outputs = list(outputs)
+        self.layer_index = list(layer_index)
+        self.time_period = time_period
+        self.errors = errors or {}
+
+        self._tabulated = [name for name in self.outputs if name not in CLASS_OUTPUTS]
+        shape = np.array([axis.size for axis in self.axes])
+        # flat offsets of the 2^k cell corners and strides of the grid
+        self._strides = np.array([np.prod(shape[j + 1:]) for j in range(shape.size)], dtype=np.int64)
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(shape))), dtype=np.int64)
+        self._flat_values = self.values.reshape(len(self._tabulated), -1)
+
+    @property
+    def thickness_ranges(self) -> list[tuple]:
+        """(min, max) thicknesses in [m] of each variable layer"""
+        return [(float(axis[0]), float(axis[-1])) for axis in self.axes]
+
+    def predict(self, thicknesses: np.ndarray) -> dict[str, np.ndarray]:
+        """interpolated outputs of many variants
+
+        Args:
+            thicknesses (np.ndarray): (n, k) thicknesses in [m] of the variable layers, or (k,) for one variant
+
+        Raises:
+            ValueError: wrong shape or thicknesses outside of the grid (no extrapolation)
+
+        Returns:
+            dict[str, np.ndarray]: one array (n,) by output
+        """
+        thicknesses = np.atleast_2d(np.asarray(thicknesses, dtype=np.float64))
+        if thicknesses.shape[1] != len(self.axes):
+            raise ValueError(f"thicknesses: {len(self.axes)} values by variant are needed")
+        low = np.array([axis[0] for axis in self.axes])
+        high = np.array([axis[-1] for axis in self.axes])
+        if not np.all((thicknesses >= low) & (thicknesses <= high)):
+            raise ValueError(f"thicknesses outside of the surrogate ranges: {self.thickness_ranges}")
+
+        # cell of each variant and position inside the cell
+        cells = np.empty(thicknesses.shape, dtype=np.int64)
+        fractions = np.empty(thicknesses.shape)
+        for j, axis in enumerate(self.axes):
+            cells[:, j] = np.clip(np.searchsorted(axis, thicknesses[:, j], side="right") - 1, 0, axis.size - 2)
+            fractions[:, j] = (thicknesses[:, j] - axis[cells[:, j]]) / (axis[cells[:, j] + 1] - axis[cells[:, j]])
+
+        # one lookup of all corners (n_outputs, n, 2^k) and multilinear weights (n, 2^k)
+        corner_index = (cells @ self._strides)[:, np.newaxis] + self._corners @ self._strides
+        weights = np.prod(np.where(self._corners[np.newaxis], fractions[:, np.newaxis], 1 - fractions[:, np.newaxis]),
+                          axis=2)
+        interpolated = np.einsum("onc,nc->on", self._flat_values[:, corner_index], weights)
+
+        results = dict(zip(self._tabulated, interpolated))
+        for name, (_transform, inverse) in OUTPUT_TRANSFORMS.items():
+            if name in results:
+                results[name] = inverse(results[name])
+        if "time_shift" in results:
+            results["time_shift"] = np.mod(results["time_shift"], self.time_period)
+        if "threshold_code_italian_dm_26_06_2009" in self.outputs:
+            results["threshold_code_italian_dm_26_06_2009"] = get_threshold_codes_italian_dm_26_06_2009(
+                results["time_shift"], results["decrement_factor"])
+        return {name: results[name] for name in self.outputs}
+
+    def save(self, path: str):
+        """save grid, table and errors in a .npz file
+
+        Args:
+            path (str): file path
+        """
+        header = {"outputs": self.outputs, "layer_index": self.layer_index,
+                  "time_period": self.time_period, "errors": self.errors}
+        np.savez(path, values=self.values, header=np.array(json.dumps(header)),
+                 **{f"axis_{j}": axis for j, axis in enumerate(self.axes)})
+
+
+def load_surrogate(path: str) -> ThicknessSurrogate:
+    """read a surrogate saved by ThicknessSurrogate.save
+
+    Args:
+        path (str): .npz file path
+
+    Returns:
+        ThicknessSurrogate:
+    """
+    with np.load(path) as data:
+        header = json.loads(str(data["header"]))
+        n_axes = len(header["layer_index"])
+        return ThicknessSurrogate(
+            axes=[data[f"axis_{j}"] for j in range(n_axes)],
+            values=data["values"],
+            **header)
+
+
+def fit_surrogate(
+        component: Component,
+        layer_index: int | list[int],
+        thickness_ranges: tuple | list[tuple],
+        n_points: int | list[int] = 9,
+        outputs: list[str] | None = None,
+        validation_size: int = 1000,
+        seed: int = 0,
+        ) -> ThicknessSurrogate:
+    """tabulate outputs of a template component on a regular grid of layer thicknesses
+        and validate the interpolation against exact evaluation on random variants
+
+        Thickness, mass and heat capacity outputs are exact, also resistance and U-value
+        without inhomogeneous layers,
+        other outputs (interpolated on OUTPUT_TRANSFORMS) converge as the grid spacing squared, increase n_points until
+        the validated errors are small enough. Validated errors are the max errors
+        on the random sample, not guaranteed bounds.
+
+    Args:
+        component (Component): template component (not modified)
+        layer_index (int | list[int]): indexes of the variable layers (interior to exterior)
+        thickness_ranges (tuple | list[tuple]): (min, max) thickness in [m] of each variable layer
+        n_points (int | list[int], optional): grid points by variable layer. Defaults to 9.
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS. Defaults to None = all outputs.
+        validation_size (int, optional): number of random validation variants. Defaults to 1000.
+        seed (int, optional): random seed of the validation variants. Defaults to 0.
+
+    Raises:
+        ValueError: invalid layer index, ranges, grid or outputs
+
+    Returns:
+        ThicknessSurrogate: surrogate with "max_absolute_error" and "max_relative_error"
+            by output in errors (time shifts on the periodic circle, class codes as class differences)
+    """
+    layer_index = np.atleast_1d(np.asarray(layer_index, dtype=np.int64))
+    thickness_ranges = np.asarray(thickness_ranges, dtype=np.float64).reshape(-1, 2)
+    n_points = np.broadcast_to(np.asarray(n_points, dtype=np.int64), layer_index.shape)
+    if ((layer_index < 0) | (layer_index >= len(component.layers))).any() \
+            or np.unique(layer_index).size != layer_index.size:
+        raise ValueError("layer_index: out of range or repeated layer index")
+    if len(thickness_ranges) != layer_index.size \
+            or not np.all((thickness_ranges[:, 0] > 0) & (thickness_ranges[:, 0] < thickness_ranges[:, 1])):
+        raise ValueError("thickness_ranges: one (min, max) range with 0 < min < max by variable layer is needed")
+    if (n_points < 2).any():
+        raise ValueError("n_points: at least 2 grid points by variable layer are needed")
+
+    outputs = list(BATCH_OUTPUTS) if outputs is None else list(outputs)
+    unknown = set(outputs) - set(BATCH_OUTPUTS)
+    if unknown:
+        raise ValueError(f"""unknown outputs: {", ".join(sorted(unknown))}
+        available choices: {", ".join(BATCH_OUTPUTS)}
+        """)
+    tabulated = [name for name in outputs if name not in CLASS_OUTPUTS]
+    if set(outputs) & set(CLASS_OUTPUTS):
+        # class codes are computed from interpolated time shift and decrement factor
+        tabulated += [name for name in ("time_shift", "decrement_factor") if name not in tabulated]
+        outputs += [name for name in ("time_shift", "decrement_factor") if name not in outputs]
+
+    template_arrays = get_layers_arrays([component.layers], component.heat_flow_direction)
+    time_period = component.time_period
+
+    def evaluate(thicknesses: np.ndarray, names: list[str]) -> dict:
+        results = {name: [] for name in names}
+        for start in range(0, len(thicknesses), MAX_ROWS):
+            chunk_results = evaluate_layers_arrays(
+                _get_variant_arrays(template_arrays, layer_index, thicknesses[start:start + MAX_ROWS]),
+                time_period=time_period,
+                outputs=names)
+            for name in names:
+                results[name].append(chunk_results[name])
+        return {name: np.concatenate(values) for name, values in results.items()}
+
+    axes = [np.linspace(low, high, n) for (low, high), n in zip(thickness_ranges, n_points)]
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, layer_index.size)
+    grid_results = evaluate(grid, tabulated)
+
+    shape = tuple(int(n) for n in n_points)
+    values = np.stack([
+        (OUTPUT_TRANSFORMS[name][0] if name in OUTPUT_TRANSFORMS else np.asarray)(grid_results[name]).reshape(shape)
+        for name in tabulated])
+    if "time_shift" in tabulated:
+        # no jump of time_period between neighbours (time shifts over 0 or T)
+        time_shifts = values[tabulated.index("time_shift")]
+        for axis in range(time_shifts.ndim):
+            time_shifts = np.unwrap(time_shifts, period=time_period, axis=axis)
+        values[tabulated.index("time_shift")] = time_shifts
+
+    surrogate = ThicknessSurrogate(axes, values, outputs, layer_index.tolist(), time_period)
+
+    # validation on random variants
+    rng = np.random.default_rng(seed)
+    sample = rng.uniform(thickness_ranges[:, 0], thickness_ranges[:, 1], size=(validation_size, layer_index.size))
+    predicted = surrogate.predict(sample)
+    reference = evaluate(sample, outputs)
+    for name in outputs:
+        differences = np.abs(predicted[name].astype(np.float64) - reference[name].astype(np.float64))
+        if name == "time_shift":
+            # differences on the periodic circle: 23.9 h and 0.1 h differ by 0.2 h
+            differences = np.abs(np.mod(differences + time_period / 2, time_period) - time_period / 2)
+        relative = np.divide(differences, np.abs(reference[name]),
+                             out=np.zeros(differences.shape), where=reference[name] != 0)
+        surrogate.errors[name] = {
+            "max_absolute_error": float(np.max(differences, initial=0)),
+            "max_relative_error": float(np.max(relative, initial=0)),
+        }
+
+    return surrogate
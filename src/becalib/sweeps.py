@@ -0,0 +1,451 @@
+"""resumable parameter sweeps: work units shared by worker processes through a
+file queue in a directory (local processes or containers sharing a filesystem)
+
+The sweep is a template component definition and a grid of parameter values,
+split into work units of unit_size components. A worker claims a unit by
+creating its claim file (O_EXCL, atomic), writes the unit results to a
+temporary file renamed into place (atomic checkpoint) and removes the claim.
+Claims are renewed during evaluations, claims of crashed workers are taken over
+after lease_timeout, at once when the worker process of the same pid namespace
+is dead. An interrupted sweep resumes at the units without results.
+
+Example:
+    create_sweep("sweep", wall_definition, {"layers.2.thickness": np.arange(0.02, 0.3, 0.001),
+                                            "layers.1.thickness": [0.1, 0.2, 0.3]})
+    results = run_sweep("sweep", n_workers=8)
+    # more workers, from other processes or containers: python -m becalib.sweeps sweep --jobs 4
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import copy
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+import numpy as np
+from becalib.batch import get_outputs, get_precision_dtype
+from becalib.studies import OUTPUT_DTYPES
+from becalib.cli import evaluate_chunk
+
+
+SWEEP_FILE = "sweep.json"
+SWEEP_VERSION = 1
+CLAIMS_DIRECTORY = "claims"
+RESULTS_DIRECTORY = "results"
+
+
+def _write_atomic(path: str, write):
+    # temporary file in the same directory renamed into place: readers see no partial file
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary_path, "wb") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def _get_claim_path(directory: str, unit: int) -> str:
+    return os.path.join(directory, CLAIMS_DIRECTORY, f"unit_{unit:08d}.json")
+
+
+def _get_result_path(directory: str, unit: int) -> str:
+    return os.path.join(directory, RESULTS_DIRECTORY, f"unit_{unit:08d}.npz")
+
+
+def _set_value(definition: dict, path: str, value):
+    # "layers.2.thickness": definition["layers"][2]["thickness"] = value
+    keys = [int(key) if key.isdigit() else key for key in path.split(".")]
+    target = definition
+    for key in keys[:-1]:
+        target = target[key]
+    target[keys[-1]] = value
+
+
+def create_sweep(
+        directory: str,
+        template: dict,
+        parameters: dict[str, list],
+        unit_size: int = 1000,
+        outputs: list[str] | None = None,
+        precision: str = "double",
+        resume: bool = True,
+        ) -> dict:
+    """write the sweep file of a directory: grid of parameter values applied to a template definition
+
+    Args:
+        directory (str): sweep directory (shared by all workers), created if needed
+        template (dict): component definition (see becalib.definitions)
+        parameters (dict[str, list]): values of each parameter path, example
+            {"layers.2.thickness": [0.05, 0.1, 0.15], "heat_flow_direction": ["Ho", "Up"]},
+            components are all combinations (last parameter varies fastest)
+        unit_size (int, optional): number of components by work unit. Defaults to 1000.
+        outputs (list[str] | None, optional): names of BATCH_OUTPUTS. Defaults to None = all outputs.
+        precision (str, optional): "double" or "single", see becalib.batch. Defaults to "double".
+        resume (bool, optional): keep the results of the same sweep in directory. Defaults to True.
+            If False, previous results and claims are removed.
+
+    Raises:
+        ValueError: invalid parameters, other sweep in directory (with resume)
+
+    Returns:
+        dict: sweep settings
+    """
+    get_precision_dtype(precision)
+    if unit_size < 1:
+        raise ValueError("unit_size: >= 1 is needed")
+    parameters = {path: [value.item() if isinstance(value, np.generic) else value for value in values]
+                  for path, values in parameters.items()}
+    if not parameters or any(len(values) == 0 for values in parameters.values()):
+        raise ValueError("parameters: at least one value by parameter is needed")
+    for path, values in parameters.items():
+        try:
+            _set_value(copy.deepcopy(template), path, values[0])
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"parameters: invalid path {path}") from None
+
+    n_components = int(np.prod([len(values) for values in parameters.values()]))
+    sweep = {
+        "version": SWEEP_VERSION,
+        "template": template,
+        "parameters": parameters,
+        "n_components": n_components,
+        "unit_size": int(unit_size),
+        "n_units": -(-n_components // unit_size),
+        "outputs": list(get_outputs(outputs)),
+        "precision": precision,
+    }
+
+    for name in (CLAIMS_DIRECTORY, RESULTS_DIRECTORY):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+    previous = get_sweep(directory)
+    if previous is not None and resume:
+        if previous != json.loads(json.dumps(sweep)):
+            raise ValueError(f"""other sweep in {directory}
+            use resume=False to start a new sweep""")
+        return previous
+    for name in (CLAIMS_DIRECTORY, RESULTS_DIRECTORY):
+        for file_name in os.listdir(os.path.join(directory, name)):
+            os.remove(os.path.join(directory, name, file_name))
+
+    _write_atomic(os.path.join(directory, SWEEP_FILE), lambda file: file.write(json.dumps(sweep).encode("utf-8")))
+    return sweep
+
+
+def get_sweep(directory: str) -> dict | None:
+    """sweep settings of a directory
+
+    Args:
+        directory (str): sweep directory
+
+    Returns:
+        dict | None: settings written by create_sweep, None if no sweep in directory
+    """
+    path = os.path.join(directory, SWEEP_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_sweep_definitions(sweep: dict, start: int, stop: int) -> list[dict]:
+    """component definitions of flat indexes start to stop of the parameter grid
+
+    Args:
+        sweep (dict): sweep settings, see create_sweep
+        start (int): first index
+        stop (int): last index (excluded)
+
+    Returns:
+        list[dict]: component definitions
+    """
+    parameters = sweep["parameters"]
+    shape = [len(values) for values in parameters.values()]
+    indexes = np.unravel_index(np.arange(start, min(stop, sweep["n_components"])), shape)
+
+    definitions = []
+    for i, index in enumerate(zip(*(index.tolist() for index in indexes))):
+        definition = copy.deepcopy(sweep["template"])
+        for (path, values), j in zip(parameters.items(), index):
+            _set_value(definition, path, values[j])
+        definition["name"] = f"{sweep['template'].get('name', 'component')} {start + i}"
+        definitions.append(definition)
+    return definitions
+
+
+def _get_process_namespace() -> str | None:
+    # pids are comparable inside one pid namespace of one boot only (containers may share a hostname)
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="utf-8") as file:
+            boot_id = file.read().strip()
+        return f"{boot_id}:{os.stat('/proc/self/ns/pid').st_ino}"
+    except OSError:
+        return None
+
+
+def _read_claim(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # claim removed meanwhile or being written
+        return None
+
+
+def _is_claim_stale(path: str, claim: dict, lease_timeout: float) -> bool:
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return False
+    if age > lease_timeout:
+        return True
+    namespace = _get_process_namespace()
+    if namespace is not None and claim.get("namespace") == namespace:
+        try:
+            os.kill(claim["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass
+    return False
+
+
+def _remove_claim(path: str, claim_id: str) -> bool:
+    """remove a claim if it is still the claim claim_id: renamed away first, put back
+        (without overwriting a newer claim) when another worker owns it
+    """
+    removed_path = f"{path}.{uuid.uuid4().hex}.removed"
+    try:
+        os.rename(path, removed_path)
+    except FileNotFoundError:
+        return False
+    claim = _read_claim(removed_path)
+    owned = claim is not None and claim.get("claim_id") == claim_id
+    if not owned:
+        with contextlib.suppress(FileExistsError):
+            os.link(removed_path, path)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(removed_path)
+    return owned
+
+
+def _claim_unit(directory: str, unit: int, worker_id: str, lease_timeout: float) -> str | None:
+    # id of the new claim, None if the unit is claimed by a live worker
+    path = _get_claim_path(directory, unit)
+    if os.path.exists(path):
+        claim = _read_claim(path)
+        if claim is None or not _is_claim_stale(path, claim, lease_timeout):
+            return None
+        # only the claim judged stale is removed, not a claim written meanwhile
+        if not _remove_claim(path, claim.get("claim_id")):
+            return None
+    try:
+        descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    claim_id = uuid.uuid4().hex
+    with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+        json.dump({"claim_id": claim_id, "worker": worker_id, "host": socket.gethostname(),
+                   "namespace": _get_process_namespace(), "pid": os.getpid(), "time": time.time()}, file)
+    # completed by another worker between the check and the claim
+    if os.path.exists(_get_result_path(directory, unit)):
+        _remove_claim(path, claim_id)
+        return None
+    return claim_id
+
+
+def _renew_claim(path: str, claim_id: str, lease_timeout: float, stop: threading.Event):
+    # the claim mtime is refreshed while the unit is evaluated
+    while not stop.wait(lease_timeout / 4):
+        claim = _read_claim(path)
+        if claim is None or claim.get("claim_id") != claim_id:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+
+
+def run_sweep_worker(
+        directory: str,
+        max_units: int | None = None,
+        lease_timeout: float = 600,
+        worker_id: str | None = None,
+        ) -> int:
+    """evaluate units of a sweep until no unit is left to claim
+
+        Claims are renewed while a unit is evaluated: lease_timeout only needs to be longer
+        than the renewal delays (lease_timeout / 4), claims of live processes of the same
+        pid namespace are never taken over.
+
+    Args:
+        directory (str): sweep directory
+        max_units (int | None, optional): stop after max_units units. Defaults to None = no limit.
+        lease_timeout (float, optional): age in [s] of claims of crashed workers taken over. Defaults to 600 s.
+        worker_id (str | None, optional): name in claim files. Defaults to None = host and process id.
+
+    Raises:
+        ValueError: no sweep in directory
+
+    Returns:
+        int: number of units evaluated by this worker
+    """
+    sweep = get_sweep(directory)
+    if sweep is None:
+        raise ValueError(f"no sweep in directory: {directory}")
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    n_evaluated = 0
+    # workers start at different units to limit claim collisions
+    first = os.getpid() % sweep["n_units"]
+    order = itertools.chain(range(first, sweep["n_units"]), range(first))
+    for unit in order:
+        if max_units is not None and n_evaluated >= max_units:
+            break
+        if os.path.exists(_get_result_path(directory, unit)):
+            continue
+        claim_id = _claim_unit(directory, unit, worker_id, lease_timeout)
+        if claim_id is None:
+            continue
+
+        claim_path = _get_claim_path(directory, unit)
+        stop = threading.Event()
+        renewal = threading.Thread(target=_renew_claim, args=(claim_path, claim_id, lease_timeout, stop), daemon=True)
+        renewal.start()
+        try:
+            start = unit * sweep["unit_size"]
+            # invalid parameter combinations are NaN (-1 for class codes): the unit is still completed
+            results, errors = evaluate_chunk(
+                get_sweep_definitions(sweep, start, start + sweep["unit_size"]),
+                outputs=sweep["outputs"],
+                precision=sweep["precision"])
+            invalid_rows = np.array([start + i for i, _message in errors], dtype=np.int64)
+            # same results if another worker completed the unit too
+            _write_atomic(_get_result_path(directory, unit),
+                          lambda file: np.savez(file, **results, invalid_rows=invalid_rows))
+        finally:
+            stop.set()
+            renewal.join()
+            _remove_claim(claim_path, claim_id)
+        n_evaluated += 1
+
+    return n_evaluated
+
+
+def get_sweep_progress(directory: str) -> dict:
+    """completed and claimed units of a sweep
+
+    Args:
+        directory (str): sweep directory
+
+    Raises:
+        ValueError: no sweep in directory
+
+    Returns:
+        dict: "n_units", "completed_units", "claimed_units", "n_components", "completed_components"
+            and "invalid_components" (invalid parameter combinations of completed units)
+    """
+    sweep = get_sweep(directory)
+    if sweep is None:
+        raise ValueError(f"no sweep in directory: {directory}")
+    completed = [unit for unit in range(sweep["n_units"]) if os.path.exists(_get_result_path(directory, unit))]
+    claimed = [name for name in os.listdir(os.path.join(directory, CLAIMS_DIRECTORY)) if name.endswith(".json")]
+    last_unit_size = sweep["n_components"] - (sweep["n_units"] - 1) * sweep["unit_size"]
+    invalid = 0
+    for unit in completed:
+        with np.load(_get_result_path(directory, unit)) as unit_results:
+            invalid += unit_results["invalid_rows"].size if "invalid_rows" in unit_results else 0
+    return {
+        "n_units": sweep["n_units"],
+        "completed_units": len(completed),
+        "claimed_units": len(claimed),
+        "n_components": sweep["n_components"],
+        "completed_components": sum(last_unit_size if unit == sweep["n_units"] - 1 else sweep["unit_size"]
+                                    for unit in completed),
+        "invalid_components": invalid,
+    }
+
+
+def load_sweep_results(directory: str) -> dict[str, np.ndarray]:
+    """results of completed units, one value by component of the parameter grid
+
+    Args:
+        directory (str): sweep directory
+
+    Raises:
+        ValueError: no sweep in directory
+
+    Returns:
+        dict[str, np.ndarray]: one array by output, NaN (-1 for class codes) for components
+            of uncompleted units and invalid parameter combinations
+    """
+    sweep = get_sweep(directory)
+    if sweep is None:
+        raise ValueError(f"no sweep in directory: {directory}")
+    dtype = get_precision_dtype(sweep["precision"])
+    results = {name: np.full(sweep["n_components"], -1 if name in OUTPUT_DTYPES else np.nan,
+                             dtype=OUTPUT_DTYPES.get(name, dtype))
+               for name in sweep["outputs"]}
+    for unit in range(sweep["n_units"]):
+        path = _get_result_path(directory, unit)
+        if not os.path.exists(path):
+            continue
+        start = unit * sweep["unit_size"]
+        with np.load(path) as unit_results:
+            for name, values in results.items():
+                values[start:start + len(unit_results[name])] = unit_results[name]
+    return results
+
+
+def run_sweep(
+        directory: str,
+        n_workers: int | None = None,
+        lease_timeout: float = 600,
+        ) -> dict[str, np.ndarray]:
+    """evaluate the remaining units of a sweep with local worker processes
+
+    Args:
+        directory (str): sweep directory, see create_sweep
+        n_workers (int | None, optional): number of processes. Defaults to None = number of CPUs.
+        lease_timeout (float, optional): see run_sweep_worker. Defaults to 600 s.
+
+    Returns:
+        dict[str, np.ndarray]: results, see load_sweep_results (units claimed by workers
+            of other hosts may still be running)
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(run_sweep_worker, directory, None, lease_timeout) for _ in range(n_workers)]
+        for future in futures:
+            future.result()
+    return load_sweep_results(directory)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m becalib.sweeps",
+        description="join the workers of a sweep directory (see becalib.sweeps.create_sweep)")
+    parser.add_argument("directory", help="sweep directory shared by workers")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes (default 1, 0 = number of CPUs)")
+    parser.add_argument("--lease-timeout", type=float, default=600,
+                        help="age in seconds of claims of crashed workers taken over (default 600)")
+    args = parser.parse_args(argv)
+
+    try:
+        run_sweep(args.directory, n_workers=args.jobs if args.jobs > 0 else None, lease_timeout=args.lease_timeout)
+        progress = get_sweep_progress(args.directory)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    print(f"{progress['completed_units']}/{progress['n_units']} units completed")
+    if progress["invalid_components"]:
+        print(f"{progress['invalid_components']} invalid parameter combinations (NaN results)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
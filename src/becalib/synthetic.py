@@ -0,0 +1,171 @@
+"""reproducible synthetic components for load and scale testing: random but
+physically plausible layer stacks streamed as component definitions
+
+Stacks are built as interior finish, core (structure, insulation and at most
+one unventilated air gap inside the core) and exterior finish. Material values
+are drawn inside realistic ranges, denser variants of a material conduct more.
+
+Example:
+    definitions = iter_synthetic_definitions(10**6, n_layers={3: 0.2, 4: 0.5, 5: 0.3}, seed=1)
+    write_definitions("synthetic.jsonl", definitions) # becalib.definitions
+"""
+from typing import Iterator
+import numpy as np
+
+
+# material: role and (min, max) of thickness [m], λ [W/mK], ρ [kg/m³], c [J/kgK] and μ [-]
+SYNTHETIC_MATERIALS = {
+    "lime plaster": ("finish", (0.01, 0.025), (0.7, 0.9), (1400, 1800), (840, 1000), (10, 20)),
+    "gypsum board": ("interior finish", (0.0125, 0.025), (0.2, 0.25), (700, 900), (1000, 1100), (8, 10)),
+    "cement render": ("exterior finish", (0.01, 0.03), (0.8, 1.0), (1800, 2000), (840, 1000), (15, 35)),
+    "reinforced concrete": ("structure", (0.12, 0.3), (1.9, 2.5), (2300, 2500), (880, 1000), (80, 130)),
+    "solid brick": ("structure", (0.12, 0.38), (0.5, 0.9), (1500, 2000), (840, 1000), (5, 10)),
+    "hollow brick": ("structure", (0.2, 0.38), (0.2, 0.4), (650, 1000), (840, 1000), (5, 10)),
+    "aerated concrete": ("structure", (0.2, 0.4), (0.09, 0.16), (350, 600), (1000, 1050), (5, 10)),
+    "natural stone": ("structure", (0.1, 0.5), (1.7, 3.5), (2200, 2800), (840, 1000), (40, 250)),
+    "solid timber": ("structure", (0.05, 0.2), (0.12, 0.18), (400, 700), (1600, 2100), (20, 50)),
+    "mineral wool": ("insulation", (0.04, 0.24), (0.032, 0.044), (30, 150), (800, 1030), (1, 1.3)),
+    "EPS": ("insulation", (0.04, 0.24), (0.031, 0.04), (15, 35), (1300, 1500), (20, 100)),
+    "wood fibre": ("insulation", (0.04, 0.2), (0.038, 0.05), (110, 250), (2000, 2100), (3, 5)),
+}
+
+# unventilated air gaps, see becalib.air_resistances
+AIR_GAP_THICKNESSES = (0.01, 0.1)
+
+SYNTHETIC_HEAT_FLOW_DIRECTIONS = ("Ho", "Up", "Do")
+
+
+def _get_role_materials(*roles: str) -> list[str]:
+    return [name for name, (role, *_ranges) in SYNTHETIC_MATERIALS.items() if role in roles]
+
+
+def _get_distribution(values: int | tuple | dict, name: str) -> tuple:
+    # (choices, probabilities) from a value, an inclusive (min, max) range or {choice: weight}
+    if isinstance(values, dict):
+        choices = list(values)
+        weights = np.array([values[choice] for choice in choices], dtype=np.float64)
+    elif isinstance(values, tuple):
+        choices = list(range(values[0], values[1] + 1))
+        weights = np.ones(len(choices))
+    else:
+        choices, weights = [values], np.ones(1)
+    if not choices or (weights < 0).any() or not weights.sum() > 0:
+        raise ValueError(f"{name}: invalid distribution {values}")
+    return choices, weights / weights.sum()
+
+
+def _choose(rng: np.random.Generator, choices: list):
+    # faster than rng.choice on short lists
+    return choices[rng.integers(len(choices))]
+
+
+def _get_material_layer(rng: np.random.Generator, name: str) -> dict:
+    _role, thicknesses, conductivities, densities, heat_capacities, vapour_factors = SYNTHETIC_MATERIALS[name]
+    # one quality parameter for λ and ρ (geometric interpolation), small independent noise on ρ
+    quality, noise, thickness, heat_capacity, vapour_factor = rng.random(5).tolist()
+    density_quality = min(max(quality + 0.2 * (noise - 0.5), 0), 1)
+    return {
+        "name": name,
+        "thickness": round(thicknesses[0] + thickness * (thicknesses[1] - thicknesses[0]), 3),
+        "thermal_conductivity": round(conductivities[0] * (conductivities[1] / conductivities[0]) ** quality, 4),
+        "gross_density": round(densities[0] * (densities[1] / densities[0]) ** density_quality),
+        "specific_heat_capacity": round(heat_capacities[0] + heat_capacity * (heat_capacities[1] - heat_capacities[0])),
+        "vapour_resistance_factor": round(vapour_factors[0] + vapour_factor * (vapour_factors[1] - vapour_factors[0]), 1),
+        "is_air": False,
+    }
+
+
+def iter_synthetic_definitions(
+        n_components: int | None = None,
+        n_layers: int | tuple | dict = (3, 7),
+        air_gap_probability: float = 0.2,
+        heat_flow_directions: str | dict = "Ho",
+        time_period: float = 24,
+        seed: int = 0,
+        ) -> Iterator[dict]:
+    """stream of random plausible component definitions (see becalib.definitions),
+        the same seed and arguments give the same components
+
+        1 layer: one structure layer, 2 layers: structure and insulation,
+        3 layers and more: interior finish, core and exterior finish. The core has at least
+        one structure layer, no material twice in a row and, with air_gap_probability,
+        one air gap between two core layers (5 layers and more).
+
+    Args:
+        n_components (int | None, optional): number of components. Defaults to None = endless stream.
+        n_layers (int | tuple | dict, optional): layer count distribution: a count, an inclusive
+            (min, max) range (uniform) or {count: weight}. Defaults to (3, 7).
+        air_gap_probability (float, optional): probability of an air gap. Defaults to 0.2.
+        heat_flow_directions (str | dict, optional): a direction or {direction: weight},
+            example {"Ho": 0.7, "Up": 0.2, "Do": 0.1}. Defaults to "Ho".
+        time_period (float, optional): analysis period in [h]. Defaults to 24 h.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Raises:
+        ValueError: invalid distributions
+
+    Yields:
+        dict: component definition
+    """
+    layer_counts, layer_count_probabilities = _get_distribution(n_layers, "n_layers")
+    if min(layer_counts) < 1:
+        raise ValueError("n_layers: at least 1 layer by component is needed")
+    directions, direction_probabilities = _get_distribution(heat_flow_directions, "heat_flow_directions")
+    if set(directions) - set(SYNTHETIC_HEAT_FLOW_DIRECTIONS):
+        raise ValueError(f"""heat_flow_directions: invalid directions {directions}
+        available choices: {", ".join(SYNTHETIC_HEAT_FLOW_DIRECTIONS)}
+        """)
+    if not 0 <= air_gap_probability <= 1:
+        raise ValueError("air_gap_probability: 0 <= probability <= 1 is needed")
+
+    interior_finishes = _get_role_materials("finish", "interior finish")
+    exterior_finishes = _get_role_materials("finish", "exterior finish")
+    structures = _get_role_materials("structure")
+    insulations = _get_role_materials("insulation")
+
+    # cumulative probabilities (last = 1) for inverse transform sampling
+    layer_count_cumulative = np.cumsum(layer_count_probabilities)[:-1]
+    direction_cumulative = np.cumsum(direction_probabilities)[:-1]
+
+    rng = np.random.default_rng(seed)
+    i = 0
+    while n_components is None or i < n_components:
+        count = layer_counts[np.searchsorted(layer_count_cumulative, rng.random(), side="right")]
+        heat_flow_direction = directions[np.searchsorted(direction_cumulative, rng.random(), side="right")]
+
+        if count == 1:
+            names = [_choose(rng, structures)]
+        elif count == 2:
+            names = [_choose(rng, structures), _choose(rng, insulations)]
+            rng.shuffle(names)
+        else:
+            # core: structure or insulation, one structure at least, no repeated material
+            # and an air gap between two core layers
+            n_core = count - 2
+            air_position = int(rng.integers(1, n_core - 1)) \
+                if n_core >= 3 and rng.random() < air_gap_probability else None
+            structure_position = _choose(rng, [j for j in range(n_core) if j != air_position])
+            core = []
+            for j in range(n_core):
+                if j == air_position:
+                    core.append(None)
+                    continue
+                choices = structures if j == structure_position or rng.random() < 0.5 else insulations
+                choices = [name for name in choices if not core or name != core[-1]]
+                core.append(_choose(rng, choices))
+            names = [_choose(rng, interior_finishes), *core, _choose(rng, exterior_finishes)]
+
+        layers = [_get_material_layer(rng, name) if name is not None else {
+            "name": "air gap",
+            "thickness": round(float(rng.uniform(*AIR_GAP_THICKNESSES)), 3),
+            "heat_flow_direction": heat_flow_direction,
+            "is_air": True,
+        } for name in names]
+
+        yield {
+            "name": f"synthetic {i}",
+            "heat_flow_direction": heat_flow_direction,
+            "time_period": time_period,
+            "layers": layers,
+        }
+        i += 1
@@ -0,0 +1,307 @@
+"""transient heat conduction of many components: implicit finite volumes through
+the layers, non periodic boundary temperatures (heatwave onset, HVAC setback, etc)
+
+Each layer is split into cells (one cell for air layers, no capacity), the
+tridiagonal systems of all components are solved together with the Thomas
+algorithm, vectorized over components. Matrices do not change over time: they
+are factored once, each time step costs O(components x cells).
+
+Example:
+    results = get_transient_response(
+        [wall.layers for wall in walls], "Ho",
+        interior_temperatures=26, exterior_temperatures=hourly_sol_air_temperatures, time_step=1)
+    results["interior_heat_fluxes"] # (n, n_times) in W/m², positive towards the exterior
+"""
+import numpy as np
+from becalib.layers import LayerBase
+from becalib.batch import (
+    get_layers_arrays,
+    get_surface_resistances_array,
+    get_thermal_resistances_array,
+    _get_first_path_index,
+)
+
+
+def _factor_tridiagonal(diagonal: np.ndarray, upper: np.ndarray) -> tuple:
+    """Thomas algorithm factors of symmetric tridiagonal systems, one by row
+
+    Args:
+        diagonal (np.ndarray): (n, m)
+        upper (np.ndarray): (n, m - 1) upper (and lower) diagonal
+
+    Returns:
+        tuple: (upper diagonal, inverse pivots, modified upper diagonal) transposed (m, n)
+            for contiguous access along cells
+    """
+    diagonal, upper = np.ascontiguousarray(diagonal.T), np.ascontiguousarray(upper.T)
+    n_cells = diagonal.shape[0]
+    inverse_pivots = np.empty(diagonal.shape)
+    modified_upper = np.empty(upper.shape)
+    inverse_pivots[0] = 1 / diagonal[0]
+    for k in range(1, n_cells):
+        modified_upper[k - 1] = upper[k - 1] * inverse_pivots[k - 1]
+        inverse_pivots[k] = 1 / (diagonal[k] - upper[k - 1] * modified_upper[k - 1])
+    return upper, inverse_pivots, modified_upper
+
+
+def _solve_factored(factors: tuple, right_hand_side: np.ndarray) -> np.ndarray:
+    # forward and back substitution of (n, m) right hand sides
+    upper, inverse_pivots, modified_upper = factors
+    solution = np.ascontiguousarray(right_hand_side.T)
+    n_cells = solution.shape[0]
+    solution[0] *= inverse_pivots[0]
+    for k in range(1, n_cells):
+        solution[k] -= upper[k - 1] * solution[k - 1]
+        solution[k] *= inverse_pivots[k]
+    for k in range(n_cells - 2, -1, -1):
+        solution[k] -= modified_upper[k] * solution[k + 1]
+    return solution.T
+
+
+def _get_equivalent_layers(layers_arrays: dict[str, np.ndarray]) -> tuple:
+    """layers by component: paths of inhomogeneous layers combined into equivalent homogeneous layers
+
+        Section resistances are combined in parallel layer by layer, 1 / Σ(f / R)
+        (lower limit of ISO 6946, as λ of InhomogeneousLayer), heat capacities
+        d·ρ·c are area-weighted. A layer is an air layer when all its sections are.
+
+    Returns:
+        tuple: (n, n_layers) thicknesses, resistances [m²K/W], capacities [J/m²K], is_air
+            and (n,) heat flow directions
+    """
+    thicknesses = layers_arrays["thicknesses"]
+    is_air = layers_arrays["is_air"]
+    heat_flow_directions = layers_arrays["heat_flow_directions"]
+    resistances = get_thermal_resistances_array(
+        thicknesses=thicknesses,
+        thermal_conductivities=layers_arrays["thermal_conductivities"],
+        is_air=is_air,
+        heat_flow_directions=heat_flow_directions)
+    capacities = thicknesses * layers_arrays["gross_densities"] * layers_arrays["specific_heat_capacities"]
+
+    component_index = layers_arrays.get("component_index")
+    if component_index is None:
+        return thicknesses, resistances, capacities, is_air, heat_flow_directions
+
+    # sections of a layer have its thickness: same padding in all paths of a component
+    weights = layers_arrays["section_weights"][:, np.newaxis]
+    starts = _get_first_path_index(component_index)
+    conductances = np.add.reduceat(
+        np.divide(weights, resistances, out=np.zeros(resistances.shape), where=resistances > 0), starts)
+    resistances = np.divide(1, conductances, out=np.zeros(conductances.shape), where=conductances > 0)
+    capacities = np.add.reduceat(weights * capacities, starts)
+    return (thicknesses[starts], resistances, capacities,
+            np.logical_and.reduceat(is_air, starts), heat_flow_directions[starts])
+
+
+def get_cells_arrays(layers_arrays: dict[str, np.ndarray], cell_thickness: float = 0.01) -> dict[str, np.ndarray]:
+    """finite volume cells of components, padded 2D arrays (components x cells)
+
+        Material layers are split into equal cells of at most cell_thickness,
+        air layers are one cell without heat capacity (ISO 6946 resistance),
+        layers of 0 m are skipped. Padding cells are not connected.
+        Inhomogeneous layers are equivalent homogeneous layers: parallel section
+        resistances 1 / Σ(f / R) and area-weighted d·ρ·c, lateral heat flow between
+        sections is not modelled.
+
+    Args:
+        layers_arrays (dict[str, np.ndarray]): layer inputs, see get_layers_arrays
+        cell_thickness (float, optional): max cell thickness in [m]. Defaults to 0.01 m.
+
+    Raises:
+        ValueError: invalid cell thickness or component without layers
+
+    Returns:
+        dict[str, np.ndarray]: "resistances" [m²K/W], "capacities" [J/m²K], "depths" of cell centres
+            from the interior surface [m] (NaN for padding) (n, n_cells), "n_cells" and
+            "heat_flow_directions" (n,)
+    """
+    if not cell_thickness > 0:
+        raise ValueError("cell_thickness: > 0 is needed")
+
+    thicknesses, layer_resistances, layer_capacities, is_air, heat_flow_directions = \
+        _get_equivalent_layers(layers_arrays)
+
+    cells_by_layer = np.where(is_air, 1, np.ceil(thicknesses / cell_thickness - 1e-9)).astype(np.int64)
+    cells_by_layer[thicknesses <= 0] = 0
+    n_cells = cells_by_layer.sum(axis=1)
+    if (n_cells == 0).any():
+        raise ValueError("transient response: components without layers")
+
+    # cells of all components in one flat array, then padded rows
+    n_components, n_layers = thicknesses.shape
+    layer_of_cell = np.repeat(np.arange(n_components * n_layers), cells_by_layer.ravel())
+    row = layer_of_cell // n_layers
+    first_cell = np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+    column = np.arange(layer_of_cell.size) - first_cell
+    shape = (n_components, int(n_cells.max()))
+
+    divisors = np.maximum(cells_by_layer, 1).ravel()[layer_of_cell]
+    resistances = np.zeros(shape)
+    resistances[row, column] = layer_resistances.ravel()[layer_of_cell] / divisors
+    capacities = np.zeros(shape)
+    capacities[row, column] = layer_capacities.ravel()[layer_of_cell] / divisors
+
+    # depth of cell centres from the interior surface of each component
+    cell_thicknesses = thicknesses.ravel()[layer_of_cell] / divisors
+    cell_starts = np.cumsum(cell_thicknesses) - cell_thicknesses
+    depths = np.full(shape, np.nan)
+    depths[row, column] = cell_starts + cell_thicknesses / 2 - cell_starts[first_cell]
+
+    return {"resistances": resistances, "capacities": capacities, "depths": depths, "n_cells": n_cells,
+            "heat_flow_directions": heat_flow_directions}
+
+
+def get_transient_response_arrays(
+        layers_arrays: dict[str, np.ndarray],
+        interior_temperatures: float | np.ndarray,
+        exterior_temperatures: float | np.ndarray,
+        time_step: float = 1,
+        cell_thickness: float = 0.01,
+        theta: float = 1,
+        initial_temperatures: np.ndarray | None = None,
+        ) -> dict[str, np.ndarray]:
+    """transient response of many components to time-varying air temperatures
+
+    Args:
+        layers_arrays (dict[str, np.ndarray]): layer inputs, see get_layers_arrays
+            (inhomogeneous layers: see get_cells_arrays)
+        interior_temperatures (float | np.ndarray): interior air temperatures in [°C] at each time,
+            scalar, (n_times,) for all components or (n, n_times)
+        exterior_temperatures (float | np.ndarray): exterior air (or sol-air) temperatures in [°C],
+            same shapes as interior_temperatures, at least one of both has n_times values
+        time_step (float, optional): time between values in [h]. Defaults to 1 h.
+        cell_thickness (float, optional): max cell thickness in [m]. Defaults to 0.01 m.
+        theta (float, optional): 1 implicit Euler (no oscillation), 0.5 Crank-Nicolson
+            (second order in time). Defaults to 1.
+        initial_temperatures (np.ndarray | None, optional): (n, n_cells) cell temperatures in [°C] at
+            the first time. Defaults to None = steady state of the first boundary temperatures.
+
+    Raises:
+        ValueError: invalid shapes or parameters
+
+    Returns:
+        dict[str, np.ndarray]: (n, n_times) "interior_heat_fluxes" and "exterior_heat_fluxes" in [W/m²]
+            (positive towards the exterior), "interior_surface_temperatures" and
+            "exterior_surface_temperatures" in [°C], (n, n_cells) "temperatures" of cells at the last time
+            and "depths" of cell centres in [m]
+    """
+    if not 0.5 <= theta <= 1:
+        raise ValueError("theta: 0.5 <= theta <= 1 is needed (unconditionally stable schemes)")
+    if not time_step > 0:
+        raise ValueError("time_step: > 0 is needed")
+
+    cells = get_cells_arrays(layers_arrays, cell_thickness)
+    resistances, capacities, n_cells = cells["resistances"], cells["capacities"], cells["n_cells"]
+    n_components, n_columns = resistances.shape
+
+    interior_temperatures = np.asarray(interior_temperatures, dtype=np.float64)
+    exterior_temperatures = np.asarray(exterior_temperatures, dtype=np.float64)
+    n_times = max(interior_temperatures.shape[-1] if interior_temperatures.ndim else 1,
+                  exterior_temperatures.shape[-1] if exterior_temperatures.ndim else 1)
+    try:
+        interior_temperatures = np.broadcast_to(interior_temperatures.reshape(
+            (-1, n_times) if interior_temperatures.ndim == 2 else (1, -1)), (n_components, n_times))
+        exterior_temperatures = np.broadcast_to(exterior_temperatures.reshape(
+            (-1, n_times) if exterior_temperatures.ndim == 2 else (1, -1)), (n_components, n_times))
+    except ValueError:
+        raise ValueError("temperatures: scalar, (n_times,) or (n_components, n_times) arrays are needed") from None
+
+    # conductances [W/m²K]: between cells, interior air - first cell, last cell - exterior air
+    rsi, rse = get_surface_resistances_array(cells["heat_flow_directions"])
+    rows = np.arange(n_components)
+    last = n_cells - 1
+    links = (np.arange(n_columns - 1) < last[:, np.newaxis])
+    conductances = np.zeros((n_components, n_columns - 1))
+    conductances[links] = 1 / ((resistances[:, :-1] + resistances[:, 1:])[links] / 2)
+    interior_conductances = 1 / (rsi + resistances[:, 0] / 2)
+    exterior_conductances = 1 / (rse + resistances[rows, last] / 2)
+
+    # K: heat balance matrix (symmetric tridiagonal), K T + b = C dT/dt
+    balance_diagonal = np.zeros((n_components, n_columns))
+    balance_diagonal[:, :-1] -= conductances
+    balance_diagonal[:, 1:] -= conductances
+    balance_diagonal[:, 0] -= interior_conductances
+    balance_diagonal[rows, last] -= exterior_conductances
+    padding = np.arange(n_columns) > last[:, np.newaxis]
+
+    def get_boundary_terms(time: int) -> np.ndarray:
+        boundary_terms = np.zeros((n_components, n_columns))
+        boundary_terms[:, 0] = interior_conductances * interior_temperatures[:, time]
+        boundary_terms[rows, last] += exterior_conductances * exterior_temperatures[:, time]
+        return boundary_terms
+
+    if initial_temperatures is None:
+        # steady state: -K T = b, padding cells are 0 °C
+        steady_diagonal = np.where(padding, 1, -balance_diagonal)
+        temperatures = _solve_factored(_factor_tridiagonal(steady_diagonal, -conductances), get_boundary_terms(0))
+    else:
+        temperatures = np.array(initial_temperatures, dtype=np.float64).reshape(n_components, n_columns)
+        temperatures[padding] = 0
+
+    # (C/Δt - θK) T_n+1 = (C/Δt + (1 - θ)K) T_n + θ b_n+1 + (1 - θ) b_n, padding cells: T_n+1 = T_n
+    capacity_rates = np.where(padding, 1, capacities / (time_step * 3600))
+    factors = _factor_tridiagonal(capacity_rates - theta * balance_diagonal, -theta * conductances)
+
+    results = {name: np.empty((n_components, n_times)) for name in (
+        "interior_heat_fluxes", "exterior_heat_fluxes",
+        "interior_surface_temperatures", "exterior_surface_temperatures")}
+
+    def save_results(time: int):
+        interior_heat_fluxes = interior_conductances * (interior_temperatures[:, time] - temperatures[:, 0])
+        exterior_heat_fluxes = exterior_conductances * (temperatures[rows, last] - exterior_temperatures[:, time])
+        results["interior_heat_fluxes"][:, time] = interior_heat_fluxes
+        results["exterior_heat_fluxes"][:, time] = exterior_heat_fluxes
+        results["interior_surface_temperatures"][:, time] = interior_temperatures[:, time] - rsi * interior_heat_fluxes
+        results["exterior_surface_temperatures"][:, time] = exterior_temperatures[:, time] + rse * exterior_heat_fluxes
+
+    save_results(0)
+    boundary_terms = get_boundary_terms(0)
+    for time in range(1, n_times):
+        next_boundary_terms = get_boundary_terms(time)
+        right_hand_side = capacity_rates * temperatures + theta * next_boundary_terms
+        if theta < 1:
+            # explicit part: (1 - θ)(K T_n + b_n)
+            balance = balance_diagonal * temperatures
+            balance[:, :-1] += conductances * temperatures[:, 1:]
+            balance[:, 1:] += conductances * temperatures[:, :-1]
+            right_hand_side += (1 - theta) * (balance + boundary_terms)
+        temperatures = _solve_factored(factors, right_hand_side)
+        boundary_terms = next_boundary_terms
+        save_results(time)
+
+    results["temperatures"] = np.where(padding, np.nan, temperatures)
+    results["depths"] = cells["depths"]
+    return results
+
+
+def get_transient_response(
+        layers_list: list[list[LayerBase]],
+        heat_flow_directions: list[str] | str,
+        interior_temperatures: float | np.ndarray,
+        exterior_temperatures: float | np.ndarray,
+        time_step: float = 1,
+        cell_thickness: float = 0.01,
+        theta: float = 1,
+        ) -> dict[str, np.ndarray]:
+    """transient response of many components, see get_transient_response_arrays
+
+    Args:
+        layers_list (list[list[LayerBase]]): one ordered list of layers (interior to exterior) by component
+        heat_flow_directions (list[str] | str): "Ho", "Up" or "Do" by component
+        interior_temperatures (float | np.ndarray): interior air temperatures in [°C]
+        exterior_temperatures (float | np.ndarray): exterior air (or sol-air) temperatures in [°C]
+        time_step (float, optional): time between values in [h]. Defaults to 1 h.
+        cell_thickness (float, optional): max cell thickness in [m]. Defaults to 0.01 m.
+        theta (float, optional): 1 implicit Euler, 0.5 Crank-Nicolson. Defaults to 1.
+
+    Returns:
+        dict[str, np.ndarray]: see get_transient_response_arrays
+    """
+    return get_transient_response_arrays(
+        get_layers_arrays(layers_list, heat_flow_directions),
+        interior_temperatures=interior_temperatures,
+        exterior_temperatures=exterior_temperatures,
+        time_step=time_step,
+        cell_thickness=cell_thickness,
+        theta=theta)
@@ -1,4 +1,5 @@
 # Import gettext module
+import functools
 import gettext
 import os
 
@@ -8,7 +9,11 @@ def get_locales_abs_path():
     return  os.path.join(absolute_path, "locales") #full_path
 
 
+@functools.lru_cache(maxsize=None)
 def get_translator(language="en"):
+    """gettext function of a language, loaded once by language.
+        builtins._ is not installed: no process-wide side effect, safe in threads
+    """
 
     # Set the local directory
     appname = 'becalib'
@@ -16,7 +21,6 @@ def get_translator(language="en"):
 
     language_i18n = gettext.translation(appname, get_locales_abs_path(), fallback=True, languages=[language])
 
-    language_i18n.install()
     _=language_i18n.gettext
 
     return _
\ No newline at end of file
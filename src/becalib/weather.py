@@ -0,0 +1,289 @@
+"""EnergyPlus EPW weather files, sol-air temperatures and design-day periodic profiles
+
+Example:
+    weather = read_epw("ITA_Torino.epw")
+    sol_air = get_sol_air_temperatures(weather, azimuths=[180, 270], tilts=[90, 90], solar_absorptances=0.6)
+    profile = get_design_day_profiles(weather, sol_air)
+    wall.get_component_sinusoidal_wave_chart(max_temp=profile["max_temp"][0], min_temp=profile["min_temp"][0])
+"""
+import csv
+import numpy as np
+import pandas as pd
+
+
+EPW_HEADER_LINES = 8
+
+# column index: (name, missing value code or None)
+EPW_COLUMNS = {
+    0: ("year", None),
+    1: ("month", None),
+    2: ("day", None),
+    3: ("hour", None),
+    6: ("dry_bulb_temperature", 99.9),
+    7: ("dew_point_temperature", 99.9),
+    8: ("relative_humidity", 999),
+    9: ("atmospheric_pressure", 999999),
+    12: ("horizontal_infrared_radiation", 9999),
+    13: ("global_horizontal_radiation", 9999),
+    14: ("direct_normal_radiation", 9999),
+    15: ("diffuse_horizontal_radiation", 9999),
+    20: ("wind_direction", 999),
+    21: ("wind_speed", 999),
+}
+
+# ISO 13790: extra thermal radiation to the sky, h_r = 5 ε and Δθ_er = 11 K
+SKY_TEMPERATURE_DIFFERENCE = 11
+
+
+class EpwWeather():
+    def __init__(self,
+        location: dict,
+        data: dict[str, np.ndarray],
+        ):
+        """hourly weather data of an EPW file, one float64 array by column (see EPW_COLUMNS),
+            missing values are NaN
+
+        Args:
+            location (dict): "city", "state", "country", "source", "wmo", "latitude" [°, north > 0],
+                "longitude" [°, east > 0], "time_zone" [h from GMT], "elevation" [m]
+            data (dict[str, np.ndarray]): hourly values
+        """
+        self.location = location
+        self.city = location.get("city", "")
+        self.latitude = float(location["latitude"])
+        self.longitude = float(location["longitude"])
+        self.time_zone = float(location["time_zone"])
+        self.elevation = float(location.get("elevation", 0))
+
+        for name, values in data.items():
+            setattr(self, name, values)
+
+        self.n_hours = len(data["hour"])
+
+    @property
+    def day_of_year(self) -> np.ndarray:
+        "day of year 1-365 of each hour (leap day counted as 28 February)"
+        cumulative_days = np.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+        month = self.month.astype(np.int64)
+        day = np.where((month == 2) & (self.day > 28), 28, self.day).astype(np.int64)
+        return cumulative_days[month - 1] + day
+
+
+def _parse_location(line: str) -> dict:
+    fields = next(csv.reader([line]))
+    if not fields or fields[0].strip().upper() != "LOCATION":
+        raise ValueError("invalid EPW file: first line is not LOCATION")
+    names = ("city", "state", "country", "source", "wmo", "latitude", "longitude", "time_zone", "elevation")
+    location = dict(zip(names, (field.strip() for field in fields[1:])))
+    for name in ("latitude", "longitude", "time_zone", "elevation"):
+        location[name] = float(location.get(name) or 0)
+    return location
+
+
+def read_epw(path: str) -> EpwWeather:
+    """read an EnergyPlus EPW weather file, columnar parser (pandas C engine)
+
+    Args:
+        path (str): .epw file
+
+    Raises:
+        ValueError: invalid EPW file
+
+    Returns:
+        EpwWeather: hourly weather data
+    """
+    with open(path, encoding="utf-8", errors="replace") as file:
+        location = _parse_location(file.readline())
+
+    columns = sorted(EPW_COLUMNS)
+    try:
+        frame = pd.read_csv(path, skiprows=EPW_HEADER_LINES, header=None, usecols=columns,
+                            engine="c", encoding="utf-8", encoding_errors="replace")
+    except (pd.errors.ParserError, ValueError) as error:
+        raise ValueError(f"invalid EPW file: {error}") from None
+
+    data = {}
+    for column in columns:
+        name, missing = EPW_COLUMNS[column]
+        values = frame[column].to_numpy(dtype=np.float64)
+        if missing is not None:
+            values = np.where(values >= missing, np.nan, values)
+        data[name] = values
+
+    return EpwWeather(location, data)
+
+
+def get_sun_vectors(weather: EpwWeather) -> np.ndarray:
+    """unit vectors to the sun (east, north, up) at the middle of each hour
+
+    Args:
+        weather (EpwWeather):
+
+    Returns:
+        np.ndarray: (n_hours, 3), up < 0 at night
+    """
+    day_of_year = weather.day_of_year
+    b = np.radians((day_of_year - 1) * 360 / 365)
+
+    # declination (Cooper) and equation of time in [min] (Spencer)
+    declination = np.radians(23.45 * np.sin(np.radians(360 * (284 + day_of_year) / 365)))
+    equation_of_time = 229.2 * (0.000075 + 0.001868 * np.cos(b) - 0.032077 * np.sin(b)
+                                - 0.014615 * np.cos(2 * b) - 0.04089 * np.sin(2 * b))
+
+    # EPW hour h is the hour ending at h:00, local standard time
+    solar_time = (weather.hour - 0.5) + (4 * (weather.longitude - 15 * weather.time_zone) + equation_of_time) / 60
+    hour_angle = np.radians(15 * (solar_time - 12))
+    latitude = np.radians(weather.latitude)
+
+    return np.stack([
+        -np.cos(declination) * np.sin(hour_angle),
+        np.sin(declination) * np.cos(latitude) - np.cos(declination) * np.sin(latitude) * np.cos(hour_angle),
+        np.sin(declination) * np.sin(latitude) + np.cos(declination) * np.cos(latitude) * np.cos(hour_angle),
+        ], axis=-1)
+
+
+def _get_surface_normals(azimuths, tilts) -> np.ndarray:
+    azimuths = np.radians(np.atleast_1d(np.asarray(azimuths, dtype=np.float64)))
+    tilts = np.radians(np.atleast_1d(np.asarray(tilts, dtype=np.float64)))
+    azimuths, tilts = np.broadcast_arrays(azimuths, tilts)
+    return np.stack([np.sin(tilts) * np.sin(azimuths), np.sin(tilts) * np.cos(azimuths), np.cos(tilts)], axis=-1)
+
+
+def get_incident_solar_radiations(
+        weather: EpwWeather,
+        azimuths: float | np.ndarray,
+        tilts: float | np.ndarray,
+        ground_reflectance: float = 0.2,
+        ) -> np.ndarray:
+    """hourly total solar irradiance on surfaces, isotropic sky (Liu-Jordan)
+
+    Args:
+        weather (EpwWeather):
+        azimuths (float | np.ndarray): surface orientations in [°] clockwise from north (180 = south)
+        tilts (float | np.ndarray): in [°], 0 = horizontal roof, 90 = wall
+        ground_reflectance (float, optional): albedo [-]. Defaults to 0.2.
+
+    Returns:
+        np.ndarray: (n_surfaces, n_hours) irradiance in [W/m²]
+    """
+    normals = _get_surface_normals(azimuths, tilts)
+    sun = get_sun_vectors(weather)
+
+    # cos of incidence angles (n_surfaces, n_hours), direct radiation only with sun above horizon
+    cos_incidence = np.matmul(normals, sun.T)
+    cos_incidence = np.where(sun[:, 2] > 0, np.maximum(cos_incidence, 0), 0)
+    cos_tilts = normals[:, 2:3]
+
+    return (weather.direct_normal_radiation * cos_incidence
+            + weather.diffuse_horizontal_radiation * (1 + cos_tilts) / 2
+            + weather.global_horizontal_radiation * ground_reflectance * (1 - cos_tilts) / 2)
+
+
+def get_sol_air_temperatures(
+        weather: EpwWeather,
+        azimuths: float | np.ndarray,
+        tilts: float | np.ndarray,
+        solar_absorptances: float | np.ndarray = 0.6,
+        emissivities: float | np.ndarray = 0.9,
+        surface_thermal_resistance_ext: float = 0.04,
+        ground_reflectance: float = 0.2,
+        ) -> np.ndarray:
+    """hourly sol-air temperatures of surfaces, vectorized over hours and surfaces
+        θ_sa = θ_e + R_se (α I - F_r h_r Δθ_er) with h_r = 5 ε, Δθ_er = 11 K (ISO 13790)
+        and F_r the sky view factor (1 + cos tilt)/2
+
+    Args:
+        weather (EpwWeather):
+        azimuths (float | np.ndarray): surface orientations in [°] clockwise from north (180 = south)
+        tilts (float | np.ndarray): in [°], 0 = horizontal roof, 90 = wall
+        solar_absorptances (float | np.ndarray, optional): α [-]. Defaults to 0.6.
+        emissivities (float | np.ndarray, optional): ε long wave [-]. Defaults to 0.9.
+        surface_thermal_resistance_ext (float, optional): R_se in [m²K/W]. Defaults to 0.04.
+        ground_reflectance (float, optional): albedo [-]. Defaults to 0.2.
+
+    Returns:
+        np.ndarray: (n_surfaces, n_hours) temperatures in [°C]
+    """
+    irradiances = get_incident_solar_radiations(weather, azimuths, tilts, ground_reflectance)
+    n_surfaces = irradiances.shape[0]
+
+    solar_absorptances = np.broadcast_to(np.asarray(solar_absorptances, dtype=np.float64), (n_surfaces,))
+    emissivities = np.broadcast_to(np.asarray(emissivities, dtype=np.float64), (n_surfaces,))
+    sky_view_factors = (1 + _get_surface_normals(azimuths, tilts)[:, 2]) / 2
+    sky_radiation = sky_view_factors * 5 * emissivities * SKY_TEMPERATURE_DIFFERENCE
+
+    return weather.dry_bulb_temperature + surface_thermal_resistance_ext * (
+        solar_absorptances[:, np.newaxis] * irradiances - sky_radiation[:, np.newaxis])
+
+
+def get_design_day_index(weather: EpwWeather, month: int | None = None) -> int:
+    """day with the highest daily mean dry bulb temperature
+
+    Args:
+        weather (EpwWeather): 24 values by day
+        month (int | None, optional): 1-12, search in this month. Defaults to None = all year.
+
+    Returns:
+        int: day index, hours day_index * 24 to day_index * 24 + 24
+    """
+    daily_means = np.nanmean(weather.dry_bulb_temperature.reshape(-1, 24), axis=1)
+    if month is not None:
+        daily_means = np.where(weather.month.reshape(-1, 24)[:, 0] == month, daily_means, -np.inf)
+    return int(np.argmax(daily_means))
+
+
+def get_periodic_profiles(hourly_values: np.ndarray, time_period: float = 24) -> dict:
+    """mean and first harmonic of periodic hourly profiles, input of the periodic
+        (ISO 13786) analysis: θ(t) = mean + amplitude cos(2π (t - time_of_max) / T)
+
+    Args:
+        hourly_values (np.ndarray): (..., time_period) values, value k at time k + 1 [h] (EPW hours)
+        time_period (float, optional): in [h]. Defaults to 24 h.
+
+    Returns:
+        dict: "mean", "amplitude", "time_of_max" [h], "max_temp" and "min_temp"
+            (mean ± amplitude, see Component.get_component_sinusoidal_wave_chart), one value by profile
+    """
+    hourly_values = np.asarray(hourly_values, dtype=np.float64)
+    n_values = hourly_values.shape[-1]
+    times = np.arange(1, n_values + 1) * time_period / n_values
+
+    mean = hourly_values.mean(axis=-1)
+    harmonic = 2 / n_values * np.sum(hourly_values * np.exp(-2j * np.pi * times / time_period), axis=-1)
+    amplitude = np.abs(harmonic)
+    time_of_max = np.mod(-np.angle(harmonic) * time_period / (2 * np.pi), time_period)
+
+    return {
+        "mean": mean,
+        "amplitude": amplitude,
+        "time_of_max": time_of_max,
+        "max_temp": mean + amplitude,
+        "min_temp": mean - amplitude,
+    }
+
+
+def get_design_day_profiles(
+        weather: EpwWeather,
+        hourly_values: np.ndarray | None = None,
+        month: int | None = None,
+        ) -> dict:
+    """periodic profiles of the design day (see get_design_day_index and get_periodic_profiles)
+
+    Args:
+        weather (EpwWeather):
+        hourly_values (np.ndarray | None, optional): (..., n_hours) values, example sol-air temperatures.
+            Defaults to None = dry bulb temperature.
+        month (int | None, optional): 1-12, design day of this month. Defaults to None = all year.
+
+    Returns:
+        dict: see get_periodic_profiles, plus "day_index" and "hourly" (..., 24) design-day values
+    """
+    if hourly_values is None:
+        hourly_values = weather.dry_bulb_temperature
+    day_index = get_design_day_index(weather, month)
+    hourly = np.asarray(hourly_values)[..., day_index * 24:day_index * 24 + 24]
+
+    profiles = get_periodic_profiles(hourly, time_period=24)
+    profiles["day_index"] = day_index
+    profiles["hourly"] = hourly
+    return profiles
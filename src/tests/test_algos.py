@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from becalib import MaterialLayer, AirLayer, Component
+from becalib.algos import (
+    get_periodic_penetration_depth_list,
+    get_xi_list,
+    get_heat_transfer_matrix_layer_list,
+    get_threshold_values_italian_dm_26_06_2009,
+    get_threshold_codes_italian_dm_26_06_2009,
+    get_threshold_labels_italian_dm_26_06_2009,
+)
+
+
+def get_reference_score(time_shift, decrement_factor):
+    """scalar rules of DM 26/06/2009"""
+    if time_shift >12 and decrement_factor<0.15:
+        return "Excellent 5/5"
+    elif (10<time_shift <=12) and (0.15 <= decrement_factor<0.3):
+        return "Good 4/5"
+    elif (8<time_shift <=10) and (0.3 <= decrement_factor<0.4):
+        return "Medium 3/5"
+    elif (6<time_shift <=8) and (0.4 <= decrement_factor<0.6):
+        return "Sufficient 2/5"
+    elif time_shift <=6 and (0.6 <= decrement_factor):
+        return "Poor 1/5"
+    else:
+        return "Impossible score"
+
+
+class TestThresholdValues(unittest.TestCase):
+
+    def test_codes_same_as_scalar_rules(self):
+        """grid including all boundaries of time shift and decrement factor
+        """
+        time_shifts = np.array([0, 5.9, 6, 6.1, 7, 8, 8.1, 9, 10, 10.1, 11, 12, 12.1, 20, np.nan])
+        decrement_factors = np.array([0, 0.1, 0.15, 0.2, 0.3, 0.35, 0.4, 0.5, 0.6, 0.9, np.nan])
+        ts, df = np.meshgrid(time_shifts, decrement_factors)
+
+        labels = get_threshold_labels_italian_dm_26_06_2009(
+            get_threshold_codes_italian_dm_26_06_2009(ts, df))
+
+        for t, d, label in zip(ts.ravel(), df.ravel(), labels.ravel()):
+            self.assertEqual(get_reference_score(t, d), label, (t, d))
+            self.assertEqual(get_reference_score(t, d), get_threshold_values_italian_dm_26_06_2009(t, d))
+
+    def test_codes(self):
+        codes = get_threshold_codes_italian_dm_26_06_2009([13, 11, 9, 7, 5, 13], [0.1, 0.2, 0.35, 0.5, 0.7, 0.9])
+        self.assertEqual([5, 4, 3, 2, 1, 0], codes.tolist())
+        self.assertEqual(np.int8, codes.dtype)
+
+    def test_labels_fr(self):
+        labels = get_threshold_labels_italian_dm_26_06_2009(np.array([5, 5, 0]), language="fr")
+        self.assertEqual(labels[0], get_threshold_values_italian_dm_26_06_2009(13, 0.1, language="fr"))
+        self.assertEqual(labels[2], get_threshold_values_italian_dm_26_06_2009(13, 0.9, language="fr"))
+
+
+class TestLayerArrays(unittest.TestCase):
+
+    def test_float_arrays_with_air_mask(self):
+        """air layers are NaN in float64 arrays, no object arrays
+        """
+        concrete = MaterialLayer(name="concrete", thickness=0.1, thermal_conductivity=1.8,
+                                 gross_density=2400, specific_heat_capacity=1000)
+        air = AirLayer(name="air", thickness=0.05)
+        layers = [concrete, air, concrete]
+
+        depths = get_periodic_penetration_depth_list(layers, time_period=24)
+        xi = get_xi_list(layers, depths)
+        self.assertEqual(np.float64, depths.dtype)
+        self.assertEqual(np.float64, xi.dtype)
+        self.assertEqual([False, True, False], np.isnan(xi).tolist())
+        self.assertAlmostEqual(np.sqrt(1.8 * 86400 / (np.pi * 2400 * 1000)), depths[0])
+
+        resistances = np.array([0.13] + [layer.thermal_resistance for layer in layers] + [0.04])
+        matrices = get_heat_transfer_matrix_layer_list(resistances, xi, depths,
+                                                      [layer.thermal_conductivity for layer in layers])
+        self.assertEqual((3, 2, 2), matrices.shape)
+        self.assertEqual(-air.thermal_resistance, matrices[1, 0, 1])
+        # det Z = 1 for all layers
+        self.assertTrue(np.allclose(np.linalg.det(matrices), 1))
+
+        component = Component(name="wall", layers=layers, heat_flow_direction="Ho")
+        self.assertEqual(np.float64, component.gross_densities.dtype)
+        self.assertEqual(np.float64, component.specific_heat_capacities.dtype)
+        self.assertEqual([False, True, False], component.is_air.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
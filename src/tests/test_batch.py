@@ -0,0 +1,218 @@
+import unittest
+import math
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer
+from becalib import Component
+from becalib.batch import (
+    evaluate_batch,
+    evaluate_batch_threaded,
+    evaluate_layers_arrays,
+    get_layers_arrays,
+    LayerMatrixCache,
+    LAYER_MATRIX_CACHE,
+    BATCH_OUTPUTS,
+    get_precision_errors,
+)
+
+
+def get_test_layers():
+    concrete = MaterialLayer(
+        name="concrete",
+        thickness=0.1, # m
+        thermal_conductivity=1.8, # W/mK
+        specific_heat_capacity=1000, # c J/kgK
+        gross_density=2400, # ro kg/mc
+    )
+    air = AirLayer(
+        name="air",
+        thickness=0.1, # m
+        heat_flow_direction="Do"
+    )
+    brick = MaterialLayer(
+        name="brick",
+        thickness=0.12, # m
+        thermal_conductivity=0.8, # W/mK
+        specific_heat_capacity=840, # c J/kgK
+        gross_density=1800, # ro kg/mc
+    )
+    iso = MaterialLayer(
+        name="iso",
+        thickness=0.05, # m
+        thermal_conductivity=0.035, # W/mK
+        specific_heat_capacity=840, # c J/kgK
+        gross_density=175, # ro kg/mc
+    )
+    return concrete, air, brick, iso
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_batch_same_values_as_component(self):
+        """check batch values against Component values
+        """
+        concrete, air, brick, iso = get_test_layers()
+
+        layers_list = [[concrete, air, brick, iso],
+                       [brick, iso],
+                       [iso, air, concrete, brick, iso]]
+        directions = ["Ho", "Up", "Do"]
+        time_periods = [24, 24, 12]
+
+        results = evaluate_batch(layers_list, directions, time_periods)
+
+        for i in range(len(layers_list)):
+            component = Component(name="test",
+                                  layers=list(layers_list[i]),
+                                  heat_flow_direction=directions[i],
+                                  time_period=time_periods[i])
+            for name in BATCH_OUTPUTS:
+                self.assertTrue(math.isclose(getattr(component, name), results[name][i], rel_tol=1e-9), name)
+
+    def test_batch_does_not_modify_layers(self):
+        """air layers keep their own heat flow direction
+        """
+        concrete, air, brick, iso = get_test_layers()
+        evaluate_batch([[concrete, air, brick]], "Ho")
+        self.assertEqual("Do", air.heat_flow_direction)
+
+    def test_layers_arrays_padding(self):
+        concrete, air, brick, iso = get_test_layers()
+        arrays = get_layers_arrays([[concrete], [concrete, air, brick]], ["Ho", "Up"])
+
+        self.assertEqual((2, 3), arrays["thicknesses"].shape)
+        self.assertTrue(arrays["is_air"][0, 1:].all())
+        self.assertEqual(0, arrays["thicknesses"][0, 2])
+
+    def test_invalid_direction(self):
+        concrete, air, brick, iso = get_test_layers()
+        with self.assertRaises(ValueError):
+            evaluate_batch([[concrete]], "Xx")
+
+    def test_inhomogeneous_batch(self):
+        """components with and without inhomogeneous layers in the same batch
+        """
+        concrete, air, brick, iso = get_test_layers()
+        wood = MaterialLayer(name="wood", thickness=0.05, thermal_conductivity=0.13,
+                             gross_density=450, specific_heat_capacity=1600)
+        air_5cm = AirLayer(name="air", thickness=0.05)
+        frame = InhomogeneousLayer(name="frame", thickness=0.05,
+                                   sections=[(0.8, iso), (0.1, wood), (0.1, air_5cm)])
+
+        layers_list = [[concrete, frame, brick], [concrete, brick], [frame, concrete, frame]]
+        results = evaluate_batch(layers_list, ["Ho", "Up", "Do"])
+
+        for i, direction in enumerate(["Ho", "Up", "Do"]):
+            component = Component(name="test", layers=list(layers_list[i]), heat_flow_direction=direction)
+            for name in BATCH_OUTPUTS:
+                self.assertTrue(math.isclose(getattr(component, name), results[name][i], rel_tol=1e-9), name)
+
+        self.assertTrue(results["thermal_resistance_upper_limit"][0] > results["thermal_resistance_lower_limit"][0])
+        self.assertEqual(results["thermal_resistance_upper_limit"][1], results["thermal_resistance_lower_limit"][1])
+
+    def test_empty_batch(self):
+        results = evaluate_batch([])
+        self.assertEqual(0, results["time_shift"].size)
+
+    def test_single_precision(self):
+        concrete, air, brick, iso = get_test_layers()
+        wood = MaterialLayer(name="wood", thickness=0.05, thermal_conductivity=0.13,
+                             gross_density=450, specific_heat_capacity=1600)
+        frame = InhomogeneousLayer(name="frame", thickness=0.05, sections=[(0.8, iso), (0.2, wood)])
+        layers_list = [[concrete, air, brick, iso], [brick, iso], [concrete, frame, brick]] * 4
+        layers_arrays = get_layers_arrays(layers_list, ["Ho", "Up", "Do"] * 4)
+
+        double = evaluate_layers_arrays(layers_arrays)
+        single = evaluate_layers_arrays(layers_arrays, precision="single")
+        self.assertEqual(np.float32, single["time_shift"].dtype)
+        self.assertEqual(np.int8, single["threshold_code_italian_dm_26_06_2009"].dtype)
+        for name in BATCH_OUTPUTS:
+            self.assertTrue(np.allclose(double[name], single[name], rtol=1e-4, atol=1e-4), name)
+
+        errors = get_precision_errors(layers_arrays, single, sample_size=5)
+        self.assertEqual(set(BATCH_OUTPUTS), set(errors))
+        self.assertLess(errors["decrement_factor"]["max_relative_error"], 1e-4)
+        self.assertGreater(errors["time_constant"]["max_absolute_error"], 0)
+        # no error for double precision results
+        errors = get_precision_errors(layers_arrays, double)
+        self.assertEqual(0, max(error["max_absolute_error"] for error in errors.values()))
+
+        # errors reported by the batch entry points in single precision
+        self.assertIsNone(double.precision_errors)
+        self.assertEqual(set(BATCH_OUTPUTS), set(single.precision_errors))
+        self.assertLess(single.precision_errors["decrement_factor"]["max_relative_error"], 1e-4)
+        batch = evaluate_batch(layers_list, ["Ho", "Up", "Do"] * 4, outputs=["time_shift"], precision="single")
+        self.assertEqual({"time_shift"}, set(batch.precision_errors))
+        threaded = evaluate_batch_threaded(layers_list, ["Ho", "Up", "Do"] * 4, outputs=["time_shift"],
+                                           precision="single", chunk_size=5)
+        self.assertEqual(batch.precision_errors, threaded.precision_errors)
+        self.assertIsNone(evaluate_batch(layers_list, precision="single", error_sample_size=0).precision_errors)
+
+        with self.assertRaises(ValueError):
+            evaluate_batch([[concrete]], precision="half")
+
+
+class TestLayerMatrixCache(unittest.TestCase):
+
+    def test_same_values_without_cache(self):
+        concrete, air, brick, iso = get_test_layers()
+        layers_list = [[concrete, air, brick, iso], [brick, iso], [iso, air, concrete, brick, iso]] * 30
+        layers_arrays = get_layers_arrays(layers_list, ["Ho", "Up", "Do"] * 30)
+
+        cache = LayerMatrixCache()
+        expected = evaluate_layers_arrays(layers_arrays, matrix_cache=None)
+        for _ in range(2):
+            results = evaluate_layers_arrays(layers_arrays, matrix_cache=cache)
+            for name in BATCH_OUTPUTS:
+                self.assertTrue(np.array_equal(expected[name], results[name]), name)
+
+        # concrete, brick, iso, air layers "Ho" and "Do" and the padding
+        stats = cache.get_stats()
+        self.assertEqual(6, stats["size"])
+        self.assertEqual(6, stats["misses"])
+        self.assertEqual(2 * layers_arrays["thicknesses"].size - 6, stats["hits"])
+
+    def test_time_period_in_key(self):
+        concrete, air, brick, iso = get_test_layers()
+        cache = LayerMatrixCache()
+        layers_arrays = get_layers_arrays([[concrete, brick]] * 2)
+        results = evaluate_layers_arrays(layers_arrays, time_period=[24, 12], matrix_cache=cache)
+        self.assertNotEqual(results["time_shift"][0], results["time_shift"][1])
+        self.assertEqual(4, cache.get_stats()["size"])
+
+    def test_bounded_size(self):
+        concrete, air, brick, iso = get_test_layers()
+        cache = LayerMatrixCache(max_size=2)
+        layers_arrays = get_layers_arrays([[concrete, brick], [iso, brick], [concrete, iso]])
+
+        expected = evaluate_layers_arrays(layers_arrays, matrix_cache=None)
+        # 3 distinct layers > max_size: computed without cache
+        results = evaluate_layers_arrays(layers_arrays, matrix_cache=cache)
+        self.assertTrue(np.array_equal(expected["time_shift"], results["time_shift"]))
+        self.assertEqual(0, cache.get_stats()["size"])
+
+        for layers in ([concrete], [brick], [iso]):
+            evaluate_layers_arrays(get_layers_arrays([layers]), matrix_cache=cache)
+        self.assertEqual(2, cache.get_stats()["size"])
+
+        cache.clear()
+        self.assertEqual({"size": 0, "max_size": 2, "hits": 0, "misses": 0, "hit_rate": 0.0}, cache.get_stats())
+
+    def test_cached_matrices_own_their_memory(self):
+        # no view of the per-call buffer: max_size bounds memory
+        concrete, air, brick, iso = get_test_layers()
+        cache = LayerMatrixCache()
+        evaluate_layers_arrays(get_layers_arrays([[concrete, air, brick, iso]], "Ho"), matrix_cache=cache)
+        for matrix in cache._matrices.values():
+            self.assertIsNone(matrix.base)
+            self.assertEqual((2, 2), matrix.shape)
+
+    def test_component_uses_shared_cache(self):
+        concrete, air, brick, iso = get_test_layers()
+        Component(name="test", layers=[concrete, brick], heat_flow_direction="Ho")
+        hits = LAYER_MATRIX_CACHE.get_stats()["hits"]
+        Component(name="test", layers=[brick, concrete], heat_flow_direction="Ho")
+        self.assertEqual(hits + 2, LAYER_MATRIX_CACHE.get_stats()["hits"])
+
+
+if __name__ == '__main__':
+    unittest.main()
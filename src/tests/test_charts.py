@@ -2,7 +2,7 @@ import unittest
 import matplotlib.pyplot as plt
 import json
 import numpy as np
-from becalib.charts import plot_sinusoidal_wave,plot_component_layers
+from becalib.charts import plot_sinusoidal_wave,plot_component_layers,plot_depth_profiles
 import math
 
 
@@ -37,6 +37,21 @@ class Testplot(unittest.TestCase):
         # plt_lay.show()
         self.assertTrue(bool(plt_lay))
 
+    def test_depth_profiles(self):
+
+        plt_depth= plot_depth_profiles(
+            depths=np.linspace(0, 0.3, 31),
+            temperature_amplitudes=np.linspace(0.2, 3.5, 31),
+            temperature_time_shifts=np.linspace(9, 0.5, 31),
+            thicknesses=[0.1, 0.2],
+            language="fr"
+        )
+
+        self.assertTrue(bool(plt_depth))
+        ax = plt.gcf().axes[0]
+        self.assertEqual("Onde de température dans le composant", ax.get_title())
+        self.assertEqual("Distance de la surface intérieure [m]", ax.get_xlabel())
+
 
 
 
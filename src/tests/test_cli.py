@@ -0,0 +1,152 @@
+import unittest
+import csv
+import json
+import math
+import os
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from becalib.cli import main
+from becalib.definitions import read_definitions
+
+
+WALL = {
+    "name": "Wall Test",
+    "heat_flow_direction": "Ho",
+    "time_period": 24,
+    "layers": [
+        {"name": "concrete", "thickness": 0.3, "thermal_conductivity": 1.8,
+         "gross_density": 2400, "specific_heat_capacity": 1000},
+        {"name": "insulation_a", "thickness": 0.1, "thermal_conductivity": 0.034,
+         "gross_density": 70, "specific_heat_capacity": 700},
+        {"name": "brick_a", "thickness": 0.08, "thermal_conductivity": 0.35,
+         "gross_density": 750, "specific_heat_capacity": 840},
+        {"name": "brick_b", "thickness": 0.12, "thermal_conductivity": 0.8,
+         "gross_density": 1800, "specific_heat_capacity": 840},
+        {"name": "plaster", "thickness": 0.02, "thermal_conductivity": 0.9,
+         "gross_density": 1400, "specific_heat_capacity": 840},
+    ],
+}
+
+CSV_WALLS = """component,heat_flow_direction,time_period,name,thickness,thermal_conductivity,gross_density,specific_heat_capacity,is_air
+Wall,Ho,24,concrete,0.1,1.8,2400,1000,
+Wall,Ho,24,air,0.1,,,,true
+Wall,Ho,24,brick_a,0.08,0.35,750,840,
+Wall,Ho,24,brick_b,0.12,0.8,1800,840,
+Wall,Ho,24,iso,0.05,0.035,175,840,
+Wall,Ho,24,plaster,0.02,0.9,1400,840,
+Roof,Up,24,concrete,0.2,1.8,2400,1000,false
+"""
+
+TOML_WALLS = """
+[[components]]
+name = "Wall Test"
+heat_flow_direction = "Ho"
+
+[[components.layers]]
+name = "concrete"
+thickness = 0.3
+thermal_conductivity = 1.8
+gross_density = 2400
+specific_heat_capacity = 1000
+"""
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, file_name: str, content: str) -> str:
+        path = os.path.join(self.dir, file_name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_json_to_csv_with_jobs(self):
+        walls = [dict(WALL, name=f"wall {i}") for i in range(10)]
+        in_path = self._write("walls.json", json.dumps({"components": walls}))
+        out_path = os.path.join(self.dir, "results.csv")
+
+        code = main([in_path, "-o", out_path, "--jobs", "2", "--chunk-size", "3", "-q"])
+        self.assertEqual(0, code)
+
+        with open(out_path, encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+        self.assertEqual(10, len(rows))
+        self.assertEqual("wall 9", rows[9]["name"])
+        self.assertTrue(math.isclose(17.854, float(rows[9]["time_shift"]), rel_tol=0.001))
+
+    def test_csv_to_jsonl_metrics(self):
+        in_path = self._write("walls.csv", CSV_WALLS)
+        out_path = os.path.join(self.dir, "results.jsonl")
+
+        code = main([in_path, "-o", out_path, "--metrics", "time_shift,thermal_resistance_component", "-q"])
+        self.assertEqual(0, code)
+
+        with open(out_path, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+
+        self.assertEqual(2, len(rows))
+        self.assertEqual({"name", "heat_flow_direction", "time_period", "time_shift", "thermal_resistance_component"},
+                         set(rows[0]))
+        self.assertTrue(math.isclose(13.376, rows[0]["time_shift"], rel_tol=0.01))
+        self.assertEqual("Up", rows[1]["heat_flow_direction"])
+
+    def test_toml_definitions(self):
+        path = self._write("walls.toml", TOML_WALLS)
+        definitions = read_definitions(path)
+        self.assertEqual("Wall Test", definitions[0]["name"])
+        self.assertEqual(0.3, definitions[0]["layers"][0]["thickness"])
+
+    def test_invalid_definition_reported(self):
+        invalid = {"name": "invalid", "layers": [{"name": "x", "thickness": 0.1}]}
+        not_object = {"name": "not object", "layers": [1]}
+        in_path = self._write("walls.jsonl", "".join(
+            json.dumps(definition) + "\n" for definition in (WALL, invalid, not_object)))
+        out_path = os.path.join(self.dir, "results.jsonl")
+
+        for jobs in ("1", "2"):
+            with redirect_stderr(StringIO()):
+                code = main([in_path, "-o", out_path, "--jobs", jobs, "-q"])
+            self.assertEqual(1, code)
+
+            with open(out_path, encoding="utf-8") as file:
+                rows = [json.loads(line) for line in file]
+            self.assertIsNone(rows[1]["time_shift"])
+            self.assertIsNone(rows[2]["time_shift"])
+            self.assertIsNotNone(rows[0]["time_shift"])
+
+    def test_report_and_charts(self):
+        in_path = self._write("walls.json", json.dumps(WALL))
+        charts_dir = os.path.join(self.dir, "charts")
+        report_path = os.path.join(self.dir, "report.txt")
+
+        code = main([in_path, "-o", os.path.join(self.dir, "out.csv"),
+                     "--charts", charts_dir, "--report", report_path, "-q"])
+        self.assertEqual(0, code)
+        self.assertEqual(2, len(os.listdir(charts_dir)))
+
+        with open(report_path, encoding="utf-8") as file:
+            self.assertIn("Wall Test", file.read())
+
+    def test_invalid_output_paths(self):
+        in_path = self._write("walls.json", json.dumps(WALL))
+        missing_dir = os.path.join(self.dir, "missing")
+        for options in (["-o", os.path.join(missing_dir, "out.csv")],
+                        ["-o", os.path.join(self.dir, "out.csv"), "--report", os.path.join(missing_dir, "r.txt")],
+                        ["-o", self.dir]):
+            stderr = StringIO()
+            with redirect_stderr(stderr):
+                code = main([in_path, *options, "-q"])
+            self.assertEqual(1, code)
+            self.assertTrue(stderr.getvalue().startswith("error: "), stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
 import unittest
-from becalib import MaterialLayer, AirLayer
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer
 from becalib import Component
 import math
+import numpy as np
 import pandas as pd
 
 #plt.style.use(["science", "retro", "no-latex"])
@@ -340,6 +341,110 @@ class TestSummerWallPerformance(unittest.TestCase):
         self.assertEqual("Résistance: 2.315 [m²K/W] Rsi and Rse included",out_str.splitlines()[6])
 
 
+    def test_inhomogeneous_layer(self):
+        """ISO 6946 combined method: upper and lower limits of timber frame wall
+        """
+        plasterboard = MaterialLayer(
+            name="plasterboard",
+            thickness=0.0125, # m
+            thermal_conductivity=0.25, # W/mK
+            gross_density=900, # ro kg/mc
+            specific_heat_capacity=1000, # c J/kgK
+        )
+        insulation = MaterialLayer(
+            name="insulation",
+            thickness=0.14, # m
+            thermal_conductivity=0.04, # W/mK
+            gross_density=30, # ro kg/mc
+            specific_heat_capacity=1030, # c J/kgK
+        )
+        stud = MaterialLayer(
+            name="stud",
+            thickness=0.14, # m
+            thermal_conductivity=0.13, # W/mK
+            gross_density=450, # ro kg/mc
+            specific_heat_capacity=1600, # c J/kgK
+        )
+        osb = MaterialLayer(
+            name="osb",
+            thickness=0.015, # m
+            thermal_conductivity=0.13, # W/mK
+            gross_density=600, # ro kg/mc
+            specific_heat_capacity=1700, # c J/kgK
+        )
+        frame = InhomogeneousLayer(
+            name="frame",
+            thickness=0.14,
+            sections=[(0.85, insulation), (0.15, stud)],
+        )
+
+        wall = Component(name="Timber frame",
+                         layers=[plasterboard, frame, osb],
+                         heat_flow_direction="Ho")
+
+        r_homogeneous = 0.13 + 0.04 + 0.0125/0.25 + 0.015/0.13
+        r_upper = 1 / (0.85/(r_homogeneous + 0.14/0.04) + 0.15/(r_homogeneous + 0.14/0.13))
+        r_lower = r_homogeneous + 0.14/(0.85*0.04 + 0.15*0.13)
+
+        self.assertTrue(math.isclose(r_upper, wall.thermal_resistance_upper_limit, rel_tol=1e-9))
+        self.assertTrue(math.isclose(r_lower, wall.thermal_resistance_lower_limit, rel_tol=1e-9))
+        self.assertTrue(math.isclose((r_upper + r_lower)/2, wall.thermal_resistance_component, rel_tol=1e-9))
+        self.assertTrue(math.isclose(0.0125*900 + 0.14*(0.85*30 + 0.15*450) + 0.015*600,
+                                     wall.mass_component, rel_tol=1e-9))
+
+        # one section layer gives the homogeneous values
+        one_section = InhomogeneousLayer(name="one", thickness=0.14, sections=[(1.0, insulation)])
+        wall_a = Component(name="a", layers=[plasterboard, one_section, osb], heat_flow_direction="Ho")
+        wall_b = Component(name="b", layers=[plasterboard, insulation, osb], heat_flow_direction="Ho")
+        self.assertTrue(math.isclose(wall_b.time_shift, wall_a.time_shift, rel_tol=1e-9))
+        self.assertTrue(math.isclose(wall_b.areal_heat_capacity_int, wall_a.areal_heat_capacity_int, rel_tol=1e-9))
+
+        self.assertIn("15.0 % stud", wall.get_values())
+
+    def test_inhomogeneous_layer_invalid(self):
+        insulation = MaterialLayer(name="insulation", thickness=0.14, thermal_conductivity=0.04,
+                                   gross_density=30, specific_heat_capacity=1030)
+        with self.assertRaises(ValueError):
+            InhomogeneousLayer(name="frame", thickness=0.14, sections=[(0.5, insulation)])
+        with self.assertRaises(ValueError):
+            InhomogeneousLayer(name="frame", thickness=0.10, sections=[(1.0, insulation)])
+
+
+    def test_depth_profiles(self):
+        def get_wall(concrete_thicknesses):
+            concretes = [MaterialLayer(name="concrete", thickness=thickness, thermal_conductivity=1.8,
+                                       gross_density=2400, specific_heat_capacity=1000)
+                         for thickness in concrete_thicknesses]
+            iso = MaterialLayer(name="iso", thickness=0.08, thermal_conductivity=0.035,
+                                gross_density=30, specific_heat_capacity=1030)
+            air = AirLayer(name="air", thickness=0.03)
+            return Component(name="wall", layers=concretes + [air, iso], heat_flow_direction="Ho")
+
+        wall = get_wall([0.2])
+        profiles = wall.get_depth_profiles(n_points=101)
+        self.assertEqual(101, profiles["depths"].size)
+
+        # interior surface: heat flux into the room is Y_ie with the component time shift
+        self.assertTrue(math.isclose(wall.periodic_thermal_transmittance, profiles["heat_flux_amplitudes"][0]))
+        lag = np.mod(-np.angle(-profiles["heat_fluxes"][0]) * 24 / (2 * np.pi), 24)
+        self.assertTrue(math.isclose(np.mod(wall.time_shift, 24), lag, rel_tol=1e-9))
+        self.assertTrue(np.isclose(-wall.surface_thermal_resistance_int * profiles["heat_fluxes"][0],
+                                   profiles["temperatures"][0]))
+
+        # exterior surface: exterior wave of unit amplitude behind Rse
+        self.assertTrue(np.isclose(1, profiles["temperatures"][-1]
+                                   - wall.surface_thermal_resistance_ext * profiles["heat_fluxes"][-1]))
+
+        # inside a layer: same state as a wall with that layer split in two
+        split = get_wall([0.05, 0.15]).get_depth_profiles(depths=[0.05, 0.25, 0.31])
+        inside = wall.get_depth_profiles(depths=[0.05, 0.25, 0.31])
+        self.assertTrue(np.allclose(split["temperatures"], inside["temperatures"]))
+        self.assertTrue(np.allclose(split["heat_fluxes"], inside["heat_fluxes"]))
+
+        # the wave damps from exterior to interior
+        self.assertGreater(profiles["temperature_amplitudes"][-1], profiles["temperature_amplitudes"][0])
+        self.assertTrue(bool(wall.get_depth_profiles_chart()))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from becalib import MaterialLayer, Component
+from becalib.envelope import Envelope
+
+
+def get_test_component(iso_thickness: float, heat_flow_direction: str = "Ho") -> Component:
+    concrete = MaterialLayer(name="concrete", thickness=0.2, thermal_conductivity=1.8,
+                             gross_density=2400, specific_heat_capacity=1000)
+    iso = MaterialLayer(name="iso", thickness=iso_thickness, thermal_conductivity=0.035,
+                        gross_density=30, specific_heat_capacity=1030)
+    return Component(name=f"wall {iso_thickness}", layers=[concrete, iso], heat_flow_direction=heat_flow_direction)
+
+
+class TestEnvelope(unittest.TestCase):
+
+    def setUp(self):
+        self.walls = [get_test_component(0.05), get_test_component(0.1), get_test_component(0.15)]
+        self.roof = get_test_component(0.2, "Up")
+
+    def get_expected(self, components, areas) -> dict:
+        areas = np.asarray(areas, dtype=np.float64)
+        return {
+            "area": areas.sum(),
+            "transmission_heat_transfer_coefficient":
+                sum(c.thermal_transmittance_component * a for c, a in zip(components, areas)),
+            "periodic_heat_transfer_coefficient":
+                sum(c.periodic_thermal_transmittance * a for c, a in zip(components, areas)),
+            "internal_heat_capacity": sum(c.areal_heat_capacity_int * a for c, a in zip(components, areas)),
+        }
+
+    def assertTotals(self, expected: dict, totals: dict):
+        for name, value in expected.items():
+            self.assertAlmostEqual(value, totals[name], msg=name)
+
+    def test_totals(self):
+        envelope = Envelope()
+        indexes = envelope.add_components(self.walls, [10, 20, 30], ["N", "S", "S"])
+        roof_index = envelope.add_component(self.roof, 50, "Roof")
+        self.assertEqual([0, 1, 2], list(indexes))
+        self.assertEqual(3, roof_index)
+        self.assertEqual(4, len(envelope))
+
+        components = self.walls + [self.roof]
+        totals = envelope.get_totals()
+        self.assertTotals(self.get_expected(components, [10, 20, 30, 50]), totals)
+        self.assertAlmostEqual(totals["transmission_heat_transfer_coefficient"] / 110,
+                               totals["thermal_transmittance_component"])
+
+        self.assertTotals(self.get_expected(self.walls[1:], [20, 30]), envelope.get_orientation_totals("S"))
+        dataframe = envelope.get_orientation_dataframe()
+        self.assertEqual(["N", "S", "Roof"], list(dataframe.index))
+        self.assertAlmostEqual(110, dataframe["area"].sum())
+
+    def test_incremental_updates(self):
+        envelope = Envelope()
+        envelope.add_components(self.walls, [10, 20, 30], "N")
+
+        envelope.set_area(0, 15)
+        envelope.set_component(1, self.roof)
+        envelope.set_orientation(2, "E")
+        components = [self.walls[0], self.roof, self.walls[2]]
+        self.assertTotals(self.get_expected(components, [15, 20, 30]), envelope.get_totals())
+        self.assertTotals(self.get_expected(components[:2], [15, 20]), envelope.get_orientation_totals("N"))
+        self.assertTotals(self.get_expected(components[2:], [30]), envelope.get_orientation_totals("E"))
+
+        # component changed in place
+        self.walls[0].layers[1].thickness = 0.3
+        self.walls[0].update()
+        envelope.update_component(0)
+        self.assertTotals(self.get_expected(components, [15, 20, 30]), envelope.get_totals())
+
+        # many updates, same totals as a full sum
+        for i in range(1000):
+            envelope.set_area(i % 3, 1 + i % 7)
+        totals = envelope.get_totals()
+        envelope.recompute()
+        self.assertTotals(envelope.get_totals(), totals)
+        self.assertTrue(np.array_equal([6, 4, 5], envelope.areas))
+
+    def test_invalid(self):
+        envelope = Envelope()
+        with self.assertRaises(ValueError):
+            envelope.add_component(self.walls[0], -1)
+        envelope.add_component(self.walls[0], 1)
+        with self.assertRaises(IndexError):
+            envelope.set_area(1, 1)
+        with self.assertRaises(KeyError):
+            envelope.get_orientation_totals("S")
+        self.assertTrue(np.isnan(Envelope().get_totals()["thermal_transmittance_component"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import threading
+from unittest import mock
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer, Component
+from becalib.explorer import ComponentExplorer
+
+
+def get_test_wall(n_layers: int = 15) -> Component:
+    layers = []
+    for i in range(n_layers):
+        if i == n_layers // 2:
+            layers.append(AirLayer(name="air", thickness=0.03))
+            continue
+        layers.append(MaterialLayer(name=f"layer {i}", thickness=0.02 + 0.005 * i,
+                                    thermal_conductivity=0.1 + 0.1 * i, gross_density=500 + 100 * i,
+                                    specific_heat_capacity=1000))
+    return Component(name="wall", layers=layers, heat_flow_direction="Ho")
+
+
+class TestExplorer(unittest.TestCase):
+
+    def assertSameResults(self, explorer: ComponentExplorer, component: Component):
+        for name, value in explorer.results.items():
+            self.assertTrue(np.isclose(getattr(component, name), value, rtol=1e-12), name)
+
+    def test_same_values_as_component(self):
+        wall = get_test_wall()
+        explorer = ComponentExplorer(wall, debounce=0)
+        self.assertSameResults(explorer, wall)
+
+        explorer.set_thickness(3, 0.12)
+        explorer.set_thickness(-1, 0.05)
+        explorer.set_thickness(7, 0.05) # air layer
+        component = explorer.to_component(name="new wall")
+        self.assertEqual(0.12, component.layers[3].thickness)
+        self.assertSameResults(explorer, component)
+
+        # explored component and its layers are not modified
+        self.assertEqual(0.035, wall.layers[3].thickness)
+        self.assertSameResults(ComponentExplorer(wall), wall)
+
+    def test_no_event_loop(self):
+        """no timer of the canvas and no running loop: recomputed at each input
+        """
+        explorer = ComponentExplorer(get_test_wall(), debounce=0.05)
+        self.assertIsNone(explorer._timer)
+        explorer.set_thickness(0, 0.2)
+        self.assertEqual(0.2, explorer.thicknesses[0])
+        self.assertSameResults(explorer, explorer.to_component())
+
+    def test_redraw_in_place(self):
+        explorer = ComponentExplorer(get_test_wall(), debounce=0)
+        canvas = FigureCanvasAgg(explorer.figure)
+        canvas.draw()
+        line = explorer._interior_line
+        old_values = line.get_ydata().copy()
+
+        for i in range(30):
+            explorer.set_thickness(i % 15, 0.03 + 0.001 * i)
+        # same artists, new values, cached background
+        self.assertIs(line, explorer._interior_line)
+        self.assertFalse(np.allclose(old_values, line.get_ydata()))
+        self.assertIsNotNone(explorer._background)
+
+    def test_incremental_update(self):
+        """only the changed layer matrix and the products after it are computed again
+        """
+        explorer = ComponentExplorer(get_test_wall(), debounce=0)
+        products = explorer._products.copy()
+        with mock.patch.object(explorer, "_get_matrices", wraps=explorer._get_matrices) as get_matrices, \
+                mock.patch.object(explorer, "_update_products", wraps=explorer._update_products) as update_products:
+            explorer.set_thickness(9, 0.1)
+        get_matrices.assert_called_once_with([9])
+        update_products.assert_called_once_with(9)
+        self.assertTrue(np.array_equal(products[:10], explorer._products[:10]))
+        self.assertFalse(np.array_equal(products[10:], explorer._products[10:]))
+
+    def test_invalid(self):
+        insulation = MaterialLayer(name="insulation", thickness=0.14, thermal_conductivity=0.04,
+                                   gross_density=30, specific_heat_capacity=1030)
+        stud = MaterialLayer(name="stud", thickness=0.14, thermal_conductivity=0.13,
+                             gross_density=500, specific_heat_capacity=1600)
+        frame = InhomogeneousLayer(name="frame", thickness=0.14, sections=[(0.85, insulation), (0.15, stud)])
+        with self.assertRaises(ValueError):
+            ComponentExplorer(Component(name="wall", layers=[frame], heat_flow_direction="Ho"))
+
+        explorer = ComponentExplorer(get_test_wall(), debounce=0)
+        with self.assertRaises(ValueError):
+            explorer.set_thickness(0, 0)
+        with self.assertRaises(IndexError):
+            explorer.set_thickness(15, 0.1)
+
+
+class TestExplorerEventLoop(unittest.IsolatedAsyncioTestCase):
+
+    async def test_debounce(self):
+        """notebook kernel: debounced by the running asyncio loop, no worker thread
+        """
+        explorer = ComponentExplorer(get_test_wall(), debounce=0.05)
+        results = explorer.results
+        n_threads = threading.active_count()
+        for thickness in np.linspace(0.05, 0.2, 20):
+            explorer.set_thickness(0, thickness)
+        # not computed before the end of the moves
+        self.assertIs(results, explorer.results)
+        self.assertEqual(n_threads, threading.active_count())
+
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if explorer.results is not results:
+                break
+        self.assertIsNot(results, explorer.results)
+        self.assertEqual(0.2, explorer.thicknesses[0])
+        self.assertEqual(0.2, explorer.to_component().layers[0].thickness)
+
+
+if __name__ == '__main__':
+    unittest.main()
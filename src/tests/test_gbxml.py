@@ -0,0 +1,142 @@
+import unittest
+import os
+import tempfile
+import tracemalloc
+import numpy as np
+from becalib import MaterialLayer, AirLayer, Component
+from becalib.batch import evaluate_definitions
+from becalib.definitions import iter_definitions
+from becalib.gbxml import iter_gbxml_definitions, read_gbxml_components
+
+
+SURFACE = """
+    <Surface id="su-{i}" surfaceType="{surface_type}" constructionIdRef="{construction}">
+      <PlanarGeometry><PolyLoop>
+        <CartesianPoint><Coordinate>0</Coordinate><Coordinate>0</Coordinate><Coordinate>0</Coordinate></CartesianPoint>
+        <CartesianPoint><Coordinate>10</Coordinate><Coordinate>0</Coordinate><Coordinate>0</Coordinate></CartesianPoint>
+        <CartesianPoint><Coordinate>10</Coordinate><Coordinate>0</Coordinate><Coordinate>3</Coordinate></CartesianPoint>
+      </PolyLoop></PlanarGeometry>
+    </Surface>"""
+
+TABLES = """
+  <Construction id="wall-1"><LayerId layerIdRef="plaster"/><LayerId layerIdRef="concrete"/><LayerId layerIdRef="gap"/>
+    <LayerId layerIdRef="board"/><Name>Wall A</Name></Construction>
+  <Construction id="wall-2"><LayerId layerIdRef="plaster-copy"/><LayerId layerIdRef="concrete"/><LayerId layerIdRef="gap"/>
+    <LayerId layerIdRef="board"/><Name>Wall A copy</Name></Construction>
+  <Construction id="roof"><LayerId layerIdRef="frame"/><LayerId layerIdRef="concrete"/><Name>Roof</Name></Construction>
+  <Layer id="plaster"><MaterialId materialIdRef="m-plaster"/></Layer>
+  <Layer id="plaster-copy"><MaterialId materialIdRef="m-plaster-copy"/></Layer>
+  <Layer id="concrete"><MaterialId materialIdRef="m-concrete"/></Layer>
+  <Layer id="gap"><MaterialId materialIdRef="m-air"/></Layer>
+  <Layer id="board"><MaterialId materialIdRef="m-board"/></Layer>
+  <Layer id="frame"><MaterialId materialIdRef="m-wool" percentOfLayer="90"/><MaterialId materialIdRef="m-wood" percentOfLayer="10"/></Layer>
+  <Material id="m-plaster"><Name>Plaster</Name><Thickness unit="Meters">0.02</Thickness>
+    <Conductivity unit="WPerMeterK">0.9</Conductivity><Density unit="KgPerCubicM">1400</Density>
+    <SpecificHeat unit="JPerKgK">840</SpecificHeat></Material>
+  <Material id="m-plaster-copy"><Name>Plaster 2</Name><Thickness unit="Millimeters">20</Thickness>
+    <Conductivity unit="WPerMeterK">0.9</Conductivity><Density unit="KgPerCubicM">1400</Density>
+    <SpecificHeat unit="JPerKgK">840</SpecificHeat></Material>
+  <Material id="m-concrete"><Name>Concrete</Name><Thickness unit="Meters">0.2</Thickness>
+    <Conductivity unit="WPerMeterK">1.8</Conductivity><Density unit="KgPerCubicM">2400</Density>
+    <SpecificHeat unit="JPerKgK">1000</SpecificHeat></Material>
+  <Material id="m-air"><Name>Air gap</Name><Thickness unit="Meters">0.05</Thickness>
+    <R-value unit="SquareMeterKPerW">0.18</R-value></Material>
+  <Material id="m-board"><Name>Board</Name><Thickness unit="Inches">0.5</Thickness>
+    <Conductivity unit="BtuPerHourFtF">0.1</Conductivity><Density unit="LbsPerCubicF">50</Density>
+    <SpecificHeat unit="BTUPerLbF">0.26</SpecificHeat></Material>
+  <Material id="m-wool"><Name>Wool</Name><Thickness unit="Meters">0.1</Thickness>
+    <Conductivity unit="WPerMeterK">0.035</Conductivity><Density unit="KgPerCubicM">70</Density>
+    <SpecificHeat unit="JPerKgK">700</SpecificHeat></Material>
+  <Material id="m-wood"><Name>Wood</Name><Thickness unit="Meters">0.1</Thickness>
+    <Conductivity unit="WPerMeterK">0.13</Conductivity><Density unit="KgPerCubicM">450</Density>
+    <SpecificHeat unit="JPerKgK">1600</SpecificHeat></Material>
+  <Material id="m-unused"><Name>No values</Name></Material>"""
+
+
+def write_gbxml(path: str, n_surfaces: int = 3):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('<?xml version="1.0"?>\n<gbXML xmlns="http://www.gbxml.org/schema" version="6.01">\n')
+        file.write('  <Campus id="campus">')
+        for i in range(n_surfaces):
+            surface_type, construction = (("Roof", "roof") if i % 3 == 0 else
+                                          ("ExteriorWall", "wall-1") if i % 3 == 1 else ("ExteriorWall", "wall-2"))
+            file.write(SURFACE.format(i=i, surface_type=surface_type, construction=construction))
+        file.write("\n  </Campus>")
+        file.write(TABLES)
+        file.write("\n</gbXML>\n")
+
+
+class TestGbxml(unittest.TestCase):
+
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._temporary_directory.name, "building.xml")
+        write_gbxml(self.path)
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def test_definitions(self):
+        definitions = list(iter_gbxml_definitions(self.path))
+        # wall-2 has the same values as wall-1
+        self.assertEqual([definition["construction_ids"] for definition in definitions], [["wall-1", "wall-2"], ["roof"]])
+        wall, roof = definitions
+        self.assertEqual(wall["heat_flow_direction"], "Ho")
+        self.assertEqual(roof["heat_flow_direction"], "Up")
+
+        # interior to exterior, units converted
+        self.assertEqual([layer["name"] for layer in wall["layers"]], ["Board", "Air gap", "Concrete", "Plaster"])
+        board = wall["layers"][0]
+        self.assertAlmostEqual(board["thickness"], 0.0127)
+        self.assertAlmostEqual(board["thermal_conductivity"], 0.1730735)
+        self.assertAlmostEqual(board["gross_density"], 800.92315)
+        self.assertAlmostEqual(board["specific_heat_capacity"], 1088.568)
+        self.assertEqual(wall["layers"][1], {"name": "Air gap", "thickness": 0.05, "is_air": True,
+                                             "heat_flow_direction": "Ho"})
+        self.assertEqual([section["fraction"] for section in roof["layers"][1]["sections"]], [0.9, 0.1])
+
+        # same values as Component
+        results = evaluate_definitions(definitions)
+        components = read_gbxml_components(self.path)
+        self.assertTrue(isinstance(components[0].layers[1], AirLayer))
+        self.assertTrue(isinstance(components[0].layers[2], MaterialLayer))
+        for i, component in enumerate(components):
+            self.assertAlmostEqual(results["time_shift"][i], component.time_shift)
+            self.assertAlmostEqual(results["thermal_transmittance_component"][i], component.thermal_transmittance_component)
+
+        # definition files
+        self.assertEqual(list(iter_definitions(self.path)), definitions)
+
+        not_reversed = next(iter_gbxml_definitions(self.path, exterior_first=False))
+        self.assertEqual(not_reversed["layers"][0]["name"], "Plaster")
+
+    def test_streaming_memory(self):
+        """geometry is dropped while reading: memory does not grow with the file size
+        """
+        path = os.path.join(self._temporary_directory.name, "large.xml")
+        write_gbxml(path, n_surfaces=10000)
+        self.assertTrue(os.path.getsize(path) > 5 * 10**6)
+
+        tracemalloc.start()
+        definitions = list(iter_gbxml_definitions(path))
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(len(definitions), 2)
+        self.assertTrue(peak < 10**6, peak)
+
+    def test_invalid_files(self):
+        path = os.path.join(self._temporary_directory.name, "invalid.xml")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('<gbXML><Construction id="c"><LayerId layerIdRef="l"/></Construction>'
+                       '<Layer id="l"><MaterialId materialIdRef="m-unused"/></Layer>'
+                       '<Material id="m-unused"><Name>No values</Name></Material></gbXML>')
+        with self.assertRaises(ValueError):
+            list(iter_gbxml_definitions(path))
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('<gbXML><Construction id="c"><LayerId layerIdRef="missing"/></Construction></gbXML>')
+        with self.assertRaises(ValueError):
+            list(iter_gbxml_definitions(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
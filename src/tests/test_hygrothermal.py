@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+from becalib import MaterialLayer, AirLayer
+from becalib.layers import InhomogeneousLayer
+from becalib.hygrothermal import (
+    get_saturation_vapour_pressures,
+    get_hygrothermal_arrays,
+    get_vapour_pressure_profiles,
+    evaluate_condensation,
+    VAPOUR_PERMEABILITY_AIR,
+    DAYS_IN_MONTHS,
+)
+
+
+EXTERIOR_TEMPERATURES = np.array([0.4, 2.3, 7.2, 11.5, 16.2, 20.4, 23.1, 22.4, 18.1, 12.2, 6.2, 1.6])
+EXTERIOR_RELATIVE_HUMIDITIES = np.array([0.85, 0.8, 0.75, 0.75, 0.75, 0.7, 0.65, 0.7, 0.75, 0.8, 0.85, 0.85])
+
+
+def get_test_layers(mu_interior: float, mu_exterior: float):
+    plaster = MaterialLayer(name="plaster", thickness=0.015, thermal_conductivity=0.7,
+                            gross_density=1400, specific_heat_capacity=1000,
+                            vapour_resistance_factor=mu_interior)
+    iso = MaterialLayer(name="iso", thickness=0.1, thermal_conductivity=0.035,
+                        gross_density=30, specific_heat_capacity=1030,
+                        vapour_resistance_factor=1.0)
+    board = MaterialLayer(name="board", thickness=0.012, thermal_conductivity=0.13,
+                          gross_density=600, specific_heat_capacity=1700,
+                          vapour_resistance_factor=mu_exterior)
+    return [plaster, iso, board]
+
+
+class TestHygrothermal(unittest.TestCase):
+
+    def test_saturation_vapour_pressures(self):
+        self.assertTrue(np.allclose([610.5, 2337, 259.3], get_saturation_vapour_pressures([0, 20, -10]), rtol=1e-3))
+
+    def test_vapour_pressure_profiles(self):
+        # no pinned interface in between: straight line if below ceilings
+        positions = np.array([0, 1, 2, 4.])
+        ceilings = np.array([1000, 5000, 5000, 200.])
+        pinned = np.array([True, False, False, True])
+        self.assertTrue(np.allclose([1000, 800, 600, 200], get_vapour_pressure_profiles(positions, ceilings, pinned)))
+
+        # profile bent at the ceiling
+        ceilings[1] = 500
+        self.assertTrue(np.allclose([1000, 500, 400, 200], get_vapour_pressure_profiles(positions, ceilings, pinned)))
+
+        # pinned interface splits the profile
+        ceilings = np.array([1000, 5000, 300, 5000, 200.])
+        positions = np.array([0, 1, 2, 3, 4.])
+        pinned = np.array([True, False, True, False, True])
+        self.assertTrue(np.allclose([1000, 650, 300, 250, 200], get_vapour_pressure_profiles(positions, ceilings, pinned)))
+
+    def test_no_condensation_with_vapour_barrier(self):
+        results = evaluate_condensation([get_test_layers(10000, 10)], EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+        self.assertFalse(results["condensation_risk"][0])
+        self.assertTrue(results["dries_out"][0])
+        self.assertTrue((results["vapour_pressures"] <= results["saturation_vapour_pressures"] + 1e-9).all())
+
+    def test_condensation_behind_tight_board(self):
+        layers = get_test_layers(10, 1000)
+        results = evaluate_condensation([layers], EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+        self.assertTrue(results["condensation_risk"][0])
+        # condensation only at the iso / board interface
+        self.assertTrue(np.allclose(0, np.delete(results["accumulated"][0], 2, axis=1)))
+
+        # january by hand, interface 2 at saturation
+        arrays = get_hygrothermal_arrays([layers])
+        resistances = np.concatenate([[arrays["surface_thermal_resistances_int"][0]],
+                                      arrays["thermal_resistances"][0], [arrays["surface_thermal_resistances_ext"][0]]])
+        theta = 20 - resistances[:3].sum() / resistances.sum() * (20 - EXTERIOR_TEMPERATURES[0])
+        self.assertAlmostEqual(theta, results["temperatures"][0, 0, 2])
+        p_c = get_saturation_vapour_pressures(theta)
+        p_i = 0.5 * get_saturation_vapour_pressures(20)
+        p_e = EXTERIOR_RELATIVE_HUMIDITIES[0] * get_saturation_vapour_pressures(EXTERIOR_TEMPERATURES[0])
+        s_d = arrays["vapour_diffusion_thicknesses"][0]
+        rate = VAPOUR_PERMEABILITY_AIR * ((p_i - p_c) / s_d[:2].sum() - (p_c - p_e) / s_d[2])
+        self.assertAlmostEqual(rate * DAYS_IN_MONTHS[0] * 86400, results["condensation"][0, 0, 2])
+        self.assertAlmostEqual(p_c, results["vapour_pressures"][0, 0, 2])
+
+        # accumulated never negative, maximum is in a cold month
+        self.assertTrue((results["accumulated"] >= 0).all())
+        self.assertEqual(results["max_accumulated"][0], results["accumulated"][0, :, 2].max())
+
+    def test_many_components(self):
+        layers_list = [get_test_layers(10000, 10), get_test_layers(10, 1000),
+                       get_test_layers(10, 1000)[:2] + [AirLayer(name="air", thickness=0.02)]]
+        results = evaluate_condensation(layers_list, EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+        single = evaluate_condensation(layers_list[1:2], EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+        self.assertEqual((3, 12, 4), results["accumulated"].shape)
+        self.assertTrue(np.allclose(single["accumulated"][0], results["accumulated"][1]))
+        self.assertEqual([False, True], list(results["condensation_risk"][:2]))
+
+        # padding interfaces
+        short = evaluate_condensation([layers_list[0][:2], layers_list[0]],
+                                      EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+        self.assertTrue(np.isnan(short["temperatures"][0, :, 3]).all())
+        self.assertTrue(np.allclose(0, short["accumulated"][0]))
+
+    def test_vapour_resistance_factor(self):
+        layer = get_test_layers(10, 1000)[2]
+        self.assertAlmostEqual(12, layer.vapour_diffusion_thickness)
+        self.assertEqual(1000, MaterialLayer.from_dict(layer.to_dict()).vapour_resistance_factor)
+        self.assertEqual(0.02, AirLayer(name="air", thickness=0.02).vapour_diffusion_thickness)
+
+        with self.assertRaises(ValueError):
+            get_hygrothermal_arrays([get_test_layers(0, 10)])
+
+    def test_unknown_vapour_resistance_factor(self):
+        # no μ default: material layers without μ are not taken as air
+        concrete = MaterialLayer(name="concrete", thickness=0.2, thermal_conductivity=2.0,
+                                 gross_density=2400, specific_heat_capacity=1000)
+        self.assertIsNone(concrete.vapour_diffusion_thickness)
+        self.assertIsNone(MaterialLayer.from_dict(concrete.to_dict()).vapour_resistance_factor)
+        with self.assertRaises(ValueError):
+            evaluate_condensation([get_test_layers(10, 10), [concrete]],
+                                  EXTERIOR_TEMPERATURES, EXTERIOR_RELATIVE_HUMIDITIES)
+
+    def test_inhomogeneous_layers(self):
+        plaster, iso, board = get_test_layers(10, 100)
+        stud = MaterialLayer(name="stud", thickness=0.1, thermal_conductivity=0.13,
+                             gross_density=500, specific_heat_capacity=1600, vapour_resistance_factor=50)
+        frame = InhomogeneousLayer(name="frame", thickness=0.1, sections=[(0.85, iso), (0.15, stud)])
+        arrays = get_hygrothermal_arrays([[plaster, frame, board], [plaster, iso]], ["Ho", "Up"])
+
+        self.assertEqual([3, 2], arrays["layer_counts"].tolist())
+        self.assertTrue(np.allclose([plaster.thermal_resistance, frame.thermal_resistance, board.thermal_resistance],
+                                    arrays["thermal_resistances"][0]))
+        self.assertTrue(np.allclose([0.15, frame.vapour_diffusion_thickness, 1.2],
+                                    arrays["vapour_diffusion_thicknesses"][0]))
+        self.assertTrue(np.allclose([0.15, 0.1, 0], arrays["vapour_diffusion_thicknesses"][1]))
+        self.assertEqual([0.13, 0.10], arrays["surface_thermal_resistances_int"].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
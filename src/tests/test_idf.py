@@ -0,0 +1,84 @@
+import unittest
+import io
+import os
+import tracemalloc
+from becalib import MaterialLayer, AirLayer, Component
+from becalib.air_resistances import get_resistance_unventilated_air_layer
+from becalib.idf import iter_idf_objects, write_idf
+from tests.test_solver import get_test_wall
+
+
+def parse_idf(text: str) -> list[list[str]]:
+    # objects as lists of fields, comments removed
+    fields = "".join(line.split("!")[0] for line in text.splitlines())
+    return [[field.strip() for field in idf_object.split(",")] for idf_object in fields.split(";") if idf_object.strip()]
+
+
+def iter_test_definitions(n_components: int):
+    for i in range(n_components):
+        yield {
+            "name": f"wall, {i}",
+            "heat_flow_direction": "Ho",
+            "layers": [
+                {"name": "concrete", "thickness": 0.1 + 0.05 * (i % 4), "thermal_conductivity": 1.8,
+                 "gross_density": 2400, "specific_heat_capacity": 1000},
+                {"name": "iso", "thickness": 0.1, "thermal_conductivity": 0.035,
+                 "gross_density": 175, "specific_heat_capacity": 840},
+            ],
+        }
+
+
+class TestIdf(unittest.TestCase):
+
+    def test_components(self):
+        wall = get_test_wall()
+        air = AirLayer(name="air gap", thickness=0.05)
+        roof = Component(name="Roof", layers=[wall.layers[0], air, wall.layers[2]], heat_flow_direction="Up")
+        # same name, other values
+        other = Component(name="Roof", layers=[MaterialLayer(
+            name="plaster", thickness=0.03, thermal_conductivity=0.9, specific_heat_capacity=840, gross_density=1400)],
+            heat_flow_direction="Ho")
+
+        file = io.StringIO()
+        counts = write_idf(file, [wall, roof, other])
+        self.assertEqual(counts, {"Material": 4, "Material:AirGap": 1, "Construction": 3})
+
+        objects = parse_idf(file.getvalue())
+        constructions = [idf_object[1:] for idf_object in objects if idf_object[0] == "Construction"]
+        # exterior to interior, shared materials written once, unique names
+        self.assertEqual(constructions, [["Wall Test", "insulation", "concrete", "plaster"],
+                                         ["Roof", "insulation", "air gap", "plaster"],
+                                         ["Roof 2", "plaster 2"]])
+
+        materials = {idf_object[1]: idf_object for idf_object in objects if idf_object[0] == "Material"}
+        self.assertEqual(materials["concrete"], ["Material", "concrete", "MediumRough", "0.2", "1.8", "2400", "1000"])
+        air_gap = next(idf_object for idf_object in objects if idf_object[0] == "Material:AirGap")
+        self.assertAlmostEqual(float(air_gap[2]), get_resistance_unventilated_air_layer("Up", 0.05))
+        self.assertAlmostEqual(float(air_gap[2]), roof.thermal_resistances[2])
+
+    def test_streaming(self):
+        """definitions from a generator, one object at a time
+        """
+        objects = iter_idf_objects(iter_test_definitions(10**9))
+        first = [next(objects) for _ in range(3)]
+        self.assertTrue(first[2].startswith("Construction,"))
+        self.assertIn("    wall 0,", first[2]) # separators removed from names
+
+        with open(os.devnull, "w", encoding="utf-8") as file:
+            tracemalloc.start()
+            counts = write_idf(file, iter_test_definitions(3000))
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.assertEqual(counts, {"Material": 5, "Material:AirGap": 0, "Construction": 3000})
+        self.assertTrue(peak < 5 * 10**5, peak)
+
+    def test_invalid_inputs(self):
+        wall = get_test_wall()
+        with self.assertRaises(ValueError):
+            write_idf(io.StringIO(), [wall], roughness="Bumpy")
+        with self.assertRaises(ValueError):
+            write_idf(io.StringIO(), [Component(name="thick", layers=wall.layers * 4, heat_flow_direction="Ho")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import itertools
+import math
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer
+from becalib import Component
+from becalib.batch import evaluate_batch
+from becalib.ordering import get_best_layer_orders
+
+
+def get_test_component() -> Component:
+    plaster = MaterialLayer(name="plaster", thickness=0.015, thermal_conductivity=0.7,
+                            gross_density=1400, specific_heat_capacity=1000)
+    concrete = MaterialLayer(name="concrete", thickness=0.1, thermal_conductivity=1.8,
+                             gross_density=2400, specific_heat_capacity=1000)
+    brick = MaterialLayer(name="brick", thickness=0.12, thermal_conductivity=0.8,
+                          gross_density=1800, specific_heat_capacity=840)
+    iso = MaterialLayer(name="iso", thickness=0.05, thermal_conductivity=0.035,
+                        gross_density=175, specific_heat_capacity=840)
+    wood = MaterialLayer(name="wood", thickness=0.04, thermal_conductivity=0.13,
+                         gross_density=450, specific_heat_capacity=1600)
+    air = AirLayer(name="air", thickness=0.03)
+    return Component(name="wall", layers=[plaster, concrete, iso, air, brick, wood], heat_flow_direction="Ho")
+
+
+def get_brute_force(component: Component, fixed_positions: dict | None = None) -> tuple:
+    n_layers = len(component.layers)
+    orders = [order for order in itertools.permutations(range(n_layers))
+              if all(order[position % n_layers] == layer % n_layers
+                     for position, layer in (fixed_positions or {}).items())]
+    results = evaluate_batch([[component.layers[i] for i in order] for order in orders],
+                             component.heat_flow_direction, component.time_period)
+    return np.array(orders), results
+
+
+class TestOrdering(unittest.TestCase):
+
+    def test_time_shift_same_as_brute_force(self):
+        component = get_test_component()
+        best = get_best_layer_orders(component, objective="time_shift", top_k=3)
+
+        orders, results = get_brute_force(component)
+        expected = np.sort(results["time_shift"])[::-1][:3]
+        self.assertTrue(np.allclose(expected, best["time_shift"], rtol=1e-12))
+
+        # best ordering evaluated by Component
+        reordered = Component(name="best", layers=[component.layers[i] for i in best["orders"][0]],
+                              heat_flow_direction=component.heat_flow_direction)
+        self.assertAlmostEqual(reordered.time_shift, best["time_shift"][0], places=9)
+        self.assertAlmostEqual(reordered.decrement_factor, best["decrement_factor"][0], places=12)
+
+    def test_decrement_factor_pruning(self):
+        component = get_test_component()
+        best = get_best_layer_orders(component, objective="decrement_factor", top_k=2)
+
+        orders, results = get_brute_force(component)
+        expected = np.sort(results["decrement_factor"])[:2]
+        self.assertTrue(np.allclose(expected, best["decrement_factor"], rtol=1e-12))
+        self.assertLess(best["n_orders"], len(orders))
+
+    def test_fixed_positions(self):
+        component = get_test_component()
+        fixed_positions = {0: 0, -1: -1}
+        best = get_best_layer_orders(component, objective="time_shift", top_k=4, fixed_positions=fixed_positions)
+
+        self.assertTrue((best["orders"][:, 0] == 0).all())
+        self.assertTrue((best["orders"][:, -1] == 5).all())
+
+        orders, results = get_brute_force(component, fixed_positions)
+        self.assertTrue(np.allclose(np.sort(results["time_shift"])[::-1][:4], best["time_shift"], rtol=1e-12))
+
+    def test_identical_layers_evaluated_once(self):
+        component = get_test_component()
+        iso = component.layers[2]
+        component = Component(name="wall", layers=[iso, component.layers[1], iso, iso], heat_flow_direction="Ho")
+        best = get_best_layer_orders(component, top_k=10)
+
+        # 4 positions of the concrete layer
+        self.assertEqual(4, best["n_orders"])
+        self.assertEqual(4, len(best["orders"]))
+
+    def test_fixed_layer_with_free_twin(self):
+        """a pinned finish and its free identical twin are both placed
+        """
+        plaster, _concrete, iso, _air, brick, _wood = get_test_component().layers
+        component = Component(name="wall", layers=[plaster, brick, plaster, iso], heat_flow_direction="Ho")
+        for fixed_positions in ({-1: 0}, {0: 2}):
+            best = get_best_layer_orders(component, top_k=3, fixed_positions=fixed_positions)
+            orders, results = get_brute_force(component, fixed_positions)
+            self.assertEqual(math.factorial(3), best["n_orders"])
+            self.assertTrue(np.allclose(np.sort(results["time_shift"])[::-1][:3], best["time_shift"], rtol=1e-12))
+
+    def test_search_size(self):
+        """time shift: all n! orderings, no bound; |Z_12| objectives: pruned below n!
+        """
+        component = get_test_component()
+        n_layers = len(component.layers)
+        all_nodes = sum(math.factorial(n_layers) // math.factorial(n_layers - depth)
+                        for depth in range(1, n_layers + 1))
+
+        best = get_best_layer_orders(component, objective="time_shift", top_k=1)
+        self.assertEqual(math.factorial(n_layers), best["n_orders"])
+        self.assertEqual(all_nodes, best["n_nodes"])
+        for objective in ("decrement_factor", "periodic_thermal_transmittance"):
+            best = get_best_layer_orders(component, objective=objective, top_k=1)
+            self.assertLess(best["n_orders"], math.factorial(n_layers) / 2, objective)
+            self.assertLess(best["n_nodes"], all_nodes / 2, objective)
+
+    def test_small_batches(self):
+        component = get_test_component()
+        expected = get_best_layer_orders(component, top_k=3)
+        best = get_best_layer_orders(component, top_k=3, max_batch=7)
+        self.assertTrue(np.allclose(expected["time_shift"], best["time_shift"], rtol=1e-12))
+
+    def test_invalid(self):
+        component = get_test_component()
+        with self.assertRaises(ValueError):
+            get_best_layer_orders(component, objective="mass")
+        with self.assertRaises(ValueError):
+            get_best_layer_orders(component, fixed_positions={0: 1, 1: 1})
+
+        frame = InhomogeneousLayer(name="frame", thickness=0.05,
+                                   sections=[(0.9, component.layers[2]),
+                                             (0.1, MaterialLayer("wood", 0.05, 0.13, 450, 1600))])
+        with self.assertRaises(ValueError):
+            get_best_layer_orders(Component(name="frame", layers=[frame, component.layers[1]], heat_flow_direction="Ho"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+from becalib.layers import MaterialLayer
+from becalib.batch import get_layers_arrays, evaluate_layers_arrays, get_component_matrices_arrays
+from becalib.rooms import get_room_components, evaluate_rooms, AIR_HEAT_CAPACITY
+from becalib.transient import get_transient_response
+
+
+def get_test_layers() -> list:
+    return [
+        [MaterialLayer("plaster", 0.015, 0.7, 1400, 1000), MaterialLayer("brick", 0.25, 0.6, 1600, 840),
+         MaterialLayer("EPS", 0.1, 0.035, 20, 1400), MaterialLayer("render", 0.01, 0.9, 1800, 1000)],
+        [MaterialLayer("wood", 0.02, 0.13, 500, 1600), MaterialLayer("mineral wool", 0.2, 0.04, 50, 1000),
+         MaterialLayer("wood", 0.02, 0.13, 500, 1600)],
+        [MaterialLayer("plaster", 0.015, 0.7, 1400, 1000), MaterialLayer("brick", 0.12, 0.6, 1600, 840),
+         MaterialLayer("plaster", 0.015, 0.7, 1400, 1000)],
+    ]
+
+
+class TestRooms(unittest.TestCase):
+
+    def setUp(self):
+        self.layers = get_test_layers()
+        self.directions = ["Ho", "Up", "Ho"]
+        self.components = get_room_components(self.layers, self.directions)
+
+    def test_component_values(self):
+        layers_arrays = get_layers_arrays(self.layers, self.directions)
+        expected = evaluate_layers_arrays(layers_arrays, outputs=[
+            "thermal_admittance_int", "periodic_thermal_transmittance", "thermal_transmittance_component"])
+        htm = get_component_matrices_arrays(layers_arrays)
+        self.assertTrue(np.allclose(expected["thermal_admittance_int"], np.abs(htm[:, 0, 0] / htm[:, 0, 1])))
+
+        self.assertEqual((3, 13), self.components["thermal_admittance_int"].shape)
+        self.assertTrue(np.allclose(expected["thermal_admittance_int"],
+                                    np.abs(self.components["thermal_admittance_int"][:, 1])))
+        self.assertTrue(np.allclose(expected["periodic_thermal_transmittance"],
+                                    np.abs(self.components["periodic_thermal_transmittance"][:, 1])))
+        self.assertTrue(np.allclose(expected["thermal_transmittance_component"],
+                                    self.components["periodic_thermal_transmittance"][:, 0].real))
+
+    def test_steady_state(self):
+        results = evaluate_rooms(self.components, [12, 20, 30], np.full(24, 30.0), gains=400,
+                                 air_change_rates=0.5, volumes=60, internal=[False, False, True])
+        conductance = (self.components["periodic_thermal_transmittance"][:2, 0].real @ [12, 20]
+                       + AIR_HEAT_CAPACITY / 3600 * 0.5 * 60)
+        self.assertTrue(np.allclose(30 + 400 / conductance, results["operative_temperatures"]))
+        self.assertAlmostEqual(0, results["operative_temperature_swing"][0])
+
+    def test_heat_balance_transient(self):
+        # periodic state of the finite volume solver: gains = Σ A·q + H·(θ_i - θ_e) at each time
+        n_times, days = 96, 10
+        times = np.arange(n_times) * 24 / n_times
+        exterior = 25 + 6 * np.cos(2 * np.pi * (times - 15) / 24)
+        sol_air = np.stack([exterior + 4 + 4 * np.cos(2 * np.pi * (times - 13) / 24),
+                            exterior + 7 + 9 * np.cos(2 * np.pi * (times - 12) / 24)
+                            + 2 * np.cos(4 * np.pi * (times - 12) / 24),
+                            exterior])
+        gains = 300 + 100 * np.cos(2 * np.pi * (times - 14) / 24)
+        areas = np.array([12, 20, 30.0])
+        conductance = AIR_HEAT_CAPACITY / 3600 * 0.5 * 60 + 3
+
+        results = evaluate_rooms(self.components, areas, exterior, gains=gains, air_change_rates=0.5, volumes=60,
+                                 window_conductances=3, sol_air_temperatures=sol_air, internal=[False, False, True])
+        temperatures = results["operative_temperatures"][0]
+
+        response = get_transient_response(
+            self.layers, self.directions,
+            interior_temperatures=np.tile(temperatures, days),
+            exterior_temperatures=np.tile(np.stack([sol_air[0], sol_air[1], temperatures]), days),
+            time_step=24 / n_times, cell_thickness=0.005, theta=0.5)
+        heat_fluxes = response["interior_heat_fluxes"][:, -n_times:]
+        balance = areas @ heat_fluxes + conductance * (temperatures - exterior) - gains
+        self.assertLess(np.abs(balance).max(), 0.5)
+        self.assertAlmostEqual(temperatures.max(), results["peak_operative_temperature"][0])
+
+    def test_vectorized_rooms(self):
+        rng = np.random.default_rng(0)
+        times = np.arange(24)
+        areas = rng.uniform(0, 30, (50, 3))
+        exterior = 25 + 6 * np.cos(2 * np.pi * (times - 15) / 24)
+        gains = rng.uniform(100, 600, (50, 1)) * (times >= 8) * (times < 18)
+        sol_air = exterior + rng.uniform(0, 10, (50, 3, 1))
+        rates = rng.uniform(0.3, 3, 50)
+        results = evaluate_rooms(self.components, areas, exterior, gains=gains, air_change_rates=rates,
+                                 volumes=60, sol_air_temperatures=sol_air, internal=[False, False, True])
+
+        for i in (0, 17, 49):
+            room = evaluate_rooms(self.components, areas[i], exterior, gains=gains[i], air_change_rates=rates[i],
+                                  volumes=60, sol_air_temperatures=sol_air[i], internal=[False, False, True])
+            for name, values in room.items():
+                self.assertTrue(np.allclose(results[name][i], values[0]), name)
+
+        self.assertEqual((50, 24), results["operative_temperatures"].shape)
+        self.assertTrue(np.all(results["time_of_peak"] < 24))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            evaluate_rooms(self.components, [12, 20], np.full(24, 30.0))
+        with self.assertRaises(ValueError):
+            evaluate_rooms(self.components, [12, 20, 30], np.full(24, 30.0), gains=np.zeros(12))
+        with self.assertRaises(ValueError):
+            evaluate_rooms(self.components, [0, 0, 30], np.full(24, 30.0), internal=[False, False, True])
+        with self.assertRaises(ValueError):
+            get_room_components(self.layers, self.directions, n_harmonics=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
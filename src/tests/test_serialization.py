@@ -0,0 +1,112 @@
+import unittest
+import pickle
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer
+from becalib import Component
+from becalib.batch import evaluate_layers_arrays
+from becalib.serialization import (
+    to_json,
+    from_json,
+    encode_components,
+    decode_components,
+    decode_components_arrays,
+)
+
+
+def get_test_components() -> list[Component]:
+    concrete = MaterialLayer(
+        name="Béton",
+        thickness=0.1, # m
+        thermal_conductivity=1.8, # W/mK
+        specific_heat_capacity=1000, # c J/kgK
+        gross_density=2400, # ro kg/mc
+    )
+    air = AirLayer(
+        name="Couche d'air",
+        thickness=0.1, # m
+        heat_flow_direction="Do"
+    )
+    iso = MaterialLayer(
+        name="iso",
+        thickness=0.05, # m
+        thermal_conductivity=0.035, # W/mK
+        specific_heat_capacity=840, # c J/kgK
+        gross_density=175, # ro kg/mc
+        language="fr",
+    )
+    return [
+        Component(name="Paroi", layers=[concrete, air, iso], heat_flow_direction="Do", language="fr"),
+        Component(name="Wall", layers=[iso, concrete], heat_flow_direction="Ho", time_period=12),
+    ]
+
+
+class TestSerialization(unittest.TestCase):
+
+    def assertSameComponent(self, expected: Component, actual: Component):
+        self.assertEqual(expected.to_dict(include_results=True), actual.to_dict(include_results=True))
+
+    def test_layer_dict_round_trip(self):
+        concrete = get_test_components()[0].layers[0]
+        self.assertEqual(concrete.to_dict(), MaterialLayer.from_dict(concrete.to_dict()).to_dict())
+
+        air = get_test_components()[0].layers[1]
+        self.assertEqual(air.to_dict(), AirLayer.from_dict(air.to_dict()).to_dict())
+
+    def test_json_round_trip(self):
+        components = get_test_components()
+        decoded = from_json(to_json(components))
+
+        for expected, actual in zip(components, decoded):
+            self.assertSameComponent(expected, actual)
+
+        layer = from_json(to_json(components[0].layers[1]))
+        self.assertIsInstance(layer, AirLayer)
+
+    def test_json_inhomogeneous_layer(self):
+        concrete, air, iso = get_test_components()[0].layers
+        frame = InhomogeneousLayer(name="frame", thickness=0.1, sections=[(0.9, air), (0.1, concrete)])
+        component = Component(name="Frame", layers=[frame, iso], heat_flow_direction="Ho")
+
+        self.assertSameComponent(component, from_json(to_json(component)))
+        with self.assertRaises(ValueError):
+            encode_components([component])
+
+    def test_json_version(self):
+        text = to_json(get_test_components()[0]).replace('"version": 1', '"version": 99')
+        with self.assertRaises(ValueError):
+            from_json(text)
+
+    def test_binary_round_trip(self):
+        components = get_test_components()
+        decoded = decode_components(encode_components(components))
+
+        for expected, actual in zip(components, decoded):
+            self.assertSameComponent(expected, actual)
+
+    def test_binary_arrays(self):
+        components = get_test_components()
+        decoded = decode_components_arrays(encode_components(components))
+
+        self.assertEqual(["Paroi", "Wall"], decoded["names"])
+        self.assertEqual((2, 3), decoded["layers_arrays"]["thicknesses"].shape)
+        self.assertEqual(components[1].time_shift, decoded["results"]["time_shift"][1])
+
+        # decoded arrays feed batch evaluation
+        results = evaluate_layers_arrays(decoded["layers_arrays"], decoded["time_periods"])
+        self.assertTrue(np.allclose(decoded["results"]["time_shift"], results["time_shift"], rtol=1e-12))
+
+    def test_binary_invalid(self):
+        with self.assertRaises(ValueError):
+            decode_components(b"not becalib")
+
+    def test_pickle_inputs_only(self):
+        component = get_test_components()[0]
+        state = component.__getstate__()
+        self.assertNotIn("_heat_transfer_matrix_layer_list", state)
+
+        unpickled = pickle.loads(pickle.dumps(component))
+        self.assertSameComponent(component, unpickled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import asyncio
+import json
+import math
+from unittest import mock
+import numpy as np
+from becalib.batch import evaluate_batch
+from becalib.service import EvaluationService, get_assembly_key
+
+
+WALL = {
+    "name": "Wall",
+    "heat_flow_direction": "Ho",
+    "time_period": 24,
+    "layers": [
+        {"name": "concrete", "thickness": 0.3, "thermal_conductivity": 1.8,
+         "gross_density": 2400, "specific_heat_capacity": 1000},
+        {"name": "insulation_a", "thickness": 0.1, "thermal_conductivity": 0.034,
+         "gross_density": 70, "specific_heat_capacity": 700},
+        {"name": "brick_a", "thickness": 0.08, "thermal_conductivity": 0.35,
+         "gross_density": 750, "specific_heat_capacity": 840},
+        {"name": "brick_b", "thickness": 0.12, "thermal_conductivity": 0.8,
+         "gross_density": 1800, "specific_heat_capacity": 840},
+        {"name": "plaster", "thickness": 0.02, "thermal_conductivity": 0.9,
+         "gross_density": 1400, "specific_heat_capacity": 840},
+    ],
+}
+
+
+def get_wall(insulation_thickness: float) -> dict:
+    wall = json.loads(json.dumps(WALL))
+    wall["layers"][1]["thickness"] = insulation_thickness
+    return wall
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+
+    async def test_micro_batching(self):
+        """concurrent requests are evaluated in one batch
+        """
+        service = EvaluationService(batch_window=0.01)
+        results = await asyncio.gather(*[service.evaluate(get_wall(0.05 + i / 100)) for i in range(20)])
+
+        self.assertEqual(20, len(results))
+        self.assertEqual(1, service.batches_count)
+        self.assertTrue(math.isclose(17.854, results[5]["time_shift"], rel_tol=0.001))
+
+    async def test_cache(self):
+        service = EvaluationService(batch_window=0.001)
+        await service.evaluate(WALL)
+        renamed = dict(WALL, name="Other name")
+        result = await service.evaluate(renamed)
+
+        self.assertEqual("Other name", result["name"])
+        self.assertEqual(1, service.cache_hits)
+        self.assertEqual(1, service.get_metrics()["evaluated_assemblies"])
+
+    async def test_invalid_definition_isolated(self):
+        service = EvaluationService(batch_window=0.01)
+        invalid = {"layers": [{"thickness": 0.1}]}
+        results = await asyncio.gather(service.evaluate(WALL), service.evaluate(invalid),
+                                       return_exceptions=True)
+
+        self.assertTrue(math.isclose(17.854, results[0]["time_shift"], rel_tol=0.001))
+        self.assertIsInstance(results[1], ValueError)
+
+    async def test_unexpected_error(self):
+        """all requests of a failed batch get the error, no request waits forever
+        """
+        service = EvaluationService(batch_window=0.01)
+        with mock.patch("becalib.service.evaluate_batch", side_effect=MemoryError("batch")):
+            results = await asyncio.wait_for(asyncio.gather(
+                service.evaluate(WALL), service.evaluate(get_wall(0.2)), return_exceptions=True), timeout=5)
+        self.assertTrue(all(isinstance(result, MemoryError) for result in results))
+
+    async def test_nan_values(self):
+        """NaN results are null in json
+        """
+        service = EvaluationService(batch_window=0.001)
+
+        def evaluate_with_nan(*args):
+            results = evaluate_batch(*args)
+            results["time_shift"][:] = np.nan
+            return results
+
+        with mock.patch("becalib.service.evaluate_batch", evaluate_with_nan):
+            result = await service.evaluate(WALL)
+        self.assertIsNone(result["time_shift"])
+        json.dumps(result, allow_nan=False)
+
+    async def test_http(self):
+        service = EvaluationService(batch_window=0.001)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def request(method, path, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                headers[name.lower()] = value.strip()
+            # strict json: NaN or Infinity tokens are rejected
+            return status, json.loads(await reader.readexactly(int(headers["content-length"])),
+                                      parse_constant=lambda token: self.fail(f"invalid json: {token}"))
+
+        status, result = await request("POST", "/evaluate", [WALL, WALL])
+        self.assertEqual(200, status)
+        self.assertTrue(math.isclose(0.03239, result[1]["decrement_factor"], rel_tol=0.001))
+
+        status, metrics = await request("GET", "/metrics")
+        self.assertEqual(200, status)
+        self.assertEqual(2, metrics["requests"])
+
+        status, _ = await request("GET", "/unknown")
+        self.assertEqual(404, status)
+        writer.close()
+
+        for content_length in ("abc", "-1", "²"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"POST /evaluate HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            self.assertEqual(400, int((await reader.readline()).split()[1]))
+            writer.close()
+
+        with mock.patch("becalib.service.evaluate_batch", side_effect=RuntimeError("batch")):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, error = await request("POST", "/evaluate", get_wall(0.3))
+            self.assertEqual(500, status)
+            self.assertIn("RuntimeError", error["error"])
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    def test_assembly_key(self):
+        self.assertEqual(get_assembly_key(WALL), get_assembly_key(dict(WALL, name="x")))
+        self.assertNotEqual(get_assembly_key(WALL), get_assembly_key(get_wall(0.2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import math
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer
+from becalib import Component
+from becalib.solver import get_minimum_thicknesses
+
+
+def get_test_wall(insulation_thickness: float = 0.1, name: str = "Wall Test") -> Component:
+    concrete = MaterialLayer(
+        name="concrete",
+        thickness=0.2, # m
+        thermal_conductivity=1.8, # W/mK
+        specific_heat_capacity=1000, # c J/kgK
+        gross_density=2400, # ro kg/mc
+    )
+    insulation = MaterialLayer(
+        name="insulation",
+        thickness=insulation_thickness, # m
+        thermal_conductivity=0.034, # W/mK
+        specific_heat_capacity=700, # c J/kgK
+        gross_density=70, # ro kg/mc
+    )
+    plaster = MaterialLayer(
+        name="plaster",
+        thickness=0.02, # m
+        thermal_conductivity=0.9, # W/mK
+        specific_heat_capacity=840, # c J/kgK
+        gross_density=1400, # ro kg/mc
+    )
+    return Component(name=name, layers=[plaster, concrete, insulation], heat_flow_direction="Ho")
+
+
+class TestSolver(unittest.TestCase):
+
+    def test_u_value_target(self):
+        """insulation thickness for U <= 0.28 W/m²K, analytical solution
+        """
+        wall = get_test_wall()
+        solution = get_minimum_thicknesses(wall, layer_index=2, max_thermal_transmittance=0.28)
+
+        r_others = 0.13 + 0.04 + 0.02/0.9 + 0.2/1.8
+        expected = (1/0.28 - r_others) * 0.034
+
+        self.assertTrue(solution["reachable"][0])
+        self.assertTrue(0 <= solution["thickness"][0] - expected <= 1e-4)
+        self.assertTrue(solution["thermal_transmittance_component"][0] <= 0.28)
+
+    def test_mixed_targets_many_components(self):
+        walls = [get_test_wall(name=f"wall {i}") for i in range(5)]
+        solution = get_minimum_thicknesses(walls, layer_index=[2, 2, 1, 1, 0],
+                                           max_thermal_transmittance=0.28, min_time_shift=10,
+                                           max_thickness=1.0)
+
+        for i, wall in enumerate(walls):
+            if not solution["reachable"][i]:
+                continue
+            thickness = solution["thickness"][i]
+            layers = list(wall.layers)
+            solved = layers[[2, 2, 1, 1, 0][i]]
+
+            # targets met at solution, not met 1 mm thinner
+            for delta, met in ((0, True), (-0.001, False)):
+                trial = MaterialLayer(name="trial", thickness=float(thickness + delta),
+                                      thermal_conductivity=solved.thermal_conductivity,
+                                      gross_density=solved.gross_density,
+                                      specific_heat_capacity=solved.specific_heat_capacity)
+                layers[[2, 2, 1, 1, 0][i]] = trial
+                component = Component(name="trial", layers=list(layers), heat_flow_direction="Ho")
+                self.assertEqual(met, component.thermal_transmittance_component <= 0.28
+                                 and component.time_shift >= 10)
+
+        self.assertEqual(solution["thickness"][0], solution["thickness"][1])
+        # components are not modified
+        self.assertEqual(0.1, walls[0].layers[2].thickness)
+
+    def test_unreachable(self):
+        wall = get_test_wall()
+        solution = get_minimum_thicknesses([wall, wall], layer_index=[0, 2], max_thermal_transmittance=0.1)
+
+        self.assertFalse(solution["reachable"][0])
+        self.assertTrue(np.isnan(solution["thickness"][0]))
+        self.assertTrue(solution["reachable"][1])
+
+    def test_inhomogeneous_layer(self):
+        wall = get_test_wall()
+        insulation, wood = wall.layers[2], MaterialLayer(
+            name="wood", thickness=0.1, thermal_conductivity=0.13, gross_density=450, specific_heat_capacity=1600)
+        frame = InhomogeneousLayer(name="frame", thickness=0.1, sections=[(0.9, insulation), (0.1, wood)])
+        framed = Component(name="framed", layers=[wall.layers[0], wall.layers[1], frame], heat_flow_direction="Ho")
+
+        solution = get_minimum_thicknesses([wall, framed], layer_index=2, max_thermal_transmittance=0.28)
+        # studs need more insulation
+        self.assertTrue(solution["thickness"][1] > solution["thickness"][0])
+        self.assertTrue(math.isclose(0.28, solution["thermal_transmittance_component"][1], rel_tol=0.01))
+
+    def test_invalid_inputs(self):
+        wall = get_test_wall()
+        with self.assertRaises(ValueError):
+            get_minimum_thicknesses(wall, layer_index=2)
+        with self.assertRaises(ValueError):
+            get_minimum_thicknesses(wall, layer_index=2, max_u=0.2)
+        with self.assertRaises(ValueError):
+            get_minimum_thicknesses(wall, layer_index=5, min_time_shift=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from becalib.batch import evaluate_definitions
+from becalib.store import create_result_store, ResultStore
+from becalib.studies import evaluate_study, load_study_results
+
+
+def iter_test_definitions(n_components: int):
+    for i in range(n_components):
+        yield {
+            "name": f"wall {i}",
+            "heat_flow_direction": "Ho",
+            "layers": [
+                {"name": "concrete", "thickness": 0.05 + 0.01 * (i % 20), "thermal_conductivity": 1.8,
+                 "gross_density": 2400, "specific_heat_capacity": 1000},
+                {"name": "iso", "thickness": 0.02 + 0.01 * (i % 15), "thermal_conductivity": 0.035,
+                 "gross_density": 175, "specific_heat_capacity": 840},
+            ],
+        }
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self._temporary_directory.name
+        self.definitions = list(iter_test_definitions(300))
+        self.results = evaluate_definitions(self.definitions)
+        self.store = create_result_store(os.path.join(self.directory, "store"), self.definitions, self.results)
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def test_query(self):
+        rows = self.store.query(min_time_shift=8, max_thermal_transmittance_component=0.5, max_mass_component=500)
+        mask = ((self.results["time_shift"] >= 8)
+                & (self.results["thermal_transmittance_component"] <= 0.5)
+                & (self.results["mass_component"] <= 500))
+        self.assertTrue(0 < rows.size < 300)
+        np.testing.assert_array_equal(rows, np.flatnonzero(mask))
+
+        # range on one output, count is exact
+        rows = self.store.query(min_mass_component=300, max_mass_component=400)
+        mask = (self.results["mass_component"] >= 300) & (self.results["mass_component"] <= 400)
+        np.testing.assert_array_equal(rows, np.flatnonzero(mask))
+        self.assertEqual(self.store.count(min_mass_component=300, max_mass_component=400), mask.sum())
+
+        self.assertEqual(self.store.query(min_time_shift=100).size, 0)
+        self.assertEqual(self.store.query().size, 300)
+        with self.assertRaises(ValueError):
+            self.store.query(above_time_shift=1)
+        with self.assertRaises(ValueError):
+            self.store.query(min_unknown=1)
+
+    def test_definitions(self):
+        rows = self.store.query(min_time_shift=8)
+        self.assertEqual(self.store.get_definitions(rows), [self.definitions[row] for row in rows])
+        results = ResultStore(self.store.directory).get_results(rows)
+        for name, values in results.items():
+            np.testing.assert_array_equal(values, self.results[name][rows])
+
+    def test_study(self):
+        directory = os.path.join(self.directory, "study")
+        evaluate_study(iter_test_definitions(300), 300, directory, chunk_size=64)
+        store = create_result_store(os.path.join(self.directory, "study_store"),
+                                    iter_test_definitions(300), load_study_results(directory))
+        self.assertEqual(len(store), 300)
+        np.testing.assert_array_equal(store.query(min_time_shift=8), self.store.query(min_time_shift=8))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            create_result_store(os.path.join(self.directory, "short"), self.definitions[:10], self.results)
+        with self.assertRaises(ValueError):
+            create_result_store(os.path.join(self.directory, "unknown"), self.definitions, {"unknown": np.zeros(300)})
+        # incomplete store has no manifest
+        with self.assertRaises(ValueError):
+            ResultStore(os.path.join(self.directory, "short"))
+
+
+if __name__ == '__main__':
+    unittest.main()
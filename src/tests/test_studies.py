@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from becalib.batch import evaluate_definitions
+from becalib.studies import evaluate_study, get_study_progress, load_study_results
+
+
+def iter_test_definitions(n_components: int):
+    for i in range(n_components):
+        yield {
+            "name": f"wall {i}",
+            "heat_flow_direction": "Ho",
+            "layers": [
+                {"name": "concrete", "thickness": 0.1, "thermal_conductivity": 1.8,
+                 "gross_density": 2400, "specific_heat_capacity": 1000},
+                {"name": "iso", "thickness": 0.01 + 0.001 * i, "thermal_conductivity": 0.035,
+                 "gross_density": 175, "specific_heat_capacity": 840},
+            ],
+        }
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def iter_interrupted_definitions(n_components: int, stop: int):
+    for i, definition in enumerate(iter_test_definitions(n_components)):
+        if i == stop:
+            raise _Interrupted()
+        yield definition
+
+
+class TestStudies(unittest.TestCase):
+
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self._temporary_directory.name
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def test_same_values_as_batch(self):
+        outputs = ["time_shift", "thermal_transmittance_component", "threshold_code_italian_dm_26_06_2009"]
+        results = evaluate_study(iter_test_definitions(25), 25, self.directory, outputs=outputs, chunk_size=7)
+        expected = evaluate_definitions(list(iter_test_definitions(25)), outputs=outputs)
+
+        for name in outputs:
+            self.assertTrue(np.array_equal(expected[name], results[name]), name)
+        self.assertEqual(np.int8, results["threshold_code_italian_dm_26_06_2009"].dtype)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "time_shift.npy")))
+        self.assertEqual(4, get_study_progress(self.directory)["completed_chunks"])
+
+    def test_resume_after_interruption(self):
+        with self.assertRaises(_Interrupted):
+            evaluate_study(iter_interrupted_definitions(25, stop=12), 25, self.directory,
+                           outputs=["time_shift"], chunk_size=5)
+        # chunks 0-4 and 5-9 completed
+        self.assertEqual(10, get_study_progress(self.directory)["completed_components"])
+
+        results = evaluate_study(iter_test_definitions(25), 25, self.directory, outputs=["time_shift"], chunk_size=5)
+        expected = evaluate_definitions(list(iter_test_definitions(25)), outputs=["time_shift"])
+        self.assertTrue(np.array_equal(expected["time_shift"], results["time_shift"]))
+        self.assertTrue(np.array_equal(results["time_shift"], load_study_results(self.directory)["time_shift"]))
+
+    def test_resume_other_settings(self):
+        evaluate_study(iter_test_definitions(5), 5, self.directory, outputs=["time_shift"])
+        with self.assertRaises(ValueError):
+            evaluate_study(iter_test_definitions(5), 5, self.directory, outputs=["decrement_factor"])
+        results = evaluate_study(iter_test_definitions(5), 5, self.directory,
+                                 outputs=["decrement_factor"], resume=False)
+        self.assertEqual(["decrement_factor"], list(results))
+
+    def test_single_precision(self):
+        results = evaluate_study(iter_test_definitions(25), 25, self.directory,
+                                 outputs=["time_shift", "decrement_factor"], chunk_size=10, precision="single")
+        expected = evaluate_definitions(list(iter_test_definitions(25)), outputs=["time_shift"])
+        self.assertEqual(np.float32, results["time_shift"].dtype)
+        self.assertTrue(np.allclose(expected["time_shift"], results["time_shift"], rtol=1e-5))
+
+        progress = get_study_progress(self.directory)
+        self.assertEqual("single", progress["precision"])
+        self.assertLess(progress["max_errors"]["time_shift"]["max_absolute_error"], 1e-3)
+
+    def test_missing_definitions(self):
+        with self.assertRaises(ValueError):
+            evaluate_study(iter_test_definitions(3), 5, self.directory, chunk_size=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
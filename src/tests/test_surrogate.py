@@ -0,0 +1,98 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from becalib import MaterialLayer, InhomogeneousLayer
+from becalib import Component
+from becalib.batch import evaluate_batch
+from becalib.surrogate import fit_surrogate, load_surrogate
+from tests.test_solver import get_test_wall
+
+
+class TestSurrogate(unittest.TestCase):
+
+    def setUp(self):
+        self.wall = get_test_wall()
+        self.ranges = [(0.05, 0.3), (0.02, 0.2)]
+        self.surrogate = fit_surrogate(self.wall, [1, 2], self.ranges, n_points=9)
+
+    def get_exact_results(self, component: Component, thicknesses: np.ndarray) -> dict:
+        layers_list = []
+        for row in thicknesses:
+            layers = list(component.layers)
+            for j, thickness in zip([1, 2], row):
+                layer = MaterialLayer(
+                    name=layers[j].name, thickness=float(thickness),
+                    thermal_conductivity=layers[j].thermal_conductivity,
+                    specific_heat_capacity=layers[j].specific_heat_capacity,
+                    gross_density=layers[j].gross_density)
+                layers[j] = layer
+            layers_list.append(layers)
+        return evaluate_batch(layers_list, component.heat_flow_direction)
+
+    def test_errors(self):
+        """validated errors hold on new variants, linear outputs are exact
+        """
+        thicknesses = np.random.default_rng(1).uniform(*np.transpose(self.ranges), size=(200, 2))
+        predicted = self.surrogate.predict(thicknesses)
+        exact = self.get_exact_results(self.wall, thicknesses)
+        for name in ("thickness_component", "thermal_transmittance_component", "mass_component"):
+            np.testing.assert_allclose(predicted[name], exact[name], rtol=1e-10)
+        for name in ("periodic_thermal_transmittance", "decrement_factor", "thermal_admittance_int"):
+            errors = self.surrogate.errors[name]
+            self.assertTrue(0 < errors["max_relative_error"] < 0.1)
+            np.testing.assert_array_less(
+                np.abs(predicted[name] - exact[name]), 1.5 * errors["max_absolute_error"])
+
+        # errors decrease with the grid spacing
+        fine = fit_surrogate(self.wall, [1, 2], self.ranges, n_points=17)
+        for name in ("periodic_thermal_transmittance", "time_shift"):
+            self.assertTrue(fine.errors[name]["max_absolute_error"] < self.surrogate.errors[name]["max_absolute_error"])
+
+        # grid points are exact
+        corner = self.surrogate.predict([0.3, 0.2])
+        exact = self.get_exact_results(self.wall, np.array([[0.3, 0.2]]))
+        for name in ("periodic_thermal_transmittance", "time_shift"):
+            np.testing.assert_allclose(corner[name], exact[name], rtol=1e-10)
+
+    def test_time_shift_wrap(self):
+        """time shifts over 24 h are interpolated without jumps
+        """
+        surrogate = fit_surrogate(self.wall, [1], [(0.3, 0.9)], n_points=33, outputs=["time_shift"])
+        self.assertTrue(surrogate.errors["time_shift"]["max_absolute_error"] < 0.05)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wall.npz")
+            self.surrogate.save(path)
+            surrogate = load_surrogate(path)
+        thicknesses = [[0.1, 0.05], [0.25, 0.15]]
+        for name, values in self.surrogate.predict(thicknesses).items():
+            np.testing.assert_array_equal(values, surrogate.predict(thicknesses)[name])
+        self.assertEqual(surrogate.errors, self.surrogate.errors)
+        self.assertEqual(surrogate.thickness_ranges, self.ranges)
+
+    def test_inhomogeneous(self):
+        wall = get_test_wall()
+        wood = MaterialLayer(name="wood", thickness=0.1, thermal_conductivity=0.13,
+                             specific_heat_capacity=1600, gross_density=450)
+        frame = InhomogeneousLayer(name="frame", thickness=0.1, sections=[(0.9, wall.layers[2]), (0.1, wood)])
+        framed = Component(name="framed", layers=[wall.layers[0], wall.layers[1], frame], heat_flow_direction="Ho")
+        surrogate = fit_surrogate(framed, 2, (0.05, 0.25), n_points=9, outputs=["thermal_transmittance_component"])
+        self.assertTrue(surrogate.errors["thermal_transmittance_component"]["max_relative_error"] < 0.01)
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            self.surrogate.predict([0.4, 0.1])
+        with self.assertRaises(ValueError):
+            self.surrogate.predict([0.1])
+        with self.assertRaises(ValueError):
+            fit_surrogate(self.wall, [1, 1], self.ranges)
+        with self.assertRaises(ValueError):
+            fit_surrogate(self.wall, [1, 2], [(0.2, 0.1), (0.02, 0.2)])
+        with self.assertRaises(ValueError):
+            fit_surrogate(self.wall, 2, (0.02, 0.2), outputs=["unknown"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest.mock
+import numpy as np
+from becalib import sweeps
+from becalib.batch import evaluate_definitions
+from becalib.cli import evaluate_chunk
+from becalib.sweeps import (create_sweep, get_sweep_definitions, get_sweep_progress, load_sweep_results,
+                            run_sweep, run_sweep_worker)
+
+
+TEMPLATE = {
+    "name": "wall",
+    "heat_flow_direction": "Ho",
+    "layers": [
+        {"name": "concrete", "thickness": 0.1, "thermal_conductivity": 1.8,
+         "gross_density": 2400, "specific_heat_capacity": 1000},
+        {"name": "iso", "thickness": 0.05, "thermal_conductivity": 0.035,
+         "gross_density": 175, "specific_heat_capacity": 840},
+    ],
+}
+PARAMETERS = {
+    "layers.0.thickness": [0.1, 0.2, 0.3],
+    "layers.1.thickness": np.arange(0.02, 0.2, 0.01),
+    "heat_flow_direction": ["Ho", "Up"],
+}
+OUTPUTS = ["time_shift", "thermal_transmittance_component", "threshold_code_italian_dm_26_06_2009"]
+
+
+class TestSweeps(unittest.TestCase):
+
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self._temporary_directory.name
+        self.sweep = create_sweep(self.directory, TEMPLATE, PARAMETERS, unit_size=10, outputs=OUTPUTS)
+
+    def tearDown(self):
+        self._temporary_directory.cleanup()
+
+    def _write_claim(self, unit: int, claim: dict, age: float = 0):
+        path = os.path.join(self.directory, "claims", f"unit_{unit:08d}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(claim, file)
+        os.utime(path, (time.time() - age, time.time() - age))
+
+    def test_definitions_grid(self):
+        self.assertEqual(108, self.sweep["n_components"])
+        self.assertEqual(11, self.sweep["n_units"])
+        definitions = get_sweep_definitions(self.sweep, 0, 200)
+        self.assertEqual(108, len(definitions))
+        # last parameter varies fastest
+        self.assertEqual(("Ho", "Up"), (definitions[0]["heat_flow_direction"], definitions[1]["heat_flow_direction"]))
+        self.assertAlmostEqual(0.03, definitions[2]["layers"][1]["thickness"])
+        self.assertEqual(0.3, definitions[-1]["layers"][0]["thickness"])
+        self.assertEqual(0.05, TEMPLATE["layers"][1]["thickness"])
+
+    def test_same_values_as_batch(self):
+        results = run_sweep(self.directory, n_workers=3)
+        expected = evaluate_definitions(get_sweep_definitions(self.sweep, 0, 108), outputs=OUTPUTS)
+        for name in OUTPUTS:
+            self.assertTrue(np.array_equal(expected[name], results[name]), name)
+        progress = get_sweep_progress(self.directory)
+        self.assertEqual((11, 0, 108), (progress["completed_units"], progress["claimed_units"],
+                                        progress["completed_components"]))
+
+    def test_resume(self):
+        self.assertEqual(4, run_sweep_worker(self.directory, max_units=4))
+        results = load_sweep_results(self.directory)
+        n_completed = get_sweep_progress(self.directory)["completed_components"]
+        self.assertIn(n_completed, (38, 40))
+        self.assertEqual(n_completed, int(np.isfinite(results["time_shift"]).sum()))
+        self.assertEqual(108 - n_completed, int((results["threshold_code_italian_dm_26_06_2009"] == -1).sum()))
+
+        # same sweep: results kept, other sweep: error
+        create_sweep(self.directory, TEMPLATE, PARAMETERS, unit_size=10, outputs=OUTPUTS)
+        self.assertEqual(4, get_sweep_progress(self.directory)["completed_units"])
+        with self.assertRaises(ValueError):
+            create_sweep(self.directory, TEMPLATE, PARAMETERS, unit_size=20, outputs=OUTPUTS)
+
+        self.assertEqual(7, run_sweep_worker(self.directory))
+        self.assertTrue(np.isfinite(load_sweep_results(self.directory)["time_shift"]).all())
+
+        create_sweep(self.directory, TEMPLATE, PARAMETERS, unit_size=20, outputs=OUTPUTS, resume=False)
+        self.assertEqual(0, get_sweep_progress(self.directory)["completed_units"])
+
+    def test_claims(self):
+        # dead process of this pid namespace and expired lease: taken over, live claim: skipped
+        process = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                 capture_output=True, text=True, check=True)
+        self._write_claim(0, {"claim_id": "a", "host": socket.gethostname(),
+                              "namespace": sweeps._get_process_namespace(), "pid": int(process.stdout)})
+        self._write_claim(1, {"claim_id": "b", "host": "other host", "pid": 1}, age=1000)
+        # same hostname, other pid namespace (container): the pid is not probed
+        self._write_claim(2, {"claim_id": "c", "host": socket.gethostname(), "namespace": "other",
+                              "pid": int(process.stdout)}, age=10)
+
+        self.assertEqual(10, run_sweep_worker(self.directory, lease_timeout=600))
+        progress = get_sweep_progress(self.directory)
+        self.assertEqual((10, 1), (progress["completed_units"], progress["claimed_units"]))
+        self.assertTrue(np.isnan(load_sweep_results(self.directory)["time_shift"][20:30]).all())
+
+        self.assertEqual(1, run_sweep_worker(self.directory, lease_timeout=5))
+        self.assertEqual(0, get_sweep_progress(self.directory)["claimed_units"])
+
+    def test_claim_ownership(self):
+        self._write_claim(0, {"claim_id": "other", "worker": "B"})
+        path = os.path.join(self.directory, "claims", "unit_00000000.json")
+        self.assertFalse(sweeps._remove_claim(path, "mine"))
+        self.assertEqual("other", sweeps._read_claim(path)["claim_id"])
+        self.assertTrue(sweeps._remove_claim(path, "other"))
+        self.assertFalse(sweeps._remove_claim(path, "other"))
+        self.assertEqual([], os.listdir(os.path.join(self.directory, "claims")))
+
+    def test_claim_renewed_during_evaluation(self):
+        # units longer than the lease: the claim is renewed, not taken over
+        directory = os.path.join(self.directory, "slow")
+        create_sweep(directory, TEMPLATE, {"layers.0.thickness": [0.1, 0.2]}, unit_size=2, outputs=OUTPUTS)
+
+        def evaluate_slowly(*args, **kwargs):
+            time.sleep(1)
+            return evaluate_chunk(*args, **kwargs)
+
+        # no pid namespace: only the lease protects the claim
+        counts = []
+        with unittest.mock.patch.object(sweeps, "evaluate_chunk", evaluate_slowly), \
+                unittest.mock.patch.object(sweeps, "_get_process_namespace", lambda: None):
+            worker = threading.Thread(target=lambda: counts.append(run_sweep_worker(directory, lease_timeout=0.2)))
+            worker.start()
+            time.sleep(0.5)
+            counts.append(run_sweep_worker(directory, lease_timeout=0.2, worker_id="B"))
+            worker.join()
+        self.assertEqual([0, 1], counts)
+        self.assertEqual(0, get_sweep_progress(directory)["claimed_units"])
+
+    def test_invalid_parameter_combinations(self):
+        # invalid rows are NaN (-1 for class codes), the units are completed and not claimed again
+        directory = os.path.join(self.directory, "invalid")
+        create_sweep(directory, TEMPLATE, {"layers.0.thickness": [0.1, 0.2, 0.3], "heat_flow_direction": ["Ho", "Xx"]},
+                     unit_size=2, outputs=OUTPUTS)
+        results = run_sweep(directory, n_workers=2)
+
+        self.assertTrue(np.isnan(results["time_shift"][1::2]).all())
+        self.assertTrue((results["threshold_code_italian_dm_26_06_2009"][1::2] == -1).all())
+        self.assertTrue(np.isfinite(results["time_shift"][::2]).all())
+        progress = get_sweep_progress(directory)
+        self.assertEqual((3, 0, 3), (progress["completed_units"], progress["claimed_units"],
+                                     progress["invalid_components"]))
+        self.assertEqual(0, run_sweep_worker(directory))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            create_sweep(self.directory, TEMPLATE, {"layers.5.thickness": [0.1]}, resume=False)
+        with self.assertRaises(ValueError):
+            create_sweep(self.directory, TEMPLATE, {"heat_flow_direction": []}, resume=False)
+        with self.assertRaises(ValueError):
+            run_sweep_worker(os.path.join(self.directory, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import os
+import itertools
+import json
+import tempfile
+import numpy as np
+from becalib.batch import evaluate_definitions
+from becalib.definitions import read_definitions, write_definitions
+from becalib.synthetic import iter_synthetic_definitions, SYNTHETIC_MATERIALS, AIR_GAP_THICKNESSES
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def test_reproducible(self):
+        definitions = list(iter_synthetic_definitions(50, seed=3))
+        self.assertEqual(definitions, list(iter_synthetic_definitions(50, seed=3)))
+        self.assertNotEqual(definitions, list(iter_synthetic_definitions(50, seed=4)))
+        # endless stream, same first components
+        self.assertEqual(definitions, list(itertools.islice(iter_synthetic_definitions(seed=3), 50)))
+
+    def test_plausible(self):
+        definitions = list(iter_synthetic_definitions(
+            2000, n_layers={3: 1, 5: 2, 7: 1}, air_gap_probability=0.5,
+            heat_flow_directions={"Ho": 0.7, "Up": 0.3}, seed=1))
+
+        counts = np.array([len(definition["layers"]) for definition in definitions])
+        self.assertEqual(set(counts), {3, 5, 7})
+        self.assertAlmostEqual(np.mean(counts == 5), 0.5, delta=0.05)
+        directions = np.array([definition["heat_flow_direction"] for definition in definitions])
+        self.assertAlmostEqual(np.mean(directions == "Up"), 0.3, delta=0.05)
+
+        n_air_gaps = 0
+        for definition in definitions:
+            layers = definition["layers"]
+            for j, layer in enumerate(layers):
+                if layer["is_air"]:
+                    n_air_gaps += 1
+                    # between two core layers
+                    self.assertTrue(2 <= j <= len(layers) - 3)
+                    self.assertFalse(layers[j - 1]["is_air"] or layers[j + 1]["is_air"])
+                    self.assertTrue(AIR_GAP_THICKNESSES[0] <= layer["thickness"] <= AIR_GAP_THICKNESSES[1])
+                    self.assertEqual(layer["heat_flow_direction"], definition["heat_flow_direction"])
+                    continue
+                _role, *ranges = SYNTHETIC_MATERIALS[layer["name"]]
+                for key, (low, high) in zip(("thickness", "thermal_conductivity", "gross_density",
+                                             "specific_heat_capacity", "vapour_resistance_factor"), ranges):
+                    self.assertTrue(0.99 * low <= layer[key] <= 1.01 * high, (key, layer))
+            self.assertEqual(SYNTHETIC_MATERIALS[layers[0]["name"]][0][-6:], "finish")
+            self.assertEqual(SYNTHETIC_MATERIALS[layers[-1]["name"]][0][-6:], "finish")
+        # 3 layers components have no air gap
+        self.assertAlmostEqual(n_air_gaps / np.sum(counts > 3), 0.5, delta=0.05)
+
+        results = evaluate_definitions(definitions)
+        self.assertTrue(np.all(np.isfinite(results["time_shift"])))
+        self.assertTrue(np.all((results["thermal_transmittance_component"] > 0.05)
+                               & (results["thermal_transmittance_component"] < 5)))
+
+    def test_write_definitions(self):
+        definitions = list(iter_synthetic_definitions(20, n_layers=(1, 6), air_gap_probability=1, seed=2))
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in ("json", "jsonl", "csv", "toml"):
+                path = os.path.join(directory, f"synthetic.{extension}")
+                self.assertEqual(write_definitions(path, iter(definitions)), 20)
+                read = read_definitions(path)
+                if extension == "csv":
+                    # air layers of csv rows have no heat flow direction
+                    for definition in read:
+                        for layer in definition["layers"]:
+                            if layer["is_air"]:
+                                layer["heat_flow_direction"] = definition["heat_flow_direction"]
+                                for key in ("thermal_conductivity", "gross_density",
+                                            "specific_heat_capacity", "vapour_resistance_factor"):
+                                    layer.pop(key, None)
+                self.assertEqual(read, definitions, extension)
+            with self.assertRaises(ValueError):
+                write_definitions(os.path.join(directory, "synthetic.xml"), definitions)
+
+    def test_toml_round_trip(self):
+        # inline tables of sections, arrays, None values left out
+        definition = {
+            "name": "timber frame \"A\"",
+            "heat_flow_direction": "Ho",
+            "time_period": 24,
+            "construction_ids": ["c-1", "c-2"],
+            "layers": [
+                {"name": "frame", "thickness": 0.1, "sections": [
+                    {"fraction": 0.85, "layer": {"name": "mineral wool", "thickness": 0.1, "thermal_conductivity": 0.04,
+                                                 "gross_density": 50, "specific_heat_capacity": 1030,
+                                                 "vapour_resistance_factor": None, "is_air": False}},
+                    {"fraction": 0.15, "layer": {"name": "stud", "thickness": 0.1, "thermal_conductivity": 0.13,
+                                                 "gross_density": 500, "specific_heat_capacity": 1600,
+                                                 "is_air": False}}]},
+                {"name": "board", "thickness": 0.012, "thermal_conductivity": 0.13, "gross_density": 600,
+                 "specific_heat_capacity": 1700, "vapour_resistance_factor": None, "is_air": False},
+            ],
+        }
+        expected = json.loads(json.dumps(definition).replace(', "vapour_resistance_factor": null', ""))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frame.toml")
+            self.assertEqual(1, write_definitions(path, [definition]))
+            self.assertEqual([expected], read_definitions(path))
+            self.assertTrue(np.allclose(evaluate_definitions([definition])["time_shift"],
+                                        evaluate_definitions(read_definitions(path))["time_shift"]))
+            with self.assertRaises(ValueError):
+                write_definitions(path, [{**definition, "tags": {"a", "b"}}])
+
+    def test_invalid_inputs(self):
+        for arguments in ({"n_layers": 0}, {"n_layers": {3: 0}}, {"heat_flow_directions": "Side"},
+                          {"air_gap_probability": 2}):
+            with self.assertRaises(ValueError):
+                next(iter_synthetic_definitions(1, **arguments))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import builtins
+import concurrent.futures
+import sys
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer, Component
+from becalib.batch import evaluate_batch, evaluate_batch_threaded, BATCH_OUTPUTS
+from becalib.translator import get_translator
+
+
+def get_shared_layers():
+    concrete = MaterialLayer(name="concrete", thickness=0.2, thermal_conductivity=1.8,
+                             gross_density=2400, specific_heat_capacity=1000)
+    iso = MaterialLayer(name="iso", thickness=0.08, thermal_conductivity=0.035,
+                        gross_density=30, specific_heat_capacity=1030)
+    air = AirLayer(name="air", thickness=0.05, heat_flow_direction="Ho")
+    return concrete, iso, air
+
+
+class TestThreads(unittest.TestCase):
+
+    def setUp(self):
+        # frequent thread switches (GIL builds) to interleave evaluations
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._switch_interval)
+
+    def test_shared_air_layer(self):
+        concrete, iso, air = get_shared_layers()
+        layers = [concrete, air, iso]
+        expected = {direction: Component(name=direction, layers=layers, heat_flow_direction=direction)
+                    for direction in ("Ho", "Up", "Do")}
+        self.assertNotEqual(expected["Up"].thermal_resistance_component,
+                            expected["Do"].thermal_resistance_component)
+
+        def evaluate(i: int) -> tuple:
+            direction = ("Ho", "Up", "Do")[i % 3]
+            component = Component(name=direction, layers=layers, heat_flow_direction=direction)
+            return direction, component.thermal_resistance_component, component.time_shift
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for direction, resistance, time_shift in executor.map(evaluate, range(600)):
+                self.assertEqual(expected[direction].thermal_resistance_component, resistance)
+                self.assertEqual(expected[direction].time_shift, time_shift)
+
+        # inputs are not modified
+        self.assertEqual("Ho", air.heat_flow_direction)
+        self.assertEqual("en", air.language)
+
+    def test_batch_threaded(self):
+        concrete, iso, air = get_shared_layers()
+        wood = MaterialLayer(name="wood", thickness=0.08, thermal_conductivity=0.13,
+                             gross_density=450, specific_heat_capacity=1600)
+        frame = InhomogeneousLayer(name="frame", thickness=0.08, sections=[(0.85, iso), (0.15, wood)])
+        layers_list = [[concrete, air, iso], [iso, concrete], [concrete, frame]] * 70
+        directions = ["Ho", "Up", "Do", "Do"] * 52 + ["Ho", "Up"]
+
+        expected = evaluate_batch(layers_list, directions)
+        results = evaluate_batch_threaded(layers_list, directions, max_workers=8, chunk_size=7)
+        for name in BATCH_OUTPUTS:
+            self.assertTrue(np.array_equal(expected[name], results[name]), name)
+        self.assertEqual("Ho", air.heat_flow_direction)
+
+        with self.assertRaises(ValueError):
+            evaluate_batch_threaded(layers_list, chunk_size=0)
+
+    def test_translations_without_global_state(self):
+        underscore = builtins.__dict__.get("_")
+        concrete, iso, air = get_shared_layers()
+        layers = [concrete, air, iso]
+        expected = {language: Component(name="wall", layers=layers, heat_flow_direction="Up",
+                                        language=language).get_values()
+                    for language in ("en", "fr")}
+        self.assertNotEqual(expected["en"], expected["fr"])
+
+        def get_values(i: int) -> tuple:
+            language = ("en", "fr")[i % 2]
+            return language, Component(name="wall", layers=layers, heat_flow_direction="Up",
+                                       language=language).get_values()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for language, values in executor.map(get_values, range(100)):
+                self.assertEqual(expected[language], values)
+
+        self.assertIs(underscore, builtins.__dict__.get("_"))
+        self.assertEqual("Ho", air.heat_flow_direction)
+        self.assertEqual("en", air.language)
+        self.assertIs(get_translator("fr"), get_translator("fr"))
+
+
+if __name__ == '__main__':
+    unittest.main()
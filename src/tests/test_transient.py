@@ -0,0 +1,103 @@
+import unittest
+import numpy as np
+from becalib import MaterialLayer, AirLayer, InhomogeneousLayer, Component
+from becalib.batch import get_layers_arrays
+from becalib.transient import get_transient_response, get_transient_response_arrays, get_cells_arrays
+from tests.test_solver import get_test_wall
+
+
+class TestTransient(unittest.TestCase):
+
+    def setUp(self):
+        self.wall = get_test_wall()
+        air = AirLayer(name="air", thickness=0.04)
+        self.roof = Component(name="roof", layers=[self.wall.layers[0], air, self.wall.layers[1]],
+                              heat_flow_direction="Up")
+
+    def test_steady_state(self):
+        results = get_transient_response([self.wall.layers, self.roof.layers], ["Ho", "Up"], 20, np.zeros(4))
+        for i, component in enumerate((self.wall, self.roof)):
+            heat_flux = 20 * component.thermal_transmittance_component
+            np.testing.assert_allclose(results["interior_heat_fluxes"][i], heat_flux)
+            np.testing.assert_allclose(results["exterior_heat_fluxes"][i], heat_flux)
+            np.testing.assert_allclose(results["interior_surface_temperatures"][i],
+                                       20 - component.thermal_resistances[0] * heat_flux)
+        # plaster 2 cells, air 1 cell, concrete 20 cells
+        self.assertEqual(np.sum(np.isfinite(results["temperatures"][1])), 2 + 1 + 20)
+
+    def test_periodic(self):
+        """periodic regime of a sinusoidal exterior temperature: Y_ie and time shift of ISO 13786
+        """
+        time_step, time_period = 0.1, 24
+        times = np.arange(int(6 * time_period / time_step) + 1) * time_step
+        results = get_transient_response([self.wall.layers], "Ho", 0, np.cos(2 * np.pi * times / time_period),
+                                         time_step=time_step, theta=0.5)
+        last_period = slice(-int(time_period / time_step), None)
+        # heat flux into the room
+        heat_fluxes = -results["interior_heat_fluxes"][0, last_period]
+        harmonic = 2 * np.mean(heat_fluxes * np.exp(-2j * np.pi * times[last_period] / time_period))
+        self.assertAlmostEqual(abs(harmonic), self.wall.periodic_thermal_transmittance, delta=0.002)
+        self.assertAlmostEqual(-np.angle(harmonic) * time_period / (2 * np.pi) % time_period,
+                               self.wall.time_shift, delta=0.05)
+
+    def test_energy_balance(self):
+        """implicit Euler: stored heat = interior minus exterior heat flows
+        """
+        layers_arrays = get_layers_arrays([self.wall.layers, self.roof.layers], ["Ho", "Up"])
+        exterior_temperatures = np.r_[np.full(5, 20.0), np.full(100, 35.0)]
+        time_step = 0.5
+        results = get_transient_response_arrays(layers_arrays, 20, exterior_temperatures, time_step=time_step)
+        capacities = get_cells_arrays(layers_arrays)["capacities"]
+        stored = np.nansum(capacities * (results["temperatures"] - 20), axis=1)
+        flows = time_step * 3600 * np.sum(
+            results["interior_heat_fluxes"][:, 1:] - results["exterior_heat_fluxes"][:, 1:], axis=1)
+        np.testing.assert_allclose(stored, flows, rtol=1e-9)
+
+    def test_vectorized(self):
+        """components solved together or alone give the same values
+        """
+        exterior_temperatures = np.array([[25, 30, 35, 35, 30], [20, 20, 40, 40, 40]], dtype=float)
+        together = get_transient_response([self.wall.layers, self.roof.layers], ["Ho", "Up"],
+                                          26, exterior_temperatures, time_step=0.25)
+        for i, component in enumerate((self.wall, self.roof)):
+            alone = get_transient_response([component.layers], component.heat_flow_direction,
+                                           26, exterior_temperatures[i], time_step=0.25)
+            for name, values in alone.items():
+                n_cells = values.shape[1] if name in ("temperatures", "depths") else None
+                np.testing.assert_allclose(together[name][i, :n_cells], values[0], rtol=1e-12)
+
+    def test_inhomogeneous_layers(self):
+        """equivalent homogeneous cells: lower limit resistance, area-weighted heat capacity
+        """
+        plaster, concrete, insulation = self.wall.layers
+        stud = MaterialLayer(name="stud", thickness=0.1, thermal_conductivity=0.13,
+                             gross_density=450, specific_heat_capacity=1600)
+        air = AirLayer(name="air", thickness=0.1)
+        frame = InhomogeneousLayer(name="frame", thickness=0.1,
+                                   sections=[(0.8, insulation), (0.1, stud), (0.1, air)])
+        layers_list = [[plaster, concrete, frame], self.wall.layers, [plaster, frame, frame]]
+        layers_arrays = get_layers_arrays(layers_list, "Ho")
+
+        results = get_transient_response_arrays(layers_arrays, 20, np.zeros(4))
+        alone = get_transient_response([self.wall.layers], "Ho", 20, np.zeros(4))
+        np.testing.assert_allclose(results["interior_heat_fluxes"][1], alone["interior_heat_fluxes"][0])
+        for i, layers in enumerate(layers_list):
+            resistance = sum(layer.thermal_resistance for layer in layers) + 0.13 + 0.04
+            np.testing.assert_allclose(results["interior_heat_fluxes"][i], 20 / resistance)
+
+        capacities = get_cells_arrays(layers_arrays)["capacities"]
+        self.assertEqual(3, capacities.shape[0])
+        np.testing.assert_allclose(np.sum(capacities[2]), plaster.thickness * 1400 * 840 + 2 * 0.1 * (
+            0.8 * 70 * 700 + 0.1 * 450 * 1600))
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            get_transient_response([self.wall.layers], "Ho", 20, np.zeros(4), theta=0)
+        with self.assertRaises(ValueError):
+            get_transient_response([self.wall.layers], "Ho", np.zeros((2, 4)), np.zeros(4))
+        with self.assertRaises(ValueError):
+            get_transient_response([self.wall.layers], "Ho", 20, np.zeros(4), cell_thickness=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from becalib.weather import (
+    read_epw,
+    get_sun_vectors,
+    get_incident_solar_radiations,
+    get_sol_air_temperatures,
+    get_design_day_index,
+    get_periodic_profiles,
+    get_design_day_profiles,
+)
+
+
+EPW_HEADER = """LOCATION,Torino,PIE,ITA,IGDG,160590,45.22,7.65,1.0,287.0
+DESIGN CONDITIONS,0
+TYPICAL/EXTREME PERIODS,0
+GROUND TEMPERATURES,0
+HOLIDAYS/DAYLIGHT SAVINGS,No,0,0,0
+COMMENTS 1,synthetic test file
+COMMENTS 2,
+DATA PERIODS,1,1,Data,Sunday, 1/ 1,12/31
+"""
+
+
+def write_test_epw(path: str):
+    """synthetic year: daily cosine of dry bulb temperature (max at 15:00), hottest day 200
+    """
+    dates = pd.date_range("2023-01-01", periods=8760, freq="h")
+    hours = dates.hour.to_numpy() + 1
+    dry_bulb = 20 + 5 * np.cos(2 * np.pi * (hours - 15) / 24)
+    dry_bulb[200 * 24:201 * 24] += 10
+    sun_up = (hours > 6) & (hours < 19)
+
+    rows = []
+    for i in range(8760):
+        fields = [2023, dates.month[i], dates.day[i], hours[i], 60, "?9?9?9?9E0?9?9?9",
+                  f"{dry_bulb[i]:.3f}", 10, 50, 101325, 0, 1415, 300,
+                  500 if sun_up[i] else 0, 400 if sun_up[i] else 0, 100 if sun_up[i] else 0,
+                  0, 0, 0, 0, 180, 2.0, 5, 5, 777.7, 77777, 9, 999999999, 0, 0, 0, 88, 0.2, 0, 0]
+        rows.append(",".join(str(field) for field in fields))
+    # one missing value
+    rows[10] = rows[10].replace(",500,", ",9999,", 1)
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(EPW_HEADER + "\n".join(rows) + "\n")
+
+
+class TestWeather(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._temporary_directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls._temporary_directory.name, "test.epw")
+        write_test_epw(cls.path)
+        cls.weather = read_epw(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temporary_directory.cleanup()
+
+    def test_read_epw(self):
+        weather = self.weather
+        self.assertEqual("Torino", weather.city)
+        self.assertEqual(45.22, weather.latitude)
+        self.assertEqual(1.0, weather.time_zone)
+        self.assertEqual(8760, weather.n_hours)
+        self.assertEqual(np.float64, weather.dry_bulb_temperature.dtype)
+        self.assertTrue(np.isnan(weather.global_horizontal_radiation[10]))
+        self.assertEqual(365, weather.day_of_year[-1])
+
+    def test_invalid_epw(self):
+        path = os.path.join(self._temporary_directory.name, "invalid.epw")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("not an epw file\n")
+        with self.assertRaises(ValueError):
+            read_epw(path)
+
+    def test_sun_vectors(self):
+        sun = get_sun_vectors(self.weather)
+        self.assertTrue(np.allclose(1, np.linalg.norm(sun, axis=1)))
+
+        # summer solstice, solar noon altitude close to 90 - latitude + 23.45
+        noon = 171 * 24 + np.argmax(sun[171 * 24:172 * 24, 2])
+        altitude = np.degrees(np.arcsin(sun[noon, 2]))
+        self.assertLess(abs(altitude - (90 - 45.22 + 23.45)), 1.5)
+        # sun is south at noon
+        self.assertLess(sun[noon, 1], 0)
+
+    def test_incident_radiations(self):
+        weather = self.weather
+        radiations = get_incident_solar_radiations(weather, azimuths=[180, 0, 0], tilts=[90, 90, 0])
+        self.assertEqual((3, 8760), radiations.shape)
+
+        # winter: south wall receives more than north wall
+        january = slice(0, 31 * 24)
+        self.assertGreater(np.nansum(radiations[0, january]), np.nansum(radiations[1, january]))
+
+        # horizontal: direct on horizontal + diffuse
+        sun = get_sun_vectors(weather)
+        expected = weather.direct_normal_radiation * np.where(sun[:, 2] > 0, sun[:, 2], 0) \
+            + weather.diffuse_horizontal_radiation
+        valid = np.ones(8760, dtype=bool)
+        valid[10] = False
+        self.assertTrue(np.allclose(expected[valid], radiations[2, valid]))
+        # missing values propagate
+        self.assertTrue(np.isnan(radiations[:, 10]).all())
+
+    def test_sol_air_temperatures(self):
+        weather = self.weather
+        sol_air = get_sol_air_temperatures(weather, azimuths=[180, 90], tilts=[90, 90],
+                                           solar_absorptances=[0.3, 0.9])
+        radiations = get_incident_solar_radiations(weather, azimuths=[180, 90], tilts=[90, 90])
+
+        hour = 180 * 24 + 12
+        expected = weather.dry_bulb_temperature[hour] + 0.04 * (0.9 * radiations[1, hour] - 0.5 * 5 * 0.9 * 11)
+        self.assertAlmostEqual(expected, sol_air[1, hour])
+        # night: below air temperature
+        self.assertLess(sol_air[0, 180 * 24 + 2], weather.dry_bulb_temperature[180 * 24 + 2])
+
+    def test_periodic_profiles(self):
+        hours = np.arange(1, 25)
+        values = np.stack([20 + 5 * np.cos(2 * np.pi * (hours - 15) / 24),
+                           30 + 2 * np.cos(2 * np.pi * (hours - 3.5) / 24)])
+        profiles = get_periodic_profiles(values)
+
+        self.assertTrue(np.allclose([20, 30], profiles["mean"]))
+        self.assertTrue(np.allclose([5, 2], profiles["amplitude"]))
+        self.assertTrue(np.allclose([15, 3.5], profiles["time_of_max"]))
+        self.assertTrue(np.allclose([25, 32], profiles["max_temp"]))
+
+    def test_design_day(self):
+        weather = self.weather
+        self.assertEqual(200, get_design_day_index(weather))
+        self.assertEqual(0, get_design_day_index(weather, month=1) // 31)
+
+        profiles = get_design_day_profiles(weather)
+        self.assertAlmostEqual(30, profiles["mean"], places=2)
+        self.assertAlmostEqual(15, profiles["time_of_max"], places=2)
+
+        sol_air = get_sol_air_temperatures(weather, azimuths=[180, 270], tilts=[90, 90])
+        profiles = get_design_day_profiles(weather, sol_air)
+        self.assertEqual((2, 24), profiles["hourly"].shape)
+        self.assertEqual((2,), profiles["max_temp"].shape)
+
+
+if __name__ == '__main__':
+    unittest.main()